@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark determinístico do ranking e do mapeamento em `nsr_learn.analogy.AnalogyEngine`.
+
+Registra milhares de estruturas aleatórias (semente fixa) sobre um
+vocabulário de predicados e consulta variantes com entidades renomeadas de
+estruturas registradas. Mede o tempo de `find_similar_domain` (índice de
+assinaturas) e de `reason_by_analogy`, confere o ranking contra a varredura
+completa por similaridade de Jaccard e verifica se o mapeamento recupera a
+correspondência plantada.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from typing import List, Sequence, Set, Tuple
+
+from nsr_learn.analogy import AnalogyEngine, Relation, Structure
+
+Facts = List[Tuple[str, ...]]
+
+
+def random_facts(rng: random.Random, predicates: int) -> Facts:
+    entities = [f"e{i}" for i in range(rng.randint(3, 8))]
+    facts: Set[Tuple[str, ...]] = set()
+    for _ in range(rng.randint(3, 12)):
+        index = rng.randrange(predicates)
+        arity = 1 + index % 3
+        facts.add((f"p{index}", *rng.sample(entities, min(arity, len(entities)))))
+    return sorted(facts)
+
+
+def renamed(facts: Sequence[Tuple[str, ...]], rng: random.Random) -> Facts:
+    """Mesma estrutura com entidades renomeadas e fatos embaralhados."""
+    variant = [(fact[0], *(f"alvo_{arg}" for arg in fact[1:])) for fact in facts]
+    rng.shuffle(variant)
+    return variant
+
+
+def jaccard_ranking(engine: AnalogyEngine, target: Structure, min_score: float) -> List[Tuple[str, float]]:
+    """Varredura completa (sem índice), como referência."""
+    keys = set(target.relation_signature())
+    ranking = []
+    for name, source in engine.known_structures.items():
+        if name == target.name:
+            continue
+        other = set(source.relation_signature())
+        union = len(keys | other)
+        score = len(keys & other) / union if union else 0.0
+        if score >= min_score:
+            ranking.append((name, score))
+    return sorted(ranking, key=lambda item: -item[1])
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Ranking de domínios análogos com milhares de estruturas.")
+    parser.add_argument("--structures", type=int, nargs="+", default=[1000, 5000], help="Estruturas registradas (default: 1000 5000).")
+    parser.add_argument("--predicates", type=int, default=60, help="Tamanho do vocabulário de predicados (default: 60).")
+    parser.add_argument("--queries", type=int, default=50, help="Consultas por tamanho (default: 50).")
+    parser.add_argument("--seed", type=int, default=23, help="Semente (default: 23).")
+    parser.add_argument("--max-ms", type=float, help="Falha se a mediana de find_similar_domain passar deste valor.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    exit_code = 0
+    for count in args.structures:
+        rng = random.Random(args.seed + count)
+        engine = AnalogyEngine()
+        corpus = [random_facts(rng, args.predicates) for _ in range(count)]
+        t0 = time.perf_counter()
+        for index, facts in enumerate(corpus):
+            engine.register_structure(Structure.from_facts(f"s{index}", facts))
+        register_ms = (time.perf_counter() - t0) * 1000
+
+        ranking_ms: List[float] = []
+        reasoning_ms: List[float] = []
+        mismatches = 0
+        recovered = 0
+        for _ in range(args.queries):
+            planted = rng.randrange(count)
+            target = Structure.from_facts("consulta", renamed(corpus[planted], rng))
+
+            t0 = time.perf_counter()
+            similar = engine.find_similar_domain(target)
+            ranking_ms.append((time.perf_counter() - t0) * 1000)
+            if [(s.name, score) for s, score in similar] != jaccard_ranking(engine, target, 0.3):
+                mismatches += 1
+
+            query = target.relations[0]
+            t0 = time.perf_counter()
+            engine.reason_by_analogy(target, Relation(query.predicate, query.args))
+            reasoning_ms.append((time.perf_counter() - t0) * 1000)
+
+            # Recuperado: toda relação da fonte cai numa relação existente do alvo
+            analogy = engine.find_analogy(engine.known_structures[f"s{planted}"], target, min_score=0.0)
+            if analogy is not None and analogy.confidence == 1.0 and not analogy.inferences:
+                recovered += 1
+
+        median = statistics.median(ranking_ms)
+        print(
+            f"structures={count:5d} register={register_ms:8.1f} ms find_similar_domain median={median:7.3f} ms "
+            f"reason_by_analogy median={statistics.median(reasoning_ms):7.3f} ms "
+            f"ranking_mismatches={mismatches} mapped={recovered}/{args.queries}"
+        )
+        if mismatches:
+            print(f"ERROR: structures={count}: ranking diverge da varredura completa", flush=True)
+            exit_code = 1
+        if args.max_ms is not None and median > args.max_ms:
+            print(f"ERROR: structures={count}: {median:.3f} ms > {args.max_ms} ms", flush=True)
+            exit_code = 1
+    raise SystemExit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark determinístico da inferência em `nsr.bayes_engine.BayesNetwork`.
+
+Gera redes aleatórias (semente fixa) com 20–40 variáveis e mede o tempo por
+consulta da eliminação de variáveis e o tempo de uma calibração da junction
+tree (todas as marginais de uma evidência). Em redes pequenas os resultados
+também são conferidos contra a enumeração completa, que é exponencial no
+número de variáveis.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import random
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+from nsr.bayes_engine import BayesNetwork
+
+
+def random_network(size: int, rng: random.Random, max_parents: int = 3, max_values: int = 3) -> BayesNetwork:
+    """Rede com variáveis em ordem topológica e pais entre as anteriores."""
+    network = BayesNetwork()
+    for position in range(size):
+        name = f"X{position}"
+        values = tuple(f"v{k}" for k in range(rng.randint(2, max_values)))
+        window = list(range(max(0, position - 6), position))
+        parents = tuple(f"X{p}" for p in sorted(rng.sample(window, min(len(window), rng.randint(0, max_parents)))))
+        network.add_variable(name, values=values, parents=parents)
+        parent_values = [network.variables[parent].values for parent in parents]
+        for combination in itertools.product(*parent_values):
+            weights = [rng.random() + 0.05 for _ in values]
+            total = sum(weights)
+            network.set_distribution(
+                name,
+                given=dict(zip(parents, combination)),
+                distribution={value: weight / total for value, weight in zip(values, weights)},
+            )
+    return network
+
+
+def random_query(network: BayesNetwork, rng: random.Random, max_evidence: int) -> Tuple[str, Dict[str, str]]:
+    names = list(network.variables)
+    query = rng.choice(names)
+    candidates = [name for name in names if name != query]
+    observed = rng.sample(candidates, rng.randint(0, min(max_evidence, len(candidates))))
+    return query, {name: rng.choice(network.variables[name].values) for name in observed}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Eliminação de variáveis em redes Bayesianas aleatórias.")
+    parser.add_argument("--variables", type=int, nargs="+", default=[20, 30, 40], help="Tamanhos das redes (default: 20 30 40).")
+    parser.add_argument("--queries", type=int, default=50, help="Consultas por rede (default: 50).")
+    parser.add_argument("--max-evidence", type=int, default=5, help="Máximo de variáveis observadas (default: 5).")
+    parser.add_argument("--seed", type=int, default=13, help="Semente das redes (default: 13).")
+    parser.add_argument(
+        "--verify-size",
+        type=int,
+        default=12,
+        help="Tamanho das redes conferidas contra a enumeração (default: 12; 0 desativa).",
+    )
+    parser.add_argument("--max-ms", type=float, help="Falha se a mediana por consulta passar deste valor.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    exit_code = 0
+    if args.verify_size > 0:
+        rng = random.Random(args.seed)
+        network = random_network(args.verify_size, rng)
+        mismatches = 0
+        for _ in range(args.queries):
+            query, evidence = random_query(network, rng, args.max_evidence)
+            expected = network.posterior(query, evidence, method="enumeration")
+            if network.posterior(query, evidence) != expected:
+                mismatches += 1
+            if network.posterior(query, evidence, method="junction_tree") != expected:
+                mismatches += 1
+        print(f"verify n={args.verify_size} queries={args.queries} mismatches={mismatches}")
+        if mismatches:
+            print("ERROR: inferência diverge da enumeração", flush=True)
+            exit_code = 1
+    for size in args.variables:
+        rng = random.Random(args.seed + size)
+        network = random_network(size, rng)
+        queries = [random_query(network, rng, args.max_evidence) for _ in range(args.queries)]
+        samples: List[float] = []
+        for query, evidence in queries:
+            t0 = time.perf_counter()
+            network.posterior(query, evidence)
+            samples.append((time.perf_counter() - t0) * 1000)
+        calibrations: List[float] = []
+        for _, evidence in queries:
+            t0 = time.perf_counter()
+            network.marginals(evidence)
+            calibrations.append((time.perf_counter() - t0) * 1000)
+        median = statistics.median(samples)
+        print(
+            f"n={size:3d} queries={len(queries)} elimination median={median:8.3f} ms max={max(samples):8.3f} ms "
+            f"junction_tree(all marginals) median={statistics.median(calibrations):8.3f} ms"
+        )
+        if args.max_ms is not None and median > args.max_ms:
+            print(f"ERROR: n={size}: {median:.3f} ms > {args.max_ms} ms", flush=True)
+            exit_code = 1
+    raise SystemExit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark determinístico do planejador do `WorldModel` no mundo de blocos.
+
+Gera problemas aleatórios (semente fixa) com N blocos sobre
+`create_blocks_world()` — torres iniciais e finais embaralhadas — e mede,
+para cada combinação de busca e heurística, problemas resolvidos, tamanho
+médio do plano, expansões e tempo.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from typing import FrozenSet, List, Sequence, Tuple
+
+from nsr_learn.world_model import HEURISTICS, SEARCH_MODES, Fluent, State, create_blocks_world
+
+
+def random_towers(blocks: Sequence[str], rng: random.Random) -> List[List[str]]:
+    """Distribui os blocos em torres aleatórias (base primeiro)."""
+    order = list(blocks)
+    rng.shuffle(order)
+    towers: List[List[str]] = []
+    for block in order:
+        if towers and rng.random() < 0.6:
+            rng.choice(towers).append(block)
+        else:
+            towers.append([block])
+    return towers
+
+
+def towers_fluents(towers: Sequence[Sequence[str]]) -> FrozenSet[Fluent]:
+    fluents = {Fluent("arm_empty", ())}
+    for tower in towers:
+        fluents.add(Fluent("on_table", (tower[0],)))
+        fluents.add(Fluent("clear", (tower[-1],)))
+        for below, above in zip(tower, tower[1:]):
+            fluents.add(Fluent("on", (above, below)))
+    return frozenset(fluents)
+
+
+def make_problem(n: int, rng: random.Random) -> Tuple[State, FrozenSet[Fluent]]:
+    blocks = [f"b{i}" for i in range(n)]
+    initial = State(towers_fluents(random_towers(blocks, rng)))
+    goal = frozenset(f for f in towers_fluents(random_towers(blocks, rng)) if f.predicate == "on")
+    return initial, goal
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Planejamento no mundo de blocos (10–20 blocos).")
+    parser.add_argument("--blocks", type=int, nargs="+", default=[10, 15, 20], help="Números de blocos (default: 10 15 20).")
+    parser.add_argument("--problems", type=int, default=3, help="Problemas por tamanho (default: 3).")
+    parser.add_argument("--seed", type=int, default=7, help="Semente dos problemas (default: 7).")
+    parser.add_argument(
+        "--search",
+        nargs="+",
+        choices=SEARCH_MODES,
+        default=["astar", "beam"],
+        help="Buscas a comparar (default: astar beam).",
+    )
+    parser.add_argument(
+        "--heuristic",
+        nargs="+",
+        choices=HEURISTICS,
+        default=["ff", "h_add"],
+        help="Heurísticas a comparar (default: ff h_add).",
+    )
+    parser.add_argument("--max-nodes", type=int, default=5000, help="Orçamento de expansões por problema (default: 5000).")
+    parser.add_argument("--max-depth", type=int, default=200, help="Profundidade máxima do plano (default: 200).")
+    parser.add_argument("--beam-width", type=int, default=16, help="Largura do feixe (default: 16).")
+    parser.add_argument("--weight", type=float, default=1.0, help="Peso da heurística no A*/IDA* (default: 1.0).")
+    parser.add_argument("--min-solved", type=float, help="Falha se alguma configuração resolver menos desta fração.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    exit_code = 0
+    for n in args.blocks:
+        rng = random.Random(args.seed + n)
+        problems = [make_problem(n, rng) for _ in range(args.problems)]
+        for search in args.search:
+            for heuristic in args.heuristic:
+                model = create_blocks_world()
+                solved = 0
+                lengths: List[int] = []
+                expanded: List[int] = []
+                t0 = time.perf_counter()
+                for initial, goal in problems:
+                    plan = model.plan(
+                        initial,
+                        goal,
+                        max_depth=args.max_depth,
+                        heuristic=heuristic,
+                        search=search,
+                        max_nodes=args.max_nodes,
+                        beam_width=args.beam_width,
+                        weight=args.weight,
+                    )
+                    expanded.append(model.search_stats["expanded"])
+                    if plan is None:
+                        continue
+                    if not model.simulate(initial, plan.actions)[-1].satisfies(goal):
+                        print(f"ERROR: n={n} {search}/{heuristic}: plano inválido", flush=True)
+                        exit_code = 1
+                        continue
+                    solved += 1
+                    lengths.append(plan.length)
+                elapsed = time.perf_counter() - t0
+                mean_length = statistics.fmean(lengths) if lengths else 0.0
+                print(
+                    f"n={n:2d} {search:5s} {heuristic:10s} solved={solved}/{len(problems)} "
+                    f"len={mean_length:6.1f} expanded={statistics.fmean(expanded):8.1f} time={elapsed:7.2f}s"
+                )
+                if args.min_solved is not None and solved < args.min_solved * len(problems):
+                    print(f"ERROR: n={n} {search}/{heuristic}: {solved}/{len(problems)} resolvidos", flush=True)
+                    exit_code = 1
+    raise SystemExit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark determinístico do custo de importação (cold start) do pacote NSR.
+
+Executa `python -X importtime -c "import <alvo>"` em subprocessos limpos, agrega o
+tempo próprio/cumulativo por submódulo do pacote e falha quando o cold start
+(mediana do cumulativo do alvo) ultrapassa o limite configurado.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+
+DEFAULT_TARGETS: Sequence[str] = ("nsr", "nsr.cli", "metanucleus.cli.chat")
+
+
+@dataclass(frozen=True)
+class ImportSample:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> List[ImportSample]:
+    """Converte as linhas `import time: self | cumulative | pacote` em amostras."""
+
+    samples: List[ImportSample] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        payload = line[len("import time:") :]
+        parts = payload.split("|")
+        if len(parts) != 3:
+            continue
+        self_raw, cumulative_raw, name_raw = parts
+        try:
+            self_us = int(self_raw.strip())
+            cumulative_us = int(cumulative_raw.strip())
+        except ValueError:
+            continue  # cabeçalho "self [us] | cumulative | imported package"
+        stripped = name_raw.lstrip(" ")
+        depth = (len(name_raw) - len(stripped) - 1) // 2
+        samples.append(ImportSample(stripped.strip(), self_us, cumulative_us, max(depth, 0)))
+    return samples
+
+
+def measure_once(target: str, python: str = sys.executable) -> List[ImportSample]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (str(SRC), env.get("PYTHONPATH", ""))))
+    env.pop("PYTHONIMPORTTIME", None)
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=str(ROOT),
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["(sem stderr)"]
+        raise RuntimeError(f"falha ao importar {target}: {tail[0]}")
+    return parse_importtime(proc.stderr)
+
+
+def cold_start_us(samples: Iterable[ImportSample], target: str) -> int:
+    """Cumulativo da raiz do alvo (último registro com o nome do alvo)."""
+
+    total = 0
+    for sample in samples:
+        if sample.module == target:
+            total = sample.cumulative_us
+    return total
+
+
+def breakdown(samples: Iterable[ImportSample], prefixes: Sequence[str]) -> Dict[str, int]:
+    """Tempo próprio (us) por módulo cujo nome começa com algum dos prefixos."""
+
+    result: Dict[str, int] = {}
+    for sample in samples:
+        if any(sample.module == prefix or sample.module.startswith(prefix + ".") for prefix in prefixes):
+            result[sample.module] = result.get(sample.module, 0) + sample.self_us
+    return result
+
+
+def render_report(target: str, totals: List[int], per_module: Dict[str, List[int]], top: int) -> str:
+    lines = [
+        f"{target}: cold_start median={statistics.median(totals)/1000:.2f}ms "
+        f"min={min(totals)/1000:.2f}ms max={max(totals)/1000:.2f}ms runs={len(totals)}"
+    ]
+    ranked = sorted(
+        ((statistics.median(values), name) for name, values in per_module.items()),
+        key=lambda item: (-item[0], item[1]),
+    )
+    for median_us, name in ranked[:top]:
+        lines.append(f"  {name:<48} self={median_us/1000:8.2f}ms")
+    return "\n".join(lines)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark de cold start (import) do NSR.")
+    parser.add_argument(
+        "--target",
+        action="append",
+        help="Módulo a importar (pode repetir). Default: nsr, nsr.cli, metanucleus.cli.chat.",
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Subprocessos por alvo (default: 5).")
+    parser.add_argument("--top", type=int, default=15, help="Quantidade de submódulos listados (default: 15).")
+    parser.add_argument(
+        "--prefix",
+        action="append",
+        help="Prefixos de pacote considerados no detalhamento (default: nsr, nsr_learn, metanucleus, liu, ontology).",
+    )
+    parser.add_argument("--max-ms", type=float, help="Falha se a mediana do cold start de `nsr` exceder este valor (ms).")
+    parser.add_argument(
+        "--max-target-ms",
+        type=float,
+        help="Falha se a mediana do cold start de qualquer alvo exceder este valor (ms).",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    targets = tuple(args.target or DEFAULT_TARGETS)
+    prefixes = tuple(args.prefix or ("nsr", "nsr_learn", "metanucleus", "liu", "ontology"))
+    exit_code = 0
+    for target in targets:
+        totals: List[int] = []
+        per_module: Dict[str, List[int]] = {}
+        for _ in range(max(1, args.runs)):
+            samples = measure_once(target)
+            totals.append(cold_start_us(samples, target))
+            for name, value in breakdown(samples, prefixes).items():
+                per_module.setdefault(name, []).append(value)
+        print(render_report(target, totals, per_module, args.top))
+        median_ms = statistics.median(totals) / 1000
+        if args.max_ms is not None and target == "nsr" and median_ms > args.max_ms:
+            print(f"ERROR: cold_start(nsr) {median_ms:.2f}ms > {args.max_ms}ms", flush=True)
+            exit_code = 1
+        if args.max_target_ms is not None and median_ms > args.max_target_ms:
+            print(f"ERROR: cold_start({target}) {median_ms:.2f}ms > {args.max_target_ms}ms", flush=True)
+            exit_code = 1
+    raise SystemExit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark determinístico de throughput do tokenizador LxU (`nsr.lex.tokenize`).
+
+Compara o caminho por dicionários (`Lexicon`) com o léxico compilado
+(`CompiledLexicon`) em tokens/segundo para pt/en/es/fr/it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+from nsr.lex import DEFAULT_LEXICON, compiled_lexicon_for, compose_lexicon, tokenize
+
+
+SAMPLE_TEXTS: Dict[str, Tuple[str, ...]] = {
+    "pt": (
+        "O automóvel anda rapidamente com quatro rodas e tem um motor forte",
+        "A casa possui janelas grandes e a porta de madeira",
+    ),
+    "en": (
+        "The car has a wheel and moves slowly with the driver",
+        "A strong engine belongs to the fast vehicle",
+    ),
+    "es": (
+        "El coche tiene una rueda y se mueve lentamente por la calle",
+        "La casa posee ventanas grandes con puertas de madera",
+    ),
+    "fr": (
+        "La voiture a une roue et avance rapidement avec le conducteur",
+        "Le véhicule appartient à la famille et marche lentement",
+    ),
+    "it": (
+        "La macchina ha una ruota e cammina lentamente con gli amici",
+        "Il veicolo veloce possiede un motore forte",
+    ),
+}
+
+
+def _build_text(lang: str, repeat: int) -> str:
+    return " ".join(SAMPLE_TEXTS[lang] * repeat)
+
+
+def measure(text: str, lexicon, runs: int) -> Tuple[float, int]:
+    """Retorna (mediana de tokens/s, tokens por execução)."""
+
+    token_count = len(tokenize(text, lexicon))
+    samples: List[float] = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        tokenize(text, lexicon)
+        elapsed = time.perf_counter() - t0
+        samples.append(token_count / elapsed if elapsed else 0.0)
+    return statistics.median(samples), token_count
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Throughput do tokenizador LxU (tokens/s).")
+    parser.add_argument("--repeat", type=int, default=200, help="Repetições das frases por idioma (default: 200).")
+    parser.add_argument("--runs", type=int, default=20, help="Execuções medidas por idioma (default: 20).")
+    parser.add_argument(
+        "--combined",
+        action="store_true",
+        help="Usa o léxico combinado pt+en+es+fr+it para todos os idiomas (default: pack do idioma).",
+    )
+    parser.add_argument("--min-speedup", type=float, help="Falha se o compilado não atingir este ganho mínimo.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    exit_code = 0
+    for lang in SAMPLE_TEXTS:
+        text = _build_text(lang, args.repeat)
+        if args.combined:
+            plain, compiled = DEFAULT_LEXICON, compiled_lexicon_for(("pt", "en", "es", "fr", "it"))
+        else:
+            plain, compiled = compose_lexicon((lang,)), compiled_lexicon_for((lang,))
+        if tokenize(text, plain) != tokenize(text, compiled):
+            print(f"ERROR: {lang}: tokens divergentes entre Lexicon e CompiledLexicon", flush=True)
+            exit_code = 1
+            continue
+        plain_tps, count = measure(text, plain, args.runs)
+        compiled_tps, _ = measure(text, compiled, args.runs)
+        speedup = compiled_tps / plain_tps if plain_tps else 0.0
+        print(
+            f"{lang}: tokens={count} dict={plain_tps:,.0f} tok/s "
+            f"compiled={compiled_tps:,.0f} tok/s speedup={speedup:.2f}x"
+        )
+        if args.min_speedup is not None and speedup < args.min_speedup:
+            print(f"ERROR: {lang}: speedup {speedup:.2f}x < {args.min_speedup}x", flush=True)
+            exit_code = 1
+    raise SystemExit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark determinístico de `nsr.polynomial_engine.factor_polynomial`.
+
+Gera polinômios (semente fixa) de grau 10 ou mais como produtos de fatores
+lineares (a·x - b) com |b| grande, raízes repetidas e fatores quadráticos sem
+raiz racional, de modo que o termo constante tenha dezenas de dígitos. Mede o
+tempo por polinômio e confere que todas as raízes racionais plantadas (com
+multiplicidade) foram encontradas.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from fractions import Fraction
+from math import gcd
+from typing import List, Sequence, Tuple
+
+from nsr.polynomial_engine import factor_polynomial
+
+
+def multiply(left: Sequence[int], right: Sequence[int]) -> List[int]:
+    product = [0] * (len(left) + len(right) - 1)
+    for i, a in enumerate(left):
+        for j, b in enumerate(right):
+            product[i + j] += a * b
+    return product
+
+
+def random_polynomial(degree: int, rng: random.Random, digits: int) -> Tuple[List[int], List[Fraction]]:
+    """Retorna (coeficientes inteiros, raízes racionais plantadas em ordem crescente)."""
+    coeffs = [1]
+    roots: List[Fraction] = []
+    while len(coeffs) - 1 < degree:
+        remaining = degree - (len(coeffs) - 1)
+        if remaining >= 2 and rng.random() < 0.25:
+            # x² + c, sem raízes reais
+            coeffs = multiply(coeffs, [1, 0, rng.randint(1, 10**digits)])
+            continue
+        numerator = rng.randint(-(10**digits), 10**digits)
+        denominator = rng.choice((1, 1, 1, 2, 3, 5))
+        common = gcd(numerator, denominator) or denominator
+        numerator, denominator = numerator // common, denominator // common
+        repeat = 2 if remaining >= 2 and rng.random() < 0.2 else 1
+        for _ in range(repeat):
+            coeffs = multiply(coeffs, [denominator, -numerator])
+            roots.append(Fraction(numerator, denominator))
+    return coeffs, sorted(roots)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fatoração de polinômios de grau alto com constantes grandes.")
+    parser.add_argument("--degrees", type=int, nargs="+", default=[10, 12, 16], help="Graus (default: 10 12 16).")
+    parser.add_argument("--digits", type=int, default=4, help="Dígitos de cada raiz plantada (default: 4).")
+    parser.add_argument("--polynomials", type=int, default=10, help="Polinômios por grau (default: 10).")
+    parser.add_argument("--seed", type=int, default=17, help="Semente dos polinômios (default: 17).")
+    parser.add_argument("--max-ms", type=float, help="Falha se a mediana por polinômio passar deste valor.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    exit_code = 0
+    for degree in args.degrees:
+        rng = random.Random(args.seed + degree)
+        samples: List[float] = []
+        digits: List[int] = []
+        for _ in range(args.polynomials):
+            coeffs, roots = random_polynomial(degree, rng, args.digits)
+            digits.append(len(str(abs(coeffs[-1]))))
+            t0 = time.perf_counter()
+            result = factor_polynomial({"coefficients": coeffs})
+            samples.append((time.perf_counter() - t0) * 1000)
+            found = [root for _, root in result.factors]
+            if found != [float(root) for root in roots]:
+                print(f"ERROR: degree={degree}: raízes {found} != {[float(root) for root in roots]}", flush=True)
+                exit_code = 1
+        median = statistics.median(samples)
+        print(
+            f"degree={degree:3d} polynomials={len(samples)} constant_digits~{statistics.median(digits):5.0f} "
+            f"median={median:9.3f} ms max={max(samples):9.3f} ms"
+        )
+        if args.max_ms is not None and median > args.max_ms:
+            print(f"ERROR: degree={degree}: {median:.3f} ms > {args.max_ms} ms", flush=True)
+            exit_code = 1
+    raise SystemExit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
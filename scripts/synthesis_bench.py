@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark determinístico da síntese de programas (`nsr_learn.ProgramSynthesizer`).
+
+Roda uma suíte de tarefas de transformação (numéricas e de strings) e mede o
+tempo até a solução, o tamanho do programa encontrado e se ele generaliza
+para exemplos de validação que não foram vistos na síntese.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+from nsr_learn import ProgramSynthesizer, SynthesisExample
+
+Pairs = Sequence[Tuple[Any, Any]]
+
+# nome -> (exemplos de síntese, exemplos de validação)
+TASKS: Dict[str, Tuple[Pairs, Pairs]] = {
+    "double": ([(1, 2), (2, 4), (3, 6), (7, 14)], [(11, 22), (-3, -6)]),
+    "plus10": ([(1, 11), (5, 15), (9, 19)], [(100, 110)]),
+    "square": ([(2, 4), (3, 9), (5, 25), (7, 49)], [(12, 144)]),
+    "2x+1": ([(1, 3), (2, 5), (4, 9), (8, 17)], [(10, 21)]),
+    "x*x+x": ([(1, 2), (2, 6), (3, 12), (5, 30)], [(10, 110)]),
+    "10-2x": ([(1, 8), (2, 6), (4, 2), (7, -4)], [(0, 10)]),
+    "upper": ([("ab", "AB"), ("xy", "XY")], [("nsr", "NSR")]),
+    "reverse": ([("abc", "cba"), ("hello", "olleh")], [("xyz", "zyx")]),
+    "reverse_upper": ([("abc", "CBA"), ("hey", "YEH")], [("nsr", "RSN")]),
+    "first_upper": ([("abc", "A"), ("hey", "H"), ("zed", "Z")], [("nsr", "N")]),
+    "duplicate": ([("ab", "abab"), ("xy", "xyxy"), ("q", "qq")], [("nsr", "nsrnsr")]),
+    "wrap_space": ([("ab", " ab "), ("xy", " xy ")], [("nsr", " nsr ")]),
+    "length_plus_one": ([("ab", 3), ("hello", 6), ("", 1)], [("nsr", 4)]),
+    "last_twice": ([("abc", "cc"), ("hey", "yy")], [("nsr", "rr")]),
+}
+
+
+def run_task(
+    synthesizer: ProgramSynthesizer,
+    train: Pairs,
+    holdout: Pairs,
+    runs: int,
+) -> Tuple[float, Any, bool]:
+    """Retorna (mediana do tempo, programa, generaliza para a validação)."""
+    examples = [SynthesisExample(inputs=(inp,), output=out) for inp, out in train]
+    samples: List[float] = []
+    program = None
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        program = synthesizer.synthesize(examples)
+        samples.append(time.perf_counter() - t0)
+    solved = program is not None and program.examples_matched == len(examples)
+    generalizes = solved and all(synthesizer.apply(program, inp) == out for inp, out in holdout)
+    return statistics.median(samples), program, generalizes
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Tempo até a solução da síntese de programas.")
+    parser.add_argument("--max-size", type=int, default=10, help="Tamanho máximo dos programas (default: 10).")
+    parser.add_argument(
+        "--max-candidates",
+        type=int,
+        default=10000,
+        help="Orçamento de candidatos por tamanho (default: 10000).",
+    )
+    parser.add_argument("--runs", type=int, default=3, help="Execuções medidas por tarefa (default: 3).")
+    parser.add_argument("--min-solved", type=int, help="Falha se menos tarefas forem resolvidas e generalizarem.")
+    parser.add_argument("--max-seconds", type=float, help="Falha se alguma tarefa passar deste tempo mediano.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    synthesizer = ProgramSynthesizer(max_size=args.max_size, max_candidates=args.max_candidates)
+    exit_code = 0
+    solved = 0
+    total = 0.0
+    for name, (train, holdout) in TASKS.items():
+        elapsed, program, generalizes = run_task(synthesizer, train, holdout, args.runs)
+        total += elapsed
+        solved += int(generalizes)
+        status = "ok" if generalizes else "FAIL"
+        expression = program.expression if program is not None else "-"
+        size = program.size if program is not None else 0
+        print(f"{name:16s} {status:4s} {elapsed * 1000:9.1f} ms size={size:2d} {expression}")
+        if args.max_seconds is not None and elapsed > args.max_seconds:
+            print(f"ERROR: {name}: {elapsed:.3f}s > {args.max_seconds}s", flush=True)
+            exit_code = 1
+    print(f"solved={solved}/{len(TASKS)} total={total:.3f}s")
+    if args.min_solved is not None and solved < args.min_solved:
+        print(f"ERROR: solved {solved} < {args.min_solved}", flush=True)
+        exit_code = 1
+    raise SystemExit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,83 +1,225 @@
-"""Pacote NSR - Núcleo Semântico Reativo."""
+"""Pacote NSR - Núcleo Semântico Reativo.
 
-from .runtime import (
-    run_text,
-    run_text_with_explanation,
-    run_struct,
-    run_text_full,
-    run_struct_full,
-    Trace,
-    HaltReason,
-    RunOutcome,
-    EquationSnapshot,
-    EquationSnapshotStats,
-    EquationInvariantStatus,
-)
-from .state import SessionCtx, Config, Rule, Lexicon
-from .lex import tokenize, compose_lexicon, load_lexicon_file
-from .parser import build_struct
-from .explain import render_explanation, render_struct_sentence, render_struct_node
-from .ian import (
-    IANInstinct,
-    analyze_utterance,
-    plan_reply,
-    respond,
-    encode_word as ian_encode_word,
-    decode_codes as ian_decode_codes,
-    word_signature as ian_word_signature,
-    conjugate as ian_conjugate,
-)
-from .ian_bridge import (
-    InstinctHook,
-    maybe_route_text,
-    utterance_to_struct,
-    reply_plan_to_answer,
-)
-from .code_bridge import CodeHook, maybe_route_code
-from .math_instinct import MathInstinct
-from .math_bridge import maybe_route_math
-from .polynomial_bridge import PolynomialHook, maybe_route_polynomial
-from .polynomial_engine import PolynomialResult, factor_polynomial
-from .logic_engine import LogicEngine, LogicRule, negate as logic_negate, normalize_statement as logic_normalize
-from .logic_bridge import LogicBridgeResult, LogicHook, maybe_route_logic as logic_route, interpret_logic_command
-from .bayes_bridge import BayesHook, maybe_route_bayes
-from .bayes_engine import BayesNetwork, BayesVariable
-from .markov_bridge import MarkovHook, maybe_route_markov
-from .markov_engine import MarkovModel
-from .factor_bridge import FactorHook, maybe_route_factor
-from .factor_graph_engine import FactorGraph, FactorVariable, Factor
-from .meta_transformer import MetaTransformer, MetaTransformResult, MetaRoute, meta_summary_to_dict, MetaCalculationPlan
-from .weightless_types import Episode, Pattern
-from .weightless_learning import WeightlessLearner, learn_from_episodes
-from .weightless_index import EpisodeIndex
-from .weightless_integration import (
-    ensure_weightless_learner,
-    record_episode_for_learning,
-    find_similar_episodes_for_context,
-    apply_learned_rules_to_session,
-)
-from .rule_evaluator import RuleEvaluator, RuleEvaluation
-from .abstraction_hierarchy import AbstractionHierarchy, AbstractionLevel
-from .meta_calculator import MetaCalculationResult, execute_meta_plan
-from .meta_structures import (
-    build_lc_meta_struct,
-    lc_term_to_node,
-    meta_calculation_to_node,
-)
-from .meta_expressor import build_meta_expression
-from .meta_memory import build_meta_memory, meta_memory_to_dict
-from .meta_reflection import build_meta_reflection
-from .meta_synthesis import build_meta_synthesis
+Os nomes públicos são resolvidos sob demanda (PEP 562): ``import nsr`` não
+carrega os submódulos, e cada atributo importa apenas o módulo que o define
+no primeiro acesso. Isso mantém o cold start de ``metanucleus.cli`` e
+``metanucleus-chat`` independente dos motores opcionais (bayes, markov,
+factor graph, weightless, ...).
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover - apenas para analisadores estáticos
+    from .runtime import (
+        run_text,
+        run_text_with_explanation,
+        run_struct,
+        run_text_full,
+        run_struct_full,
+        Trace,
+        HaltReason,
+        RunOutcome,
+        EquationSnapshot,
+        EquationSnapshotStats,
+        EquationInvariantStatus,
+    )
+    from .state import SessionCtx, Config, Rule, Lexicon
+    from .lex import tokenize, compose_lexicon, load_lexicon_file
+    from .parser import build_struct
+    from .explain import render_explanation, render_struct_sentence, render_struct_node
+    from .ian import (
+        IANInstinct,
+        analyze_utterance,
+        plan_reply,
+        respond,
+        encode_word as ian_encode_word,
+        decode_codes as ian_decode_codes,
+        word_signature as ian_word_signature,
+        conjugate as ian_conjugate,
+    )
+    from .ian_bridge import (
+        InstinctHook,
+        maybe_route_text,
+        utterance_to_struct,
+        reply_plan_to_answer,
+    )
+    from .code_bridge import CodeHook, maybe_route_code
+    from .math_instinct import MathInstinct
+    from .math_bridge import maybe_route_math
+    from .polynomial_bridge import PolynomialHook, maybe_route_polynomial
+    from .polynomial_engine import PolynomialResult, factor_polynomial
+    from .logic_engine import LogicEngine, LogicRule, negate as logic_negate, normalize_statement as logic_normalize
+    from .logic_bridge import LogicBridgeResult, LogicHook, maybe_route_logic as logic_route, interpret_logic_command
+    from .bayes_bridge import BayesHook, maybe_route_bayes
+    from .bayes_engine import BayesNetwork, BayesVariable
+    from .markov_bridge import MarkovHook, maybe_route_markov
+    from .markov_engine import MarkovModel
+    from .factor_bridge import FactorHook, maybe_route_factor
+    from .factor_graph_engine import FactorGraph, FactorVariable, Factor
+    from .meta_transformer import MetaTransformer, MetaTransformResult, MetaRoute, meta_summary_to_dict, MetaCalculationPlan
+    from .weightless_types import Episode, Pattern
+    from .weightless_learning import WeightlessLearner, learn_from_episodes
+    from .weightless_index import EpisodeIndex
+    from .weightless_integration import (
+        ensure_weightless_learner,
+        record_episode_for_learning,
+        find_similar_episodes_for_context,
+        apply_learned_rules_to_session,
+    )
+    from .rule_evaluator import RuleEvaluator, RuleEvaluation
+    from .abstraction_hierarchy import AbstractionHierarchy, AbstractionLevel
+    from .meta_calculator import MetaCalculationResult, execute_meta_plan
+    from .meta_structures import (
+        build_lc_meta_struct,
+        lc_term_to_node,
+        meta_calculation_to_node,
+    )
+    from .meta_expressor import build_meta_expression
+    from .meta_memory import build_meta_memory, meta_memory_to_dict
+    from .meta_reflection import build_meta_reflection
+    from .meta_synthesis import build_meta_synthesis
+
+    # New enhanced capabilities - Perfect AI System
+    from .enhanced_conversation import EnhancedConversation, create_conversation
+    from .deep_reasoning import DeepReasoner, ReasoningChain, create_deep_reasoner
+    from .code_evolution import CodeEvolutionEngine, create_evolution_engine
+    from .perfect_ai import PerfectAI, create_perfect_ai, demo_perfect_ai
+    from .advanced_inference import AdvancedInferenceEngine, InferenceRule, InferenceProof, create_inference_engine
+    from .language_detector import detect_language_profile
+    from .code_ast import build_python_ast_meta, build_rust_ast_meta
+    from .math_ast import build_math_ast_node
+    from .async_service import AsyncConversationService
+
+# nome público → (submódulo, atributo)
+_LAZY_ATTRS: Dict[str, Tuple[str, str]] = {
+    "run_text": ("runtime", "run_text"),
+    "run_text_with_explanation": ("runtime", "run_text_with_explanation"),
+    "run_struct": ("runtime", "run_struct"),
+    "run_text_full": ("runtime", "run_text_full"),
+    "run_struct_full": ("runtime", "run_struct_full"),
+    "Trace": ("runtime", "Trace"),
+    "HaltReason": ("runtime", "HaltReason"),
+    "RunOutcome": ("runtime", "RunOutcome"),
+    "EquationSnapshot": ("runtime", "EquationSnapshot"),
+    "EquationSnapshotStats": ("runtime", "EquationSnapshotStats"),
+    "EquationInvariantStatus": ("runtime", "EquationInvariantStatus"),
+    "SessionCtx": ("state", "SessionCtx"),
+    "Config": ("state", "Config"),
+    "Rule": ("state", "Rule"),
+    "Lexicon": ("state", "Lexicon"),
+    "tokenize": ("lex", "tokenize"),
+    "compose_lexicon": ("lex", "compose_lexicon"),
+    "load_lexicon_file": ("lex", "load_lexicon_file"),
+    "build_struct": ("parser", "build_struct"),
+    "render_explanation": ("explain", "render_explanation"),
+    "render_struct_sentence": ("explain", "render_struct_sentence"),
+    "render_struct_node": ("explain", "render_struct_node"),
+    "IANInstinct": ("ian", "IANInstinct"),
+    "analyze_utterance": ("ian", "analyze_utterance"),
+    "plan_reply": ("ian", "plan_reply"),
+    "respond": ("ian", "respond"),
+    "ian_encode_word": ("ian", "encode_word"),
+    "ian_decode_codes": ("ian", "decode_codes"),
+    "ian_word_signature": ("ian", "word_signature"),
+    "ian_conjugate": ("ian", "conjugate"),
+    "InstinctHook": ("ian_bridge", "InstinctHook"),
+    "maybe_route_text": ("ian_bridge", "maybe_route_text"),
+    "utterance_to_struct": ("ian_bridge", "utterance_to_struct"),
+    "reply_plan_to_answer": ("ian_bridge", "reply_plan_to_answer"),
+    "CodeHook": ("code_bridge", "CodeHook"),
+    "maybe_route_code": ("code_bridge", "maybe_route_code"),
+    "MathInstinct": ("math_instinct", "MathInstinct"),
+    "maybe_route_math": ("math_bridge", "maybe_route_math"),
+    "PolynomialHook": ("polynomial_bridge", "PolynomialHook"),
+    "maybe_route_polynomial": ("polynomial_bridge", "maybe_route_polynomial"),
+    "PolynomialResult": ("polynomial_engine", "PolynomialResult"),
+    "factor_polynomial": ("polynomial_engine", "factor_polynomial"),
+    "LogicEngine": ("logic_engine", "LogicEngine"),
+    "LogicRule": ("logic_engine", "LogicRule"),
+    "logic_negate": ("logic_engine", "negate"),
+    "logic_normalize": ("logic_engine", "normalize_statement"),
+    "LogicBridgeResult": ("logic_bridge", "LogicBridgeResult"),
+    "LogicHook": ("logic_bridge", "LogicHook"),
+    "logic_route": ("logic_bridge", "maybe_route_logic"),
+    "interpret_logic_command": ("logic_bridge", "interpret_logic_command"),
+    "BayesHook": ("bayes_bridge", "BayesHook"),
+    "maybe_route_bayes": ("bayes_bridge", "maybe_route_bayes"),
+    "BayesNetwork": ("bayes_engine", "BayesNetwork"),
+    "BayesVariable": ("bayes_engine", "BayesVariable"),
+    "MarkovHook": ("markov_bridge", "MarkovHook"),
+    "maybe_route_markov": ("markov_bridge", "maybe_route_markov"),
+    "MarkovModel": ("markov_engine", "MarkovModel"),
+    "FactorHook": ("factor_bridge", "FactorHook"),
+    "maybe_route_factor": ("factor_bridge", "maybe_route_factor"),
+    "FactorGraph": ("factor_graph_engine", "FactorGraph"),
+    "FactorVariable": ("factor_graph_engine", "FactorVariable"),
+    "Factor": ("factor_graph_engine", "Factor"),
+    "MetaTransformer": ("meta_transformer", "MetaTransformer"),
+    "MetaTransformResult": ("meta_transformer", "MetaTransformResult"),
+    "MetaRoute": ("meta_transformer", "MetaRoute"),
+    "meta_summary_to_dict": ("meta_transformer", "meta_summary_to_dict"),
+    "MetaCalculationPlan": ("meta_transformer", "MetaCalculationPlan"),
+    "Episode": ("weightless_types", "Episode"),
+    "Pattern": ("weightless_types", "Pattern"),
+    "WeightlessLearner": ("weightless_learning", "WeightlessLearner"),
+    "learn_from_episodes": ("weightless_learning", "learn_from_episodes"),
+    "EpisodeIndex": ("weightless_index", "EpisodeIndex"),
+    "ensure_weightless_learner": ("weightless_integration", "ensure_weightless_learner"),
+    "record_episode_for_learning": ("weightless_integration", "record_episode_for_learning"),
+    "find_similar_episodes_for_context": ("weightless_integration", "find_similar_episodes_for_context"),
+    "apply_learned_rules_to_session": ("weightless_integration", "apply_learned_rules_to_session"),
+    "RuleEvaluator": ("rule_evaluator", "RuleEvaluator"),
+    "RuleEvaluation": ("rule_evaluator", "RuleEvaluation"),
+    "AbstractionHierarchy": ("abstraction_hierarchy", "AbstractionHierarchy"),
+    "AbstractionLevel": ("abstraction_hierarchy", "AbstractionLevel"),
+    "MetaCalculationResult": ("meta_calculator", "MetaCalculationResult"),
+    "execute_meta_plan": ("meta_calculator", "execute_meta_plan"),
+    "build_lc_meta_struct": ("meta_structures", "build_lc_meta_struct"),
+    "lc_term_to_node": ("meta_structures", "lc_term_to_node"),
+    "meta_calculation_to_node": ("meta_structures", "meta_calculation_to_node"),
+    "build_meta_expression": ("meta_expressor", "build_meta_expression"),
+    "build_meta_memory": ("meta_memory", "build_meta_memory"),
+    "meta_memory_to_dict": ("meta_memory", "meta_memory_to_dict"),
+    "build_meta_reflection": ("meta_reflection", "build_meta_reflection"),
+    "build_meta_synthesis": ("meta_synthesis", "build_meta_synthesis"),
+    "EnhancedConversation": ("enhanced_conversation", "EnhancedConversation"),
+    "create_conversation": ("enhanced_conversation", "create_conversation"),
+    "DeepReasoner": ("deep_reasoning", "DeepReasoner"),
+    "ReasoningChain": ("deep_reasoning", "ReasoningChain"),
+    "create_deep_reasoner": ("deep_reasoning", "create_deep_reasoner"),
+    "CodeEvolutionEngine": ("code_evolution", "CodeEvolutionEngine"),
+    "create_evolution_engine": ("code_evolution", "create_evolution_engine"),
+    "PerfectAI": ("perfect_ai", "PerfectAI"),
+    "create_perfect_ai": ("perfect_ai", "create_perfect_ai"),
+    "demo_perfect_ai": ("perfect_ai", "demo_perfect_ai"),
+    "AdvancedInferenceEngine": ("advanced_inference", "AdvancedInferenceEngine"),
+    "InferenceRule": ("advanced_inference", "InferenceRule"),
+    "InferenceProof": ("advanced_inference", "InferenceProof"),
+    "create_inference_engine": ("advanced_inference", "create_inference_engine"),
+    "detect_language_profile": ("language_detector", "detect_language_profile"),
+    "build_python_ast_meta": ("code_ast", "build_python_ast_meta"),
+    "build_rust_ast_meta": ("code_ast", "build_rust_ast_meta"),
+    "build_math_ast_node": ("math_ast", "build_math_ast_node"),
+    "AsyncConversationService": ("async_service", "AsyncConversationService"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name, attr = _LAZY_ATTRS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(f".{module_name}", __name__), attr)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
 
-# New enhanced capabilities - Perfect AI System
-from .enhanced_conversation import EnhancedConversation, create_conversation
-from .deep_reasoning import DeepReasoner, ReasoningChain, create_deep_reasoner
-from .code_evolution import CodeEvolutionEngine, create_evolution_engine
-from .perfect_ai import PerfectAI, create_perfect_ai, demo_perfect_ai
-from .advanced_inference import AdvancedInferenceEngine, InferenceRule, InferenceProof, create_inference_engine
-from .language_detector import detect_language_profile
-from .code_ast import build_python_ast_meta, build_rust_ast_meta
-from .math_ast import build_math_ast_node
 
 __all__ = [
     "run_text",
@@ -161,4 +303,5 @@ __all__ = [
     "meta_memory_to_dict",
     "build_meta_synthesis",
     "build_meta_reflection",
+    "AsyncConversationService",
 ]
@@ -0,0 +1,294 @@
+"""
+Front-end asyncio para muitas sessões conversacionais simultâneas.
+
+Cada sessão tem sua própria fila e um único consumidor: as requisições de uma
+sessão são processadas na ordem de chegada e o estado (`SessionCtx`,
+`EnhancedConversation` ou `MetaRuntime`) nunca é compartilhado nem tocado por
+duas threads ao mesmo tempo. O trabalho CPU-bound (`run_text_full`) roda num
+`ThreadPoolExecutor` limitado; sessões diferentes avançam em paralelo.
+
+Backpressure: o total de requisições pendentes é limitado por `max_pending`
+(quem chama aguarda uma vaga) e cada fila de sessão por `max_queue_per_session`.
+Timeouts: a chamada expira com `asyncio.TimeoutError`; se o prazo vencer antes
+de a requisição começar, ela é descartada sem alterar o estado da sessão.
+
+Sessões ociosas: a fila e o consumidor de uma sessão são descartados assim que
+ela esvazia sem ninguém aguardando vaga; o estado continua disponível para a
+próxima requisição, num LRU limitado por `max_idle_sessions`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+SessionT = TypeVar("SessionT")
+
+SessionFactory = Callable[[str], SessionT]
+SessionHandler = Callable[[SessionT, str], Any]
+
+
+_MISSING = object()
+
+
+class ServiceClosed(RuntimeError):
+    """Requisição enviada a um serviço já encerrado."""
+
+
+@dataclass()
+class ServiceStats:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    timeouts: int = 0
+    dropped_expired: int = 0
+    sessions_created: int = 0
+    sessions_closed: int = 0
+    sessions_evicted: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+@dataclass()
+class _Job:
+    text: str
+    future: "asyncio.Future[Any]"
+    deadline: Optional[float]
+
+
+@dataclass()
+class _SessionSlot(Generic[SessionT]):
+    session_id: str
+    state: SessionT
+    queue: "asyncio.Queue[Optional[_Job]]"
+    worker: Optional["asyncio.Task[None]"] = None
+    processed: int = 0
+    # Requisições que já pegaram o slot e ainda não saíram da fila
+    pending: int = 0
+
+
+def _consume_outcome(future: "asyncio.Future[Any]") -> None:
+    # Resultado de requisição expirada: ninguém mais aguarda, evita aviso do asyncio.
+    if not future.cancelled():
+        future.exception()
+
+
+def _default_conversation_factory(session_id: str):
+    from .enhanced_conversation import EnhancedConversation
+    from .state import SessionCtx
+
+    session = SessionCtx()
+    session.config.memory_store_path = None
+    session.config.episodes_path = None
+    session.config.induction_rules_path = None
+    return EnhancedConversation(session)
+
+
+def _default_conversation_handler(conversation, text: str) -> Tuple[str, Any]:
+    return conversation.process(text)
+
+
+def _meta_runtime_factory(session_id: str):
+    from metanucleus.core.state import MetaState
+    from metanucleus.runtime.meta_runtime import MetaRuntime
+
+    return MetaRuntime(state=MetaState())
+
+
+def _meta_runtime_handler(runtime, text: str) -> str:
+    return runtime.handle_request(text)
+
+
+class AsyncConversationService(Generic[SessionT]):
+    """Multiplexa sessões isoladas sobre um pool de threads limitado."""
+
+    def __init__(
+        self,
+        session_factory: Optional[SessionFactory] = None,
+        handler: Optional[SessionHandler] = None,
+        *,
+        max_workers: int = 4,
+        max_pending: int = 256,
+        max_queue_per_session: int = 32,
+        request_timeout: Optional[float] = None,
+        executor: Optional[Executor] = None,
+        max_idle_sessions: Optional[int] = 1024,
+    ) -> None:
+        if max_workers <= 0 or max_pending <= 0 or max_queue_per_session <= 0:
+            raise ValueError("max_workers, max_pending e max_queue_per_session devem ser positivos.")
+        if max_idle_sessions is not None and max_idle_sessions < 0:
+            raise ValueError("max_idle_sessions não pode ser negativo.")
+        self._factory = session_factory or _default_conversation_factory
+        self._handler = handler or _default_conversation_handler
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nsr-async")
+        self._max_queue = max_queue_per_session
+        self._pending = asyncio.Semaphore(max_pending)
+        self.request_timeout = request_timeout
+        self.max_idle_sessions = max_idle_sessions
+        # Slots (fila + consumidor) só de sessões ativas; estados de todas, em ordem LRU
+        self._slots: Dict[str, _SessionSlot[SessionT]] = {}
+        self._states: "OrderedDict[str, SessionT]" = OrderedDict()
+        self._closed = False
+        self.stats = ServiceStats()
+
+    @classmethod
+    def for_meta_runtime(cls, **kwargs: Any) -> "AsyncConversationService[Any]":
+        """Serviço cujas sessões são `MetaRuntime.handle_request` independentes."""
+
+        return cls(_meta_runtime_factory, _meta_runtime_handler, **kwargs)
+
+    @property
+    def session_ids(self) -> Tuple[str, ...]:
+        return tuple(sorted(self._states))
+
+    @property
+    def active_session_ids(self) -> Tuple[str, ...]:
+        """Sessões com fila e consumidor vivos (requisições em voo)."""
+
+        return tuple(sorted(self._slots))
+
+    def session_state(self, session_id: str) -> SessionT:
+        """Estado da sessão (use apenas quando não houver requisições em voo)."""
+
+        return self._states[session_id]
+
+    async def process(self, session_id: str, text: str, timeout: Optional[float] = None) -> Any:
+        """
+        Enfileira `text` na sessão e aguarda o resultado do handler.
+
+        Aguarda (backpressure) quando o serviço ou a fila da sessão estão cheios.
+        """
+
+        if self._closed:
+            raise ServiceClosed("Serviço assíncrono encerrado.")
+        loop = asyncio.get_running_loop()
+        limit = self.request_timeout if timeout is None else timeout
+        deadline = loop.time() + limit if limit is not None else None
+        await self._pending.acquire()
+        try:
+            slot = self._ensure_slot(session_id)
+            slot.pending += 1
+            job = _Job(text=text, future=loop.create_future(), deadline=deadline)
+            self.stats.submitted += 1
+            try:
+                await slot.queue.put(job)
+            except BaseException:
+                # Cancelado esperando vaga na fila: o job nunca entra, libera o slot se ficou vazio
+                slot.pending -= 1
+                if self._release_slot(slot):
+                    slot.queue.put_nowait(None)
+                raise
+            try:
+                if deadline is None:
+                    return await asyncio.shield(job.future)
+                remaining = max(0.0, deadline - loop.time())
+                return await asyncio.wait_for(asyncio.shield(job.future), remaining)
+            except asyncio.TimeoutError:
+                self.stats.timeouts += 1
+                job.future.add_done_callback(_consume_outcome)
+                raise
+        finally:
+            self._pending.release()
+
+    async def close_session(self, session_id: str) -> bool:
+        """Drena a fila da sessão e descarta seu estado."""
+
+        slot = self._slots.pop(session_id, None)
+        if slot is not None:
+            await slot.queue.put(None)
+            if slot.worker is not None:
+                await slot.worker
+        if self._states.pop(session_id, _MISSING) is _MISSING:
+            return False
+        self.stats.sessions_closed += 1
+        return True
+
+    async def aclose(self) -> None:
+        """Encerra todas as sessões (após drenar as filas) e o executor próprio."""
+
+        self._closed = True
+        for session_id in list(self._states):
+            await self.close_session(session_id)
+        if self._own_executor:
+            self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> "AsyncConversationService[SessionT]":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    def _ensure_slot(self, session_id: str) -> _SessionSlot[SessionT]:
+        slot = self._slots.get(session_id)
+        if slot is not None:
+            return slot
+        if session_id in self._states:
+            self._states.move_to_end(session_id)
+        else:
+            self._states[session_id] = self._factory(session_id)
+            self.stats.sessions_created += 1
+        slot = _SessionSlot(
+            session_id=session_id,
+            state=self._states[session_id],
+            queue=asyncio.Queue(maxsize=self._max_queue),
+        )
+        slot.worker = asyncio.get_running_loop().create_task(self._drain(slot), name=f"nsr-session-{session_id}")
+        self._slots[session_id] = slot
+        return slot
+
+    def _release_slot(self, slot: _SessionSlot[SessionT]) -> bool:
+        """Descarta fila e consumidor de uma sessão que esvaziou; o estado vai para o LRU."""
+
+        if slot.pending or self._slots.get(slot.session_id) is not slot:
+            return False
+        del self._slots[slot.session_id]
+        if self.max_idle_sessions is None:
+            return True
+        excess = len(self._states) - len(self._slots) - self.max_idle_sessions
+        for session_id in list(self._states):
+            if excess <= 0:
+                break
+            if session_id in self._slots:
+                continue
+            del self._states[session_id]
+            self.stats.sessions_evicted += 1
+            excess -= 1
+        return True
+
+    async def _drain(self, slot: _SessionSlot[SessionT]) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await slot.queue.get()
+            if job is None:
+                return
+            slot.pending -= 1
+            await self._run_job(slot, job, loop)
+            if self._release_slot(slot):
+                return
+
+    async def _run_job(self, slot: _SessionSlot[SessionT], job: _Job, loop: asyncio.AbstractEventLoop) -> None:
+        if job.future.done():
+            return
+        if job.deadline is not None and loop.time() >= job.deadline:
+            self.stats.dropped_expired += 1
+            job.future.set_exception(asyncio.TimeoutError())
+            return
+        try:
+            result = await loop.run_in_executor(self._executor, self._handler, slot.state, job.text)
+        except Exception as exc:
+            self.stats.failed += 1
+            if not job.future.done():
+                job.future.set_exception(exc)
+            return
+        slot.processed += 1
+        self.stats.completed += 1
+        if not job.future.done():
+            job.future.set_result(result)
+
+
+__all__ = ["AsyncConversationService", "ServiceClosed", "ServiceStats"]
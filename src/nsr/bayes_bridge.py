@@ -91,7 +91,9 @@ def _execute_payload(payload: Mapping[str, object]) -> tuple[BayesNetwork, str,
     evidence = payload.get("evidence") or {}
     if not isinstance(evidence, Mapping):
         raise ValueError("evidence must be an object")
-    posterior = network.posterior(query, evidence)
+    # Junction tree: a compilação e a calibração ficam em cache por digest da
+    # rede, então consultas repetidas sobre o mesmo payload não recalculam
+    posterior = network.posterior(query, evidence, method="junction_tree")
     return network, query, evidence, posterior
 
 
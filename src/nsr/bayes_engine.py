@@ -1,11 +1,28 @@
 """
 Motor determinístico para inferência Bayesiana discreta.
+
+A inferência padrão é eliminação de variáveis exata: as CPTs são compiladas
+uma vez em fatores planos (listas em ordem row-major, última variável mais
+rápida) e a rede compilada fica em cache, chaveada pelo digest da estrutura e
+das CPTs, de modo que redes idênticas reconstruídas a cada consulta (como no
+`bayes_bridge`) reaproveitam a compilação e as ordens de eliminação.
 """
 
 from __future__ import annotations
 
+import itertools
+import math
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, Mapping, Sequence, Tuple
+from hashlib import blake2b
+from operator import mul
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Sequence, Set, Tuple
+
+INFERENCE_METHODS = ("elimination", "junction_tree", "enumeration")
+
+# Fator: (escopo em índices de variável, valores planos em ordem row-major)
+Factor = Tuple[Tuple[int, ...], List[float]]
 
 
 @dataclass(frozen=True)
@@ -24,6 +41,7 @@ class BayesNetwork:
     variables: Dict[str, BayesVariable] = field(default_factory=dict)
     _order: Tuple[str, ...] = field(default_factory=tuple)
     _cpts: Dict[str, Dict[Tuple[Tuple[str, str], ...], Dict[str, float]]] = field(default_factory=dict)
+    _digest: str | None = field(default=None, repr=False, compare=False)
 
     def add_variable(
         self,
@@ -48,6 +66,7 @@ class BayesNetwork:
         self.variables[key] = variable
         self._order = tuple((*self._order, key))
         self._cpts[key] = {}
+        self._digest = None
 
     def set_distribution(
         self,
@@ -71,27 +90,62 @@ class BayesNetwork:
         if abs(total - 1.0) > 1e-6:
             raise ValueError(f"Distribution for '{var.name}' does not sum to 1 (total={total})")
         self._cpts[var.name][assignment_key] = normalized_distribution
+        self._digest = None
 
-    def posterior(self, variable: str, evidence: Mapping[str, str] | None = None) -> Dict[str, float]:
+    def posterior(
+        self,
+        variable: str,
+        evidence: Mapping[str, str] | None = None,
+        *,
+        method: str = "elimination",
+    ) -> Dict[str, float]:
         """
-        Calcula P(variable | evidence) via enumeração determinística.
+        Calcula P(variable | evidence).
+
+        `method="elimination"` (padrão) usa eliminação de variáveis com ordem
+        min-fill sobre a rede compilada; `method="junction_tree"` lê a marginal
+        de uma calibração da junction tree (em cache por evidência, ideal para
+        muitas consultas com a mesma evidência); `method="enumeration"` mantém
+        a enumeração da conjunta completa (exponencial), útil como referência.
         """
 
+        if method not in INFERENCE_METHODS:
+            raise ValueError(f"Unknown inference method '{method}' (expected one of {INFERENCE_METHODS})")
         var = self._require_variable(variable)
-        evidence_map = {name.strip(): value.strip() for name, value in (evidence or {}).items()}
-        for name, value in evidence_map.items():
-            target = self._require_variable(name)
-            if value not in target.values:
-                raise ValueError(f"Value '{value}' is not valid for variable '{name}'")
-        results: Dict[str, float] = {}
-        for value in var.values:
-            extended = dict(evidence_map)
-            extended[var.name] = value
-            results[value] = self._enumerate_all(self._order, extended)
-        total = sum(results.values())
-        if total <= 0.0:
-            raise ValueError("Posterior could not be normalized (probability mass is zero)")
-        return {value: round(prob / total, 6) for value, prob in results.items()}
+        evidence_map = self._normalize_evidence(evidence)
+        if method == "enumeration":
+            results = {}
+            for value in var.values:
+                extended = dict(evidence_map)
+                extended[var.name] = value
+                results[value] = self._enumerate_all(self._order, extended)
+        else:
+            # Como na enumeração, evidência sobre a própria consulta é ignorada
+            evidence_map.pop(var.name, None)
+            if method == "elimination":
+                scores = self._eliminate(var, evidence_map)
+            else:
+                compiled = self._compiled()
+                scores = self._junction_scores(compiled, evidence_map)[compiled.index[var.name]]
+            results = dict(zip(var.values, scores))
+        return self._normalize(results)
+
+    def marginals(self, evidence: Mapping[str, str] | None = None) -> Dict[str, Dict[str, float]]:
+        """
+        Calcula P(X | evidence) de todas as variáveis numa única calibração da
+        junction tree (compilada uma vez por estrutura e CPTs).
+
+        Variáveis observadas recebem a massa concentrada no valor observado;
+        para P(X | demais evidências) use `posterior`.
+        """
+
+        evidence_map = self._normalize_evidence(evidence)
+        compiled = self._compiled()
+        scores = self._junction_scores(compiled, evidence_map)
+        return {
+            name: self._normalize(dict(zip(compiled.values[position], scores[position])))
+            for position, name in enumerate(compiled.names)
+        }
 
     def summarize(self) -> Dict[str, object]:
         """
@@ -120,6 +174,116 @@ class BayesNetwork:
             raise ValueError(f"Unknown variable '{name}'")
         return self.variables[key]
 
+    def _normalize_evidence(self, evidence: Mapping[str, str] | None) -> Dict[str, str]:
+        evidence_map = {name.strip(): value.strip() for name, value in (evidence or {}).items()}
+        for name, value in evidence_map.items():
+            target = self._require_variable(name)
+            if value not in target.values:
+                raise ValueError(f"Value '{value}' is not valid for variable '{name}'")
+        return evidence_map
+
+    @staticmethod
+    def _normalize(results: Mapping[str, float]) -> Dict[str, float]:
+        total = sum(results.values())
+        if total <= 0.0:
+            raise ValueError("Posterior could not be normalized (probability mass is zero)")
+        return {value: round(prob / total, 6) for value, prob in results.items()}
+
+    def digest(self) -> str:
+        """
+        Digest estável da estrutura e das CPTs (chave do cache de compilação).
+        """
+
+        if self._digest is None:
+            payload = repr(
+                [
+                    (
+                        var.name,
+                        var.values,
+                        var.parents,
+                        sorted((key, sorted(dist.items())) for key, dist in self._cpts[var.name].items()),
+                    )
+                    for var in (self.variables[name] for name in self._order)
+                ]
+            )
+            self._digest = blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+        return self._digest
+
+    def _compiled(self) -> "_CompiledNetwork":
+        key = self.digest()
+        with _COMPILED_CACHE_LOCK:
+            compiled = _COMPILED_CACHE.get(key)
+            if compiled is not None:
+                _COMPILED_CACHE.move_to_end(key)
+                return compiled
+        # Compila fora do lock; se outra thread compilou a mesma rede, fica a primeira
+        compiled = _CompiledNetwork(self)
+        with _COMPILED_CACHE_LOCK:
+            compiled = _COMPILED_CACHE.setdefault(key, compiled)
+            _COMPILED_CACHE.move_to_end(key)
+            while len(_COMPILED_CACHE) > _COMPILED_CACHE_SIZE:
+                _COMPILED_CACHE.popitem(last=False)
+        return compiled
+
+    def _eliminate(self, var: BayesVariable, evidence: Mapping[str, str]) -> List[float]:
+        """
+        Pontuações não normalizadas P(var=v, evidence) por eliminação de variáveis.
+        """
+
+        compiled = self._compiled()
+        query = compiled.index[var.name]
+        observed = {compiled.index[name]: compiled.positions[compiled.index[name]][value] for name, value in evidence.items()}
+        factors = [self._reduce_checked(compiled, factor, observed) for factor in compiled.factors]
+        order = compiled.elimination_order(query, frozenset(observed))
+        cards = compiled.cards
+        for eliminated in order:
+            bucket = [factor for factor in factors if eliminated in factor[0]]
+            if not bucket:
+                continue
+            factors = [factor for factor in factors if eliminated not in factor[0]]
+            factors.append(_sum_out(bucket, eliminated, cards))
+        scores = [1.0] * cards[query]
+        for scope, values in factors:
+            if scope:
+                scores = list(map(mul, scores, values))
+            else:
+                scores = [score * values[0] for score in scores]
+        return scores
+
+    def _junction_scores(self, compiled: "_CompiledNetwork", evidence: Mapping[str, str]) -> List[List[float]]:
+        observed = {compiled.index[name]: compiled.positions[compiled.index[name]][value] for name, value in evidence.items()}
+        if compiled.incomplete:
+            for factor in compiled.factors:
+                self._reduce_checked(compiled, factor, observed)
+        return compiled.junction_tree().marginal_scores(observed)
+
+    def _reduce_checked(self, compiled: "_CompiledNetwork", factor: Factor, observed: Mapping[int, int]) -> Factor:
+        reduced = _reduce(factor, observed, compiled.cards)
+        if any(math.isnan(value) for value in reduced[1]):
+            self._raise_missing_entry(compiled, factor[0], observed)
+        return reduced
+
+    def _raise_missing_entry(self, compiled: "_CompiledNetwork", scope: Tuple[int, ...], observed: Mapping[int, int]) -> None:
+        """
+        Reproduz o erro da enumeração para a primeira entrada ausente da CPT.
+        """
+
+        names = [compiled.names[index] for index in scope]
+        domains = [
+            (compiled.values[index][observed[index]],) if index in observed else compiled.values[index]
+            for index in scope
+        ]
+        variable = self.variables[names[-1]]
+        assignments = [dict(zip(names, combination)) for combination in itertools.product(*domains)]
+        table = self._cpts.get(variable.name) or {}
+        for assignment in assignments:
+            key = self._assignment_key(assignment, variable.parents)
+            if key not in table:
+                raise ValueError(f"Missing CPT entry for '{variable.name}' with parents {dict(key)}")
+        for assignment in assignments:
+            self._probability(variable, assignment[variable.name], assignment)
+        raise ValueError(f"Missing CPT entry for '{variable.name}'")  # pragma: no cover - defensivo
+
     def _enumerate_all(self, order: Tuple[str, ...], evidence: Dict[str, str]) -> float:
         if not order:
             return 1.0
@@ -159,4 +323,316 @@ class BayesNetwork:
         return tuple(sorted(key))
 
 
-__all__ = ["BayesNetwork", "BayesVariable"]
+class _CompiledNetwork:
+    """
+    Forma compilada e imutável de uma rede: índices de variáveis e valores,
+    fatores planos das CPTs (NaN marca entradas ausentes), grafo moral e
+    cache de ordens de eliminação por (consulta, variáveis observadas).
+    """
+
+    def __init__(self, network: BayesNetwork) -> None:
+        self.names: Tuple[str, ...] = network._order
+        self.index: Dict[str, int] = {name: position for position, name in enumerate(self.names)}
+        self.values: Tuple[Tuple[str, ...], ...] = tuple(network.variables[name].values for name in self.names)
+        self.positions: Tuple[Dict[str, int], ...] = tuple(
+            {value: position for position, value in enumerate(values)} for values in self.values
+        )
+        self.cards: Tuple[int, ...] = tuple(len(values) for values in self.values)
+        self.factors: List[Factor] = [self._cpt_factor(network, network.variables[name]) for name in self.names]
+        self.incomplete = any(math.isnan(value) for _, values in self.factors for value in values)
+        self.neighbors: List[Set[int]] = [set() for _ in self.names]
+        for scope, _ in self.factors:
+            for a in scope:
+                self.neighbors[a].update(b for b in scope if b != a)
+        self._orders: Dict[Tuple[int, FrozenSet[int]], Tuple[int, ...]] = {}
+        self._junction_tree: _JunctionTree | None = None
+
+    def _cpt_factor(self, network: BayesNetwork, var: BayesVariable) -> Factor:
+        for parent in var.parents:
+            if parent not in self.index:
+                raise ValueError(f"Parent '{parent}' missing from assignment")
+        parents = var.parents
+        table = network._cpts.get(var.name) or {}
+        values: List[float] = []
+        for combination in itertools.product(*(self.values[self.index[parent]] for parent in parents)):
+            key = tuple(sorted(zip(parents, combination))) if parents else ()
+            distribution = table.get(key) or {}
+            values.extend(distribution.get(value, math.nan) for value in var.values)
+        scope = tuple(self.index[parent] for parent in parents) + (self.index[var.name],)
+        return scope, values
+
+    def elimination_order(self, query: int, observed: FrozenSet[int]) -> Tuple[int, ...]:
+        """
+        Ordem min-fill (desempate: grau, posição na rede) das variáveis ocultas.
+        """
+
+        key = (query, observed)
+        order = self._orders.get(key)
+        if order is not None:
+            return order
+        hidden = [index for index in range(len(self.names)) if index != query and index not in observed]
+        graph = {
+            index: {other for other in self.neighbors[index] if other not in observed}
+            for index in range(len(self.names))
+            if index not in observed
+        }
+        order = tuple(node for node, _ in _triangulate(graph, hidden))
+        self._orders[key] = order
+        return order
+
+    def junction_tree(self) -> "_JunctionTree":
+        if self._junction_tree is None:
+            self._junction_tree = _JunctionTree(self)
+        return self._junction_tree
+
+
+class _JunctionTree:
+    """
+    Árvore de cliques da rede compilada: grafo moral triangulado por min-fill,
+    cliques maximais ligados por uma árvore geradora máxima (peso = tamanho do
+    separador) e potenciais planos com os fatores das CPTs. Uma calibração
+    Hugin (coleta + distribuição) por conjunto de evidências fornece todas as
+    marginais; calibrações recentes ficam em cache.
+    """
+
+    def __init__(self, compiled: _CompiledNetwork) -> None:
+        self.compiled = compiled
+        cards = compiled.cards
+        graph = {index: set(compiled.neighbors[index]) for index in range(len(compiled.names))}
+        eliminated = _triangulate(graph, list(graph))
+        candidates = [tuple(sorted(clique)) for _, clique in eliminated]
+        self.cliques: List[Tuple[int, ...]] = []
+        for position, clique in enumerate(candidates):
+            members = set(clique)
+            if any(
+                members < set(other) or (members == set(other) and other_position < position)
+                for other_position, other in enumerate(candidates)
+                if other_position != position
+            ):
+                continue
+            self.cliques.append(clique)
+        self.sizes = [math.prod(cards[index] for index in clique) for clique in self.cliques]
+        self.adjacent: List[List[int]] = [[] for _ in self.cliques]
+        root_of = list(range(len(self.cliques)))
+
+        def find(node: int) -> int:
+            while root_of[node] != node:
+                root_of[node] = root_of[root_of[node]]
+                node = root_of[node]
+            return node
+
+        pairs = sorted(
+            (-len(set(a) & set(b)), i, j)
+            for i, a in enumerate(self.cliques)
+            for j, b in enumerate(self.cliques)
+            if i < j
+        )
+        for _, i, j in pairs:
+            if find(i) != find(j):
+                root_of[find(i)] = find(j)
+                self.adjacent[i].append(j)
+                self.adjacent[j].append(i)
+
+        # Pré-ordem a partir do clique 0 (a árvore geradora é conexa)
+        self.parent: List[int] = [-1] * len(self.cliques)
+        self.preorder: List[int] = []
+        stack = [0] if self.cliques else []
+        seen = set(stack)
+        while stack:
+            node = stack.pop()
+            self.preorder.append(node)
+            for neighbor in sorted(self.adjacent[node], reverse=True):
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    self.parent[neighbor] = node
+                    stack.append(neighbor)
+
+        # Separador com o pai: posição no separador de cada entrada do clique
+        self.up_positions: List[List[int]] = []
+        self.down_positions: List[List[int]] = []
+        self.separator_sizes: List[int] = []
+        for node, clique in enumerate(self.cliques):
+            parent = self.parent[node]
+            separator = tuple(index for index in clique if parent >= 0 and index in self.cliques[parent])
+            strides = _strides(separator, cards)
+            self.separator_sizes.append(math.prod(cards[index] for index in separator))
+            self.up_positions.append(_gather(strides, clique, cards))
+            self.down_positions.append(_gather(strides, self.cliques[parent], cards) if parent >= 0 else [])
+
+        # Potenciais iniciais: cada CPT vai para o menor clique que contém sua família
+        self.potentials: List[List[float]] = [[1.0] * size for size in self.sizes]
+        for scope, values in compiled.factors:
+            family = set(scope)
+            home = min(
+                (node for node, clique in enumerate(self.cliques) if family <= set(clique)),
+                key=lambda node: (self.sizes[node], node),
+            )
+            positions = _gather(_strides(scope, cards), self.cliques[home], cards)
+            self.potentials[home] = [value * values[offset] for value, offset in zip(self.potentials[home], positions)]
+
+        # Clique de leitura de cada variável e posição do seu valor em cada entrada
+        self.home: List[int] = []
+        self.value_positions: List[List[int]] = []
+        for index in range(len(compiled.names)):
+            home = min(
+                (node for node, clique in enumerate(self.cliques) if index in clique),
+                key=lambda node: (self.sizes[node], node),
+            )
+            self.home.append(home)
+            self.value_positions.append(_gather({index: 1}, self.cliques[home], cards))
+        self._calibrations: "OrderedDict[FrozenSet[Tuple[int, int]], List[List[float]]]" = OrderedDict()
+        self._calibrations_lock = threading.Lock()
+
+    def marginal_scores(self, observed: Mapping[int, int]) -> List[List[float]]:
+        """
+        Pontuações não normalizadas P(X=x, evidência) de todas as variáveis.
+        """
+
+        key = frozenset(observed.items())
+        with self._calibrations_lock:
+            scores = self._calibrations.get(key)
+            if scores is not None:
+                self._calibrations.move_to_end(key)
+                return scores
+        beliefs = self._calibrate(observed)
+        scores = []
+        for index, home in enumerate(self.home):
+            totals = [0.0] * self.compiled.cards[index]
+            for value, position in zip(beliefs[home], self.value_positions[index]):
+                totals[position] += value
+            scores.append(totals)
+        with self._calibrations_lock:
+            self._calibrations[key] = scores
+            self._calibrations.move_to_end(key)
+            while len(self._calibrations) > _CALIBRATION_CACHE_SIZE:
+                self._calibrations.popitem(last=False)
+        return scores
+
+    def _calibrate(self, observed: Mapping[int, int]) -> List[List[float]]:
+        cards = self.compiled.cards
+        beliefs = []
+        for clique, potential in zip(self.cliques, self.potentials):
+            observed_here = [(index, observed[index]) for index in clique if index in observed]
+            if observed_here:
+                # Zera (e não multiplica) as entradas incompatíveis: elimina NaN de CPTs incompletas
+                potential = list(potential)
+                for index, value in observed_here:
+                    for position, current in enumerate(_gather({index: 1}, clique, cards)):
+                        if current != value:
+                            potential[position] = 0.0
+            beliefs.append(potential)
+
+        # Coleta: das folhas para a raiz
+        upward: List[List[float]] = [[] for _ in self.cliques]
+        for node in reversed(self.preorder):
+            parent = self.parent[node]
+            if parent < 0:
+                continue
+            message = [0.0] * self.separator_sizes[node]
+            for value, position in zip(beliefs[node], self.up_positions[node]):
+                message[position] += value
+            upward[node] = message
+            beliefs[parent] = [
+                value * message[position] for value, position in zip(beliefs[parent], self.down_positions[node])
+            ]
+
+        # Distribuição: da raiz para as folhas (Hugin, com 0/0 = 0)
+        for node in self.preorder:
+            parent = self.parent[node]
+            if parent < 0:
+                continue
+            message = [0.0] * self.separator_sizes[node]
+            for value, position in zip(beliefs[parent], self.down_positions[node]):
+                message[position] += value
+            ratio = [new / old if old else 0.0 for new, old in zip(message, upward[node])]
+            beliefs[node] = [value * ratio[position] for value, position in zip(beliefs[node], self.up_positions[node])]
+        return beliefs
+
+
+def _triangulate(graph: Dict[int, Set[int]], nodes: Sequence[int]) -> List[Tuple[int, FrozenSet[int]]]:
+    """
+    Elimina `nodes` de `graph` (alterado in-place) em ordem min-fill
+    (desempate: grau, índice) e devolve (nó, clique formado) por passo.
+    """
+
+    steps: List[Tuple[int, FrozenSet[int]]] = []
+    remaining = set(nodes)
+    while remaining:
+        best = min(remaining, key=lambda node: (_fill_in(graph, node), len(graph[node]), node))
+        remaining.discard(best)
+        adjacent = graph.pop(best)
+        steps.append((best, frozenset(adjacent | {best})))
+        for node in adjacent:
+            graph[node].discard(best)
+            graph[node].update(adjacent - {node})
+    return steps
+
+
+def _fill_in(graph: Mapping[int, Set[int]], node: int) -> int:
+    adjacent = list(graph[node])
+    return sum(
+        1
+        for position, a in enumerate(adjacent)
+        for b in adjacent[position + 1 :]
+        if b not in graph[a]
+    )
+
+
+def _strides(scope: Sequence[int], cards: Sequence[int]) -> Dict[int, int]:
+    strides: Dict[int, int] = {}
+    step = 1
+    for index in reversed(scope):
+        strides[index] = step
+        step *= cards[index]
+    return strides
+
+
+def _gather(strides: Mapping[int, int], scope: Sequence[int], cards: Sequence[int], base: int = 0) -> List[int]:
+    """
+    Posições no fator (com `strides`) de cada atribuição de `scope`, em ordem row-major.
+    """
+
+    positions = [base]
+    for index in scope:
+        stride = strides.get(index, 0)
+        span = range(cards[index])
+        if stride:
+            positions = [position + value * stride for position in positions for value in span]
+        else:
+            positions = [position for position in positions for _ in span]
+    return positions
+
+
+def _reduce(factor: Factor, observed: Mapping[int, int], cards: Sequence[int]) -> Factor:
+    scope, values = factor
+    if not any(index in observed for index in scope):
+        return factor
+    strides = _strides(scope, cards)
+    base = sum(strides[index] * observed[index] for index in scope if index in observed)
+    kept = tuple(index for index in scope if index not in observed)
+    return kept, [values[position] for position in _gather(strides, kept, cards, base)]
+
+
+def _sum_out(factors: Sequence[Factor], eliminated: int, cards: Sequence[int]) -> Factor:
+    """
+    Multiplica os fatores e soma `eliminated`, que fica na posição mais interna.
+    """
+
+    kept = tuple(sorted({index for scope, _ in factors for index in scope if index != eliminated}))
+    scope = kept + (eliminated,)
+    product: List[float] = []
+    for position, (factor_scope, values) in enumerate(factors):
+        gathered = [values[offset] for offset in _gather(_strides(factor_scope, cards), scope, cards)]
+        product = list(map(mul, product, gathered)) if position else gathered
+    width = cards[eliminated]
+    return kept, [sum(product[start : start + width]) for start in range(0, len(product), width)]
+
+
+_COMPILED_CACHE_SIZE = 64
+_CALIBRATION_CACHE_SIZE = 32
+# Redes compiladas são compartilhadas entre instâncias (e threads) com o mesmo digest
+_COMPILED_CACHE: "OrderedDict[str, _CompiledNetwork]" = OrderedDict()
+_COMPILED_CACHE_LOCK = threading.Lock()
+
+
+__all__ = ["BayesNetwork", "BayesVariable", "INFERENCE_METHODS"]
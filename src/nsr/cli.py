@@ -7,13 +7,13 @@ from __future__ import annotations
 import argparse
 import json
 import sys
+from contextlib import contextmanager
+from dataclasses import replace
 from pathlib import Path
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, Iterator
 
-from liu import to_json
-
-from . import SessionCtx, run_text_full
-from .meta_transformer import meta_summary_to_dict
+if TYPE_CHECKING:
+    from .state import SessionCtx
 
 
 def _build_parser() -> argparse.ArgumentParser:
@@ -114,6 +114,19 @@ def _build_parser() -> argparse.ArgumentParser:
         action="append",
         help="Garante que o resumo de código contém uma função com o nome informado (pode repetir a flag).",
     )
+    parser.add_argument(
+        "--cache-dir",
+        help="Ativa o cache determinístico de resultados (LRU em memória + diretório em disco informado).",
+    )
+    parser.add_argument(
+        "--session",
+        help="Sessão nomeada mantida aquecida pelo servidor `python -m nsr.server` (ignorada sem servidor).",
+    )
+    parser.add_argument(
+        "--no-server",
+        action="store_true",
+        help="Executa sempre localmente, mesmo quando há um servidor NSR ativo.",
+    )
     return parser
 
 
@@ -126,15 +139,40 @@ def _build_equation_bundle(outcome, fmt: str) -> Dict[str, Any]:
     return bundle
 
 
-def main(argv: list[str] | None = None) -> int:
-    parser = _build_parser()
-    args = parser.parse_args(argv)
+def build_cli_session() -> "SessionCtx":
+    """Cria a sessão isolada usada pela CLI (sem persistência em disco)."""
+
+    from .state import SessionCtx
 
     session = SessionCtx()
     session.config.memory_store_path = None
     session.config.episodes_path = None
     session.config.induction_rules_path = None
     session.meta_buffer = tuple()
+    return session
+
+
+@contextmanager
+def request_overrides(session: "SessionCtx", args: argparse.Namespace) -> Iterator["SessionCtx"]:
+    """
+    Aplica as flags de uma requisição só enquanto ela roda.
+
+    A sessão recebe uma cópia do `Config` (e o cache da requisição); ao sair,
+    config e cache originais são restaurados, então as flags de um cliente
+    não vazam para as próximas requisições de uma sessão nomeada aquecida.
+    O restante do estado (memória, histórico) continua acumulando normalmente.
+    """
+
+    config, result_cache = session.config, session.result_cache
+    session.config = replace(config)
+    try:
+        apply_cli_overrides(session, args)
+        yield session
+    finally:
+        session.config, session.result_cache = config, result_cache
+
+
+def apply_cli_overrides(session: "SessionCtx", args: argparse.Namespace) -> None:
     if args.disable_contradictions:
         session.config.enable_contradiction_check = False
     elif args.enable_contradictions:
@@ -145,8 +183,42 @@ def main(argv: list[str] | None = None) -> int:
         session.config.min_quality = args.min_quality
     if args.calc_mode is not None:
         session.config.calc_mode = args.calc_mode
+    if args.cache_dir and session.result_cache is None:
+        session.result_cache = _shared_cache(args.cache_dir)
+
+
+_CACHES: Dict[str, Any] = {}
+
+
+def _shared_cache(cache_dir: str):
+    # Um OutcomeCache por diretório: o servidor reaproveita a camada em memória entre chamadas.
+    from .result_cache import OutcomeCache
+
+    key = str(Path(cache_dir).resolve())
+    cache = _CACHES.get(key)
+    if cache is None:
+        cache = OutcomeCache(disk_path=key)
+        _CACHES[key] = cache
+    return cache
 
-    outcome = run_text_full(args.text, session)
+
+def render_cli_output(args: argparse.Namespace, session: "SessionCtx | None" = None) -> str:
+    """
+    Executa `run_text_full` e serializa o payload exatamente como a CLI imprime.
+
+    Sem `session`, usa uma sessão nova (comportamento padrão da CLI); o servidor
+    passa sessões nomeadas já aquecidas.
+    """
+
+    from liu import to_json
+
+    from .runtime import run_text_full
+    from .meta_transformer import meta_summary_to_dict
+
+    if session is None:
+        session = build_cli_session()
+    with request_overrides(session, args):
+        outcome = run_text_full(args.text, session)
     if args.expect_meta_digest:
         if not outcome.meta_summary:
             raise SystemExit("expect-meta-digest requer meta_summary (use --include-meta).")
@@ -235,18 +307,32 @@ def main(argv: list[str] | None = None) -> int:
             raise SystemExit("--include-proof requer meta_summary e uma consulta lógica (use --include-meta).")
         payload["proof_detail"] = proof_meta
 
-    serialized = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def main(argv: list[str] | None = None) -> int:
+    raw_argv = list(sys.argv[1:] if argv is None else argv)
+    parser = _build_parser()
+    args = parser.parse_args(raw_argv)
+
+    serialized = None
+    if not args.no_server:
+        from .server import request_cli_output
+
+        serialized = request_cli_output(raw_argv)
+    if serialized is None:
+        serialized = render_cli_output(args)
     if args.output:
         Path(args.output).write_text(serialized + "\n", encoding="utf-8")
     print(serialized)
     return 0
 
 
-if __name__ == "__main__":
-    sys.exit(main())
+def _extract_code_summary_data(outcome) -> dict[str, object] | None:
+    from liu import to_json
 
+    from .meta_transformer import meta_summary_to_dict
 
-def _extract_code_summary_data(outcome) -> dict[str, object] | None:
     digest = None
     fn_count = None
     node_count = None
@@ -353,6 +439,8 @@ def _extract_code_summary_data(outcome) -> dict[str, object] | None:
 
 
 def _extract_equation_trend_data(outcome) -> dict[str, object] | None:
+    from .meta_transformer import meta_summary_to_dict
+
     if not outcome.meta_summary:
         return None
     summary_dict = meta_summary_to_dict(outcome.meta_summary)
@@ -379,6 +467,8 @@ def _extract_equation_trend_data(outcome) -> dict[str, object] | None:
 
 
 def _extract_logic_proof_data(outcome) -> dict[str, object] | None:
+    from .meta_transformer import meta_summary_to_dict
+
     if not outcome.meta_summary:
         return None
     summary_dict = meta_summary_to_dict(outcome.meta_summary)
@@ -396,3 +486,7 @@ def _extract_logic_proof_data(outcome) -> dict[str, object] | None:
     if proof_payload:
         proof_data["proof"] = proof_payload
     return proof_data
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,8 +4,25 @@ Belief Propagation determinístico para grafos fatoriais discretos.
 
 from __future__ import annotations
 
+import heapq
+import math
 from dataclasses import dataclass, field
-from typing import Dict, Mapping, Tuple
+from operator import mul
+from typing import Dict, List, Mapping, Tuple, Union
+
+try:  # pragma: no cover - optional acceleration
+    import numpy as _np
+except Exception:  # pragma: no cover - fallback uses stdlib
+    _np = None
+
+BP_SCHEDULES = ("residual", "flooding")
+BP_BACKENDS = ("auto", "python", "numpy")
+
+# Tabelas com pelo menos este número de entradas usam NumPy em backend="auto"
+_NUMPY_MIN_ENTRIES = 64
+
+# Valores de `bp_stats`: iterações/atualizações, resíduo e a flag `converged`
+BPStat = Union[bool, int, float]
 
 
 @dataclass(frozen=True)
@@ -25,6 +42,7 @@ class Factor:
 class FactorGraph:
     variables: Dict[str, FactorVariable] = field(default_factory=dict)
     factors: Dict[str, Factor] = field(default_factory=dict)
+    bp_stats: Dict[str, BPStat] = field(default_factory=dict, repr=False, compare=False)
 
     @staticmethod
     def from_payload(payload: Mapping[str, object]) -> FactorGraph:
@@ -61,123 +79,248 @@ class FactorGraph:
         *,
         max_iters: int = 20,
         damping: float = 0.0,
+        tolerance: float = 1e-6,
+        schedule: str = "residual",
+        backend: str = "auto",
     ) -> Dict[str, Dict[str, float]]:
-        messages = self._initialize_messages()
-        for _ in range(max_iters):
-            new_messages = self._iterate_messages(messages, damping)
-            if self._messages_converged(messages, new_messages):
-                messages = new_messages
+        """
+        Loopy belief propagation sobre índices e tabelas densas pré-computados.
+
+        `schedule="residual"` atualiza primeiro a mensagem fator→variável de
+        maior resíduo (fila de prioridade, empates pela ordem das arestas) até
+        o resíduo máximo ficar abaixo de `tolerance` ou o orçamento de
+        `max_iters` varreduras se esgotar; `schedule="flooding"` mantém as
+        iterações síncronas. `damping` mistura cada mensagem nova com a
+        anterior. Com `backend="numpy"` (ou "auto", para tabelas grandes) as
+        contrações tensoriais usam NumPy.
+        """
+
+        if schedule not in BP_SCHEDULES:
+            raise ValueError(f"unknown schedule '{schedule}' (expected one of {BP_SCHEDULES})")
+        if backend not in BP_BACKENDS:
+            raise ValueError(f"unknown backend '{backend}' (expected one of {BP_BACKENDS})")
+        if backend == "numpy" and _np is None:
+            raise RuntimeError("backend 'numpy' requires numpy to be installed")
+        if not 0.0 <= damping < 1.0:
+            raise ValueError("damping must be in [0, 1)")
+        compiled = _CompiledGraph(self, backend)
+        if schedule == "residual":
+            to_variable, stats = compiled.run_residual(max_iters, damping, tolerance)
+        else:
+            to_variable, stats = compiled.run_flooding(max_iters, damping, tolerance)
+        self.bp_stats = stats
+        return compiled.marginals(to_variable)
+
+
+class _CompiledGraph:
+    """
+    Forma indexada do grafo para uma execução de BP.
+
+    Cada aresta (fator, posição) tem um índice; as mensagens são listas de
+    floats na ordem dos valores da variável. As tabelas dos fatores são
+    densas em ordem row-major (última variável mais rápida), com zero para
+    atribuições ausentes, e `coords[f][j]` dá o índice do valor da j-ésima
+    variável em cada entrada da tabela.
+    """
+
+    def __init__(self, graph: FactorGraph, backend: str) -> None:
+        self.names: Tuple[str, ...] = tuple(graph.variables)
+        index = {name: position for position, name in enumerate(self.names)}
+        self.values: Tuple[Tuple[str, ...], ...] = tuple(graph.variables[name].values for name in self.names)
+        self.cards: Tuple[int, ...] = tuple(len(values) for values in self.values)
+        self.scopes: List[Tuple[int, ...]] = []
+        self.tables: List[List[float]] = []
+        self.coords: List[List[List[int]]] = []
+        self.arrays: List[object | None] = []
+        # Arestas: (fator, posição no escopo) -> índice; vizinhos das variáveis por aresta
+        self.edge_factor: List[int] = []
+        self.edge_variable: List[int] = []
+        self.factor_edges: List[List[int]] = []
+        self.variable_edges: List[List[int]] = [[] for _ in self.names]
+        for factor in graph.factors.values():
+            scope = tuple(index[name] for name in factor.variables)
+            cards = [self.cards[variable] for variable in scope]
+            positions = [
+                {value: position for position, value in enumerate(self.values[variable])} for variable in scope
+            ]
+            size = math.prod(cards)
+            table = [0.0] * size
+            for assignment, weight in factor.table.items():
+                offset = 0
+                for value, lookup, card in zip(assignment, positions, cards):
+                    if value not in lookup:
+                        raise ValueError(f"factor '{factor.name}' uses unknown value '{value}'")
+                    offset = offset * card + lookup[value]
+                table[offset] = float(weight)
+            coords = []
+            stride = size
+            for card in cards:
+                stride //= card
+                coords.append([(entry // stride) % card for entry in range(size)])
+            use_numpy = _np is not None and (backend == "numpy" or (backend == "auto" and size >= _NUMPY_MIN_ENTRIES))
+            factor_index = len(self.scopes)
+            self.scopes.append(scope)
+            self.tables.append(table)
+            self.coords.append(coords)
+            self.arrays.append(_np.asarray(table, dtype=float).reshape(cards) if use_numpy else None)
+            edges = []
+            for variable in scope:
+                edge = len(self.edge_factor)
+                self.edge_factor.append(factor_index)
+                self.edge_variable.append(variable)
+                self.variable_edges[variable].append(edge)
+                edges.append(edge)
+            self.factor_edges.append(edges)
+
+    def _uniform(self, edge: int) -> List[float]:
+        card = self.cards[self.edge_variable[edge]]
+        return [1.0 / card] * card
+
+    def factor_message(self, edge: int, to_factor: List[List[float]]) -> List[float]:
+        """
+        Mensagem não normalizada fator→variável da aresta `edge`.
+        """
+
+        factor = self.edge_factor[edge]
+        edges = self.factor_edges[factor]
+        target = edges.index(edge)
+        array = self.arrays[factor]
+        if array is not None:
+            operands: List[object] = [array, list(range(len(edges)))]
+            for position, other in enumerate(edges):
+                if position != target:
+                    operands.extend((_np.asarray(to_factor[other]), [position]))
+            return _np.einsum(*operands, [target]).tolist()
+        coords = self.coords[factor]
+        product = self.tables[factor]
+        for position, other in enumerate(edges):
+            if position != target:
+                product = list(map(mul, product, map(to_factor[other].__getitem__, coords[position])))
+        totals = [0.0] * self.cards[self.edge_variable[edge]]
+        for value, weight in zip(coords[target], product):
+            totals[value] += weight
+        return totals
+
+    def variable_message(self, edge: int, to_variable: List[List[float]]) -> List[float]:
+        """
+        Mensagem não normalizada variável→fator da aresta `edge`.
+        """
+
+        variable = self.edge_variable[edge]
+        product = [1.0] * self.cards[variable]
+        for other in self.variable_edges[variable]:
+            if other != edge:
+                product = list(map(mul, product, to_variable[other]))
+        return product
+
+    def run_flooding(self, max_iters: int, damping: float, tolerance: float) -> Tuple[List[List[float]], Dict[str, BPStat]]:
+        edges = range(len(self.edge_factor))
+        to_factor = [self._uniform(edge) for edge in edges]
+        to_variable = [self._uniform(edge) for edge in edges]
+        iterations = 0
+        residual = 0.0
+        for iterations in range(1, max_iters + 1):
+            new_to_variable = [
+                _normalize(self.factor_message(edge, to_factor), damping, to_variable[edge]) for edge in edges
+            ]
+            new_to_factor = [
+                _normalize(self.variable_message(edge, new_to_variable), damping, to_factor[edge]) for edge in edges
+            ]
+            residual = max(
+                (_residual(old, new) for old, new in zip(to_variable + to_factor, new_to_variable + new_to_factor)),
+                default=0.0,
+            )
+            to_variable, to_factor = new_to_variable, new_to_factor
+            if residual <= tolerance:
                 break
-            messages = new_messages
-        return self._compute_marginals(messages)
-
-    def _variable_neighbors(self, variable: str) -> Tuple[str, ...]:
-        return tuple(
-            factor.name
-            for factor in self.factors.values()
-            if variable in factor.variables
+        stats = {"iterations": iterations, "updates": iterations * len(edges), "residual": residual, "converged": residual <= tolerance}
+        return to_variable, stats
+
+    def run_residual(self, max_iters: int, damping: float, tolerance: float) -> Tuple[List[List[float]], Dict[str, BPStat]]:
+        edge_count = len(self.edge_factor)
+        to_factor = [self._uniform(edge) for edge in range(edge_count)]
+        to_variable = [self._uniform(edge) for edge in range(edge_count)]
+        priority = [0.0] * edge_count
+        version = [0] * edge_count
+        heap: List[Tuple[float, int, int]] = []
+
+        def schedule(edge: int, change: float) -> None:
+            # Estimativa do resíduo: soma das variações das mensagens de entrada
+            priority[edge] += change
+            version[edge] += 1
+            heapq.heappush(heap, (-priority[edge], edge, version[edge]))
+
+        for edge in range(edge_count):
+            candidate = _normalize(self.factor_message(edge, to_factor), damping, to_variable[edge])
+            change = _residual(to_variable[edge], candidate)
+            if change > tolerance:
+                schedule(edge, change)
+        budget = max_iters * edge_count
+        updates = 0
+        while heap and updates < budget:
+            _, edge, stamp = heapq.heappop(heap)
+            if stamp != version[edge]:
+                continue
+            priority[edge] = 0.0
+            version[edge] += 1
+            candidate = _normalize(self.factor_message(edge, to_factor), damping, to_variable[edge])
+            change = _residual(to_variable[edge], candidate)
+            if change <= tolerance:
+                continue
+            to_variable[edge] = candidate
+            updates += 1
+            if damping > 0.0:
+                # Mensagem amortecida ainda não chegou ao valor da regra de atualização
+                schedule(edge, change)
+            # A variável recebeu nova mensagem: atualiza suas mensagens para os
+            # outros fatores e agenda as mensagens desses fatores para as demais
+            variable = self.edge_variable[edge]
+            for other in self.variable_edges[variable]:
+                if other == edge:
+                    continue
+                message = _normalize(self.variable_message(other, to_variable))
+                delta = _residual(to_factor[other], message)
+                to_factor[other] = message
+                for target in self.factor_edges[self.edge_factor[other]]:
+                    if target != other:
+                        schedule(target, delta)
+        residual = max(
+            (
+                _residual(to_variable[edge], _normalize(self.factor_message(edge, to_factor), damping, to_variable[edge]))
+                for edge in range(edge_count)
+            ),
+            default=0.0,
         )
+        stats = {
+            "iterations": updates / edge_count if edge_count else 0.0,
+            "updates": updates,
+            "residual": residual,
+            "converged": residual <= tolerance,
+        }
+        return to_variable, stats
 
-    def _factor_neighbors(self, factor_name: str) -> Tuple[str, ...]:
-        factor = self.factors[factor_name]
-        return factor.variables
-
-    def _initialize_messages(self) -> Dict[Tuple[str, str], Dict[str, float]]:
-        messages: Dict[Tuple[str, str], Dict[str, float]] = {}
-        for variable in self.variables:
-            neighbors = self._variable_neighbors(variable)
-            for factor in neighbors:
-                messages[(variable, factor)] = {
-                    value: 1.0 / len(self.variables[variable].values)
-                    for value in self.variables[variable].values
-                }
-                messages[(factor, variable)] = {
-                    value: 1.0 / len(self.variables[variable].values)
-                    for value in self.variables[variable].values
-                }
-        return messages
-
-    def _iterate_messages(
-        self,
-        messages: Dict[Tuple[str, str], Dict[str, float]],
-        damping: float,
-    ) -> Dict[Tuple[str, str], Dict[str, float]]:
-        new_messages = dict(messages)
-        for factor_name, factor in self.factors.items():
-            for target_variable in factor.variables:
-                incoming = [
-                    (neighbor, messages[(neighbor, factor_name)])
-                    for neighbor in factor.variables
-                    if neighbor != target_variable
-                ]
-                table = factor.table
-                variable_values = self.variables[target_variable].values
-                updated = {}
-                for target_value in variable_values:
-                    total = 0.0
-                    for assignment, weight in table.items():
-                        if assignment[factor.variables.index(target_variable)] != target_value:
-                            continue
-                        product = weight
-                        for neighbor_name, neighbor_message in incoming:
-                            neighbor_value = assignment[factor.variables.index(neighbor_name)]
-                            product *= neighbor_message[neighbor_value]
-                        total += product
-                    updated[target_value] = total
-                new_messages[(factor_name, target_variable)] = _normalize(updated, damping, messages[(factor_name, target_variable)])
-        for variable_name, variable in self.variables.items():
-            neighbors = self._variable_neighbors(variable_name)
-            for factor_name in neighbors:
-                product = {value: 1.0 for value in variable.values}
-                for other_factor in neighbors:
-                    if other_factor == factor_name:
-                        continue
-                    incoming = new_messages[(other_factor, variable_name)]
-                    for value in variable.values:
-                        product[value] *= incoming[value]
-                new_messages[(variable_name, factor_name)] = _normalize(product, damping, messages[(variable_name, factor_name)])
-        return new_messages
-
-    def _messages_converged(
-        self,
-        old: Dict[Tuple[str, str], Dict[str, float]],
-        new: Dict[Tuple[str, str], Dict[str, float]],
-        threshold: float = 1e-6,
-    ) -> bool:
-        for key in old:
-            for value in old[key]:
-                if abs(old[key][value] - new[key][value]) > threshold:
-                    return False
-        return True
-
-    def _compute_marginals(self, messages: Dict[Tuple[str, str], Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    def marginals(self, to_variable: List[List[float]]) -> Dict[str, Dict[str, float]]:
         marginals: Dict[str, Dict[str, float]] = {}
-        for variable_name, variable in self.variables.items():
-            product = {value: 1.0 for value in variable.values}
-            neighbors = self._variable_neighbors(variable_name)
-            for factor_name in neighbors:
-                incoming = messages[(factor_name, variable_name)]
-                for value in variable.values:
-                    product[value] *= incoming[value]
-            marginals[variable_name] = _normalize(product)
+        for variable, name in enumerate(self.names):
+            product = [1.0] * self.cards[variable]
+            for edge in self.variable_edges[variable]:
+                product = list(map(mul, product, to_variable[edge]))
+            marginals[name] = dict(zip(self.values[variable], _normalize(product)))
         return marginals
 
 
-def _normalize(
-    distribution: Mapping[str, float],
-    damping: float = 0.0,
-    previous: Mapping[str, float] | None = None,
-) -> Dict[str, float]:
-    total = sum(distribution.values())
+def _normalize(message: List[float], damping: float = 0.0, previous: List[float] | None = None) -> List[float]:
+    total = sum(message)
     if total <= 0.0:
         raise ValueError("distribution mass is zero or negative")
-    normalized = {state: value / total for state, value in distribution.items()}
+    normalized = [value / total for value in message]
     if previous is not None and damping > 0.0:
-        return {
-            state: (1 - damping) * normalized[state] + damping * previous[state]
-            for state in normalized
-        }
+        return [(1 - damping) * value + damping * old for value, old in zip(normalized, previous)]
     return normalized
 
 
-__all__ = ["FactorGraph", "FactorVariable", "Factor"]
+def _residual(old: List[float], new: List[float]) -> float:
+    return max((abs(a - b) for a, b in zip(old, new)), default=0.0)
+
+
+__all__ = ["BP_BACKENDS", "BP_SCHEDULES", "FactorGraph", "FactorVariable", "Factor"]
@@ -6,8 +6,11 @@ from __future__ import annotations
 
 import json
 import re
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Sequence
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Sequence, Tuple, Union
 
 from .langpacks_verbs import (
     EN_VERB_LEXEMES,
@@ -53,8 +56,87 @@ STOP_WORDS = {
 }
 
 
-def tokenize(text: str, lexicon: Lexicon) -> List[Token]:
-    tokens: List[Token] = []
+# (lemma, tag, payload, descartável) — resultado único de uma consulta ao léxico.
+LexEntry = Tuple[str, str, Union[str, None], bool]
+
+_PHRASE_END = ""
+
+
+@dataclass(frozen=True)
+class CompiledLexicon:
+    """
+    Léxico congelado: cada forma conhecida resolve sinônimo, rel_word, pos_hint,
+    qualifier e stop word numa única consulta. Expressões multi-palavra (chaves
+    com espaço) ficam num trie de palavras e são reconhecidas no tokenize.
+    """
+
+    entries: Mapping[str, LexEntry]
+    phrases: Mapping[str, object]
+    max_phrase_words: int
+    _table: Dict[str, LexEntry] = field(default_factory=dict, repr=False, compare=False)
+
+    def lookup(self, word: str) -> LexEntry:
+        entry = self._table.get(word)
+        if entry is not None:
+            return entry
+        # Forma desconhecida: lemma = forma e somente o sufixo adverbial importa.
+        return (word, "QUALIFIER" if word.endswith("mente") else "ENTITY", None, False)
+
+
+def compile_lexicon(lexicon: Lexicon) -> CompiledLexicon:
+    words = set(lexicon.synonyms) | set(lexicon.rel_words) | set(lexicon.pos_hint) | set(lexicon.qualifiers)
+    words |= STOP_WORDS
+    entries: Dict[str, LexEntry] = {}
+    trie: Dict[str, object] = {}
+    max_phrase_words = 1
+    for word in words:
+        lemma = lexicon.synonyms.get(word, word)
+        tag, payload = infer_tag(word, lemma, lexicon)
+        entry = (lemma, tag, payload, word in STOP_WORDS and tag == "ENTITY")
+        parts = word.split()
+        if len(parts) > 1:
+            node = trie
+            for part in parts:
+                node = node.setdefault(part, {})  # type: ignore[assignment]
+            node[_PHRASE_END] = entry  # type: ignore[index]
+            max_phrase_words = max(max_phrase_words, len(parts))
+        else:
+            entries[word] = entry
+    return CompiledLexicon(
+        entries=MappingProxyType(entries),
+        phrases=MappingProxyType(trie),
+        max_phrase_words=max_phrase_words,
+        _table=entries,
+    )
+
+
+@lru_cache(maxsize=32)
+def _compiled_for_codes(codes: Tuple[str, ...]) -> CompiledLexicon:
+    return compile_lexicon(compose_lexicon(codes))
+
+
+def compiled_lexicon_for(language_codes: Sequence[str]) -> CompiledLexicon:
+    """Léxico compilado (e cacheado) para uma combinação de LangPacks."""
+
+    return _compiled_for_codes(tuple(code.lower() for code in language_codes))
+
+
+def tokenize(text: str, lexicon: Lexicon | CompiledLexicon) -> List[Token]:
+    if isinstance(lexicon, CompiledLexicon):
+        if lexicon.phrases:
+            return _tokenize_phrases(text, lexicon)
+        tokens: List[Token] = []
+        append = tokens.append
+        table_get = lexicon._table.get
+        for surface in WORD_RE.findall(text):
+            word = surface.lower()
+            entry = table_get(word)
+            if entry is None:
+                append(Token(word, "QUALIFIER" if word.endswith("mente") else "ENTITY", None, surface))
+            elif not entry[3]:
+                append(Token(entry[0], entry[1], entry[2], surface))
+        return tokens
+    tokens = []
     for match in WORD_RE.finditer(text):
         surface = match.group(0)
         word = surface.lower()
@@ -66,6 +148,34 @@ def tokenize(text: str, lexicon: Lexicon) -> List[Token]:
     return tokens
 
 
+def _tokenize_phrases(text: str, lexicon: CompiledLexicon) -> List[Token]:
+    matches = list(WORD_RE.finditer(text))
+    lowered = [match.group(0).lower() for match in matches]
+    tokens: List[Token] = []
+    idx = 0
+    while idx < len(matches):
+        node = lexicon.phrases.get(lowered[idx])
+        best: Tuple[int, LexEntry] | None = None
+        probe = idx + 1
+        while isinstance(node, Mapping) and probe < len(matches) and probe - idx < lexicon.max_phrase_words:
+            node = node.get(lowered[probe])
+            probe += 1
+            if isinstance(node, Mapping) and _PHRASE_END in node:
+                best = (probe, node[_PHRASE_END])  # type: ignore[assignment]
+        if best is not None:
+            end, entry = best
+            surface = text[matches[idx].start() : matches[end - 1].end()]
+        else:
+            end = idx + 1
+            surface = matches[idx].group(0)
+            entry = lexicon.lookup(lowered[idx])
+        idx = end
+        if entry[3]:
+            continue
+        tokens.append(Token(lemma=entry[0], tag=entry[1], payload=entry[2], surface=surface))
+    return tokens
+
+
 def infer_tag(word: str, lemma: str, lexicon: Lexicon) -> tuple[str, str | None]:
     rel_label = lexicon.rel_words.get(word) or lexicon.rel_words.get(lemma)
     if rel_label:
@@ -77,13 +187,20 @@ def infer_tag(word: str, lemma: str, lexicon: Lexicon) -> tuple[str, str | None]
 
 
 def compose_lexicon(language_codes: Sequence[str]) -> Lexicon:
-    lex = Lexicon()
+    # Mesma precedência de Lexicon.merge encadeado, mas num único passe (sem cópias intermediárias).
+    synonyms: Dict[str, str] = {}
+    pos_hint: Dict[str, str] = {}
+    qualifiers: set[str] = set()
+    rel_words: Dict[str, str] = {}
     for code in language_codes:
         pack = LANGUAGE_PACKS.get(code.lower())
         if pack is None:
             raise ValueError(f"Unknown language pack '{code}'")
-        lex = lex.merge(pack)
-    return lex
+        synonyms.update(pack.synonyms)
+        pos_hint.update(pack.pos_hint)
+        qualifiers.update(pack.qualifiers)
+        rel_words.update(pack.rel_words)
+    return Lexicon(synonyms=synonyms, pos_hint=pos_hint, qualifiers=qualifiers, rel_words=rel_words)
 
 
 def load_lexicon_file(path: str | Path) -> Lexicon:
@@ -266,7 +383,19 @@ _extend_with_verbs("it", IT_VERB_LEXEMES)
 _extend_with_verbs("en", EN_VERB_LEXEMES)
 
 
-DEFAULT_LEXICON = compose_lexicon(("pt", "en", "es", "fr", "it"))
+DEFAULT_LANGUAGE_CODES = ("pt", "en", "es", "fr", "it")
+DEFAULT_LEXICON = compose_lexicon(DEFAULT_LANGUAGE_CODES)
+DEFAULT_COMPILED_LEXICON = compiled_lexicon_for(DEFAULT_LANGUAGE_CODES)
 
 
-__all__ = ["tokenize", "DEFAULT_LEXICON", "compose_lexicon", "load_lexicon_file", "LANGUAGE_PACKS"]
+__all__ = [
+    "tokenize",
+    "DEFAULT_LEXICON",
+    "DEFAULT_COMPILED_LEXICON",
+    "CompiledLexicon",
+    "compile_lexicon",
+    "compiled_lexicon_for",
+    "compose_lexicon",
+    "load_lexicon_file",
+    "LANGUAGE_PACKS",
+]
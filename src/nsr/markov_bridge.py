@@ -40,6 +40,8 @@ def maybe_route_markov(text: str) -> MarkovHook | None:
         model = MarkovModel.from_payload(payload)
         observations = tuple(str(obs).strip() for obs in payload.get("observations", []) if str(obs).strip())
         final_distribution, history, likelihood = model.forward(observations)
+        log_likelihood = model.log_likelihood(observations)
+        path, path_score = model.viterbi(observations)
     except ValueError:
         return None
     struct_node = liu_struct(
@@ -51,6 +53,7 @@ def maybe_route_markov(text: str) -> MarkovHook | None:
         _model_context(model),
         _observation_context(observations),
         forward_node,
+        _decoding_context(path, path_score, log_likelihood),
     )
     return MarkovHook(
         struct_node=struct_node,
@@ -103,4 +106,13 @@ def _observation_context(observations: Tuple[str, ...]) -> Node:
     )
 
 
+def _decoding_context(path: Tuple[str, ...], path_score: float, log_likelihood: float) -> Node:
+    return liu_struct(
+        tag=entity("markov_decoding"),
+        viterbi_path=list_node(entity(state) for state in path),
+        viterbi_log_probability=number(round(path_score, 6)),
+        log_likelihood=number(round(log_likelihood, 6)),
+    )
+
+
 __all__ = ["MarkovHook", "maybe_route_markov"]
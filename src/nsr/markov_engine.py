@@ -4,8 +4,10 @@ Motor determinístico para cadeias de Markov/HMM discretas.
 
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, Mapping, Sequence, Tuple
+from operator import mul
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
 
 
 def _normalize(probabilities: Dict[str, float]) -> Dict[str, float]:
@@ -18,7 +20,8 @@ def _normalize(probabilities: Dict[str, float]) -> Dict[str, float]:
 @dataclass()
 class MarkovModel:
     """
-    Cadeia de Markov/HMM discreta com inferência determinística (algoritmo forward).
+    Cadeia de Markov/HMM discreta com inferência determinística: forward com
+    reescalonamento, forward-backward, Viterbi em espaço log e avaliação em lote.
     """
 
     states: Tuple[str, ...]
@@ -40,21 +43,64 @@ class MarkovModel:
         """
         Executa o algoritmo forward determinístico e retorna:
             (distribuição final, histórico de distribuições, verossimilhança total)
+
+        As mensagens são vetores indexados pela posição do estado e
+        reescalonadas a cada passo; a verossimilhança é o produto dos fatores
+        de escala (ver `log_likelihood` para sequências longas, em que ela
+        arredonda para zero).
+        """
+
+        chain = self._compile()
+        alphas, scales = chain.forward(chain.encode(observations))
+        final = alphas[-1] if alphas else chain.initial
+        history = tuple(chain.distribution(alpha) for alpha in alphas)
+        likelihood = math.exp(math.fsum(math.log(scale) for scale in scales))
+        return chain.distribution(final), history, round(likelihood, 6)
+
+    def log_likelihood(self, observations: Sequence[str] | None = None) -> float:
+        """
+        log P(observações) em espaço logarítmico, sem underflow.
+        """
+
+        chain = self._compile()
+        _, scales = chain.forward(chain.encode(observations))
+        return math.fsum(math.log(scale) for scale in scales)
+
+    def batch_log_likelihood(self, sequences: Iterable[Sequence[str]]) -> Tuple[float, ...]:
+        """
+        log P(observações) de várias sequências reaproveitando a compilação
+        (índices de estados e vetores de emissão por símbolo).
+        """
+
+        chain = self._compile()
+        results = []
+        for observations in sequences:
+            _, scales = chain.forward(chain.encode(observations))
+            results.append(math.fsum(math.log(scale) for scale in scales))
+        return tuple(results)
+
+    def smooth(self, observations: Sequence[str] | None = None) -> Tuple[Dict[str, float], ...]:
+        """
+        Forward-backward: P(estado no passo t | todas as observações), com o
+        mesmo alinhamento do histórico de `forward`.
+        """
+
+        chain = self._compile()
+        encoded = chain.encode(observations)
+        alphas, scales = chain.forward(encoded)
+        betas = chain.backward(encoded, scales)
+        return tuple(chain.distribution(list(map(mul, alpha, beta))) for alpha, beta in zip(alphas, betas))
+
+    def viterbi(self, observations: Sequence[str] | None = None) -> Tuple[Tuple[str, ...], float]:
+        """
+        Sequência de estados mais provável (passos 1..T, com o estado inicial
+        marginalizado) e sua log-probabilidade conjunta com as observações.
+        Empates escolhem o estado declarado primeiro.
         """
 
-        obs_sequence = tuple(str(obs).strip() for obs in (observations or ()))
-        history: list[Dict[str, float]] = []
-        current = dict(self.initial)
-        self._ensure_distribution(current)
-        likelihood = 1.0
-        for observation in obs_sequence:
-            propagated = self._propagate(current)
-            if observation:
-                propagated = self._apply_emission(propagated, observation)
-            history.append(dict(propagated))
-            current = propagated
-            likelihood *= sum(propagated.values())
-        return current, tuple(history), round(likelihood, 6)
+        chain = self._compile()
+        path, score = chain.viterbi(chain.encode(observations))
+        return tuple(self.states[index] for index in path), score
 
     def summarize(self) -> Dict[str, object]:
         return {
@@ -64,22 +110,9 @@ class MarkovModel:
             "emission_symbols": sorted({symbol for table in self.emissions.values() for symbol in table}),
         }
 
-    def _propagate(self, distribution: Mapping[str, float]) -> Dict[str, float]:
-        next_distribution: Dict[str, float] = {state: 0.0 for state in self.states}
-        for from_state, prob in distribution.items():
-            for to_state, transition_prob in self.transitions[from_state].items():
-                next_distribution[to_state] += prob * transition_prob
-        return _normalize(next_distribution)
-
-    def _apply_emission(self, distribution: Mapping[str, float], observation: str) -> Dict[str, float]:
-        adjusted = {}
-        for state, prob in distribution.items():
-            emission_table = self.emissions.get(state)
-            weight = emission_table.get(observation) if emission_table else 1.0
-            if weight is None:
-                raise ValueError(f"Emission for '{observation}' missing in state '{state}'")
-            adjusted[state] = prob * weight
-        return _normalize(adjusted)
+    def _compile(self) -> "_CompiledChain":
+        self._ensure_distribution(self.initial)
+        return _CompiledChain(self)
 
     def _ensure_distribution(self, distribution: Mapping[str, float]) -> None:
         if set(distribution.keys()) != set(self.states):
@@ -88,6 +121,111 @@ class MarkovModel:
             raise ValueError("distribution must sum to 1")
 
 
+class _CompiledChain:
+    """
+    Forma indexada do modelo: distribuição inicial, linhas e colunas da
+    matriz de transição e vetores de emissão por símbolo (em cache), todos
+    como listas na ordem de `MarkovModel.states`.
+    """
+
+    def __init__(self, model: MarkovModel) -> None:
+        self.model = model
+        self.states = model.states
+        self.initial = [model.initial[state] for state in self.states]
+        self.rows = [[model.transitions[source].get(target, 0.0) for target in self.states] for source in self.states]
+        self.columns = [list(column) for column in zip(*self.rows)]
+        self.log_rows = [[_log(value) for value in row] for row in self.rows]
+        self._emissions: Dict[str, List[float] | None] = {"": None}
+
+    def encode(self, observations: Sequence[str] | None) -> List[List[float] | None]:
+        """
+        Vetor de emissão de cada observação (None = passo sem observação).
+        """
+
+        return [self.emission(str(observation).strip()) for observation in (observations or ())]
+
+    def emission(self, observation: str) -> List[float] | None:
+        if observation in self._emissions:
+            return self._emissions[observation]
+        vector = []
+        for state in self.states:
+            table = self.model.emissions.get(state)
+            weight = table.get(observation) if table else 1.0
+            if weight is None:
+                raise ValueError(f"Emission for '{observation}' missing in state '{state}'")
+            vector.append(weight)
+        self._emissions[observation] = vector
+        return vector
+
+    def forward(self, encoded: Sequence[List[float] | None]) -> Tuple[List[List[float]], List[float]]:
+        """
+        Mensagens alfa normalizadas por passo e seus fatores de escala c_t,
+        com P(o_1..o_T) = prod c_t.
+        """
+
+        alphas: List[List[float]] = []
+        scales: List[float] = []
+        current = self.initial
+        for weights in encoded:
+            predicted = [sum(map(mul, current, column)) for column in self.columns]
+            if weights is not None:
+                predicted = list(map(mul, predicted, weights))
+            scale = sum(predicted)
+            if scale <= 0.0:
+                raise ValueError("probability mass must be > 0")
+            current = [value / scale for value in predicted]
+            alphas.append(current)
+            scales.append(scale)
+        return alphas, scales
+
+    def backward(self, encoded: Sequence[List[float] | None], scales: Sequence[float]) -> List[List[float]]:
+        betas: List[List[float]] = [[1.0] * len(self.states) for _ in encoded]
+        for step in range(len(encoded) - 2, -1, -1):
+            weights = encoded[step + 1]
+            following = betas[step + 1]
+            scaled = [value / scales[step + 1] for value in following]
+            if weights is not None:
+                scaled = list(map(mul, scaled, weights))
+            betas[step] = [sum(map(mul, row, scaled)) for row in self.rows]
+        return betas
+
+    def viterbi(self, encoded: Sequence[List[float] | None]) -> Tuple[List[int], float]:
+        if not encoded:
+            return [], 0.0
+        size = len(self.states)
+        prior = [sum(map(mul, self.initial, column)) for column in self.columns]
+        scores = [_log(value) for value in prior]
+        pointers: List[List[int]] = []
+        for step, weights in enumerate(encoded):
+            if step:
+                best_from: List[int] = []
+                next_scores: List[float] = []
+                for target in range(size):
+                    candidates = [scores[source] + self.log_rows[source][target] for source in range(size)]
+                    best = max(range(size), key=candidates.__getitem__)
+                    best_from.append(best)
+                    next_scores.append(candidates[best])
+                pointers.append(best_from)
+                scores = next_scores
+            if weights is not None:
+                scores = [score + _log(weight) for score, weight in zip(scores, weights)]
+        last = max(range(size), key=scores.__getitem__)
+        if scores[last] == -math.inf:
+            raise ValueError("probability mass must be > 0")
+        path = [last]
+        for best_from in reversed(pointers):
+            path.append(best_from[path[-1]])
+        path.reverse()
+        return path, scores[last]
+
+    def distribution(self, vector: Sequence[float]) -> Dict[str, float]:
+        return _normalize(dict(zip(self.states, vector)))
+
+
+def _log(value: float) -> float:
+    return math.log(value) if value > 0.0 else -math.inf
+
+
 def _parse_transition_matrix(states: Iterable[str], entries: object) -> Dict[str, Dict[str, float]]:
     transitions: Dict[str, Dict[str, float]] = {}
     if not isinstance(entries, Sequence):
@@ -27,7 +27,7 @@ if TYPE_CHECKING:
 
 from .code_bridge import maybe_route_code
 from .ian_bridge import maybe_route_text
-from .lex import DEFAULT_LEXICON, tokenize
+from .lex import DEFAULT_COMPILED_LEXICON, tokenize
 from .logic_bridge import maybe_route_logic
 from .math_bridge import maybe_route_math
 from .polynomial_bridge import maybe_route_polynomial
@@ -519,7 +519,7 @@ class MetaTransformer:
         lexicon = self.session.lexicon
         if lexicon.synonyms or lexicon.pos_hint or lexicon.qualifiers or lexicon.rel_words:
             return lexicon
-        return DEFAULT_LEXICON
+        return DEFAULT_COMPILED_LEXICON
 
     def _with_meta_context(
         self,
@@ -6,11 +6,12 @@ Aprende quais ações são boas para alcançar quais objetivos.
 
 from __future__ import annotations
 
+import heapq
 from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Mapping, Set, Tuple
 
-from liu import Node, NodeKind, fingerprint
+from liu import Node, NodeKind, fingerprint, list_node, struct
 
 
 @dataclass(frozen=True)
@@ -56,6 +57,9 @@ class PlanningSystem:
     # Planos bem-sucedidos
     successful_plans: List[Plan] = field(default_factory=list)
     
+    # Contadores da última busca: expandidos, gerados, duplicados descartados
+    search_stats: Dict[str, int] = field(default_factory=dict)
+    
     def add_action(self, action: Action) -> None:
         """Adiciona ação ao sistema."""
         self.actions[action.name] = action
@@ -74,25 +78,42 @@ class PlanningSystem:
         """
         Planeja sequência de ações para alcançar objetivo.
         
-        Usa busca com heurísticas aprendidas.
+        Busca A* com fila de prioridade (heapq): a heurística aprendida é
+        calculada uma vez por estado, estados fechados são identificados pelo
+        fingerprint e empates em f são desfeitos pelo fingerprint, o que torna
+        a busca determinística. O caminho é reconstruído por ponteiros para o
+        pai; contadores da última busca ficam em `search_stats`.
         """
-        # Busca em largura com heurística
-        from collections import deque
+        goal_key = fingerprint(goal)
+        goal_relations = set(self._extract_relations(goal))
+        preconditions = {
+            name: set(self._extract_relations_from_list(action.preconditions))
+            for name, action in self.actions.items()
+        }
         
-        queue = deque([(initial_state, [], 0.0)])  # (estado, ações, custo)
-        visited: Set[str] = set()
+        start_key = fingerprint(initial_state)
+        states: Dict[str, Node] = {start_key: initial_state}
+        best_cost: Dict[str, float] = {start_key: 0.0}
+        parents: Dict[str, Tuple[str, Action] | None] = {start_key: None}
+        closed: Set[str] = set()
+        stats = {"expanded": 0, "generated": 0, "duplicates": 0}
+        self.search_stats = stats
         
-        while queue:
-            current_state, actions_so_far, cost_so_far = queue.popleft()
-            
-            state_key = fingerprint(current_state)
-            if state_key in visited:
+        start_h = self._heuristic_value(initial_state, start_key, goal_key, goal_relations)
+        # (f, fingerprint, custo, profundidade): nunca compara `Node`s
+        frontier: List[Tuple[float, str, float, int]] = [(start_h, start_key, 0.0, 0)]
+        
+        while frontier:
+            _, state_key, cost_so_far, depth = heapq.heappop(frontier)
+            if state_key in closed or cost_so_far > best_cost[state_key]:
                 continue
-            visited.add(state_key)
+            closed.add(state_key)
+            current_state = states[state_key]
+            state_relations = set(self._extract_relations(current_state))
             
             # Verifica se alcançou objetivo
-            if self._goal_achieved(current_state, goal):
-                plan_actions = [self.actions[name] for name in actions_so_far if name in self.actions]
+            if self._goal_achieved(state_relations, goal_relations):
+                plan_actions = self._extract_plan(parents, state_key)
                 return Plan(
                     actions=tuple(plan_actions),
                     goal=goal,
@@ -101,30 +122,38 @@ class PlanningSystem:
                 )
             
             # Limite de profundidade
-            if len(actions_so_far) >= max_depth:
+            if depth >= max_depth:
                 continue
             
-            # Gera ações possíveis
-            possible_actions = self._get_possible_actions(current_state)
-            
-            for action in possible_actions:
-                # Estima estado resultante
-                estimated_state = self._estimate_result(current_state, action)
-                
-                # Calcula custo estimado
-                estimated_cost = cost_so_far + action.cost
-                heuristic_cost = self._get_heuristic(estimated_state, goal)
-                total_cost = estimated_cost + heuristic_cost
-                
-                # Adiciona à fila (ordenada por custo total)
-                new_actions = actions_so_far + [action.name]
-                queue.append((estimated_state, new_actions, estimated_cost))
-            
-            # Ordena fila por custo total
-            queue = deque(sorted(queue, key=lambda x: x[2] + self._get_heuristic(x[0], goal)))
+            stats["expanded"] += 1
+            for action in self._get_possible_actions(state_relations, preconditions):
+                next_state = self._estimate_result(current_state, action)
+                next_key = fingerprint(next_state)
+                next_cost = cost_so_far + action.cost
+                stats["generated"] += 1
+                if next_key in closed or next_cost >= best_cost.get(next_key, float("inf")):
+                    stats["duplicates"] += 1
+                    continue
+                states[next_key] = next_state
+                best_cost[next_key] = next_cost
+                parents[next_key] = (state_key, action)
+                heuristic_cost = self._heuristic_value(next_state, next_key, goal_key, goal_relations)
+                heapq.heappush(frontier, (next_cost + heuristic_cost, next_key, next_cost, depth + 1))
         
         return None
     
+    @staticmethod
+    def _extract_plan(parents: Dict[str, Tuple[str, Action] | None], state_key: str) -> List[Action]:
+        """Reconstrói as ações seguindo os ponteiros para o pai."""
+        actions: List[Action] = []
+        link = parents[state_key]
+        while link is not None:
+            state_key, action = link
+            actions.append(action)
+            link = parents[state_key]
+        actions.reverse()
+        return actions
+    
     def learn_from_experience(self) -> None:
         """Aprende heurísticas e ações a partir de experiências."""
         
@@ -151,61 +180,43 @@ class PlanningSystem:
                 # Em produção, atualizaria ação
                 # Por enquanto, apenas registra
     
-    def _get_possible_actions(self, state: Node) -> List[Action]:
-        """Retorna ações possíveis no estado atual."""
-        possible = []
-        
-        for action in self.actions.values():
-            if self._preconditions_met(state, action):
-                possible.append(action)
-        
-        return possible
-    
-    def _preconditions_met(self, state: Node, action: Action) -> bool:
-        """Verifica se precondições da ação são satisfeitas."""
-        # Simplificação: verifica se precondições estão no estado
-        # Em produção, faria matching mais sofisticado
-        state_relations = self._extract_relations(state)
-        precondition_relations = self._extract_relations_from_list(action.preconditions)
-        
-        # Verifica se todas as precondições estão no estado
-        for prec in precondition_relations:
-            if prec not in state_relations:
-                return False
-        
-        return True
+    def _get_possible_actions(
+        self, state_relations: Set[Node], preconditions: Mapping[str, Set[Node]]
+    ) -> List[Action]:
+        """Retorna ações cujas precondições (já extraídas por ação) estão no estado."""
+        return [
+            action
+            for name, action in self.actions.items()
+            if preconditions[name] <= state_relations
+        ]
     
     def _estimate_result(self, state: Node, action: Action) -> Node:
         """Estima estado resultante de executar ação."""
         # Simplificação: adiciona efeitos ao estado
         # Em produção, faria transformação mais sofisticada
-        from liu import struct
-        
-        state_relations = list(self._extract_relations(state))
-        effect_relations = list(self._extract_relations_from_list(action.effects))
-        
-        # Combina estado com efeitos
-        new_relations = state_relations + effect_relations
-        
-        # Cria novo estado (simplificado)
-        return struct(relations=tuple(new_relations))
-    
-    def _goal_achieved(self, state: Node, goal: Node) -> bool:
-        """Verifica se objetivo foi alcançado."""
         state_relations = self._extract_relations(state)
-        goal_relations = self._extract_relations(goal)
+        effect_relations = self._extract_relations_from_list(action.effects)
         
-        # Verifica se todas as relações do objetivo estão no estado
-        for goal_rel in goal_relations:
-            if goal_rel not in state_relations:
-                return False
+        # Conjunto de relações em ordem canônica: estados equivalentes
+        # (mesmas relações, qualquer ordem de ações) têm o mesmo fingerprint
+        unique = {relation: fingerprint(relation) for relation in state_relations + effect_relations}
+        new_relations = sorted(unique, key=unique.__getitem__)
         
-        return True
+        return struct(relations=list_node(new_relations))
+    
+    def _goal_achieved(self, state_relations: Set[Node], goal_relations: Set[Node]) -> bool:
+        """Verifica se todas as relações do objetivo estão no estado."""
+        return goal_relations <= state_relations
     
     def _get_heuristic(self, state: Node, goal: Node) -> float:
         """Retorna heurística (estimativa de custo) para alcançar objetivo."""
-        state_key = fingerprint(state)
-        goal_key = fingerprint(goal)
+        goal_relations = set(self._extract_relations(goal))
+        return self._heuristic_value(state, fingerprint(state), fingerprint(goal), goal_relations)
+    
+    def _heuristic_value(
+        self, state: Node, state_key: str, goal_key: str, goal_relations: Set[Node]
+    ) -> float:
+        """Heurística com fingerprints e relações do objetivo já calculados."""
         heuristic_key = f"{state_key}:{goal_key}"
         
         if heuristic_key in self.heuristics:
@@ -213,7 +224,6 @@ class PlanningSystem:
         
         # Heurística padrão: número de relações faltando
         state_relations = set(self._extract_relations(state))
-        goal_relations = set(self._extract_relations(goal))
         missing = len(goal_relations - state_relations)
         
         return float(missing)
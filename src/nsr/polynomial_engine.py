@@ -4,9 +4,10 @@ Motor determinístico de fatoração polinomial univariada (coeficientes raciona
 
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass
 from fractions import Fraction
-from typing import Iterable, List, Sequence
+from typing import Dict, List, Sequence
 
 
 @dataclass(frozen=True)
@@ -46,41 +47,394 @@ def factor_polynomial(payload: dict) -> PolynomialResult:
 
 
 def _rational_roots(coeffs: Sequence[Fraction]) -> List[Fraction]:
-    leading = coeffs[0]
-    constant = coeffs[-1]
-    candidates = set()
-    for p in _divisors(constant.numerator):
-        for q in _divisors(leading.numerator):
-            candidates.add(Fraction(p, q))
-            candidates.add(Fraction(-p, q))
-    roots = []
-    for candidate in sorted(candidates):
-        if candidate == 0 and coeffs[-1] != 0:
+    """
+    Raízes racionais com multiplicidade, em ordem crescente.
+
+    O polinômio é escalado para coeficientes inteiros (denominador comum),
+    as raízes nulas saem pelos zeros finais e a busca pelo teorema das raízes
+    racionais roda sobre a parte livre de quadrados, com divisores gerados
+    da fatoração prima, limitados pela cota de Fujiwara e filtrados por
+    P(±1) e por resíduos módulo primos pequenos antes do Horner exato.
+    Constantes difíceis de fatorar caem no levantamento p-ádico.
+    """
+
+    integer = _integer_coefficients(coeffs)
+    zeros = 0
+    while len(integer) > 1 and integer[-1] == 0:
+        integer.pop()
+        zeros += 1
+    roots = [Fraction(0)] * zeros
+    if len(integer) > 1:
+        square_free = _integer_coefficients(_square_free_part([Fraction(value) for value in integer]))
+        for root in _square_free_roots(square_free):
+            remaining = integer
+            while len(remaining) > 1:
+                quotient = _divide_linear(remaining, root.numerator, root.denominator)
+                if quotient is None:
+                    break
+                remaining = quotient
+                roots.append(root)
+    return sorted(roots)
+
+
+def _square_free_roots(coeffs: Sequence[int]) -> List[Fraction]:
+    """
+    Raízes racionais (distintas) de um polinômio inteiro com constante não nula.
+
+    Os divisores da constante só são gerados até a cota das raízes (primos
+    acima dela nem chegam a entrar na fatoração). Cada raiz encontrada é
+    dividida do polinômio na hora; os candidatos seguintes são testados
+    contra o quociente (constante, coeficiente líder e cota menores) e o resto
+    de grau ≤ 2 é resolvido diretamente. Se a fatoração estourar o orçamento,
+    as raízes saem por levantamento p-ádico (`_lifted_roots`).
+    """
+
+    coeffs = list(coeffs)
+    if len(coeffs) <= 3:
+        return _low_degree_roots(coeffs)
+    checks = _CandidateChecks(coeffs)
+    # |p| ≤ cota·q ≤ cota·a_n
+    limit = min(abs(coeffs[-1]), int(checks.bound * coeffs[0]) + 1)
+    leading_factors = _factorize(coeffs[0])
+    constant_factors = _factorize(abs(coeffs[-1]), limit)
+    if leading_factors is None or constant_factors is None:
+        return _lifted_roots(coeffs, checks.bound)
+    roots: List[Fraction] = []
+    for q in _divisors(leading_factors):
+        if len(coeffs) <= 3:
+            break
+        if coeffs[0] % q:
             continue
-        value = _evaluate(coeffs, candidate)
-        if value == 0:
+        coprime = {prime: exponent for prime, exponent in constant_factors.items() if q % prime}
+        for p in _divisors(coprime, int(checks.bound * q) + 1):
+            if len(coeffs) <= 3 or p > checks.bound * q:
+                break
+            if coeffs[-1] % p:
+                continue
+            for numerator in (p, -p):
+                if checks.admits(numerator, q) and _evaluate_scaled(coeffs, numerator, q) == 0:
+                    roots.append(Fraction(numerator, q))
+                    coeffs = _divide_linear(coeffs, numerator, q)
+                    checks = _CandidateChecks(coeffs)
+                    if len(coeffs) <= 3:
+                        break
+    return roots + _low_degree_roots(coeffs)
+
+
+def _lifted_roots(coeffs: Sequence[int], bound: float) -> List[Fraction]:
+    """
+    Raízes racionais sem fatorar constante nem coeficiente líder.
+
+    Toda raiz p/q (q | a_n) é, módulo um primo ℓ ∤ a_n, raiz de P mod ℓ.
+    Escolhido ℓ em que essas raízes são simples, cada uma é levantada por
+    Newton-Hensel até ℓ^k > 2·N·a_n (N = cota de |p|) e a reconstrução
+    racional devolve o único p/q com |p| ≤ N e 0 < q ≤ a_n: no máximo um
+    candidato por raiz módulo ℓ, conferido por Horner exato.
+    """
+
+    leading = coeffs[0]
+    numerator_bound = min(abs(coeffs[-1]), int(bound * leading) + 1)
+    target = 2 * numerator_bound * leading
+    derivative = [coeff * (len(coeffs) - 1 - index) for index, coeff in enumerate(coeffs[:-1])]
+    prime, residues = _lifting_prime(coeffs, derivative)
+    roots: List[Fraction] = []
+    for residue in residues:
+        modulus = prime
+        while modulus <= target:
+            modulus *= modulus
+            step = _evaluate_mod(coeffs, residue, modulus) * pow(_evaluate_mod(derivative, residue, modulus), -1, modulus)
+            residue = (residue - step) % modulus
+        candidate = _rational_reconstruction(residue, modulus, numerator_bound, leading)
+        if candidate is not None and _evaluate_scaled(coeffs, candidate.numerator, candidate.denominator) == 0:
             roots.append(candidate)
     return roots
 
 
-def _divisors(value: int) -> Iterable[int]:
-    value = abs(value)
-    if value == 0:
-        return [0]
-    divisors = set()
-    for i in range(1, value + 1):
-        if value % i == 0:
-            divisors.add(i)
-    return divisors
+def _lifting_prime(coeffs: Sequence[int], derivative: Sequence[int]) -> tuple[int, List[int]]:
+    """Menor primo ℓ ∤ a_n em que todas as raízes de P mod ℓ são simples, com essas raízes."""
+    for prime in range(3, _LIFTING_PRIME_LIMIT, 2):
+        if not _is_probable_prime(prime) or coeffs[0] % prime == 0:
+            continue
+        residues = [x for x in range(prime) if _evaluate_mod(coeffs, x, prime) == 0]
+        if all(_evaluate_mod(derivative, x, prime) for x in residues):
+            return prime, residues
+    raise ValueError("no suitable prime for root lifting")  # pragma: no cover - exige discriminante enorme
+
+
+def _rational_reconstruction(residue: int, modulus: int, numerator_bound: int, denominator_bound: int) -> Fraction | None:
+    """p/q ≡ residue (mod modulus) com |p| ≤ N e 0 < q ≤ D (único se modulus > 2·N·D)."""
+    r0, r1 = modulus, residue
+    s0, s1 = 0, 1
+    while r1 > numerator_bound:
+        quotient = r0 // r1
+        r0, r1 = r1, r0 - quotient * r1
+        s0, s1 = s1, s0 - quotient * s1
+    if s1 == 0 or abs(s1) > denominator_bound:
+        return None
+    return Fraction(r1, s1)
+
+
+class _CandidateChecks:
+    """Filtros baratos para um candidato p/q (mdc(p, q) = 1) antes do Horner exato."""
+
+    def __init__(self, coeffs: Sequence[int]) -> None:
+        degree = len(coeffs) - 1
+        self.bound = _root_bound(coeffs)
+        self.at_one = sum(coeffs)
+        self.at_minus_one = sum(value if (degree - index) % 2 == 0 else -value for index, value in enumerate(coeffs))
+        self.tables = [
+            (modulus, coeffs[0] % modulus, [_evaluate_mod(coeffs, x, modulus) for x in range(modulus)])
+            for modulus in _FILTER_PRIMES
+        ]
+
+    def admits(self, p: int, q: int) -> bool:
+        # (q·x - p) | P  =>  (q - p) | P(1)  e  (q + p) | P(-1)
+        if q != p and self.at_one % (q - p):
+            return False
+        if q != -p and self.at_minus_one % (q + p):
+            return False
+        for modulus, leading_residue, values in self.tables:
+            if q % modulus == 0:
+                # q^n·P(p/q) ≡ a_0·p^n (mod m), com p invertível
+                if leading_residue:
+                    return False
+                continue
+            if values[p * pow(q, -1, modulus) % modulus]:
+                return False
+        return True
+
+
+def _low_degree_roots(coeffs: Sequence[int]) -> List[Fraction]:
+    """Raízes racionais de grau 1 ou 2 (discriminante quadrado perfeito)."""
+    if len(coeffs) == 2:
+        return [Fraction(-coeffs[1], coeffs[0])]
+    if len(coeffs) != 3:
+        return []
+    a, b, c = coeffs
+    discriminant = b * b - 4 * a * c
+    if discriminant < 0:
+        return []
+    root = math.isqrt(discriminant)
+    if root * root != discriminant:
+        return []
+    return [Fraction(-b - root, 2 * a), Fraction(-b + root, 2 * a)]
 
 
-def _evaluate(coeffs: Sequence[Fraction], x: Fraction) -> Fraction:
-    result = Fraction(0)
+def _evaluate_scaled(coeffs: Sequence[int], p: int, q: int) -> int:
+    """Horner homogêneo: q^n·P(p/q), só com inteiros."""
+    scale = 1
+    result = coeffs[0]
+    for coeff in coeffs[1:]:
+        scale *= q
+        result = result * p + coeff * scale
+    return result
+
+
+def _evaluate_mod(coeffs: Sequence[int], x: int, modulus: int) -> int:
+    result = 0
     for coeff in coeffs:
-        result = result * x + coeff
+        result = (result * x + coeff) % modulus
     return result
 
 
+def _root_bound(coeffs: Sequence[int]) -> float:
+    """Cota de Fujiwara para |raiz|, com folga para o arredondamento em float."""
+    leading = abs(coeffs[0])
+    degree = len(coeffs) - 1
+    log_leading = math.log(leading)
+    terms = []
+    for index, coeff in enumerate(coeffs[1:], start=1):
+        if coeff == 0:
+            continue
+        magnitude = abs(coeff) / 2 if index == degree else abs(coeff)
+        terms.append((math.log(magnitude) - log_leading) / index if magnitude else -math.inf)
+    if not terms:
+        return 0.0
+    return 2.0 * math.exp(max(terms)) * (1.0 + 1e-9) + 1e-9
+
+
+def _integer_coefficients(coeffs: Sequence[Fraction]) -> List[int]:
+    """Multiplica pelo denominador comum e divide pelo conteúdo (parte primitiva)."""
+    denominator = 1
+    for coeff in coeffs:
+        denominator = denominator * coeff.denominator // math.gcd(denominator, coeff.denominator)
+    integer = [int(coeff * denominator) for coeff in coeffs]
+    content = 0
+    for value in integer:
+        content = math.gcd(content, value)
+    if content > 1:
+        integer = [value // content for value in integer]
+    if integer[0] < 0:
+        integer = [-value for value in integer]
+    return integer
+
+
+def _square_free_part(coeffs: Sequence[Fraction]) -> List[Fraction]:
+    """P / mdc(P, P'): mesmas raízes, todas simples."""
+    degree = len(coeffs) - 1
+    derivative = [coeff * (degree - index) for index, coeff in enumerate(coeffs[:-1])]
+    common = _poly_gcd(list(coeffs), derivative)
+    if len(common) == 1:
+        return list(coeffs)
+    quotient, _ = _poly_divmod(coeffs, common)
+    return quotient
+
+
+def _poly_gcd(a: List[Fraction], b: List[Fraction]) -> List[Fraction]:
+    while b:
+        _, remainder = _poly_divmod(a, b)
+        a, b = b, remainder
+    return [coeff / a[0] for coeff in a]
+
+
+def _poly_divmod(dividend: Sequence[Fraction], divisor: Sequence[Fraction]) -> tuple[List[Fraction], List[Fraction]]:
+    remainder = list(dividend)
+    quotient: List[Fraction] = []
+    while len(remainder) >= len(divisor):
+        factor = remainder[0] / divisor[0]
+        quotient.append(factor)
+        for index, coeff in enumerate(divisor):
+            remainder[index] -= factor * coeff
+        remainder.pop(0)
+    while remainder and remainder[0] == 0:
+        remainder.pop(0)
+    return quotient, remainder
+
+
+def _divide_linear(coeffs: Sequence[int], p: int, q: int) -> List[int] | None:
+    """Divide P inteiro por (q·x - p); None se não for divisível."""
+    quotient = []
+    carry = 0
+    for coeff in coeffs[:-1]:
+        value = coeff + carry * p
+        if value % q:
+            return None
+        carry = value // q
+        quotient.append(carry)
+    if coeffs[-1] + carry * p != 0:
+        return None
+    return quotient
+
+
+def _divisors(factors: Dict[int, int], limit: int | None = None) -> List[int]:
+    """Divisores positivos (até `limit`) gerados a partir de uma fatoração prima."""
+    divisors = [1]
+    for prime, exponent in sorted(factors.items()):
+        extended = []
+        for divisor in divisors:
+            power = divisor
+            for _ in range(exponent + 1):
+                if limit is not None and power > limit:
+                    break
+                extended.append(power)
+                power *= prime
+        divisors = extended
+    return sorted(divisors)
+
+
+def _factorize(value: int, limit: int | None = None) -> Dict[int, int] | None:
+    """
+    Fatoração prima de `value`, descartando primos maiores que `limit`.
+
+    Devolve None (fatoração não confiável) se o Pollard-Brent esgotar
+    `_POLLARD_STEPS` iterações ou se sobrar um provável primo acima da faixa
+    em que `_is_probable_prime` é determinístico.
+    """
+
+    factors: Dict[int, int] = {}
+    for prime in _SMALL_PRIMES:
+        if prime * prime > value:
+            break
+        while value % prime == 0:
+            factors[prime] = factors.get(prime, 0) + 1
+            value //= prime
+    budget = _POLLARD_STEPS
+    stack = [value] if value > 1 else []
+    while stack:
+        current = stack.pop()
+        if _is_probable_prime(current):
+            if current >= _MILLER_RABIN_LIMIT:
+                return None
+            if limit is None or current <= limit:
+                factors[current] = factors.get(current, 0) + 1
+            continue
+        divisor, steps = _pollard_brent(current, budget)
+        if divisor is None:
+            return None
+        budget -= steps
+        stack.extend((divisor, current // divisor))
+    return factors
+
+
+def _is_probable_prime(value: int) -> bool:
+    """
+    Miller-Rabin com as 13 primeiras bases primas: determinístico abaixo de
+    `_MILLER_RABIN_LIMIT` (~3.3·10^24), probabilístico acima.
+    """
+    if value < 2:
+        return False
+    for prime in _SMALL_PRIMES[:13]:
+        if value % prime == 0:
+            return value == prime
+    d = value - 1
+    shift = 0
+    while d % 2 == 0:
+        d //= 2
+        shift += 1
+    for base in _SMALL_PRIMES[:13]:
+        x = pow(base, d, value)
+        if x in (1, value - 1):
+            continue
+        for _ in range(shift - 1):
+            x = x * x % value
+            if x == value - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def _pollard_brent(value: int, max_steps: int) -> tuple[int | None, int]:
+    """
+    Fator não trivial de um composto ímpar (sementes fixas: determinístico) e
+    as iterações gastas; None se passar de `max_steps` iterações.
+    """
+    if value % 2 == 0:
+        return 2, 0
+    steps = 0
+    for increment in range(1, value):
+        y, r, product = 2, 1, 1
+        x = ys = y
+        divisor = 1
+        while divisor == 1:
+            if steps >= max_steps:
+                return None, steps
+            x = y
+            for _ in range(r):
+                y = (y * y + increment) % value
+            steps += r
+            k = 0
+            while k < r and divisor == 1:
+                ys = y
+                batch = min(128, r - k)
+                for _ in range(batch):
+                    y = (y * y + increment) % value
+                    product = product * abs(x - y) % value
+                steps += batch
+                divisor = math.gcd(product, value)
+                k += 128
+            r *= 2
+        if divisor == value:
+            divisor = 1
+            while divisor == 1:
+                ys = (ys * ys + increment) % value
+                steps += 1
+                divisor = math.gcd(abs(x - ys), value)
+        if divisor != value:
+            return divisor, steps
+    raise ValueError(f"could not factor {value}")  # pragma: no cover - inalcançável para compostos
+
+
 def _deflate(coeffs: Sequence[Fraction], root: Fraction) -> List[Fraction]:
     result = []
     accumulator = Fraction(0)
@@ -102,4 +456,15 @@ def _residual(coeffs: Sequence[Fraction]) -> float:
     return float(sum(abs(float(coef)) for coef in coeffs))
 
 
+_SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97)
+# Primos do pré-filtro modular dos candidatos p/q
+_FILTER_PRIMES = (3, 5, 7, 11, 13, 17, 19, 23)
+# Menor composto que passa Miller-Rabin com as bases 2..41 (Sorenson-Webster)
+_MILLER_RABIN_LIMIT = 3_317_044_064_679_887_385_961_981
+# Orçamento de iterações do Pollard-Brent por fatoração (~fatores de até 10^9)
+_POLLARD_STEPS = 100_000
+# Primos ímpares abaixo disto são tentados para o levantamento de Hensel
+_LIFTING_PRIME_LIMIT = 10_000
+
+
 __all__ = ["PolynomialResult", "factor_polynomial"]
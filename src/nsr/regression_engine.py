@@ -1,11 +1,33 @@
 """
-Estatística clássica determinística: regressão linear múltipla via forma fechada.
+Estatística clássica determinística: regressão linear múltipla via forma
+fechada (padrão, bit a bit igual às versões anteriores), QR (Householder) ou
+Cholesky, com ridge opcional, NumPy opcional e uma variante em passagem única
+(`stream_linear_regression`) para arquivos CSV/JSONL.
 """
 
 from __future__ import annotations
 
+import csv
+import json
+import math
+import os
 from dataclasses import dataclass
-from typing import List, Mapping, Sequence
+from operator import mul, sub
+from typing import Iterable, Iterator, List, Mapping, Sequence
+
+try:  # pragma: no cover - optional acceleration
+    import numpy as _np
+except Exception:  # pragma: no cover - fallback uses stdlib
+    _np = None
+
+SOLVERS = ("normal", "qr", "cholesky")
+BACKENDS = ("auto", "python", "numpy")
+
+# Matrizes com pelo menos este número de entradas usam NumPy em backend="auto"
+# (só para "qr"/"cholesky"; "normal" fica em Python para manter o resultado bit a bit)
+_NUMPY_MIN_ENTRIES = 20_000
+# Pivô relativo (à norma da coluna em QR, à diagonal original em Cholesky) abaixo do qual a matriz é singular
+_RANK_TOLERANCE = 1e-10
 
 
 @dataclass(frozen=True)
@@ -28,52 +50,114 @@ def solve_linear_regression(payload: Mapping[str, object]) -> RegressionResult:
             "features": ["x1", "x2"],
             "target": "y",                     # opcional (default: "target")
             "intercept": true,                 # opcional (default: true)
+            "solver": "normal",                # opcional: "normal" | "qr" | "cholesky"
+            "ridge": 0.0,                      # opcional: penalidade L2 (intercepto livre)
+            "backend": "auto",                 # opcional: "auto" | "python" | "numpy"
             "data": [
                 {"x1": 1.0, "x2": 2.0, "y": 4.0},
                 ...
             ]
         }
+
+    O solver padrão "normal" inverte XᵀX por Gauss-Jordan, como sempre fez,
+    e devolve os mesmos campos bit a bit para payloads existentes. "qr" é
+    numericamente mais estável (não forma XᵀX) e "cholesky" é o mais rápido;
+    ambos concordam com "normal" dentro de ~1e-9 relativo em dados bem
+    condicionados, mas não bit a bit.
     """
 
     features = _parse_features(payload.get("features"))
     target_key = str(payload.get("target") or "target").strip() or "target"
     include_intercept = bool(payload.get("intercept", True))
+    solver, ridge, backend = _parse_options(payload)
     rows = payload.get("data") or []
     if not isinstance(rows, Sequence) or not rows:
         raise ValueError("data must be a non-empty list")
     matrix = []
     targets: list[float] = []
     for entry in rows:
-        if not isinstance(entry, Mapping):
-            raise ValueError("each data row must be an object")
-        row_vector = [1.0] if include_intercept else []
-        for feature in features:
-            if feature not in entry:
-                raise ValueError(f"feature '{feature}' missing from data row")
-            row_vector.append(float(entry[feature]))
-        if target_key not in entry:
-            raise ValueError(f"target '{target_key}' missing from data row")
+        row_vector, target = _row_vector(entry, features, target_key, include_intercept)
         matrix.append(row_vector)
-        targets.append(float(entry[target_key]))
-    beta = _least_squares(matrix, targets)
-    predictions = _mat_vec_mul(matrix, beta)
+        targets.append(target)
+    if _use_numpy(backend, solver, len(matrix) * len(matrix[0])):
+        beta, predictions = _solve_numpy(matrix, targets, solver, ridge, include_intercept)
+    else:
+        if solver == "normal":
+            xtx, xty = _normal_equations(matrix, targets)
+            if ridge > 0.0:
+                xtx = _with_ridge(xtx, ridge, include_intercept)
+            beta = _mat_vec_mul(_invert_matrix(xtx), xty)
+        elif solver == "qr":
+            beta = _qr_least_squares(matrix, targets, ridge, include_intercept)
+        else:
+            xtx, xty = _normal_equations(matrix, targets)
+            beta = _cholesky_solve(_with_ridge(xtx, ridge, include_intercept), xty)
+        predictions = _mat_vec_mul(matrix, beta)
     residuals = [y - y_hat for y, y_hat in zip(targets, predictions)]
     sample_size = len(targets)
     mse = sum(res * res for res in residuals) / sample_size
     residual_sum = sum(residuals)
     r_squared = _determine_r_squared(targets, predictions)
-    intercept_value = beta[0] if include_intercept else None
-    start_index = 1 if include_intercept else 0
-    coeffs = tuple((features[i - start_index], beta[i]) for i in range(start_index, len(beta)))
-    return RegressionResult(
-        features=tuple(features),
-        coefficients=coeffs,
-        intercept=intercept_value,
-        r_squared=round(r_squared, 6),
-        mse=round(mse, 6),
-        sample_size=sample_size,
-        residual_sum=round(residual_sum, 6),
-    )
+    return _build_result(features, beta, include_intercept, r_squared, mse, sample_size, residual_sum)
+
+
+def stream_linear_regression(
+    source: str | os.PathLike[str] | Iterable[Mapping[str, object]],
+    *,
+    features: Sequence[str],
+    target: str = "target",
+    intercept: bool = True,
+    ridge: float = 0.0,
+) -> RegressionResult:
+    """
+    Regressão linear em passagem única sobre um CSV (com cabeçalho), um
+    JSONL (um objeto por linha) ou qualquer iterável de linhas.
+
+    Só as estatísticas suficientes (XᵀX, Xᵀy, Σy, Σy², n) ficam em
+    memória; os coeficientes saem por Cholesky (com `ridge` na diagonal) e
+    as métricas são recompostas a partir dessas somas.
+    """
+
+    feature_names = _parse_features(features)
+    target_key = str(target or "target").strip() or "target"
+    ridge = _parse_ridge(ridge)
+    width = len(feature_names) + (1 if intercept else 0)
+    xtx = [[0.0] * width for _ in range(width)]
+    xty = [0.0] * width
+    column_sums = [0.0] * width
+    sum_y = 0.0
+    sum_y2 = 0.0
+    sample_size = 0
+    for entry in _iter_rows(source):
+        row_vector, value = _row_vector(entry, feature_names, target_key, intercept)
+        for i, x_i in enumerate(row_vector):
+            if x_i == 0.0:
+                continue
+            row = xtx[i]
+            for j in range(i, width):
+                row[j] += x_i * row_vector[j]
+            xty[i] += x_i * value
+            column_sums[i] += x_i
+        sum_y += value
+        sum_y2 += value * value
+        sample_size += 1
+    if not sample_size:
+        raise ValueError("data must be a non-empty list")
+    for i in range(width):
+        for j in range(i):
+            xtx[i][j] = xtx[j][i]
+    beta = _cholesky_solve(_with_ridge(xtx, ridge, intercept), xty)
+    # SSres = yᵀy - 2βᵀXᵀy + βᵀXᵀXβ
+    fitted_cross = sum(b * c for b, c in zip(beta, xty))
+    fitted_square = sum(b_i * sum(x * b_j for x, b_j in zip(row, beta)) for b_i, row in zip(beta, xtx))
+    ss_res = max(0.0, sum_y2 - 2.0 * fitted_cross + fitted_square)
+    ss_tot = max(0.0, sum_y2 - sum_y * sum_y / sample_size)
+    if ss_tot == 0:
+        r_squared = 1.0 if ss_res == 0 else 0.0
+    else:
+        r_squared = 1.0 - ss_res / ss_tot
+    residual_sum = sum_y - sum(b * c for b, c in zip(beta, column_sums))
+    return _build_result(feature_names, beta, intercept, r_squared, ss_res / sample_size, sample_size, residual_sum)
 
 
 # ----------------------------------------------------------------------
@@ -93,47 +177,141 @@ def _parse_features(raw: object) -> list[str]:
     return features
 
 
-def _least_squares(matrix: Sequence[Sequence[float]], targets: Sequence[float]) -> List[float]:
-    xt = _transpose(matrix)
-    xtx = _matmul(xt, matrix)
-    xty = _mat_vec_mul(xt, targets)
-    xtx_inv = _invert_matrix(xtx)
-    return _mat_vec_mul(xtx_inv, xty)
+def _parse_options(payload: Mapping[str, object]) -> tuple[str, float, str]:
+    solver = str(payload.get("solver") or "normal").strip().lower()
+    if solver not in SOLVERS:
+        raise ValueError(f"solver must be one of {SOLVERS}")
+    backend = str(payload.get("backend") or "auto").strip().lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}")
+    if backend == "numpy" and _np is None:
+        raise ValueError("backend 'numpy' requires numpy to be installed")
+    return solver, _parse_ridge(payload.get("ridge", 0.0)), backend
 
 
-def _determine_r_squared(actual: Sequence[float], predicted: Sequence[float]) -> float:
-    mean_value = sum(actual) / len(actual)
-    ss_tot = sum((value - mean_value) ** 2 for value in actual)
-    ss_res = sum((value - pred) ** 2 for value, pred in zip(actual, predicted))
-    if ss_tot == 0:
-        return 1.0 if ss_res == 0 else 0.0
-    return 1.0 - (ss_res / ss_tot)
+def _parse_ridge(raw: object) -> float:
+    ridge = float(raw or 0.0)
+    if ridge < 0.0 or math.isnan(ridge):
+        raise ValueError("ridge must be >= 0")
+    return ridge
 
 
-def _transpose(matrix: Sequence[Sequence[float]]) -> List[List[float]]:
-    return [list(col) for col in zip(*matrix)]
+def _row_vector(
+    entry: object,
+    features: Sequence[str],
+    target_key: str,
+    include_intercept: bool,
+) -> tuple[list[float], float]:
+    if not isinstance(entry, Mapping):
+        raise ValueError("each data row must be an object")
+    row_vector = [1.0] if include_intercept else []
+    for feature in features:
+        if feature not in entry:
+            raise ValueError(f"feature '{feature}' missing from data row")
+        row_vector.append(float(entry[feature]))
+    if target_key not in entry:
+        raise ValueError(f"target '{target_key}' missing from data row")
+    return row_vector, float(entry[target_key])
 
 
-def _matmul(a: Sequence[Sequence[float]], b: Sequence[Sequence[float]]) -> List[List[float]]:
-    if len(a[0]) != len(b):
-        raise ValueError("matrix dimensions mismatch")
-    result = []
-    b_transposed = _transpose(b)
-    for row in a:
-        result.append([sum(x * y for x, y in zip(row, col)) for col in b_transposed])
-    return result
+def _iter_rows(source: str | os.PathLike[str] | Iterable[Mapping[str, object]]) -> Iterator[Mapping[str, object]]:
+    if not isinstance(source, (str, os.PathLike)):
+        yield from source
+        return
+    path = os.fspath(source)
+    with open(path, newline="", encoding="utf-8") as handle:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(handle)
 
 
-def _mat_vec_mul(matrix: Sequence[Sequence[float]], vector: Sequence[float]) -> List[float]:
-    if len(matrix[0]) != len(vector):
-        raise ValueError("matrix/vector dimensions mismatch")
-    return [sum(value * weight for value, weight in zip(row, vector)) for row in matrix]
+def _build_result(
+    features: Sequence[str],
+    beta: Sequence[float],
+    include_intercept: bool,
+    r_squared: float,
+    mse: float,
+    sample_size: int,
+    residual_sum: float,
+) -> RegressionResult:
+    intercept_value = beta[0] if include_intercept else None
+    start_index = 1 if include_intercept else 0
+    coeffs = tuple((features[i - start_index], beta[i]) for i in range(start_index, len(beta)))
+    return RegressionResult(
+        features=tuple(features),
+        coefficients=coeffs,
+        intercept=intercept_value,
+        r_squared=round(r_squared, 6),
+        mse=round(mse, 6),
+        sample_size=sample_size,
+        residual_sum=round(residual_sum, 6),
+    )
+
+
+def _use_numpy(backend: str, solver: str, size: int) -> bool:
+    if backend == "numpy":
+        return True
+    return backend == "auto" and solver != "normal" and _np is not None and size >= _NUMPY_MIN_ENTRIES
+
+
+def _penalty(width: int, ridge: float, include_intercept: bool) -> list[float]:
+    """Diagonal da penalidade ridge (o intercepto não é penalizado)."""
+    return [0.0 if (include_intercept and i == 0) else ridge for i in range(width)]
+
+
+def _qr_least_squares(
+    matrix: Sequence[Sequence[float]],
+    targets: Sequence[float],
+    ridge: float,
+    include_intercept: bool,
+) -> List[float]:
+    """
+    Mínimos quadrados por QR (Householder, colunas como listas). Ridge entra
+    como linhas aumentadas sqrt(λ)·I, sem formar XᵀX.
+    """
+
+    width = len(matrix[0])
+    columns = [list(column) for column in zip(*matrix)]
+    rhs = list(targets)
+    if ridge > 0.0:
+        for i, weight in enumerate(_penalty(width, ridge, include_intercept)):
+            for j, column in enumerate(columns):
+                column.append(math.sqrt(weight) if i == j else 0.0)
+            rhs.append(0.0)
+    if len(rhs) < width:
+        raise ValueError("matrix is singular")
+    column_norms = [math.sqrt(sum(value * value for value in column)) for column in columns]
+    for k in range(width):
+        head = columns[k][k:]
+        norm = math.sqrt(sum(map(mul, head, head)))
+        if norm <= _RANK_TOLERANCE * column_norms[k]:
+            raise ValueError("matrix is singular")
+        alpha = -math.copysign(norm, head[0])
+        reflector = head
+        reflector[0] -= alpha
+        denominator = sum(map(mul, reflector, reflector))
+        for target in columns[k + 1 :] + [rhs]:
+            segment = target[k:]
+            factor = 2.0 * sum(map(mul, reflector, segment)) / denominator
+            target[k:] = map(sub, segment, [factor * v for v in reflector])
+        columns[k][k] = alpha
+    # R·β = Qᵀy, com R[i][j] = columns[j][i]
+    upper = [[columns[j][i] for j in range(width)] for i in range(width)]
+    return _back_substitute(upper, rhs[:width])
+
+
+def _normal_equations(matrix: Sequence[Sequence[float]], targets: Sequence[float]) -> tuple[List[List[float]], List[float]]:
+    xt = _transpose(matrix)
+    xtx = [[sum(map(mul, row_i, row_j)) for row_j in xt] for row_i in xt]
+    return xtx, _mat_vec_mul(xt, targets)
 
 
 def _invert_matrix(matrix: Sequence[Sequence[float]]) -> List[List[float]]:
+    """Inversa por Gauss-Jordan sem pivotamento (caminho histórico do solver "normal")."""
     size = len(matrix)
-    if size != len(matrix[0]):
-        raise ValueError("matrix must be square")
     augmented = [list(row) + [1.0 if i == j else 0.0 for j in range(size)] for i, row in enumerate(matrix)]
     for i in range(size):
         pivot = augmented[i][i]
@@ -149,4 +327,89 @@ def _invert_matrix(matrix: Sequence[Sequence[float]]) -> List[List[float]]:
     return [row[size:] for row in augmented]
 
 
-__all__ = ["RegressionResult", "solve_linear_regression"]
+def _with_ridge(xtx: Sequence[Sequence[float]], ridge: float, include_intercept: bool) -> List[List[float]]:
+    penalty = _penalty(len(xtx), ridge, include_intercept)
+    return [[value + (penalty[i] if i == j else 0.0) for j, value in enumerate(row)] for i, row in enumerate(xtx)]
+
+
+def _cholesky_solve(matrix: Sequence[Sequence[float]], vector: Sequence[float]) -> List[float]:
+    """Resolve A·x = b com A simétrica definida positiva (A = L·Lᵀ)."""
+    size = len(matrix)
+    lower = [[0.0] * size for _ in range(size)]
+    for i in range(size):
+        for j in range(i + 1):
+            acc = matrix[i][j] - sum(lower[i][k] * lower[j][k] for k in range(j))
+            if i == j:
+                if acc <= _RANK_TOLERANCE * matrix[i][i]:
+                    raise ValueError("matrix is singular")
+                lower[i][i] = math.sqrt(acc)
+            else:
+                lower[i][j] = acc / lower[j][j]
+    forward = [0.0] * size
+    for i in range(size):
+        forward[i] = (vector[i] - sum(lower[i][k] * forward[k] for k in range(i))) / lower[i][i]
+    solution = [0.0] * size
+    for i in range(size - 1, -1, -1):
+        solution[i] = (forward[i] - sum(lower[k][i] * solution[k] for k in range(i + 1, size))) / lower[i][i]
+    return solution
+
+
+def _solve_numpy(
+    matrix: Sequence[Sequence[float]],
+    targets: Sequence[float],
+    solver: str,
+    ridge: float,
+    include_intercept: bool,
+) -> tuple[List[float], List[float]]:
+    x = _np.asarray(matrix, dtype=float)
+    y = _np.asarray(targets, dtype=float)
+    width = x.shape[1]
+    penalty = _np.asarray(_penalty(width, ridge, include_intercept))
+    if solver == "qr":
+        design, rhs = x, y
+        if ridge > 0.0:
+            design = _np.vstack([x, _np.diag(_np.sqrt(penalty))])
+            rhs = _np.concatenate([y, _np.zeros(width)])
+        if design.shape[0] < width:
+            raise ValueError("matrix is singular")
+        q, r = _np.linalg.qr(design)
+        if _np.any(_np.abs(_np.diag(r)) <= _RANK_TOLERANCE * _np.linalg.norm(design, axis=0)):
+            raise ValueError("matrix is singular")
+        beta = _back_substitute(r.tolist(), (q.T @ rhs).tolist())
+    elif solver == "normal":
+        xtx = (x.T @ x + _np.diag(penalty)).tolist()
+        beta = _mat_vec_mul(_invert_matrix(xtx), (x.T @ y).tolist())
+    else:
+        xtx = x.T @ x + _np.diag(penalty)
+        beta = _cholesky_solve(xtx.tolist(), (x.T @ y).tolist())
+    return beta, (x @ _np.asarray(beta)).tolist()
+
+
+def _back_substitute(upper: Sequence[Sequence[float]], rhs: Sequence[float]) -> List[float]:
+    size = len(rhs)
+    beta = [0.0] * size
+    for i in range(size - 1, -1, -1):
+        beta[i] = (rhs[i] - sum(upper[i][j] * beta[j] for j in range(i + 1, size))) / upper[i][i]
+    return beta
+
+
+def _determine_r_squared(actual: Sequence[float], predicted: Sequence[float]) -> float:
+    mean_value = sum(actual) / len(actual)
+    ss_tot = sum((value - mean_value) ** 2 for value in actual)
+    ss_res = sum((value - pred) ** 2 for value, pred in zip(actual, predicted))
+    if ss_tot == 0:
+        return 1.0 if ss_res == 0 else 0.0
+    return 1.0 - (ss_res / ss_tot)
+
+
+def _transpose(matrix: Sequence[Sequence[float]]) -> List[List[float]]:
+    return [list(col) for col in zip(*matrix)]
+
+
+def _mat_vec_mul(matrix: Sequence[Sequence[float]], vector: Sequence[float]) -> List[float]:
+    if len(matrix[0]) != len(vector):
+        raise ValueError("matrix/vector dimensions mismatch")
+    return [sum(value * weight for value, weight in zip(row, vector)) for row in matrix]
+
+
+__all__ = ["BACKENDS", "SOLVERS", "RegressionResult", "solve_linear_regression", "stream_linear_regression"]
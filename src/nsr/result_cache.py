@@ -0,0 +1,337 @@
+"""
+Cache opt-in de `RunOutcome` para `run_text_full`.
+
+O pipeline é determinístico: o mesmo texto aplicado ao mesmo estado de sessão
+com a mesma configuração produz o mesmo resultado e o mesmo estado final. A
+chave combina o texto exato (espaços e forma Unicode alteram `input_preview` e
+os digests, então não há normalização), um digest do estado relevante da sessão
+(domínios ativos, ontologia, regras, snapshot do LogicEngine, buffer/histórico
+de memória, estatísticas da última equação, learner sem pesos, léxico) e da
+`Config`. Não há TTL: qualquer mudança em um desses componentes gera outra
+chave, então entradas antigas simplesmente deixam de ser alcançadas.
+
+Cada entrada guarda o `RunOutcome` e o estado pós-execução da sessão, que é
+restaurado num acerto — a sessão evolui exatamente como evoluiria sem cache.
+
+Camadas: LRU em memória e, opcionalmente, diretório em disco (pickle). O
+diretório deve ser local e confiável, como qualquer arquivo pickle.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, fields, replace
+from hashlib import blake2b
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from liu import Node, fingerprint
+
+from .logic_persistence import serialize_logic_engine
+
+if TYPE_CHECKING:
+    from .equation import EquationSnapshotStats
+    from .runtime import RunOutcome
+    from .state import Rule, SessionCtx
+
+CACHE_FORMAT_VERSION = 1
+
+
+@dataclass()
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    disk_errors: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    def to_dict(self) -> Dict[str, int]:
+        data = asdict(self)
+        data["hits"] = self.hits
+        return data
+
+
+@dataclass(frozen=True)
+class SessionPostState:
+    """Estado da sessão após a execução, reaplicado em acertos de cache."""
+
+    meta_buffer: Tuple[Node, ...]
+    meta_history: Tuple[Tuple[Node, ...], ...]
+    last_equation_stats: "EquationSnapshotStats | None"
+    logic_serialized: str | None
+    kb_rules: Tuple["Rule", ...]
+    kb_ontology: Tuple[Node, ...]
+    language_hint: str | None
+    active_domains: Tuple[str, ...]
+    learner_blob: bytes | None
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    outcome: "RunOutcome"
+    post_state: SessionPostState
+
+
+class _IdentityDigests:
+    """Memoiza digests de tuplas imutáveis pela identidade do objeto."""
+
+    def __init__(self, limit: int = 64) -> None:
+        self._items: "OrderedDict[int, Tuple[object, str]]" = OrderedDict()
+        self._limit = limit
+
+    def get(self, value: Tuple[object, ...], compute) -> str:
+        cached = self._items.get(id(value))
+        if cached is not None and cached[0] is value:
+            self._items.move_to_end(id(value))
+            return cached[1]
+        digest = compute(value)
+        self._items[id(value)] = (value, digest)
+        while len(self._items) > self._limit:
+            self._items.popitem(last=False)
+        return digest
+
+
+_NODE_TUPLE_DIGESTS = _IdentityDigests()
+
+
+def _nodes_digest(nodes: Tuple[Node, ...]) -> str:
+    hasher = blake2b(digest_size=16)
+    for node in nodes:
+        hasher.update(fingerprint(node).encode("ascii") if node is not None else b"-")
+        hasher.update(b"|")
+    return hasher.hexdigest()
+
+
+def _rules_digest(rules: Tuple["Rule", ...]) -> str:
+    hasher = blake2b(digest_size=16)
+    for rule in rules:
+        hasher.update(_nodes_digest(tuple(rule.if_all)).encode("ascii"))
+        hasher.update(b"=>")
+        hasher.update(fingerprint(rule.then).encode("ascii"))
+        hasher.update(b";")
+    return hasher.hexdigest()
+
+
+def _learner_digest(session: "SessionCtx") -> str:
+    learner = session.weightless_learner
+    if learner is None:
+        return "none"
+    hasher = blake2b(digest_size=16)
+    for fp in sorted(learner.episodes):
+        hasher.update(fp.encode("utf-8"))
+    hasher.update(
+        f"|{learner.episodes_since_learning}|{len(learner.patterns)}|{len(learner.learned_rules)}".encode("utf-8")
+    )
+    return hasher.hexdigest()
+
+
+def session_fingerprint(session: "SessionCtx") -> Dict[str, str]:
+    """Componentes do estado da sessão que influenciam `run_text_full`."""
+
+    manager = session.ontology_manager
+    active = sorted(manager.active_domains) if manager is not None else []
+    if session.logic_engine is not None:
+        logic_snapshot = serialize_logic_engine(session.logic_engine)
+    else:
+        logic_snapshot = session.logic_serialized or ""
+    history = session.meta_history
+    history_digest = blake2b(digest_size=16)
+    for entry in history:
+        history_digest.update(_NODE_TUPLE_DIGESTS.get(tuple(entry), _nodes_digest).encode("ascii"))
+    stats = session.last_equation_stats
+    lexicon = session.lexicon
+    lexicon_digest = blake2b(
+        repr(
+            (
+                sorted(lexicon.synonyms.items()),
+                sorted(lexicon.pos_hint.items()),
+                sorted(lexicon.qualifiers),
+                sorted(lexicon.rel_words.items()),
+            )
+        ).encode("utf-8"),
+        digest_size=16,
+    ).hexdigest()
+    return {
+        "active_domains": ",".join(active),
+        "ontology": _NODE_TUPLE_DIGESTS.get(session.kb_ontology, _nodes_digest),
+        "rules": _rules_digest(session.kb_rules),
+        "logic": blake2b(logic_snapshot.encode("utf-8"), digest_size=16).hexdigest(),
+        "memory_buffer": _NODE_TUPLE_DIGESTS.get(session.meta_buffer, _nodes_digest),
+        "meta_history": f"{len(history)}:{history_digest.hexdigest()}",
+        "equation_stats": stats.equation_digest if stats is not None else "",
+        "language_hint": session.language_hint or "",
+        "learner": _learner_digest(session),
+        "lexicon": lexicon_digest,
+    }
+
+
+def config_fingerprint(session: "SessionCtx") -> str:
+    config = session.config
+    items = sorted((item.name, repr(getattr(config, item.name))) for item in fields(config))
+    return blake2b(repr(items).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def outcome_cache_key(text: str, session: "SessionCtx") -> str:
+    hasher = blake2b(digest_size=16)
+    hasher.update(f"v{CACHE_FORMAT_VERSION}|".encode("ascii"))
+    hasher.update(text.encode("utf-8"))
+    for name, value in sorted(session_fingerprint(session).items()):
+        hasher.update(f"|{name}={value}".encode("utf-8"))
+    hasher.update(f"|config={config_fingerprint(session)}".encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def capture_post_state(session: "SessionCtx") -> SessionPostState:
+    if session.logic_engine is not None:
+        logic_serialized = serialize_logic_engine(session.logic_engine)
+    else:
+        logic_serialized = session.logic_serialized
+    manager = session.ontology_manager
+    learner = session.weightless_learner
+    return SessionPostState(
+        meta_buffer=tuple(session.meta_buffer),
+        meta_history=tuple(tuple(entry) for entry in session.meta_history),
+        last_equation_stats=session.last_equation_stats,
+        logic_serialized=logic_serialized,
+        kb_rules=tuple(session.kb_rules),
+        kb_ontology=tuple(session.kb_ontology),
+        language_hint=session.language_hint,
+        active_domains=tuple(sorted(manager.active_domains)) if manager is not None else tuple(),
+        learner_blob=pickle.dumps(learner, protocol=pickle.HIGHEST_PROTOCOL) if learner is not None else None,
+    )
+
+
+def restore_post_state(session: "SessionCtx", state: SessionPostState) -> None:
+    from .logic_persistence import deserialize_logic_engine
+
+    session.meta_buffer = state.meta_buffer
+    session.meta_history = [tuple(entry) for entry in state.meta_history]
+    session.last_equation_stats = state.last_equation_stats
+    session.logic_serialized = state.logic_serialized
+    session.logic_engine = deserialize_logic_engine(state.logic_serialized) if state.logic_serialized else None
+    session.kb_rules = state.kb_rules
+    session.kb_ontology = state.kb_ontology
+    session.language_hint = state.language_hint
+    if session.ontology_manager is not None:
+        session.ontology_manager.active_domains = set(state.active_domains)
+    session.weightless_learner = pickle.loads(state.learner_blob) if state.learner_blob is not None else None
+
+
+def clone_outcome(outcome: "RunOutcome") -> "RunOutcome":
+    """Cópia com `Trace`/`ISR` próprios; os `Node` são imutáveis e compartilhados."""
+
+    trace = outcome.trace
+    trace_copy = replace(
+        trace,
+        steps=list(trace.steps),
+        contradictions=list(trace.contradictions),
+        invariant_failures=list(trace.invariant_failures),
+        cache=None,
+    )
+    return replace(outcome, trace=trace_copy, isr=outcome.isr.snapshot())
+
+
+class OutcomeCache:
+    """LRU em memória com camada opcional em disco para resultados de `run_text_full`."""
+
+    def __init__(self, max_entries: int = 256, disk_path: str | os.PathLike[str] | None = None) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries deve ser positivo.")
+        self.max_entries = max_entries
+        self.disk_path = Path(disk_path) if disk_path is not None else None
+        if self.disk_path is not None:
+            self.disk_path.mkdir(parents=True, exist_ok=True)
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def lookup(self, key: str) -> Tuple[Optional[CacheEntry], str]:
+        """Retorna `(entrada, camada)`; camada é `memory`, `disk` ou `miss`."""
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            self.stats.memory_hits += 1
+            return entry, "memory"
+        entry = self._load_disk(key)
+        if entry is not None:
+            self._remember(key, entry)
+            self.stats.disk_hits += 1
+            return entry, "disk"
+        self.stats.misses += 1
+        return None, "miss"
+
+    def store(self, key: str, entry: CacheEntry) -> None:
+        self._remember(key, entry)
+        self.stats.stores += 1
+        self._save_disk(key, entry)
+
+    def clear(self) -> None:
+        self._memory.clear()
+
+    def report(self, status: str, key: str) -> Dict[str, object]:
+        payload: Dict[str, object] = {"status": status, "key": key, "entries": len(self._memory)}
+        payload.update(self.stats.to_dict())
+        return payload
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _disk_file(self, key: str) -> Path | None:
+        if self.disk_path is None:
+            return None
+        return self.disk_path / f"{key}.pkl"
+
+    def _load_disk(self, key: str) -> CacheEntry | None:
+        path = self._disk_file(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            with path.open("rb") as handle:
+                version, entry = pickle.load(handle)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError, ImportError):
+            self.stats.disk_errors += 1
+            return None
+        if version != CACHE_FORMAT_VERSION or not isinstance(entry, CacheEntry):
+            return None
+        return entry
+
+    def _save_disk(self, key: str, entry: CacheEntry) -> None:
+        path = self._disk_file(key)
+        if path is None:
+            return
+        try:
+            fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=".tmp-", suffix=".pkl")
+            with os.fdopen(fd, "wb") as handle:
+                pickle.dump((CACHE_FORMAT_VERSION, entry), handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, path)
+        except (OSError, pickle.PicklingError):
+            self.stats.disk_errors += 1
+
+
+__all__ = [
+    "CacheEntry",
+    "CacheStats",
+    "OutcomeCache",
+    "SessionPostState",
+    "capture_post_state",
+    "clone_outcome",
+    "config_fingerprint",
+    "outcome_cache_key",
+    "restore_post_state",
+    "session_fingerprint",
+]
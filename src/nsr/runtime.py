@@ -7,7 +7,7 @@ from __future__ import annotations
 from dataclasses import dataclass, field, replace as dc_replace
 from enum import Enum
 from hashlib import blake2b
-from typing import Iterable, List, Tuple, Optional
+from typing import Dict, Iterable, List, Tuple, Optional
 from collections import deque, Counter
 
 from liu import Node, NodeKind, operation, fingerprint, text
@@ -41,6 +41,13 @@ from .meta_equation import build_meta_equation_node
 from .meta_memory_store import append_memory, load_recent_memory
 from .meta_memory_induction import record_episode, run_memory_induction
 from .context_stats import build_context_probabilities
+from .result_cache import (
+    CacheEntry,
+    capture_post_state,
+    clone_outcome,
+    outcome_cache_key,
+    restore_post_state,
+)
 from .meta_synthesis import build_meta_synthesis
 from .weightless_integration import (
     record_episode_for_learning,
@@ -67,6 +74,7 @@ class Trace:
     finalized: bool = False
     contradictions: List[Contradiction] = field(default_factory=list)
     invariant_failures: List[str] = field(default_factory=list)
+    cache: Dict[str, object] | None = None  # estatísticas do OutcomeCache (fora do digest)
 
     def add(self, label: str, quality: float, rels: int, ctx: int) -> None:
         entry = f"{len(self.steps)+1}:{label} q={quality:.2f} rel={rels} ctx={ctx}"
@@ -176,6 +184,25 @@ def run_text_full(text: str, session: SessionCtx | None = None) -> RunOutcome:
     session = session or SessionCtx()
     _ensure_logic_engine(session)
     _ensure_memory_loaded(session)
+    cache = session.result_cache
+    if cache is None:
+        return _run_text_pipeline(text, session)
+    key = outcome_cache_key(text, session)
+    entry, tier = cache.lookup(key)
+    if entry is not None:
+        restore_post_state(session, entry.post_state)
+        outcome = clone_outcome(entry.outcome)
+        _persist_meta_memory(session, outcome.meta_memory)
+        outcome = _finalize_outcome(session, text, outcome)
+        outcome.trace.cache = cache.report(f"hit:{tier}", key)
+        return outcome
+    outcome = _run_text_pipeline(text, session)
+    cache.store(key, CacheEntry(outcome=clone_outcome(outcome), post_state=capture_post_state(session)))
+    outcome.trace.cache = cache.report("miss", key)
+    return outcome
+
+
+def _run_text_pipeline(text: str, session: SessionCtx) -> RunOutcome:
     transformer = MetaTransformer(session)
     meta = transformer.transform(text)
     if session.meta_buffer:
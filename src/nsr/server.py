@@ -0,0 +1,330 @@
+"""
+Servidor local persistente para a CLI do NSR.
+
+Mantém o processo (ontologia, LangPacks, motores) carregado e um conjunto de
+sessões nomeadas (`SessionCtx`) aquecidas. Fala um protocolo JSON-lines, seja
+via stdin/stdout (`--stdio`) ou via socket Unix (`--socket`):
+
+    → {"id": 1, "op": "run", "argv": ["O carro tem roda", "--include-meta"], "session": "bot"}
+    ← {"id": 1, "ok": true, "output": "<mesmo JSON impresso por python -m nsr.cli>"}
+
+Operações: `run`, `ping`, `sessions`, `reset`, `shutdown`. Sem `session`, cada
+`run` usa uma sessão nova — o resultado é byte a byte igual ao da CLI local.
+
+Este módulo só importa a stdlib no topo: o cliente (`request_cli_output`) é
+usado pela CLI antes de decidir se precisa carregar o runtime.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import IO, Any, Dict, List, Mapping, Optional, Sequence
+
+SOCKET_ENV = "NSR_SERVER_SOCKET"
+DEFAULT_MAX_SESSIONS = 64
+CLIENT_TIMEOUT = 30.0
+
+# Flags tratadas pelo cliente, nunca repassadas ao servidor.
+_CLIENT_ONLY_FLAGS = ("--output",)
+
+
+def default_socket_path() -> Path:
+    """Caminho do socket: `$NSR_SERVER_SOCKET` ou `<tmp>/nsr-server-<uid>.sock`."""
+
+    env_value = os.environ.get(SOCKET_ENV)
+    if env_value:
+        return Path(env_value)
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return Path(tempfile.gettempdir()) / f"nsr-server-{uid}.sock"
+
+
+class NSRServer:
+    """Despacha requisições JSON para sessões `SessionCtx` mantidas em memória."""
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS) -> None:
+        if max_sessions <= 0:
+            raise ValueError("max_sessions deve ser positivo.")
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._parser: argparse.ArgumentParser | None = None
+        self.requests_served = 0
+        self.stop_requested = False
+
+    def warm_up(self) -> None:
+        """Carrega runtime, ontologia e LangPacks antes da primeira requisição."""
+
+        from .cli import build_cli_session, _build_parser
+        from .runtime import run_text_full  # noqa: F401 - aquece o import
+
+        self._parser = _build_parser()
+        build_cli_session()
+
+    @property
+    def session_names(self) -> List[str]:
+        return list(self._sessions.keys())
+
+    def handle(self, request: Mapping[str, Any]) -> Dict[str, Any]:
+        """Processa uma requisição; erros viram `{"ok": false, "error": ...}`."""
+
+        response: Dict[str, Any] = {}
+        if "id" in request:
+            response["id"] = request["id"]
+        op = request.get("op", "run")
+        try:
+            with self._lock:
+                response.update(self._dispatch(op, request))
+            response["ok"] = True
+        except SystemExit as exc:
+            response["ok"] = False
+            response["error"] = str(exc.code) if exc.code is not None else "SystemExit"
+        except Exception as exc:  # pragma: no cover - defensivo
+            response["ok"] = False
+            response["error"] = f"{type(exc).__name__}: {exc}"
+        return response
+
+    def handle_line(self, line: str) -> Optional[str]:
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as exc:
+            return json.dumps({"ok": False, "error": f"JSON inválido: {exc.msg}"}, ensure_ascii=False)
+        if not isinstance(request, dict):
+            return json.dumps({"ok": False, "error": "Requisição deve ser um objeto JSON."}, ensure_ascii=False)
+        return json.dumps(self.handle(request), ensure_ascii=False, separators=(",", ":"))
+
+    def _dispatch(self, op: str, request: Mapping[str, Any]) -> Dict[str, Any]:
+        if op == "run":
+            return {"output": self._run(request)}
+        if op == "ping":
+            return {"pid": os.getpid(), "requests": self.requests_served, "sessions": len(self._sessions)}
+        if op == "sessions":
+            return {"sessions": self.session_names}
+        if op == "reset":
+            name = request.get("session")
+            if name:
+                removed = self._sessions.pop(str(name), None) is not None
+            else:
+                removed = bool(self._sessions)
+                self._sessions.clear()
+            return {"reset": removed}
+        if op == "shutdown":
+            self.stop_requested = True
+            return {"stopping": True}
+        raise SystemExit(f"Operação desconhecida: {op!r}")
+
+    def _run(self, request: Mapping[str, Any]) -> str:
+        from .cli import render_cli_output
+
+        argv = request.get("argv")
+        if argv is None:
+            text = request.get("text")
+            if not isinstance(text, str):
+                raise SystemExit("Requisição `run` requer `argv` ou `text`.")
+            argv = [text]
+        if not isinstance(argv, list) or not all(isinstance(item, str) for item in argv):
+            raise SystemExit("`argv` deve ser uma lista de strings.")
+        args = self._parse_argv(argv)
+        name = request.get("session") or args.session
+        session = self._session(str(name)) if name else None
+        self.requests_served += 1
+        return render_cli_output(args, session)
+
+    def _parse_argv(self, argv: Sequence[str]) -> argparse.Namespace:
+        if self._parser is None:
+            from .cli import _build_parser
+
+            self._parser = _build_parser()
+        try:
+            return self._parser.parse_args(list(argv))
+        except SystemExit as exc:
+            raise SystemExit(f"Argumentos inválidos: {' '.join(argv)}") from exc
+
+    def _session(self, name: str):
+        session = self._sessions.get(name)
+        if session is not None:
+            self._sessions.move_to_end(name)
+            return session
+        from .cli import build_cli_session
+
+        session = build_cli_session()
+        self._sessions[name] = session
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return session
+
+
+def serve_stdio(server: NSRServer, stdin: IO[str] | None = None, stdout: IO[str] | None = None) -> int:
+    """Lê uma requisição por linha em `stdin` e responde uma linha em `stdout`."""
+
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    for line in stdin:
+        reply = server.handle_line(line)
+        if reply is None:
+            continue
+        stdout.write(reply + "\n")
+        stdout.flush()
+        if server.stop_requested:
+            break
+    return 0
+
+
+class _UnixHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        nsr_server: NSRServer = self.server.nsr_server  # type: ignore[attr-defined]
+        for raw in self.rfile:
+            reply = nsr_server.handle_line(raw.decode("utf-8"))
+            if reply is None:
+                continue
+            self.wfile.write(reply.encode("utf-8") + b"\n")
+            self.wfile.flush()
+            if nsr_server.stop_requested:
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                break
+
+
+def serve_unix(server: NSRServer, path: Path | str | None = None) -> int:
+    """Atende conexões no socket Unix indicado até receber `shutdown`."""
+
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("Sockets Unix indisponíveis nesta plataforma; use --stdio.")
+    socket_path = Path(path) if path is not None else default_socket_path()
+    if socket_path.exists():
+        if _probe(socket_path):
+            raise RuntimeError(f"Já existe um servidor NSR ativo em {socket_path}.")
+        socket_path.unlink()
+    socketserver.ThreadingUnixStreamServer.daemon_threads = True
+    with socketserver.ThreadingUnixStreamServer(str(socket_path), _UnixHandler) as unix_server:
+        unix_server.nsr_server = server  # type: ignore[attr-defined]
+        os.chmod(socket_path, 0o600)
+        try:
+            unix_server.serve_forever()
+        finally:
+            try:
+                socket_path.unlink()
+            except FileNotFoundError:
+                pass
+    return 0
+
+
+def _probe(path: Path) -> bool:
+    try:
+        return bool(send_request({"op": "ping"}, path=path, timeout=1.0).get("ok"))
+    except OSError:
+        return False
+
+
+def send_request(
+    payload: Mapping[str, Any],
+    path: Path | str | None = None,
+    timeout: float = CLIENT_TIMEOUT,
+) -> Dict[str, Any]:
+    """Envia uma requisição ao servidor e devolve a resposta decodificada."""
+
+    socket_path = Path(path) if path is not None else default_socket_path()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.settimeout(timeout)
+        conn.connect(str(socket_path))
+        conn.sendall(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        buffer = bytearray()
+        while not buffer.endswith(b"\n"):
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            buffer.extend(chunk)
+    if not buffer:
+        raise ConnectionError("Servidor NSR encerrou a conexão sem resposta.")
+    return json.loads(buffer.decode("utf-8"))
+
+
+def request_cli_output(argv: Sequence[str], path: Path | str | None = None) -> Optional[str]:
+    """
+    Cliente fino usado pela CLI: devolve o JSON produzido pelo servidor ou `None`
+    quando não há servidor ativo (a CLI então executa localmente).
+    """
+
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    socket_path = Path(path) if path is not None else default_socket_path()
+    if not socket_path.exists():
+        return None
+    forwarded = _strip_client_flags(argv)
+    try:
+        response = send_request({"op": "run", "argv": forwarded}, path=socket_path)
+    except (OSError, ValueError):
+        return None
+    if not response.get("ok"):
+        raise SystemExit(response.get("error") or "Servidor NSR retornou erro.")
+    output = response.get("output")
+    return output if isinstance(output, str) else None
+
+
+def _strip_client_flags(argv: Sequence[str]) -> List[str]:
+    forwarded: List[str] = []
+    skip_next = False
+    for item in argv:
+        if skip_next:
+            skip_next = False
+            continue
+        if item in _CLIENT_ONLY_FLAGS:
+            skip_next = True
+            continue
+        if any(item.startswith(flag + "=") for flag in _CLIENT_ONLY_FLAGS):
+            continue
+        forwarded.append(item)
+    return forwarded
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m nsr.server",
+        description="Servidor NSR persistente (JSON-lines) com sessões nomeadas aquecidas.",
+    )
+    transport = parser.add_mutually_exclusive_group()
+    transport.add_argument("--stdio", action="store_true", help="Atende requisições via stdin/stdout.")
+    transport.add_argument(
+        "--socket",
+        help=f"Caminho do socket Unix (default: ${SOCKET_ENV} ou <tmp>/nsr-server-<uid>.sock).",
+    )
+    parser.add_argument(
+        "--max-sessions",
+        type=int,
+        default=DEFAULT_MAX_SESSIONS,
+        help=f"Sessões nomeadas mantidas em memória (LRU, default: {DEFAULT_MAX_SESSIONS}).",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    server = NSRServer(max_sessions=args.max_sessions)
+    server.warm_up()
+    if args.stdio:
+        return serve_stdio(server)
+    return serve_unix(server, args.socket)
+
+
+__all__ = [
+    "NSRServer",
+    "default_socket_path",
+    "request_cli_output",
+    "send_request",
+    "serve_stdio",
+    "serve_unix",
+]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -18,6 +18,7 @@ from .multi_ontology import MultiOntologyManager, build_default_multi_ontology_m
 if TYPE_CHECKING:
     from .logic_engine import LogicEngine
     from .equation import EquationSnapshotStats
+    from .result_cache import OutcomeCache
 
 
 def _env_path(var_name: str) -> str | None:
@@ -122,6 +123,7 @@ class SessionCtx:
     last_equation_stats: "EquationSnapshotStats | None" = None
     ontology_manager: MultiOntologyManager | None = None
     weightless_learner: "WeightlessLearner | None" = None  # Sistema de aprendizado sem pesos
+    result_cache: "OutcomeCache | None" = None  # Cache opt-in de run_text_full (pode ser compartilhado)
 
     def __post_init__(self) -> None:
         if self.ontology_manager is None:
@@ -40,9 +40,12 @@ Licença: MIT
 
 from .compressor import MDLCompressor, CompressionResult
 from .graph import CooccurrenceGraph, GraphNode, GraphEdge
+from .sparse import CooccurrenceMatrix
 from .inductor import RuleInductor, SymbolicRule, RuleSet, Condition
 from .memory import AssociativeMemory, MemoryTrace, RetrievalResult
 from .engine import LearningEngine, LearningConfig, LearningState
+from .ingest import IngestProgress, iter_documents
+from .persistence import StateArchive
 
 # === LEVEL 2: REASONING COMPONENTS ===
 
@@ -50,6 +53,7 @@ from .engine import LearningEngine, LearningConfig, LearningState
 from .analogy import (
     Relation,
     Structure, 
+    StructureSignature,
     StructuralMapping,
     Analogy,
     AnalogyEngine,
@@ -201,6 +205,7 @@ __all__ = [
     "CooccurrenceGraph", 
     "GraphNode",
     "GraphEdge",
+    "CooccurrenceMatrix",
     
     # Inductor
     "RuleInductor",
@@ -217,12 +222,16 @@ __all__ = [
     "LearningEngine",
     "LearningConfig",
     "LearningState",
+    "IngestProgress",
+    "iter_documents",
+    "StateArchive",
     
     # === LEVEL 2: REASONING ===
     
     # Analogy
     "Relation",
     "Structure",
+    "StructureSignature",
     "StructuralMapping",
     "Analogy",
     "AnalogyEngine",
@@ -32,9 +32,10 @@ Isso permite TRANSFERÊNCIA de conhecimento sem treinamento!
 
 from __future__ import annotations
 
-from collections import defaultdict
+import heapq
+from collections import Counter, OrderedDict, defaultdict, deque
 from dataclasses import dataclass, field
-from typing import Dict, FrozenSet, Iterator, List, Mapping, Sequence, Set, Tuple
+from typing import Deque, Dict, FrozenSet, Iterator, List, Mapping, Sequence, Set, Tuple
 from hashlib import blake2b
 
 
@@ -91,6 +92,56 @@ class Structure:
         return f"{self.name}: {{{rels}}}"
 
 
+@dataclass(frozen=True)
+class StructureSignature:
+    """
+    Resumo estrutural usado para pré-filtrar domínios candidatos.
+
+    `relation_types` é o multiconjunto de tipos (predicado, aridade) das
+    relações e `predicates_by_arity` o histograma de predicados por aridade;
+    juntos limitam por cima o score de qualquer mapeamento.
+    """
+    
+    keys: FrozenSet[Tuple[str, int]]
+    relation_types: Mapping[Tuple[str, int], int]
+    predicates_by_arity: Mapping[int, int]
+    predicate_count: int
+    entity_count: int
+    
+    @staticmethod
+    def of(structure: Structure) -> "StructureSignature":
+        relation_types = Counter((r.predicate, r.arity) for r in structure.relations)
+        return StructureSignature(
+            keys=frozenset(relation_types),
+            relation_types=dict(relation_types),
+            predicates_by_arity=dict(Counter(arity for _, arity in relation_types)),
+            predicate_count=len({predicate for predicate, _ in relation_types}),
+            entity_count=len(structure.entities),
+        )
+    
+    def score_bound(self, other: "StructureSignature") -> float:
+        """Limite superior do score de mapeamento desta estrutura (fonte) para `other`."""
+        # Predicados só mapeiam para predicados do alvo com a mesma aridade
+        mappable_predicates = min(
+            self.predicate_count,
+            sum(
+                min(count, other.predicates_by_arity.get(arity, 0))
+                for arity, count in self.predicates_by_arity.items()
+            ),
+        )
+        mappable = {predicate for predicate, arity in self.keys if arity in other.predicates_by_arity}
+        relations = sum(self.relation_types.values())
+        mappable_relations = sum(
+            count for (predicate, _), count in self.relation_types.items() if predicate in mappable
+        )
+        entities = min(self.entity_count, other.entity_count)
+        return (
+            mappable_predicates / max(1, self.predicate_count)
+            + entities / max(1, self.entity_count)
+            + mappable_relations / max(1, relations)
+        ) / 3
+
+
 @dataclass(frozen=True)
 class StructuralMapping:
     """Mapeamento entre duas estruturas."""
@@ -165,23 +216,54 @@ class AnalogyEngine:
     Encontra mapeamentos estruturais entre domínios e
     transfere conhecimento SEM usar pesos ou gradientes.
     
-    Algoritmo:
-    1. Encontra correspondência de predicados (mesma aridade)
-    2. Encontra correspondência de entidades (consistência estrutural)
-    3. Pontua mapeamento por:
+    Algoritmo (Structure-Mapping Engine guloso):
+    1. Hipóteses de correspondência: pares de relações de mesma aridade
+       cujos argumentos formam um alinhamento de entidades injetivo
+       (memoizadas por par de grupos de relações)
+    2. Prioridade por peso do predicado (idêntico > renomeado) e pelo apoio
+       que cada correspondência de entidades recebe das demais hipóteses
+    3. Fusão gulosa propagando as restrições 1:1 de predicados e entidades;
+       hipóteses conectadas ao que já foi aceito passam à frente
+    4. Pontua mapeamento por:
        - Quantidade de relações mapeadas
        - Sistematicidade (relações conectadas)
        - Consistência (sem conflitos)
-    4. Transfere inferências do domínio fonte para o alvo
+    5. Transfere inferências do domínio fonte para o alvo
+    
+    Domínios registrados ficam num índice invertido por tipo de relação
+    (predicado, aridade), então o ranking só toca estruturas que
+    compartilham algum tipo com o alvo. Mapeamentos são guardados num cache
+    LRU por conteúdo das estruturas e `known_analogies` guarda só as
+    `max_analogies` mais recentes.
     """
     
-    def __init__(self):
+    def __init__(self, cache_size: int = 256, max_analogies: int = 1024):
         self.known_structures: Dict[str, Structure] = {}
-        self.known_analogies: List[Analogy] = []
+        self.known_analogies: Deque[Analogy] = deque(maxlen=max_analogies)
+        self.cache_size = cache_size
+        
+        # Índice de assinaturas: tipo (predicado, aridade) → nomes registrados
+        self._signatures: Dict[str, StructureSignature] = {}
+        self._postings: Dict[Tuple[str, int], Set[str]] = defaultdict(set)
+        self._order: Dict[str, int] = {}
+        
+        # Mapeamentos por (digest fonte, digest alvo) e hipóteses por par de grupos de relações, LRU
+        self._mapping_cache: "OrderedDict[Tuple[str, str], Tuple[Dict[str, str], Dict[str, str]]]" = OrderedDict()
+        self._hypothesis_cache: "OrderedDict[Tuple[Tuple[Relation, ...], Tuple[Relation, ...]], Tuple[Tuple[int, int, Tuple[Tuple[str, str], ...]], ...]]" = OrderedDict()
     
     def register_structure(self, structure: Structure) -> None:
         """Registra uma estrutura conhecida."""
-        self.known_structures[structure.name] = structure
+        name = structure.name
+        previous = self._signatures.get(name)
+        if previous is not None:
+            for key in previous.keys:
+                self._postings[key].discard(name)
+        signature = StructureSignature.of(structure)
+        for key in signature.keys:
+            self._postings[key].add(name)
+        self._signatures[name] = signature
+        self._order.setdefault(name, len(self._order))
+        self.known_structures[name] = structure
     
     def find_analogy(
         self,
@@ -192,16 +274,13 @@ class AnalogyEngine:
         """
         Encontra a melhor analogia entre fonte e alvo.
         """
-        # Encontra mapeamento de predicados
-        pred_mapping = self._map_predicates(source, target)
-        
-        if not pred_mapping:
+        # Nenhum mapeamento pode superar o limite dado pelas assinaturas
+        if self._signature(source).score_bound(self._signature(target)) < min_score:
             return None
         
-        # Encontra mapeamento de entidades
-        entity_mapping = self._map_entities(source, target, pred_mapping)
+        pred_mapping, entity_mapping = self._structure_mapping(source, target)
         
-        if not entity_mapping:
+        if not pred_mapping or not entity_mapping:
             return None
         
         # Calcula score
@@ -240,19 +319,26 @@ class AnalogyEngine:
         min_score: float = 0.3,
     ) -> List[Tuple[Structure, float]]:
         """Encontra domínios conhecidos similares ao alvo."""
-        candidates = []
+        keys = self._signature(target).keys
+        
+        # Interseção das assinaturas via índice invertido
+        shared: Counter[str] = Counter()
+        for key in keys:
+            shared.update(self._postings.get(key, ()))
         
-        for name, source in self.known_structures.items():
+        names = self.known_structures if min_score <= 0 else shared
+        candidates = []
+        for name in names:
             if name == target.name:
                 continue
-            
-            # Compara assinaturas estruturais
-            sig_similarity = self._signature_similarity(source, target)
-            
+            common = shared.get(name, 0)
+            union = len(self._signatures[name].keys) + len(keys) - common
+            # Similaridade de Jaccard das assinaturas estruturais
+            sig_similarity = common / union if union > 0 else 0.0
             if sig_similarity >= min_score:
-                candidates.append((source, sig_similarity))
+                candidates.append((self.known_structures[name], sig_similarity))
         
-        return sorted(candidates, key=lambda x: -x[1])
+        return sorted(candidates, key=lambda x: (-x[1], self._order[x[0].name]))
     
     def reason_by_analogy(
         self,
@@ -289,85 +375,137 @@ class AnalogyEngine:
         
         return sorted(conclusions, key=lambda x: -x[1])
     
-    def _map_predicates(
+    def _signature(self, structure: Structure) -> StructureSignature:
+        signature = self._signatures.get(structure.name)
+        if signature is not None and self.known_structures[structure.name] is structure:
+            return signature
+        return StructureSignature.of(structure)
+    
+    def _structure_mapping(
         self,
         source: Structure,
         target: Structure,
-    ) -> Dict[str, str]:
-        """Mapeia predicados da fonte para o alvo."""
-        mapping = {}
-        
-        # Agrupa por aridade
-        source_by_arity: Dict[int, List[str]] = defaultdict(list)
-        target_by_arity: Dict[int, List[str]] = defaultdict(list)
-        
-        for rel in source.relations:
-            source_by_arity[rel.arity].append(rel.predicate)
-        
-        for rel in target.relations:
-            target_by_arity[rel.arity].append(rel.predicate)
+    ) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """Mapeamentos (predicados, entidades) da fonte para o alvo, com cache LRU."""
+        key = (_structure_digest(source), _structure_digest(target))
+        cached = self._mapping_cache.get(key)
+        if cached is not None:
+            self._mapping_cache.move_to_end(key)
+            return dict(cached[0]), dict(cached[1])
+        
+        mapping = self._greedy_merge(source, target)
+        self._mapping_cache[key] = mapping
+        while len(self._mapping_cache) > self.cache_size:
+            self._mapping_cache.popitem(last=False)
+        return dict(mapping[0]), dict(mapping[1])
+    
+    def _greedy_merge(self, source: Structure, target: Structure) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """
+        Fusão gulosa das hipóteses de correspondência.
         
-        # Mapeia predicados da mesma aridade
-        for arity in source_by_arity:
-            if arity not in target_by_arity:
+        A prioridade de uma hipótese soma seu peso (predicado idêntico ou
+        renomeado), o apoio de suas correspondências de entidades entre todas
+        as hipóteses (sistematicidade) e um bônus por correspondência já
+        aceita; cada aceitação propaga as restrições 1:1 e reprioriza só as
+        hipóteses que tocam as correspondências novas.
+        """
+        source_groups = _relation_groups(source)
+        target_groups = _relation_groups(target)
+        
+        hypotheses: List[Tuple[Relation, Relation, Tuple[Tuple[str, str], ...], float]] = []
+        for (src_pred, arity), src_rels in source_groups.items():
+            for (tgt_pred, tgt_arity), tgt_rels in target_groups.items():
+                if arity != tgt_arity:
+                    continue
+                base = 1.0 if src_pred == tgt_pred else _RENAMED_PREDICATE_WEIGHT
+                for i, j, alignment in self._hypotheses(src_rels, tgt_rels):
+                    hypotheses.append((src_rels[i], tgt_rels[j], alignment, base))
+        
+        support: Counter[Tuple[str, str]] = Counter()
+        by_pair: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        by_predicates: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        for index, (src_rel, tgt_rel, alignment, base) in enumerate(hypotheses):
+            by_predicates[(src_rel.predicate, tgt_rel.predicate)].append(index)
+            for pair in alignment:
+                support[pair] += base
+                by_pair[pair].append(index)
+        
+        pred_mapping: Dict[str, str] = {}
+        mapped_targets: Set[str] = set()
+        forward: Dict[str, str] = {}
+        backward: Dict[str, str] = {}
+        used_src: Set[Relation] = set()
+        used_tgt: Set[Relation] = set()
+        
+        def priority(index: int) -> float:
+            src_rel, tgt_rel, alignment, base = hypotheses[index]
+            anchored = sum(1 for src, tgt in alignment if forward.get(src) == tgt)
+            if pred_mapping.get(src_rel.predicate) == tgt_rel.predicate:
+                anchored += 1
+            systematicity = sum(support[pair] for pair in alignment)
+            return base + _SYSTEMATICITY_WEIGHT * systematicity + _ANCHOR_WEIGHT * anchored
+        
+        current = [priority(index) for index in range(len(hypotheses))]
+        heap = [(-value, index) for index, value in enumerate(current)]
+        heapq.heapify(heap)
+        while heap:
+            negative, index = heapq.heappop(heap)
+            if -negative != current[index]:
+                continue
+            src_rel, tgt_rel, alignment, _ = hypotheses[index]
+            if src_rel in used_src or tgt_rel in used_tgt:
+                continue
+            mapped = pred_mapping.get(src_rel.predicate)
+            if mapped is None and tgt_rel.predicate in mapped_targets:
+                continue
+            if mapped is not None and mapped != tgt_rel.predicate:
+                continue
+            new_pairs = [pair for pair in alignment if pair[0] not in forward]
+            if not _extend(forward, backward, alignment):
                 continue
             
-            src_preds = list(set(source_by_arity[arity]))
-            tgt_preds = list(set(target_by_arity[arity]))
-            
-            # Mapeamento simples: primeiro com primeiro
-            # Em versão avançada, usaríamos similaridade semântica
-            for i, src in enumerate(src_preds):
-                if i < len(tgt_preds):
-                    mapping[src] = tgt_preds[i]
-        
-        return mapping
+            used_src.add(src_rel)
+            used_tgt.add(tgt_rel)
+            affected: Set[int] = set()
+            if mapped is None:
+                pred_mapping[src_rel.predicate] = tgt_rel.predicate
+                mapped_targets.add(tgt_rel.predicate)
+                affected.update(by_predicates[(src_rel.predicate, tgt_rel.predicate)])
+            for pair in new_pairs:
+                affected.update(by_pair[pair])
+            # Propagação: só as hipóteses ligadas às correspondências novas mudam de prioridade
+            for other in sorted(affected):
+                value = priority(other)
+                if value != current[other]:
+                    current[other] = value
+                    heapq.heappush(heap, (-value, other))
+        
+        return pred_mapping, forward
     
-    def _map_entities(
+    def _hypotheses(
         self,
-        source: Structure,
-        target: Structure,
-        pred_mapping: Dict[str, str],
-    ) -> Dict[str, str]:
-        """Mapeia entidades mantendo consistência estrutural."""
-        entity_mapping: Dict[str, str] = {}
-        
-        # Para cada relação mapeada, tenta alinhar entidades
-        source_rels_by_pred = defaultdict(list)
-        target_rels_by_pred = defaultdict(list)
-        
-        for rel in source.relations:
-            source_rels_by_pred[rel.predicate].append(rel)
-        
-        for rel in target.relations:
-            target_rels_by_pred[rel.predicate].append(rel)
-        
-        # Alinha entidades por posição nas relações
-        for src_pred, tgt_pred in pred_mapping.items():
-            src_rels = source_rels_by_pred.get(src_pred, [])
-            tgt_rels = target_rels_by_pred.get(tgt_pred, [])
-            
-            for i, src_rel in enumerate(src_rels):
-                if i >= len(tgt_rels):
-                    break
-                
-                tgt_rel = tgt_rels[i]
-                
-                for j, src_ent in enumerate(src_rel.args):
-                    if j >= len(tgt_rel.args):
-                        break
-                    
-                    tgt_ent = tgt_rel.args[j]
-                    
-                    # Verifica consistência
-                    if src_ent in entity_mapping:
-                        if entity_mapping[src_ent] != tgt_ent:
-                            # Conflito - ignora este mapeamento
-                            continue
-                    else:
-                        entity_mapping[src_ent] = tgt_ent
-        
-        return entity_mapping
+        src_rels: Tuple[Relation, ...],
+        tgt_rels: Tuple[Relation, ...],
+    ) -> Tuple[Tuple[int, int, Tuple[Tuple[str, str], ...]], ...]:
+        """Hipóteses (i, j, alinhamento) localmente consistentes entre dois grupos, memoizadas."""
+        key = (src_rels, tgt_rels)
+        cached = self._hypothesis_cache.get(key)
+        if cached is not None:
+            self._hypothesis_cache.move_to_end(key)
+            return cached
+        
+        hypotheses = []
+        for i, src_rel in enumerate(src_rels):
+            for j, tgt_rel in enumerate(tgt_rels):
+                alignment = _align(src_rel.args, tgt_rel.args)
+                if alignment is not None:
+                    hypotheses.append((i, j, alignment))
+        
+        result = tuple(hypotheses)
+        self._hypothesis_cache[key] = result
+        while len(self._hypothesis_cache) > _HYPOTHESIS_CACHE_SIZE:
+            self._hypothesis_cache.popitem(last=False)
+        return result
     
     def _compute_mapping_score(
         self,
@@ -425,28 +563,74 @@ class AnalogyEngine:
         
         return inferences
     
-    def _signature_similarity(
-        self,
-        source: Structure,
-        target: Structure,
-    ) -> float:
-        """Similaridade baseada em assinatura estrutural."""
-        sig1 = set(source.relation_signature())
-        sig2 = set(target.relation_signature())
-        
-        if not sig1 and not sig2:
-            return 0.0
-        
-        intersection = len(sig1 & sig2)
-        union = len(sig1 | sig2)
-        
-        return intersection / union if union > 0 else 0.0
-    
     def _relations_compatible(self, rel1: Relation, rel2: Relation) -> bool:
         """Verifica se duas relações são compatíveis."""
         return rel1.predicate == rel2.predicate and rel1.arity == rel2.arity
 
 
+def _relation_groups(structure: Structure) -> Dict[Tuple[str, int], Tuple[Relation, ...]]:
+    """Relações distintas agrupadas por tipo (predicado, aridade), na ordem original."""
+    groups: Dict[Tuple[str, int], List[Relation]] = defaultdict(list)
+    for rel in dict.fromkeys(structure.relations):
+        groups[(rel.predicate, rel.arity)].append(rel)
+    return {key: tuple(rels) for key, rels in groups.items()}
+
+
+def _align(src_args: Sequence[str], tgt_args: Sequence[str]) -> Tuple[Tuple[str, str], ...] | None:
+    """Alinhamento posicional de argumentos, se for injetivo nos dois sentidos."""
+    forward: Dict[str, str] = {}
+    backward: Dict[str, str] = {}
+    if not _extend(forward, backward, tuple(zip(src_args, tgt_args))):
+        return None
+    return tuple(forward.items())
+
+
+def _extend(
+    forward: Dict[str, str],
+    backward: Dict[str, str],
+    pairs: Sequence[Tuple[str, str]],
+) -> bool:
+    """Estende o mapeamento 1:1 com `pairs`; não altera nada se houver conflito."""
+    added: Dict[str, str] = {}
+    for src, tgt in pairs:
+        current = forward.get(src, added.get(src))
+        if current is not None:
+            if current != tgt:
+                return False
+            continue
+        if tgt in backward or tgt in added.values():
+            return False
+        added[src] = tgt
+    for src, tgt in added.items():
+        forward[src] = tgt
+        backward[tgt] = src
+    return True
+
+
+def _structure_digest(structure: Structure) -> str:
+    """Impressão digital do conteúdo (relações e entidades) de uma estrutura."""
+    hasher = blake2b(digest_size=16)
+    for rel in structure.relations:
+        hasher.update(rel.predicate.encode("utf-8"))
+        for arg in rel.args:
+            hasher.update(b"\x1f" + arg.encode("utf-8"))
+        hasher.update(b"\x1e")
+    hasher.update(b"\x1d")
+    for entity in sorted(structure.entities):
+        hasher.update(entity.encode("utf-8") + b"\x1f")
+    return hasher.hexdigest()
+
+
+_HYPOTHESIS_CACHE_SIZE = 4096
+
+# Peso de uma correspondência entre predicados diferentes (idênticos valem 1)
+_RENAMED_PREDICATE_WEIGHT = 0.5
+# Peso do apoio que as correspondências de entidades recebem das outras hipóteses
+_SYSTEMATICITY_WEIGHT = 0.1
+# Bônus por correspondência (entidade ou predicado) já aceita: o mapeamento cresce conectado
+_ANCHOR_WEIGHT = 10.0
+
+
 # Estruturas de exemplo pré-definidas
 SOLAR_SYSTEM = Structure.from_facts("sistema_solar", [
     ("atrai", "sol", "planetas"),
@@ -482,6 +666,7 @@ DOCTOR_PATIENT = Structure.from_facts("medico_paciente", [
 __all__ = [
     "Relation",
     "Structure",
+    "StructureSignature",
     "StructuralMapping",
     "Analogy",
     "AnalogyEngine",
@@ -28,8 +28,17 @@ from __future__ import annotations
 from collections import defaultdict
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Mapping, Set, Tuple
+from heapq import nlargest
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Mapping, Sequence, Set, Tuple
 import math
+import sys
+
+try:  # pragma: no cover - optional acceleration
+    import numpy as _np
+except Exception:  # pragma: no cover - fallback uses stdlib
+    _np = None
+
+BACKENDS = ("python", "numpy")
 
 
 class AttentionFactor(Enum):
@@ -100,6 +109,17 @@ class AttentionContext:
             return 1.0 - (idx / len(self.history))
         except ValueError:
             return 0.0
+    
+    def recency_many(self, items: Sequence[str]) -> List[float]:
+        """`get_recency` de cada item, com uma única passada pelo histórico."""
+        if not self.history:
+            return [0.0] * len(items)
+        size = len(self.history)
+        last = {item: position for position, item in enumerate(self.history)}
+        return [
+            1.0 - ((size - 1 - last[item]) / size) if item in last else 0.0
+            for item in items
+        ]
 
 
 class SalienceComputer:
@@ -132,6 +152,30 @@ class SalienceComputer:
     
     def compute(self, item: str, document: List[str]) -> float:
         """Computa saliência de um item no documento."""
+        try:
+            position: int | None = document.index(item)
+        except ValueError:
+            position = None
+        return self._score(item, position, len(document))
+    
+    def compute_many(self, document: Sequence[str]) -> List[float]:
+        """
+        Saliência de cada item do documento (igual a `compute(item, document)`).
+        
+        A primeira posição de cada item é indexada numa única passada, e itens
+        repetidos reutilizam o score.
+        """
+        first_position: Dict[str, int] = {}
+        for position, item in enumerate(document):
+            first_position.setdefault(item, position)
+        doc_len = len(document)
+        scores: Dict[str, float] = {
+            item: self._score(item, position, doc_len)
+            for item, position in first_position.items()
+        }
+        return [scores[item] for item in document]
+    
+    def _score(self, item: str, position: int | None, doc_len: int) -> float:
         item_lower = item.lower()
         
         # Fator 1: IDF-like (quanto mais raro, mais saliente)
@@ -143,19 +187,15 @@ class SalienceComputer:
             idf = 1.0  # Item nunca visto = muito saliente
         
         # Fator 2: Posição no documento
-        try:
-            position = document.index(item)
-            doc_len = len(document)
-            
-            # Início e fim são mais salientes
-            if position < doc_len * 0.1:
-                position_score = 1.0
-            elif position > doc_len * 0.9:
-                position_score = 0.8
-            else:
-                position_score = 0.5
-        except ValueError:
+        if position is None:
             position_score = 0.0
+        # Início e fim são mais salientes
+        elif position < doc_len * 0.1:
+            position_score = 1.0
+        elif position > doc_len * 0.9:
+            position_score = 0.8
+        else:
+            position_score = 0.5
         
         # Fator 3: Padrão saliente
         pattern_match = 1.0 if any(p in item_lower for p in self.salient_patterns) else 0.0
@@ -203,9 +243,28 @@ class RelevanceComputer:
     
     def compute(self, query: str, item: str) -> float:
         """Computa relevância de item para query."""
-        query_terms = set(query.lower().split())
-        item_lower = item.lower()
+        return self._score(set(query.lower().split()), item.lower(), None)
+    
+    def compute_many(self, query: str, items: Sequence[str]) -> List[float]:
+        """
+        Relevância de cada item para a query (igual a `compute(query, item)`).
         
+        Os termos da query e o total de contagens são calculados uma vez; a
+        linha de relevância é calculada por item distinto (em minúsculas).
+        """
+        query_terms = set(query.lower().split())
+        total = sum(self.term_counts.values()) or 1
+        row: Dict[str, float] = {}
+        scores: List[float] = []
+        for item in items:
+            item_lower = item.lower()
+            score = row.get(item_lower)
+            if score is None:
+                score = row[item_lower] = self._score(query_terms, item_lower, total)
+            scores.append(score)
+        return scores
+    
+    def _score(self, query_terms: Set[str], item_lower: str, total: int | None) -> float:
         # Fator 1: Match direto
         if item_lower in query_terms:
             direct_match = 1.0
@@ -223,7 +282,8 @@ class RelevanceComputer:
             
             if cooc > 0:
                 # PMI simplificado
-                total = sum(self.term_counts.values()) or 1
+                if total is None:
+                    total = sum(self.term_counts.values()) or 1
                 p_joint = cooc / total
                 p_qt = self.term_counts.get(qt, 1) / total
                 p_item = self.term_counts.get(item_lower, 1) / total
@@ -263,8 +323,28 @@ class SurpriseComputer:
     
     def compute(self, item: str, previous_item: str | None = None) -> float:
         """Computa surpresa de um item."""
-        item_lower = item.lower()
+        return self._score(item.lower(), previous_item.lower() if previous_item is not None else None)
+    
+    def compute_many(self, sequence: Sequence[str]) -> List[float]:
+        """
+        Surpresa de cada item dado o anterior (igual a `compute(item, prev)`).
         
+        Usa uma tabela por bigrama (anterior, item) distinto da sequência.
+        """
+        table: Dict[Tuple[str | None, str], float] = {}
+        scores: List[float] = []
+        previous: str | None = None
+        for item in sequence:
+            item_lower = item.lower()
+            key = (previous, item_lower)
+            score = table.get(key)
+            if score is None:
+                score = table[key] = self._score(item_lower, previous)
+            scores.append(score)
+            previous = item_lower
+        return scores
+    
+    def _score(self, item_lower: str, prev_lower: str | None) -> float:
         if self.total_items == 0:
             return 0.5  # Incerteza total
         
@@ -279,8 +359,7 @@ class SurpriseComputer:
         surprise_marginal = -math.log2(p_marginal) / math.log2(self.total_items + 1)
         
         # Se há contexto, usa probabilidade condicional
-        if previous_item is not None:
-            prev_lower = previous_item.lower()
+        if prev_lower is not None:
             trans_count = self.transition_counts.get((prev_lower, item_lower), 0)
             prev_count = self.item_counts.get(prev_lower, 1)
             
@@ -294,6 +373,41 @@ class SurpriseComputer:
         return min(1.0, surprise_marginal)
 
 
+_FACTORS = tuple(AttentionFactor)
+
+
+def _check_backend(backend: str) -> None:
+    if backend not in BACKENDS:
+        raise ValueError(f"backend desconhecido: {backend!r} (use {', '.join(BACKENDS)})")
+    if backend == "numpy" and _np is None:
+        raise RuntimeError("backend 'numpy' requer o pacote numpy instalado")
+
+
+def _python_sum(terms: Sequence[Any]) -> Any:
+    """
+    Soma elemento a elemento com o mesmo arredondamento de `sum()` do Python.
+    
+    A partir do Python 3.12, `sum()` de floats usa soma compensada (Neumaier);
+    antes, soma sequencial simples.
+    """
+    total = terms[0] + 0.0
+    if sys.version_info < (3, 12):
+        for term in terms[1:]:
+            total = total + term
+        return total
+    compensation = _np.zeros_like(total)
+    for term in terms[1:]:
+        partial = total + term
+        compensation += _np.where(
+            _np.abs(total) >= _np.abs(term),
+            (total - partial) + term,
+            (term - partial) + total,
+        )
+        total = partial
+    finite = (compensation != 0) & _np.isfinite(compensation)
+    return _np.where(finite, total + compensation, total)
+
+
 class SymbolicAttention:
     """
     Motor de atenção simbólica principal.
@@ -328,73 +442,93 @@ class SymbolicAttention:
         items: List[str],
         context: AttentionContext,
         top_k: int | None = None,
+        backend: str = "python",
     ) -> List[AttentionScore]:
         """
         Computa atenção sobre uma lista de itens.
         
         Retorna scores ordenados por atenção (maior primeiro).
+        
+        Os fatores são calculados em lote: frequências do documento, linha de
+        relevância da query, tabela de surpresa por bigrama e recência vêm de
+        uma passada cada, e os `AttentionScore` só são montados para os itens
+        devolvidos. Com `backend="numpy"` a combinação dos fatores e a
+        ordenação são vetorizadas; os resultados são idênticos.
         """
-        scores = []
+        _check_backend(backend)
+        count = len(items)
         
         # Computa frequência local
-        freq = defaultdict(int)
-        for item in items:
-            freq[item.lower()] += 1
+        freq: Dict[str, int] = defaultdict(int)
+        lowered = [item.lower() for item in items]
+        for item_lower in lowered:
+            freq[item_lower] += 1
         
         max_freq = max(freq.values()) if freq else 1
         
-        for i, item in enumerate(items):
-            factors = {}
-            
-            # Saliência
-            factors[AttentionFactor.SALIENCE] = self.salience.compute(item, items)
-            
-            # Relevância
-            if context.query:
-                factors[AttentionFactor.RELEVANCE] = self.relevance.compute(
-                    context.query, item
-                )
-            else:
-                factors[AttentionFactor.RELEVANCE] = 0.0
-            
-            # Recência
-            factors[AttentionFactor.RECENCY] = context.get_recency(item)
-            
-            # Frequência (normalizada)
-            factors[AttentionFactor.FREQUENCY] = freq[item.lower()] / max_freq
-            
-            # Surpresa
-            prev_item = items[i - 1] if i > 0 else None
-            factors[AttentionFactor.SURPRISE] = self.surprise.compute(item, prev_item)
-            
-            # Posição
-            pos_score = 1.0 - (i / len(items)) if items else 0.0
-            factors[AttentionFactor.POSITION] = pos_score
-            
+        # Colunas na ordem de AttentionFactor (ordem da soma ponderada)
+        columns = [
+            self.salience.compute_many(items),
+            self.relevance.compute_many(context.query, items) if context.query else [0.0] * count,
+            context.recency_many(items),
+            [freq[item_lower] / max_freq for item_lower in lowered],
+            self.surprise.compute_many(items),
+            [1.0 - (i / count) for i in range(count)],
+        ]
+        weights = [self.factor_weights[f] for f in _FACTORS]
+        focus = [item in context.focus_items for item in items]
+        
+        if backend == "numpy":
+            return self._combine_numpy(items, columns, weights, focus, top_k)
+        
+        rows: List[List[float]] = []
+        totals: List[float] = []
+        for i, values in enumerate(zip(*columns)):
             # Boost para itens em foco
-            if item in context.focus_items:
-                for f in factors:
-                    factors[f] = min(1.0, factors[f] * 1.5)
+            if focus[i]:
+                values = [min(1.0, value * 1.5) for value in values]
+            rows.append(values)
             
             # Score total (soma ponderada)
-            total = sum(
-                factors[f] * self.factor_weights[f]
-                for f in AttentionFactor
-            )
-            
-            scores.append(AttentionScore(
-                item=item,
-                total_score=total,
-                factors=factors,
-            ))
+            totals.append(sum(value * weight for value, weight in zip(values, weights)))
         
-        # Ordena por score
-        scores.sort(key=lambda x: x.total_score, reverse=True)
-        
-        if top_k is not None:
-            return scores[:top_k]
+        # Ordena por score (estável, como `sort(reverse=True)`)
+        if top_k is not None and top_k >= 0:
+            selected = nlargest(top_k, range(count), key=totals.__getitem__)
+        else:
+            selected = sorted(range(count), key=totals.__getitem__, reverse=True)[:top_k]
         
-        return scores
+        return [
+            AttentionScore(item=items[i], total_score=totals[i], factors=dict(zip(_FACTORS, rows[i])))
+            for i in selected
+        ]
+    
+    def _combine_numpy(
+        self,
+        items: List[str],
+        columns: List[List[float]],
+        weights: List[float],
+        focus: List[bool],
+        top_k: int | None,
+    ) -> List[AttentionScore]:
+        """Boost de foco, soma ponderada e ordenação vetorizados."""
+        factors = _np.array(columns, dtype=float).reshape(len(columns), len(items))
+        mask = _np.array(focus, dtype=bool)
+        if mask.any():
+            factors[:, mask] = _np.minimum(1.0, factors[:, mask] * 1.5)
+        
+        totals = _python_sum([factors[row] * weight for row, weight in enumerate(weights)])
+        order = _np.argsort(-totals, kind="stable")
+        selected = order[:top_k] if top_k is not None else order
+        
+        return [
+            AttentionScore(
+                item=items[i],
+                total_score=float(totals[i]),
+                factors=dict(zip(_FACTORS, factors[:, i].tolist())),
+            )
+            for i in selected.tolist()
+        ]
     
     def focus(
         self,
@@ -536,6 +670,7 @@ class MultiHeadSymbolicAttention:
 
 
 __all__ = [
+    "BACKENDS",
     "AttentionFactor",
     "AttentionScore",
     "AttentionContext",
@@ -22,7 +22,9 @@ são capturados e podem ser reutilizados para generalização.
 from __future__ import annotations
 
 import math
+from bisect import bisect_left
 from collections import Counter
+from heapq import heappop, heappush
 from dataclasses import dataclass, field
 from hashlib import blake2b
 from typing import Dict, FrozenSet, Iterator, List, Mapping, Sequence, Tuple
@@ -151,6 +153,14 @@ class MDLCompressor:
         
         Este é o processo de "treinamento" — mas sem gradientes ou pesos.
         Apenas contagem e substituição simbólica.
+        
+        As contagens de pares são mantidas incrementalmente (`_PairSequence`):
+        cada substituição só toca as posições do par escolhido e seus
+        vizinhos, em vez de recontar e copiar a sequência inteira.
+        
+        Chamadas sucessivas (um corpus em fatias) reaproveitam o símbolo de
+        um par já presente no dicionário, que nunca passa de
+        `max_dictionary_size` entradas.
         """
         # Concatena todas as sequências com separadores
         all_tokens: List[str] = []
@@ -168,8 +178,13 @@ class MDLCompressor:
             )
         
         original_bits = self._compute_bits(all_tokens)
-        current_sequence = list(all_tokens)
+        sequence = _PairSequence(all_tokens)
         patterns_found: List[Pattern] = []
+        dict_cost = self.dictionary.size_in_bits()
+        old_bits = original_bits
+        
+        # Símbolos já aprendidos (chamadas anteriores) por padrão
+        known = {pattern: symbol for symbol, pattern in self.dictionary.entries.items()}
         
         # Iterativamente encontra e substitui padrões
         iteration = 0
@@ -179,25 +194,30 @@ class MDLCompressor:
             iteration += 1
             
             # Encontra o melhor par para substituir
-            best_pair, best_freq = self._find_best_pair(current_sequence)
+            best_pair, best_freq = sequence.best_pair()
             
             if best_pair is None or best_freq < self.min_pattern_freq:
                 break
             
-            # Calcula economia
-            old_bits = self._compute_bits(current_sequence)
-            
-            # Cria novo símbolo
-            new_symbol = self._new_symbol()
+            # Reaproveita o símbolo do par ou cria um novo (se couber)
+            new_symbol = known.get(best_pair)
+            is_new = new_symbol is None
+            if is_new:
+                if len(self.dictionary) >= self.max_dictionary_size:
+                    break
+                new_symbol = self._new_symbol()
             
             # Substitui todas as ocorrências
-            current_sequence = self._substitute(current_sequence, best_pair, new_symbol)
+            sequence.substitute(best_pair, new_symbol)
             
-            # Adiciona ao dicionário
+            # Adiciona ao dicionário (custo acumulado como em size_in_bits)
             self.dictionary.add(new_symbol, best_pair, best_freq)
+            if is_new:
+                dict_cost += _symbol_bits(new_symbol)
+                dict_cost += sum(_symbol_bits(tok) for tok in best_pair)
+                dict_cost += 8
             
-            new_bits = self._compute_bits(current_sequence)
-            dict_cost = self.dictionary.size_in_bits()
+            new_bits = sequence.bits()
             
             # Verifica se houve economia real (MDL criterion)
             num_patterns = len(patterns_found) + 1  # +1 para evitar divisão por zero
@@ -205,8 +225,11 @@ class MDLCompressor:
             
             if savings <= 0:
                 # Reverte se não houve economia
-                self.dictionary.entries.pop(new_symbol, None)
-                self.dictionary.frequencies.pop(new_symbol, None)
+                if is_new:
+                    self.dictionary.entries.pop(new_symbol, None)
+                    self.dictionary.frequencies.pop(new_symbol, None)
+                else:
+                    self.dictionary.frequencies[new_symbol] -= best_freq
                 break
             
             patterns_found.append(Pattern(
@@ -214,6 +237,9 @@ class MDLCompressor:
                 count=best_freq,
                 savings=savings,
             ))
+            old_bits = new_bits
+        
+        current_sequence = sequence.to_list()
         
         # Tenta encontrar padrões maiores (n-grams)
         patterns_found.extend(self._find_ngram_patterns(current_sequence))
@@ -331,43 +357,59 @@ class MDLCompressor:
         # Combina Jaccard e NCD
         return max(jaccard, compression_sim)
     
-    def _find_best_pair(self, sequence: Sequence[str]) -> Tuple[Tuple[str, str] | None, int]:
-        """Encontra o par mais frequente na sequência."""
-        if len(sequence) < 2:
-            return None, 0
-        
-        pair_counts: Counter[Tuple[str, str]] = Counter()
-        
-        for i in range(len(sequence) - 1):
-            pair = (sequence[i], sequence[i + 1])
-            # Ignora pares com separadores
-            if "<SEP>" not in pair and "<JOIN>" not in pair:
-                pair_counts[pair] += 1
-        
-        if not pair_counts:
-            return None, 0
-        
-        best_pair, best_count = pair_counts.most_common(1)[0]
-        return best_pair, best_count
-    
     def _find_ngram_patterns(self, sequence: Sequence[str]) -> List[Pattern]:
-        """Encontra padrões de n-grams (n > 2)."""
-        patterns = []
+        """
+        Encontra padrões de n-grams (n > 2).
         
-        for n in range(3, min(self.max_pattern_length + 1, len(sequence) // 2 + 1)):
-            ngram_counts: Counter[Tuple[str, ...]] = Counter()
+        Em vez de materializar todo n-gram para cada n, agrupa as posições
+        iniciais por prefixo comum e refina cada grupo pelo próximo token
+        (os intervalos de LCP de um suffix array). Só grupos com suporte
+        mínimo são estendidos, já que estender nunca aumenta a contagem.
+        """
+        patterns: List[Pattern] = []
+        length = len(sequence)
+        max_n = min(self.max_pattern_length, length // 2)
+        if max_n < 3:
+            return patterns
+        
+        separator = [tok in _SEPARATORS for tok in sequence]
+        min_count = max(1, self.min_pattern_freq)
+        
+        # Grupos de posições com o mesmo prefixo de tamanho n (n = 1)
+        by_token: Dict[str, List[int]] = {}
+        for i, tok in enumerate(sequence):
+            if not separator[i]:
+                by_token.setdefault(tok, []).append(i)
+        groups = [positions for positions in by_token.values() if len(positions) >= min_count]
+        
+        for n in range(1, max_n):
+            # Refina cada grupo pelo token na posição i + n
+            refined: List[List[int]] = []
+            for positions in groups:
+                children: Dict[str, List[int]] = {}
+                for i in positions:
+                    j = i + n
+                    if j < length and not separator[j]:
+                        children.setdefault(sequence[j], []).append(i)
+                refined.extend(child for child in children.values() if len(child) >= min_count)
+            groups = refined
+            if not groups:
+                break
             
-            for i in range(len(sequence) - n + 1):
-                ngram = tuple(sequence[i:i + n])
-                # Ignora n-grams com separadores
-                if not any(tok in ("<SEP>", "<JOIN>") for tok in ngram):
-                    ngram_counts[ngram] += 1
+            size = n + 1
+            if size < 3:
+                continue
             
-            for ngram, count in ngram_counts.items():
+            # Mesma ordem da contagem original: primeira ocorrência do n-gram
+            groups.sort(key=lambda positions: positions[0])
+            symbol_bits = _symbol_bits(f"N{size}")
+            for positions in groups:
+                start = positions[0]
+                ngram = tuple(sequence[start:start + size])
+                count = len(positions)
                 if count >= self.min_pattern_freq:
                     # Calcula economia potencial
                     ngram_bits = sum(_symbol_bits(tok) for tok in ngram)
-                    symbol_bits = _symbol_bits(f"N{n}")
                     savings = count * (ngram_bits - symbol_bits)
                     
                     if savings > 0:
@@ -436,6 +478,199 @@ class MDLCompressor:
         return entropy * total
 
 
+_SEPARATORS = frozenset(("<SEP>", "<JOIN>"))
+
+
+class _PairSequence:
+    """
+    Sequência de símbolos com contagem incremental de pares adjacentes.
+    
+    - Lista duplamente encadeada sobre as posições originais (a posição da
+      esquerda de um par substituído passa a guardar o novo símbolo)
+    - Índice par -> posições (contagem com sobreposição, como um Counter)
+    - Fila de prioridade (-contagem, primeira posição): empates resolvidos
+      pela primeira ocorrência, como `Counter.most_common`
+    - Contagem por símbolo na ordem da primeira ocorrência, para que a
+      entropia seja somada na mesma ordem de `_compute_bits`
+    """
+    
+    def __init__(self, tokens: Sequence[str]):
+        size = len(tokens)
+        self.symbols: List[str | None] = list(tokens)
+        self.prev = list(range(-1, size - 1))
+        self.next = list(range(1, size + 1))
+        self.next[-1] = -1
+        self.total = size
+        
+        self.pairs: Dict[Tuple[str, str], set] = {}
+        self._pair_heaps: Dict[Tuple[str, str], List[int]] = {}
+        self._queue: List[Tuple[int, int, Tuple[str, str]]] = []
+        
+        self.counts: Dict[str, int] = {}
+        self._occurrences: Dict[str, List[int]] = {}
+        self._cursor: Dict[str, int] = {}
+        for i, tok in enumerate(tokens):
+            self.counts[tok] = self.counts.get(tok, 0) + 1
+            self._occurrences.setdefault(tok, []).append(i)
+            if i + 1 < size:
+                self._add_pair(i, (tok, tokens[i + 1]))
+        
+        # Símbolos ordenados pela primeira ocorrência (posições paralelas)
+        self._order_symbols: List[str] = list(self.counts)
+        self._order_positions: List[int] = [self._occurrences[tok][0] for tok in self._order_symbols]
+        for tok in self._order_symbols:
+            self._cursor[tok] = 0
+        
+        for pair in self.pairs:
+            self._push(pair)
+    
+    def _add_pair(self, position: int, pair: Tuple[str, str]) -> None:
+        if pair[0] in _SEPARATORS or pair[1] in _SEPARATORS:
+            return
+        positions = self.pairs.get(pair)
+        if positions is None:
+            positions = self.pairs[pair] = set()
+            self._pair_heaps[pair] = []
+        positions.add(position)
+        heappush(self._pair_heaps[pair], position)
+    
+    def _remove_pair(self, position: int, pair: Tuple[str, str]) -> None:
+        positions = self.pairs.get(pair)
+        if positions is not None:
+            positions.discard(position)
+    
+    def _first_position(self, pair: Tuple[str, str]) -> int:
+        positions = self.pairs[pair]
+        heap = self._pair_heaps[pair]
+        while heap[0] not in positions:
+            heappop(heap)
+        return heap[0]
+    
+    def _push(self, pair: Tuple[str, str]) -> None:
+        count = len(self.pairs[pair])
+        if count:
+            heappush(self._queue, (-count, self._first_position(pair), pair))
+        else:
+            del self.pairs[pair]
+            del self._pair_heaps[pair]
+    
+    def best_pair(self) -> Tuple[Tuple[str, str] | None, int]:
+        """Par mais frequente (primeira ocorrência desempata)."""
+        queue = self._queue
+        while queue:
+            neg_count, first, pair = queue[0]
+            positions = self.pairs.get(pair)
+            if positions and len(positions) == -neg_count and self._first_position(pair) == first:
+                return pair, -neg_count
+            heappop(queue)
+        return None, 0
+    
+    def substitute(self, pair: Tuple[str, str], symbol: str) -> None:
+        """Substitui, da esquerda para a direita, as ocorrências sem sobreposição."""
+        left, right = pair
+        symbols = self.symbols
+        prev = self.prev
+        nxt = self.next
+        touched = {pair}
+        replaced: List[int] = []
+        
+        for position in sorted(self.pairs[pair]):
+            following = nxt[position]
+            if symbols[position] != left or following == -1 or symbols[following] != right:
+                continue  # consumida por uma substituição anterior
+            
+            before = prev[position]
+            after = nxt[following]
+            
+            if before != -1:
+                old = (symbols[before], left)
+                self._remove_pair(before, old)
+                touched.add(old)
+            self._remove_pair(position, pair)
+            if after != -1:
+                old = (right, symbols[after])
+                self._remove_pair(following, old)
+                touched.add(old)
+            
+            symbols[position] = symbol
+            symbols[following] = None
+            nxt[position] = after
+            if after != -1:
+                prev[after] = position
+            replaced.append(position)
+            
+            if before != -1:
+                new = (symbols[before], symbol)
+                self._add_pair(before, new)
+                touched.add(new)
+            if after != -1:
+                new = (symbol, symbols[after])
+                self._add_pair(position, new)
+                touched.add(new)
+        
+        if not replaced:
+            return
+        
+        self.total -= len(replaced)
+        self.counts[left] -= len(replaced)
+        self.counts[right] -= len(replaced)
+        self.counts[symbol] = len(replaced)
+        self._occurrences[symbol] = replaced
+        self._cursor[symbol] = 0
+        
+        for tok in (left, right):
+            self._reorder(tok, symbol)
+        self._insert_order(symbol, replaced[0])
+        
+        for touched_pair in touched:
+            if touched_pair in self.pairs:
+                self._push(touched_pair)
+    
+    def _reorder(self, tok: str, replaced_by: str) -> None:
+        """Atualiza a primeira ocorrência de `tok` após uma substituição."""
+        occurrences = self._occurrences[tok]
+        cursor = self._cursor[tok]
+        old_first = occurrences[cursor] if cursor < len(occurrences) else -1
+        symbols = self.symbols
+        while cursor < len(occurrences) and symbols[occurrences[cursor]] != tok:
+            cursor += 1
+        self._cursor[tok] = cursor
+        new_first = occurrences[cursor] if cursor < len(occurrences) else -1
+        if new_first == old_first:
+            return
+        index = bisect_left(self._order_positions, old_first)
+        if index < len(self._order_positions) and self._order_symbols[index] == tok:
+            del self._order_positions[index]
+            del self._order_symbols[index]
+        if self.counts[tok] > 0:
+            self._insert_order(tok, new_first)
+    
+    def _insert_order(self, tok: str, position: int) -> None:
+        index = bisect_left(self._order_positions, position)
+        self._order_positions.insert(index, position)
+        self._order_symbols.insert(index, tok)
+    
+    def bits(self) -> float:
+        """Mesmo valor de `MDLCompressor._compute_bits` sobre a sequência atual."""
+        total = self.total
+        counts = self.counts
+        entropy = 0.0
+        for tok in self._order_symbols:
+            prob = counts[tok] / total
+            entropy -= prob * math.log2(prob)
+        return entropy * total
+    
+    def to_list(self) -> List[str]:
+        result: List[str] = []
+        position = 0
+        symbols = self.symbols
+        nxt = self.next
+        while position != -1:
+            result.append(symbols[position])
+            position = nxt[position]
+        return result
+
+
 def _symbol_bits(symbol: str) -> float:
     """Estima bits necessários para codificar um símbolo."""
     # Aproximação: log2 do número de símbolos possíveis
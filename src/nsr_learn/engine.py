@@ -31,15 +31,25 @@ import json
 import math
 import re
 from collections import Counter
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field, fields
 from hashlib import blake2b
 from pathlib import Path
-from typing import Any, Dict, Iterator, List, Mapping, Sequence, Set, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Sequence, Set, Tuple
 
-from .compressor import CompressionResult, MDLCompressor
+from .compressor import CompressionResult, MDLCompressor, Pattern
 from .graph import CooccurrenceGraph
+from .ingest import DocumentSource, ProgressCallback, ingest
 from .inductor import Condition, RuleInductor, RuleSet, SymbolicRule
 from .memory import AssociativeMemory, MemoryTrace, RetrievalResult
+from .persistence import (
+    STATE_FILE,
+    StateArchive,
+    graph_sections,
+    json_section,
+    memory_sections,
+    pickle_section,
+    write_archive,
+)
 
 
 # Tokenização simples
@@ -98,13 +108,33 @@ class LearningState:
     
     def digest(self) -> str:
         """Hash do estado atual."""
-        hasher = blake2b(digest_size=16)
-        hasher.update(f"docs:{self.documents_seen}".encode())
-        hasher.update(f"tokens:{self.tokens_seen}".encode())
-        hasher.update(f"vocab:{len(self.vocabulary)}".encode())
-        hasher.update(f"rules:{len(self.rules)}".encode())
-        hasher.update(f"memory:{len(self.memory)}".encode())
-        return hasher.hexdigest()
+        return state_digest(
+            self.documents_seen,
+            self.tokens_seen,
+            len(self.vocabulary),
+            len(self.rules),
+            len(self.memory),
+        )
+    
+    def __getattr__(self, name: str) -> Any:
+        # Estado carregado com `lazy=True`: componente lido no primeiro acesso
+        pending: Dict[str, Callable[[], Any]] | None = self.__dict__.get("_pending")
+        if pending and name in pending:
+            value = pending.pop(name)()
+            setattr(self, name, value)
+            return value
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+
+def state_digest(documents: int, tokens: int, vocabulary: int, rules: int, memory: int) -> str:
+    """Digest de `LearningState` a partir das contagens que o compõem."""
+    hasher = blake2b(digest_size=16)
+    hasher.update(f"docs:{documents}".encode())
+    hasher.update(f"tokens:{tokens}".encode())
+    hasher.update(f"vocab:{vocabulary}".encode())
+    hasher.update(f"rules:{rules}".encode())
+    hasher.update(f"memory:{memory}".encode())
+    return hasher.hexdigest()
 
 
 @dataclass()
@@ -188,18 +218,93 @@ class LearningEngine:
         tokenized = [tokenize(doc) for doc in corpus]
         
         # 2. Atualiza vocabulário
+        self._register_documents(tokenized)
+        
+        # 3. Constrói grafo de co-ocorrência (aprende associações)
+        self.state.graph.add_corpus(tokenized, window_size=self.config.cooc_window_size)
+        
+        return self._learn_tokenized(tokenized)
+    
+    def learn_stream(
+        self,
+        source: DocumentSource,
+        *,
+        workers: int = 0,
+        chunk_size: int = 256,
+        max_pending: int | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> Dict[str, Any]:
+        """
+        Aprende de um fluxo de documentos (iterável ou arquivo `.txt`/`.jsonl`).
+        
+        Tokenização, vocabulário e grafo de co-ocorrência são feitos por fatia,
+        opcionalmente em `workers` processos, e reduzidos na ordem do corpus.
+        Cada fatia passa em seguida pelo compressor, pelo índice de fatos do
+        indutor e pela memória (n-grams e associações) e é descartada: nenhum
+        passo guarda os tokens do corpus inteiro.
+        
+        Vocabulário, grafo e regras saem idênticos aos de `learn`. Os padrões
+        do compressor são aprendidos por fatia (o dicionário é compartilhado)
+        e só os `_STREAM_PATTERN_POOL` melhores candidatos ficam guardados até
+        o fim, quando os 100 melhores entram na memória; por isso o estado da
+        memória difere do de `learn` sobre o mesmo corpus.
+        """
+        documents = 0
+        patterns_found = 0
+        original_bits = 0.0
+        compressed_bits = 0.0
+        pool: Dict[Tuple[str, ...], Tuple[int, float]] = {}
+        
+        def shards() -> Iterator[Tuple[str, ...]]:
+            nonlocal documents, patterns_found, original_bits, compressed_bits
+            for shard in ingest(
+                source,
+                window_size=self.config.cooc_window_size,
+                workers=workers,
+                chunk_size=chunk_size,
+                max_pending=max_pending,
+                progress=progress,
+            ):
+                self._register_documents(shard.tokenized)
+                self.state.graph.merge(shard.graph)
+                
+                compression = self.state.compressor.learn(shard.tokenized)
+                original_bits += compression.original_bits
+                compressed_bits += compression.compressed_bits
+                patterns_found += len(compression.patterns)
+                _pool_patterns(pool, compression.patterns)
+                
+                self._store_ngrams(shard.tokenized)
+                self._create_associations(shard.tokenized)
+                documents += len(shard.tokenized)
+                # O indutor consome os documentos da fatia (índice de fatos)
+                yield from shard.tokenized
+        
+        rules = self.state.inductor.induce_from_sequences(shards())
+        if not documents:
+            return {"status": "empty_corpus"}
+        self.state.rules = rules
+        
+        best = sorted(pool.items(), key=lambda item: -item[1][1])[:100]
+        self._store_patterns((tokens, count) for tokens, (count, _) in best)
+        
+        model_bits = self.state.compressor.dictionary.size_in_bits()
+        ratio = (compressed_bits + model_bits) / original_bits if original_bits > 0 else 1.0
+        return self._learn_summary(documents, patterns_found, ratio)
+    
+    def _register_documents(self, tokenized: Sequence[Sequence[str]]) -> None:
+        """Atualiza vocabulário e contadores com documentos já tokenizados."""
         for doc_tokens in tokenized:
             self.state.vocabulary.update(doc_tokens)
             self.state.tokens_seen += len(doc_tokens)
         
-        self.state.documents_seen += len(corpus)
-        
-        # 3. Comprime (aprende padrões frequentes)
+        self.state.documents_seen += len(tokenized)
+    
+    def _learn_tokenized(self, tokenized: Sequence[Sequence[str]]) -> Dict[str, Any]:
+        """Passos que dependem do corpus inteiro (após vocabulário e grafo)."""
+        # 4. Comprime (aprende padrões frequentes)
         compression_result = self.state.compressor.learn(tokenized)
         
-        # 4. Constrói grafo de co-ocorrência (aprende associações)
-        self.state.graph.add_corpus(tokenized, window_size=self.config.cooc_window_size)
-        
         # 5. Induz regras simbólicas (aprende generalizações)
         self.state.rules = self.state.inductor.induce_from_sequences(tokenized)
         
@@ -209,13 +314,20 @@ class LearningEngine:
         # 7. Cria associações entre tokens co-ocorrentes
         self._create_associations(tokenized)
         
+        return self._learn_summary(
+            len(tokenized),
+            len(compression_result.patterns),
+            compression_result.compression_ratio,
+        )
+    
+    def _learn_summary(self, documents: int, patterns_found: int, compression_ratio: float) -> Dict[str, Any]:
         return {
             "status": "learned",
-            "documents": len(corpus),
+            "documents": documents,
             "tokens": self.state.tokens_seen,
             "vocabulary_size": len(self.state.vocabulary),
-            "patterns_found": len(compression_result.patterns),
-            "compression_ratio": compression_result.compression_ratio,
+            "patterns_found": patterns_found,
+            "compression_ratio": compression_ratio,
             "rules_induced": len(self.state.rules),
             "memory_traces": len(self.state.memory),
             "state_digest": self.state.digest(),
@@ -271,24 +383,34 @@ class LearningEngine:
     ) -> None:
         """Popula memória com padrões aprendidos."""
         # Armazena padrões frequentes
-        for pattern in compression.patterns[:100]:  # Top 100
-            self.state.memory.store(
-                key=pattern.tokens,
-                value={"type": "pattern", "count": pattern.count},
-                strength=math.log1p(pattern.count),
-            )
+        self._store_patterns(
+            (pattern.tokens, pattern.count)
+            for pattern in compression.patterns[:100]  # Top 100
+        )
         
         # Armazena n-grams frequentes de cada documento
-        for doc_tokens in tokenized:
-            for n in range(2, 6):
-                for i in range(len(doc_tokens) - n + 1):
-                    ngram = tuple(doc_tokens[i:i + n])
-                    self.state.memory.store(
-                        key=ngram,
-                        value={"type": "ngram", "n": n},
-                        context=tuple(doc_tokens[max(0, i - 2):i]),
-                        strength=0.5,
-                    )
+        self._store_ngrams(tokenized)
+    
+    def _store_patterns(self, patterns: Iterable[Tuple[Tuple[str, ...], int]]) -> None:
+        """Armazena padrões `(tokens, contagem)` com força log(1 + contagem)."""
+        self.state.memory.store_many(
+            (tokens, {"type": "pattern", "count": count}, (), math.log1p(count))
+            for tokens, count in patterns
+        )
+    
+    def _store_ngrams(self, tokenized: Sequence[Sequence[str]]) -> None:
+        """Armazena os n-grams (2 a 5) de cada documento."""
+        ngrams = (
+            (
+                tuple(doc_tokens[i:i + n]),
+                {"type": "ngram", "n": n},
+                tuple(doc_tokens[max(0, i - 2):i]),
+            )
+            for doc_tokens in tokenized
+            for n in range(2, 6)
+            for i in range(len(doc_tokens) - n + 1)
+        )
+        self.state.memory.store_many(ngrams, strength=0.5)
     
     def _create_associations(self, tokenized: Sequence[Sequence[str]]) -> None:
         """Cria associações entre tokens que co-ocorrem."""
@@ -536,7 +658,12 @@ class LearningEngine:
     # =========================================================================
     
     def save(self, path: str | Path) -> None:
-        """Salva o estado aprendido."""
+        """
+        Salva o estado aprendido.
+        
+        O estado completo vai para o contêiner binário `state.nsrl` (lido por
+        `load`); os arquivos JSON/texto são um resumo legível.
+        """
         path = Path(path)
         path.mkdir(parents=True, exist_ok=True)
         
@@ -579,6 +706,91 @@ class LearningEngine:
                 "lift": rule.lift,
             })
         (path / "rules.json").write_text(json.dumps(rules, indent=2))
+        
+        # Estado completo (contêiner binário)
+        self._write_state(path / STATE_FILE)
+    
+    def _write_state(self, path: Path) -> None:
+        state = self.state
+        meta = {
+            "documents_seen": state.documents_seen,
+            "tokens_seen": state.tokens_seen,
+            "queries_processed": state.queries_processed,
+            "vocabulary_size": len(state.vocabulary),
+            "rules_count": len(state.rules),
+            "memory_traces": len(state.memory),
+            "config": asdict(self.config),
+        }
+        sections = [
+            json_section("meta", meta),
+            json_section("vocabulary", sorted(state.vocabulary)),
+            *graph_sections(state.graph),
+            *memory_sections(state.memory),
+            pickle_section("compressor", state.compressor),
+            pickle_section("inductor", state.inductor),
+            pickle_section("rules", state.rules),
+        ]
+        write_archive(path, state.digest(), sections)
+    
+    @classmethod
+    def load(cls, path: str | Path, *, lazy: bool = True, verify: bool = True) -> "LearningEngine":
+        """
+        Carrega um estado salvo com `save` (diretório ou arquivo `state.nsrl`).
+        
+        Com `lazy=True` cada componente (vocabulário, grafo, memória,
+        compressor, indutor, regras) só é lido do arquivo no primeiro acesso.
+        O digest gravado é conferido contra as contagens do cabeçalho na
+        abertura e cada componente, ao ser lido, contra essas contagens; com
+        `verify=True` os checksums das seções também são conferidos.
+        """
+        path = Path(path)
+        archive = StateArchive(path / STATE_FILE if path.is_dir() else path, verify=verify)
+        meta = archive.json("meta")
+        
+        expected = state_digest(
+            meta["documents_seen"],
+            meta["tokens_seen"],
+            meta["vocabulary_size"],
+            meta["rules_count"],
+            meta["memory_traces"],
+        )
+        if expected != archive.digest:
+            raise ValueError(f"{archive.path}: digest do estado não confere ({archive.digest} != {expected})")
+        
+        known = {item.name for item in fields(LearningConfig)}
+        config = LearningConfig(**{k: v for k, v in meta["config"].items() if k in known})
+        engine = cls(config)
+        
+        def checked(name: str, loader: Callable[[], Any], size_key: str | None = None) -> Callable[[], Any]:
+            def load_component() -> Any:
+                value = loader()
+                if size_key is not None and len(value) != meta[size_key]:
+                    raise ValueError(
+                        f"{archive.path}: componente {name!r} não confere com o digest do estado"
+                    )
+                return value
+            return load_component
+        
+        state = LearningState.__new__(LearningState)
+        state.documents_seen = meta["documents_seen"]
+        state.tokens_seen = meta["tokens_seen"]
+        state.queries_processed = meta["queries_processed"]
+        state._pending = {
+            "vocabulary": checked("vocabulary", lambda: set(archive.json("vocabulary")), "vocabulary_size"),
+            "graph": checked("graph", archive.graph),
+            "memory": checked("memory", archive.memory, "memory_traces"),
+            "compressor": checked("compressor", lambda: archive.pickle("compressor")),
+            "inductor": checked("inductor", lambda: archive.pickle("inductor")),
+            "rules": checked("rules", lambda: archive.pickle("rules"), "rules_count"),
+        }
+        engine.state = state
+        
+        if not lazy:
+            for name in list(state._pending):
+                getattr(state, name)
+            if state.digest() != archive.digest:
+                raise ValueError(f"{archive.path}: digest do estado não confere após a carga")
+        return engine
     
     def stats(self) -> Dict[str, Any]:
         """Retorna estatísticas do sistema."""
@@ -595,4 +807,19 @@ class LearningEngine:
         }
 
 
-__all__ = ["LearningEngine", "LearningConfig", "LearningState", "QueryResult", "tokenize"]
+# Candidatos a padrão guardados durante `learn_stream` (os de maior economia)
+_STREAM_PATTERN_POOL = 1000
+
+
+def _pool_patterns(pool: Dict[Tuple[str, ...], Tuple[int, float]], patterns: Iterable[Pattern]) -> None:
+    """Soma contagem e economia por padrão, podando o excesso pela economia."""
+    for pattern in patterns:
+        count, savings = pool.get(pattern.tokens, (0, 0.0))
+        pool[pattern.tokens] = (count + pattern.count, savings + pattern.savings)
+    if len(pool) > 2 * _STREAM_PATTERN_POOL:
+        kept = sorted(pool.items(), key=lambda item: -item[1][1])[:_STREAM_PATTERN_POOL]
+        pool.clear()
+        pool.update(kept)
+
+
+__all__ = ["LearningEngine", "LearningConfig", "LearningState", "QueryResult", "state_digest", "tokenize"]
@@ -22,10 +22,16 @@ Isso é similar a word2vec/GloVe, mas SEM:
 from __future__ import annotations
 
 import math
-from collections import Counter, defaultdict
+from array import array
+from collections import Counter
 from dataclasses import dataclass, field
 from heapq import nlargest, nsmallest
-from typing import Dict, FrozenSet, Iterator, List, Mapping, Sequence, Set, Tuple
+from itertools import repeat
+from operator import add
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterator, List, Mapping, Sequence, Set, Tuple
+
+if TYPE_CHECKING:
+    from .sparse import CooccurrenceMatrix
 
 
 @dataclass(frozen=True)
@@ -59,6 +65,144 @@ class GraphEdge:
         return self.pmi * math.log1p(self.count)
 
 
+# Deltas pendentes a partir dos quais a compactação é disparada (no mínimo;
+# o limite acompanha metade das entradas já compactadas, o que amortiza as
+# cópias em O(1) por entrada)
+_COMPACT_PENDING = 1 << 16
+
+
+class _CsrRows:
+    """
+    Linhas esparsas em CSR (`array` da stdlib) com buffers de delta por linha.
+    
+    A linha `i` ocupa `indices[indptr[i]:indptr[i + 1]]` e o mesmo intervalo
+    de `data`; linhas além de `indptr` estão vazias. Incrementos vão para
+    `deltas` (linha -> {coluna: incremento}); leituras somam o delta da
+    linha e `compact` funde todos em buffers novos. Entradas existentes vêm
+    primeiro e colunas novas na ordem em que apareceram, então a ordem de
+    inserção de cada linha se mantém. Buffers compactados nunca são
+    alterados no lugar, e matrizes exportadas podem compartilhá-los.
+    """
+    
+    __slots__ = ("indptr", "indices", "data", "deltas", "pending")
+    
+    def __init__(
+        self,
+        indptr: array | None = None,
+        indices: array | None = None,
+        data: array | None = None,
+    ) -> None:
+        self.indptr = indptr if indptr is not None else array("q", [0])
+        self.indices = indices if indices is not None else array("i")
+        self.data = data if data is not None else array("q")
+        self.deltas: Dict[int, Dict[int, int]] = {}
+        self.pending = 0  # entradas distintas nos deltas
+    
+    def bounds(self, row: int) -> Tuple[int, int]:
+        indptr = self.indptr
+        if row + 1 < len(indptr):
+            return indptr[row], indptr[row + 1]
+        return indptr[-1], indptr[-1]
+    
+    def items(self, row: int) -> Iterator[Tuple[int, int]]:
+        """(coluna, contagem) da linha, deltas incluídos, na ordem de inserção."""
+        if row in self.deltas:
+            cols, values, _ = self._merged(row)
+            return zip(cols, values)
+        start, end = self.bounds(row)
+        return zip(self.indices[start:end], self.data[start:end])
+    
+    def get(self, row: int, col: int) -> int:
+        """Contagem de (linha, coluna); a busca na parte compactada é em C."""
+        start, end = self.bounds(row)
+        delta = self.deltas.get(row)
+        pending = delta.get(col, 0) if delta else 0
+        try:
+            return self.data[self.indices.index(col, start, end)] + pending
+        except ValueError:
+            return pending
+    
+    def _merged(self, row: int, consume: bool = False) -> Tuple[array, array, Dict[int, int]]:
+        """
+        (colunas, contagens, colunas novas) da linha com o delta fundido.
+        
+        Os laços correm em C (`map`): cada coluna existente retira seu
+        incremento do delta e o que sobra são as colunas novas, na ordem de
+        inserção. Com `consume`, o próprio delta é esvaziado.
+        """
+        delta = self.deltas[row] if consume else dict(self.deltas[row])
+        start, end = self.bounds(row)
+        cols = self.indices[start:end]
+        values = self.data[start:end]
+        if delta and start != end:
+            values = array("q", map(add, values, map(delta.pop, cols, repeat(0, end - start))))
+        cols.extend(delta)
+        values.extend(delta.values())
+        return cols, values, delta
+    
+    def add(self, row: int, col: int, count: int) -> None:
+        delta = self.deltas.get(row)
+        if delta is None:
+            self.deltas[row] = {col: count}
+            self.pending += 1
+        elif col in delta:
+            delta[col] += count
+        else:
+            delta[col] = count
+            self.pending += 1
+    
+    def should_compact(self) -> bool:
+        return self.pending >= max(_COMPACT_PENDING, len(self.indices) >> 1)
+    
+    def compact(self, rows: int) -> Tuple[int, int]:
+        """
+        Funde os deltas e estende `indptr` até `rows` linhas.
+        
+        Blocos de linhas sem delta são copiados em bloco (em C); só as linhas
+        com delta são refeitas. Devolve (entradas novas, das quais na
+        diagonal), de onde o grafo tira o nº de pares distintos.
+        """
+        indptr, indices, data = self.indptr, self.indices, self.data
+        old_rows = len(indptr) - 1
+        if not self.deltas and old_rows >= rows:
+            return 0, 0
+        
+        new_indptr = array("q", [0])
+        new_indices = array("i")
+        new_data = array("q")
+        
+        def copy_rows(lo: int, hi: int) -> None:
+            # Linhas [lo, hi): as compactadas em bloco, as demais vazias
+            top = min(hi, old_rows)
+            if lo < top:
+                shift = len(new_indices) - indptr[lo]
+                new_indices.extend(indices[indptr[lo]:indptr[top]])
+                new_data.extend(data[indptr[lo]:indptr[top]])
+                new_indptr.extend([offset + shift for offset in indptr[lo + 1:top + 1]])
+            empty = hi - max(lo, top)
+            if empty > 0:
+                new_indptr.extend([len(new_indices)] * empty)
+        
+        diagonal = 0
+        done = 0
+        for row in sorted(self.deltas):
+            copy_rows(done, row)
+            cols, values, fresh = self._merged(row, consume=True)
+            if row in fresh:
+                diagonal += 1
+            new_indices.extend(cols)
+            new_data.extend(values)
+            new_indptr.append(len(new_indices))
+            done = row + 1
+        copy_rows(done, max(rows, done))
+        
+        added = len(new_indices) - len(indices)
+        self.indptr, self.indices, self.data = new_indptr, new_indices, new_data
+        self.deltas = {}
+        self.pending = 0
+        return added, diagonal
+
+
 @dataclass()
 class CooccurrenceGraph:
     """
@@ -66,25 +210,123 @@ class CooccurrenceGraph:
     
     Substitui embeddings neurais por estrutura de grafo explícita.
     Toda a "semântica" vem de contagens e relações estruturais.
+    
+    Internamente os tokens são internados em ids inteiros e as co-ocorrências
+    ficam em linhas CSR por id (`_CsrRows`), de modo que consultas por token
+    custam O(grau) em vez de O(arestas). Documentos novos só acumulam deltas
+    por linha (somados nas leituras), fundidos na compactação: quando os
+    deltas crescem, na exportação e em `stats`. A ordem de inserção de cada linha acompanha a
+    ordem global dos pares, preservando o desempate das consultas.
     """
     
     # Contagens de tokens
     token_counts: Counter[str] = field(default_factory=Counter)
     
-    # Contagens de co-ocorrência (token1, token2) -> count
-    cooc_counts: Dict[FrozenSet[str], int] = field(default_factory=lambda: defaultdict(int))
-    
-    # Contagens direcionais para ordem
-    directed_counts: Dict[Tuple[str, str], int] = field(default_factory=lambda: defaultdict(int))
-    
     # Total de tokens vistos
     total_tokens: int = 0
     
     # Total de janelas de co-ocorrência
     total_windows: int = 0
     
-    # Cache de PMI
-    _pmi_cache: Dict[FrozenSet[str], float] = field(default_factory=dict)
+    # Cache de PMI por par de ids (menor, maior)
+    _pmi_cache: Dict[Tuple[int, int], float] = field(default_factory=dict)
+    
+    # Internação de tokens: token -> id e id -> token
+    _ids: Dict[str, int] = field(default_factory=dict, repr=False)
+    _vocab: List[str] = field(default_factory=list, repr=False)
+    
+    # Adjacência simétrica: linha id -> (id vizinho, contagem de co-ocorrência)
+    _adjacency: _CsrRows = field(default_factory=_CsrRows, repr=False)
+    
+    # Contagens direcionais (centro -> contexto), também por id
+    _directed: _CsrRows = field(default_factory=_CsrRows, repr=False)
+    
+    # Geração (nº de documentos) em que cada linha mudou pela última vez
+    _generation: int = 0
+    _row_versions: array = field(default_factory=lambda: array("q"), repr=False)
+    
+    # Tokens na ordem em que ganharam a primeira aresta (centralidade)
+    _linked: Dict[int, None] = field(default_factory=dict, repr=False)
+    
+    # Arestas distintas e soma das contagens (para stats)
+    _edge_count: int = 0
+    _cooc_total: int = 0
+    
+    # Vizinhos ordenados por PPMI: id -> [(id vizinho, ppmi, contagem)]
+    _neighbor_cache: Dict[int, List[Tuple[int, float, int]]] = field(default_factory=dict, repr=False)
+    
+    def _intern(self, token: str) -> int:
+        token_id = self._ids.get(token)
+        if token_id is None:
+            token_id = len(self._vocab)
+            self._ids[token] = token_id
+            self._vocab.append(token)
+            self._row_versions.append(self._generation)
+        return token_id
+    
+    def _compact(self) -> None:
+        """Funde os deltas pendentes nas linhas CSR (exportação e `stats`)."""
+        rows = len(self._vocab)
+        # Adjacência simétrica: cada par distinto novo gera duas entradas,
+        # exceto o de um token consigo mesmo
+        added, diagonal = self._adjacency.compact(rows)
+        self._edge_count += (added + diagonal) // 2
+        self._directed.compact(rows)
+    
+    @property
+    def cooc_counts(self) -> Dict[FrozenSet[str], int]:
+        """Visão (cópia) das co-ocorrências no formato par -> contagem."""
+        vocab = self._vocab
+        counts: Dict[FrozenSet[str], int] = {}
+        for token_id, token in enumerate(vocab):
+            for other_id, count in self._adjacency.items(token_id):
+                if other_id >= token_id:
+                    counts[frozenset((token, vocab[other_id]))] = count
+        return counts
+    
+    @property
+    def directed_counts(self) -> Dict[Tuple[str, str], int]:
+        """Visão (cópia) das contagens direcionais (centro, contexto) -> contagem."""
+        vocab = self._vocab
+        return {
+            (center, vocab[context_id]): count
+            for center_id, center in enumerate(vocab)
+            for context_id, count in self._directed.items(center_id)
+        }
+    
+    @property
+    def generation(self) -> int:
+        """Número de documentos adicionados (versão do grafo)."""
+        return self._generation
+    
+    def rows_changed_since(self, generation: int) -> List[int]:
+        """Ids das linhas alteradas depois da geração indicada."""
+        return [
+            token_id
+            for token_id, version in enumerate(self._row_versions)
+            if version > generation
+        ]
+    
+    def to_matrix(self, backend: str = "array", previous: "CooccurrenceMatrix | None" = None) -> "CooccurrenceMatrix":
+        """
+        Exporta as contagens para uma matriz CSR compacta (`nsr_learn.sparse`).
+        
+        A matriz compartilha os buffers compactados do grafo (sem cópia).
+        Com `previous`, valida que o grafo é posterior àquela matriz.
+        """
+        from .sparse import CooccurrenceMatrix
+        
+        if previous is not None:
+            return previous.updated(self, backend=backend)
+        return CooccurrenceMatrix.from_graph(self, backend=backend)
+    
+    def cooc_count(self, token1: str, token2: str) -> int:
+        """Contagem de co-ocorrência entre dois tokens (0 se não houver)."""
+        id1 = self._ids.get(token1)
+        id2 = self._ids.get(token2)
+        if id1 is None or id2 is None:
+            return 0
+        return self._adjacency.get(id1, id2)
     
     def add_document(
         self,
@@ -104,26 +346,64 @@ class CooccurrenceGraph:
             self.token_counts[token] += 1
             self.total_tokens += 1
         
-        # Atualiza co-ocorrências em janela deslizante
-        for i, center in enumerate(tokens):
+        self._generation += 1
+        generation = self._generation
+        ids = [self._intern(token) for token in tokens]
+        adjacency = self._adjacency
+        directed_rows = self._directed
+        deltas = adjacency.deltas
+        directed_deltas = directed_rows.deltas
+        linked = self._linked
+        versions = self._row_versions
+        length = len(tokens)
+        
+        distinct = set(ids)
+        for token_id in distinct:
+            deltas.setdefault(token_id, {})
+            directed_deltas.setdefault(token_id, {})
+        sizes = sum(len(deltas[token_id]) for token_id in distinct)
+        directed_sizes = sum(len(directed_deltas[token_id]) for token_id in distinct)
+        rows = [deltas[token_id] for token_id in ids]
+        # Par já visto implica ambos ligados: com todos ligados, nada a fazer
+        check_links = not all(token_id in linked for token_id in distinct)
+        
+        # Atualiza co-ocorrências em janela deslizante (deltas por linha)
+        for i, center_id in enumerate(ids):
             start = max(0, i - window_size)
-            end = min(len(tokens), i + window_size + 1)
+            end = min(length, i + window_size + 1)
+            row = rows[i]
+            directed = directed_deltas[center_id]
+            versions[center_id] = generation
             
             for j in range(start, end):
                 if i == j:
                     continue
                 
-                context = tokens[j]
-                pair = frozenset([center, context])
-                self.cooc_counts[pair] += 1
+                context_id = ids[j]
+                count = row.get(context_id, 0) + 1
+                row[context_id] = count
+                if context_id != center_id:
+                    if check_links and (center_id not in linked or context_id not in linked):
+                        # Mesma ordem em que o par apareceria num frozenset
+                        for token in frozenset((tokens[i], tokens[j])):
+                            linked.setdefault(self._ids[token], None)
+                    # Deltas são simétricos como a adjacência
+                    rows[j][center_id] = count
                 
                 # Direção importa para algumas análises
-                self.directed_counts[(center, context)] += 1
+                directed[context_id] = directed.get(context_id, 0) + 1
             
+            self._cooc_total += end - start - 1
             self.total_windows += 1
         
-        # Invalida cache
+        adjacency.pending += sum(len(deltas[token_id]) for token_id in distinct) - sizes
+        directed_rows.pending += sum(len(directed_deltas[token_id]) for token_id in distinct) - directed_sizes
+        if adjacency.should_compact() or directed_rows.should_compact():
+            self._compact()
+        
+        # Invalida caches (totais mudaram, todo PMI muda)
         self._pmi_cache.clear()
+        self._neighbor_cache.clear()
     
     def add_corpus(
         self,
@@ -134,6 +414,47 @@ class CooccurrenceGraph:
         for doc in documents:
             self.add_document(doc, window_size)
     
+    def merge(self, other: "CooccurrenceGraph") -> None:
+        """
+        Incorpora outro grafo como se seus documentos fossem adicionados agora.
+        
+        Permite construir grafos parciais por fatia do corpus (inclusive em
+        outros processos) e reduzi-los na ordem das fatias: contagens, ids,
+        ordem das linhas e versões ficam idênticos aos da ingestão sequencial.
+        """
+        if other._generation == 0:
+            return
+        
+        self.token_counts.update(other.token_counts)
+        self.total_tokens += other.total_tokens
+        self.total_windows += other.total_windows
+        
+        base_generation = self._generation
+        remap = [self._intern(token) for token in other._vocab]
+        adjacency = self._adjacency
+        directed = self._directed
+        
+        for other_id, token_id in enumerate(remap):
+            for neighbor, count in other._adjacency.items(other_id):
+                adjacency.add(token_id, remap[neighbor], count)
+            for context, count in other._directed.items(other_id):
+                directed.add(token_id, remap[context], count)
+            
+            version = other._row_versions[other_id]
+            if version > 0:
+                self._row_versions[token_id] = base_generation + version
+        
+        for other_id in other._linked:
+            self._linked.setdefault(remap[other_id], None)
+        
+        self._cooc_total += other._cooc_total
+        self._generation += other._generation
+        if adjacency.should_compact() or directed.should_compact():
+            self._compact()
+        
+        self._pmi_cache.clear()
+        self._neighbor_cache.clear()
+    
     def pmi(self, token1: str, token2: str) -> float:
         """
         Calcula PMI (Pointwise Mutual Information) entre dois tokens.
@@ -143,14 +464,24 @@ class CooccurrenceGraph:
         PMI positivo = tokens co-ocorrem mais que o esperado
         PMI negativo = tokens co-ocorrem menos que o esperado
         """
-        pair = frozenset([token1, token2])
+        id1 = self._ids.get(token1)
+        id2 = self._ids.get(token2)
+        if id1 is None or id2 is None:
+            return 0.0
+        return self._pmi_ids(id1, id2)
+    
+    def _pmi_ids(self, id1: int, id2: int, cooc: int | None = None) -> float:
+        """PMI por ids; `cooc` evita a busca na linha quando já é conhecido."""
+        key = (id1, id2) if id1 <= id2 else (id2, id1)
         
-        if pair in self._pmi_cache:
-            return self._pmi_cache[pair]
+        cached = self._pmi_cache.get(key)
+        if cached is not None:
+            return cached
         
-        count1 = self.token_counts.get(token1, 0)
-        count2 = self.token_counts.get(token2, 0)
-        cooc = self.cooc_counts.get(pair, 0)
+        count1 = self.token_counts.get(self._vocab[id1], 0)
+        count2 = self.token_counts.get(self._vocab[id2], 0)
+        if cooc is None:
+            cooc = self._adjacency.get(id1, id2)
         
         if count1 == 0 or count2 == 0 or cooc == 0 or self.total_tokens == 0:
             return 0.0
@@ -167,7 +498,7 @@ class CooccurrenceGraph:
         
         pmi_value = math.log2(p_cooc / expected) if p_cooc > 0 else -10.0
         
-        self._pmi_cache[pair] = pmi_value
+        self._pmi_cache[key] = pmi_value
         return pmi_value
     
     def ppmi(self, token1: str, token2: str) -> float:
@@ -180,8 +511,7 @@ class CooccurrenceGraph:
         
         NPMI = PMI / -log(P(x,y))
         """
-        pair = frozenset([token1, token2])
-        cooc = self.cooc_counts.get(pair, 0)
+        cooc = self.cooc_count(token1, token2)
         
         if cooc == 0 or self.total_windows == 0:
             return 0.0
@@ -198,6 +528,28 @@ class CooccurrenceGraph:
         
         return pmi_val / denominator
     
+    def _ranked_neighbors(self, token_id: int) -> List[Tuple[int, float, int]]:
+        """
+        Vizinhos com PPMI > 0 ordenados por PPMI decrescente (estável).
+        
+        Empates mantêm a ordem de inserção dos pares; o resultado é cacheado
+        até o próximo `add_document`.
+        """
+        ranked = self._neighbor_cache.get(token_id)
+        if ranked is not None:
+            return ranked
+        
+        ranked = []
+        for other_id, count in self._adjacency.items(token_id):
+            if other_id == token_id:
+                continue  # um token não é vizinho de si mesmo
+            ppmi_val = max(0.0, self._pmi_ids(token_id, other_id, count))
+            if ppmi_val > 0:
+                ranked.append((other_id, ppmi_val, count))
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        self._neighbor_cache[token_id] = ranked
+        return ranked
+    
     def neighbors(
         self,
         token: str,
@@ -209,27 +561,21 @@ class CooccurrenceGraph:
         
         Usa PPMI como medida de associação.
         """
-        if token not in self.token_counts:
+        token_id = self._ids.get(token)
+        if token_id is None or token not in self.token_counts or top_k <= 0:
             return []
         
-        candidates = []
-        
-        for pair, count in self.cooc_counts.items():
+        vocab = self._vocab
+        result: List[Tuple[str, float]] = []
+        for other_id, score, count in self._ranked_neighbors(token_id):
             if count < min_cooc:
                 continue
-            
-            tokens = list(pair)
-            if token not in tokens:
-                continue
-            
-            other = tokens[0] if tokens[1] == token else tokens[1]
-            ppmi_val = self.ppmi(token, other)
-            
-            if ppmi_val > 0:
-                candidates.append((other, ppmi_val))
+            result.append((vocab[other_id], score))
+            if len(result) >= top_k:
+                break
         
-        # Retorna top-k por PPMI
-        return nlargest(top_k, candidates, key=lambda x: x[1])
+        # Top-k por PPMI
+        return result
     
     def similarity(self, token1: str, token2: str) -> float:
         """
@@ -351,8 +697,7 @@ class CooccurrenceGraph:
     
     def get_edge(self, token1: str, token2: str) -> GraphEdge | None:
         """Retorna a aresta entre dois tokens, se existir."""
-        pair = frozenset([token1, token2])
-        count = self.cooc_counts.get(pair, 0)
+        count = self.cooc_count(token1, token2)
         
         if count == 0:
             return None
@@ -377,29 +722,28 @@ class CooccurrenceGraph:
         
         Centralidade baseada em conexões semânticas, não apenas frequência.
         """
-        centrality: Dict[str, float] = defaultdict(float)
+        centrality: Dict[str, float] = {}
         
-        for pair, count in self.cooc_counts.items():
-            tokens = list(pair)
-            if len(tokens) != 2:
-                continue
-            
-            ppmi_val = self.ppmi(tokens[0], tokens[1])
-            centrality[tokens[0]] += ppmi_val
-            centrality[tokens[1]] += ppmi_val
+        for token_id in self._linked:
+            total = 0.0
+            for other_id, count in self._adjacency.items(token_id):
+                if other_id != token_id:
+                    total += max(0.0, self._pmi_ids(token_id, other_id, count))
+            centrality[self._vocab[token_id]] = total
         
         return nlargest(top_k, centrality.items(), key=lambda x: x[1])
     
     def stats(self) -> Dict[str, int | float]:
         """Estatísticas do grafo."""
+        self._compact()
         return {
             "total_tokens": self.total_tokens,
             "unique_tokens": len(self.token_counts),
-            "total_edges": len(self.cooc_counts),
+            "total_edges": self._edge_count,
             "total_windows": self.total_windows,
             "avg_cooc": (
-                sum(self.cooc_counts.values()) / len(self.cooc_counts)
-                if self.cooc_counts else 0.0
+                self._cooc_total / self._edge_count
+                if self._edge_count else 0.0
             ),
         }
 
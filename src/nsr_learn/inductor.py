@@ -22,6 +22,8 @@ comprimem bem os dados (explicam muito com pouca complexidade).
 from __future__ import annotations
 
 import math
+from array import array
+from bisect import bisect_left
 from collections import Counter, defaultdict
 from dataclasses import dataclass, field
 from hashlib import blake2b
@@ -29,6 +31,7 @@ from typing import (
     Callable,
     Dict,
     FrozenSet,
+    Iterable,
     Iterator,
     List,
     Mapping,
@@ -213,6 +216,147 @@ class RuleSet:
         return iter(self.rules)
 
 
+def _sequence_facts(seq: Sequence[str]) -> Set[Condition]:
+    """Fatos `exists`/`follows`/`near` de uma sequência de tokens."""
+    example_facts: Set[Condition] = set()
+    
+    for i, token in enumerate(seq):
+        # Fato: exists(token)
+        example_facts.add(Condition("exists", (token,)))
+        
+        # Fato: follows(prev, curr)
+        if i > 0:
+            prev = seq[i - 1]
+            example_facts.add(Condition("follows", (prev, token)))
+        
+        # Fato: near(token1, token2)
+        for j in range(max(0, i - 2), min(len(seq), i + 3)):
+            if i != j:
+                other = seq[j]
+                pair = tuple(sorted([token, other]))
+                example_facts.add(Condition("near", pair))
+    
+    return example_facts
+
+
+class _FactIndex:
+    """
+    Base de transações para mineração de padrões frequentes (estilo Eclat).
+    
+    Os fatos são internados como ids inteiros na ordem da primeira ocorrência
+    (a mesma de `Counter(all_facts)`), e cada exemplo vira um `array` ordenado
+    de ids. `select` mantém só os fatos frequentes, renumerados de forma
+    contígua por predicado, e monta a base vertical: `tidlists[f]` são os
+    exemplos que contêm `f`. Suporte de conjuntos de fatos vem da interseção
+    de tidlists, como bitsets (inteiros Python) construídos sob demanda.
+    
+    A memória é linear no número de ocorrências de fatos: nenhuma estrutura
+    cresce com o quadrado do vocabulário.
+    """
+    
+    def __init__(self) -> None:
+        self.ids: Dict[Condition, int] = {}
+        self.facts: List[Condition] = []
+        self.counts: List[int] = []
+        self.rows: List[array] = []
+        self.tidlists: List[array] = []
+        self._bitsets: Dict[int, int] = {}
+    
+    def add_example(self, facts: Iterable[Condition]) -> None:
+        """Registra um exemplo; cada ocorrência conta para a frequência."""
+        ids = self.ids
+        counts = self.counts
+        row: Set[int] = set()
+        for fact in facts:
+            fact_id = ids.get(fact)
+            if fact_id is None:
+                fact_id = ids[fact] = len(self.facts)
+                self.facts.append(fact)
+                counts.append(0)
+            counts[fact_id] += 1
+            row.add(fact_id)
+        self.rows.append(array("l", sorted(row)))
+    
+    def select(self, min_support: int) -> Dict[str, range]:
+        """
+        Mantém os fatos com frequência >= `min_support`.
+        
+        Retorna, por predicado, o intervalo de ids dos seus fatos. Predicados
+        e fatos seguem a ordem de iteração do conjunto de fatos frequentes.
+        """
+        frequent = {
+            f for f, count in zip(self.facts, self.counts)
+            if count >= min_support
+        }
+        
+        by_predicate: Dict[str, List[Condition]] = defaultdict(list)
+        for fact in frequent:
+            by_predicate[fact.predicate].append(fact)
+        
+        remap = [-1] * len(self.facts)
+        facts: List[Condition] = []
+        spans: Dict[str, range] = {}
+        for predicate, group in by_predicate.items():
+            start = len(facts)
+            for fact in group:
+                remap[self.ids[fact]] = len(facts)
+                facts.append(fact)
+            spans[predicate] = range(start, len(facts))
+        
+        self.facts = facts
+        self.ids = {fact: fact_id for fact_id, fact in enumerate(facts)}
+        self.counts = []
+        self.tidlists = [array("l") for _ in facts]
+        for example, row in enumerate(self.rows):
+            row = array("l", sorted(remap[f] for f in row if remap[f] >= 0))
+            self.rows[example] = row
+            for fact_id in row:
+                self.tidlists[fact_id].append(example)
+        self._bitsets.clear()
+        return spans
+    
+    def support(self, fact_id: int) -> int:
+        """Número de exemplos que contêm o fato."""
+        return len(self.tidlists[fact_id])
+    
+    def cooccurrence(self, fact_id: int, span: range) -> Counter[int]:
+        """
+        Conta, para cada fato com id em `span`, os exemplos em que ele ocorre
+        junto com `fact_id` (projeção da base nos exemplos de `fact_id`).
+        """
+        counts: Counter[int] = Counter()
+        lo, hi = span.start, span.stop
+        rows = self.rows
+        for example in self.tidlists[fact_id]:
+            row = rows[example]
+            first = bisect_left(row, lo)
+            counts.update(row[first:bisect_left(row, hi, first)])
+        return counts
+    
+    def bitset(self, fact_id: int) -> int:
+        """Tidlist do fato como bitset (bit `e` ligado se o exemplo contém o fato)."""
+        bits = self._bitsets.get(fact_id)
+        if bits is None:
+            buffer = bytearray((len(self.rows) + 7) // 8)
+            for example in self.tidlists[fact_id]:
+                buffer[example >> 3] |= 1 << (example & 7)
+            bits = self._bitsets[fact_id] = int.from_bytes(buffer, "little")
+        return bits
+    
+    def rule_metrics(self, antecedents: Sequence[int], consequent: int) -> Tuple[int, float]:
+        """Suporte e confiança de `antecedentes → consequente` por interseção."""
+        covered = self.bitset(antecedents[0])
+        for fact_id in antecedents[1:]:
+            covered &= self.bitset(fact_id)
+        
+        ant_match = covered.bit_count()
+        if ant_match == 0:
+            return 0, 0.0
+        
+        both_match = (covered & self.bitset(consequent)).bit_count()
+        return both_match, both_match / ant_match
+
+
 @dataclass()
 class RuleInductor:
     """
@@ -226,6 +370,12 @@ class RuleInductor:
     
     Isso é similar a Apriori/FP-Growth para association rules,
     mas com extensões para regras lógicas de primeira ordem.
+    
+    A mineração é vertical (Eclat): os fatos frequentes são internados em
+    ids, cada um com sua tidlist, e co-ocorrências são contadas só dentro
+    dos exemplos do antecedente; regras com vários antecedentes usam
+    interseção de bitsets. O `RuleSet` resultante (regras e ordem) é o mesmo
+    da contagem par a par sobre todos os exemplos.
     """
     
     min_support: int = 2
@@ -235,128 +385,119 @@ class RuleInductor:
     
     def induce_from_sequences(
         self,
-        sequences: Sequence[Sequence[str]],
+        sequences: Iterable[Sequence[str]],
     ) -> RuleSet:
         """
         Induz regras de sequências de tokens.
         
+        `sequences` é consumido uma única vez (pode ser um gerador): só os
+        ids dos fatos de cada sequência ficam no índice.
+        
         Trata cada sequência como uma série de fatos:
         - follows(token_i, token_j) se j = i + 1
         - near(token_i, token_j) se |i - j| <= 2
         """
-        facts_per_example: List[Set[Condition]] = []
-        all_facts: List[Condition] = []
-        
+        index = _FactIndex()
         for seq in sequences:
-            example_facts: Set[Condition] = set()
-            
-            for i, token in enumerate(seq):
-                # Fato: exists(token)
-                example_facts.add(Condition("exists", (token,)))
-                
-                # Fato: follows(prev, curr)
-                if i > 0:
-                    prev = seq[i - 1]
-                    example_facts.add(Condition("follows", (prev, token)))
-                
-                # Fato: near(token1, token2)
-                for j in range(max(0, i - 2), min(len(seq), i + 3)):
-                    if i != j:
-                        other = seq[j]
-                        pair = tuple(sorted([token, other]))
-                        example_facts.add(Condition("near", pair))
-            
-            facts_per_example.append(example_facts)
-            all_facts.extend(example_facts)
-        
-        return self._induce_from_facts(facts_per_example, all_facts)
+            index.add_example(_sequence_facts(seq))
+        return self._induce(index)
     
     def induce_from_facts(
         self,
         examples: Sequence[Sequence[Condition]],
     ) -> RuleSet:
         """Induz regras a partir de exemplos de fatos."""
-        facts_per_example = [set(ex) for ex in examples]
-        all_facts = [f for ex in examples for f in ex]
-        return self._induce_from_facts(facts_per_example, all_facts)
+        index = _FactIndex()
+        for ex in examples:
+            index.add_example(ex)
+        return self._induce(index)
     
-    def _induce_from_facts(
-        self,
-        facts_per_example: Sequence[Set[Condition]],
-        all_facts: Sequence[Condition],
-    ) -> RuleSet:
+    def _induce(self, index: _FactIndex) -> RuleSet:
         """Implementação principal da indução."""
         rules = RuleSet()
-        
-        # Conta frequência de cada fato
-        fact_counts = Counter(all_facts)
-        total_examples = len(facts_per_example)
+        total_examples = len(index.rows)
         
         if total_examples == 0:
             return rules
         
-        # Encontra padrões frequentes
-        frequent_facts = {
-            f for f, count in fact_counts.items()
-            if count >= self.min_support
-        }
+        # Encontra padrões frequentes, agrupados por predicado
+        spans = index.select(self.min_support)
+        facts = index.facts
         
-        # Agrupa por predicado para generalização
-        by_predicate: Dict[str, List[Condition]] = defaultdict(list)
-        for fact in frequent_facts:
-            by_predicate[fact.predicate].append(fact)
+        # Com suporte e confiança mínimos <= 0, pares que nunca co-ocorrem
+        # também viram regras; caso contrário basta olhar os que co-ocorrem.
+        dense = self.min_support <= 0 and self.min_confidence <= 0
         
         # Gera regras simples (1 antecedente -> 1 consequente)
         rules_generated = 0
         
-        for pred1, facts1 in by_predicate.items():
-            for pred2, facts2 in by_predicate.items():
+        for span1 in spans.values():
+            for span2 in spans.values():
                 if rules_generated >= self.max_rules:
                     break
                 
                 # Tenta encontrar padrões A -> B
-                cooc = self._compute_cooccurrence(
-                    facts1, facts2, facts_per_example
-                )
-                
-                for (ant, cons), (support, confidence) in cooc.items():
-                    if support < self.min_support:
-                        continue
-                    if confidence < self.min_confidence:
-                        continue
-                    
-                    # Calcula lift
-                    cons_prob = sum(
-                        1 for ex in facts_per_example if cons in ex
-                    ) / total_examples
-                    lift = confidence / cons_prob if cons_prob > 0 else 1.0
+                for f1 in span1:
+                    cooc = index.cooccurrence(f1, span2)
+                    f1_count = index.support(f1)
                     
-                    rule = SymbolicRule(
-                        antecedents=(ant,),
-                        consequent=cons,
-                        support=support,
-                        confidence=confidence,
-                        lift=lift,
-                    )
-                    
-                    rules.add(rule)
-                    rules_generated += 1
+                    for f2 in (span2 if dense else sorted(cooc)):
+                        if f1 == f2:
+                            continue
+                        
+                        support = cooc[f2]
+                        confidence = support / f1_count
+                        
+                        if support < self.min_support:
+                            continue
+                        if confidence < self.min_confidence:
+                            continue
+                        
+                        # Calcula lift
+                        cons_prob = index.support(f2) / total_examples
+                        lift = confidence / cons_prob if cons_prob > 0 else 1.0
+                        
+                        rule = SymbolicRule(
+                            antecedents=(facts[f1],),
+                            consequent=facts[f2],
+                            support=support,
+                            confidence=confidence,
+                            lift=lift,
+                        )
+                        
+                        rules.add(rule)
+                        rules_generated += 1
         
         # Gera regras com múltiplos antecedentes
         if self.max_antecedents > 1:
             simple_rules = list(rules)
+            ids = index.ids
+            
+            # Só regras com o mesmo consequente podem ser combinadas
+            by_consequent: Dict[Condition, List[SymbolicRule]] = defaultdict(list)
+            for rule in simple_rules:
+                by_consequent[rule.consequent].append(rule)
             
             for rule1 in simple_rules:
-                for rule2 in simple_rules:
+                if rules_generated >= self.max_rules:
+                    break
+                
+                consequent = rule1.consequent
+                cons_prob = index.support(ids[consequent]) / total_examples
+                
+                for rule2 in by_consequent[consequent]:
                     if rules_generated >= self.max_rules:
                         break
                     
-                    # Tenta combinar se têm o mesmo consequente
-                    if rule1.consequent != rule2.consequent:
-                        continue
                     if rule1.antecedents == rule2.antecedents:
                         continue
                     
+                    # Limite superior do ganho: suporte <= min dos suportes,
+                    # confiança <= 1, lift <= 1 / P(consequente)
+                    bound = min(rule1.support, rule2.support) / cons_prob * _BOUND_SLACK
+                    if (len(rule1.antecedents) + 2) * 10 - bound >= rule1.mdl_score:
+                        continue
+                    
                     # Combina antecedentes
                     combined_ants = tuple(set(rule1.antecedents) | set(rule2.antecedents))
                     
@@ -364,8 +505,8 @@ class RuleInductor:
                         continue
                     
                     # Calcula métricas da regra combinada
-                    support, confidence = self._compute_rule_metrics(
-                        combined_ants, rule1.consequent, facts_per_example
+                    support, confidence = index.rule_metrics(
+                        [ids[ant] for ant in combined_ants], ids[consequent]
                     )
                     
                     if support < self.min_support:
@@ -373,14 +514,11 @@ class RuleInductor:
                     if confidence < self.min_confidence:
                         continue
                     
-                    cons_prob = sum(
-                        1 for ex in facts_per_example if rule1.consequent in ex
-                    ) / total_examples
                     lift = confidence / cons_prob if cons_prob > 0 else 1.0
                     
                     combined_rule = SymbolicRule(
                         antecedents=combined_ants,
-                        consequent=rule1.consequent,
+                        consequent=consequent,
                         support=support,
                         confidence=confidence,
                         lift=lift,
@@ -396,58 +534,6 @@ class RuleInductor:
         
         return generalized
     
-    def _compute_cooccurrence(
-        self,
-        facts1: Sequence[Condition],
-        facts2: Sequence[Condition],
-        examples: Sequence[Set[Condition]],
-    ) -> Dict[Tuple[Condition, Condition], Tuple[int, float]]:
-        """Computa co-ocorrência entre fatos para derivar regras."""
-        result: Dict[Tuple[Condition, Condition], Tuple[int, float]] = {}
-        
-        for f1 in facts1:
-            for f2 in facts2:
-                if f1 == f2:
-                    continue
-                
-                # Conta exemplos onde ambos ocorrem
-                both = sum(1 for ex in examples if f1 in ex and f2 in ex)
-                
-                # Conta exemplos onde f1 ocorre
-                f1_count = sum(1 for ex in examples if f1 in ex)
-                
-                if f1_count == 0:
-                    continue
-                
-                support = both
-                confidence = both / f1_count
-                
-                result[(f1, f2)] = (support, confidence)
-        
-        return result
-    
-    def _compute_rule_metrics(
-        self,
-        antecedents: Tuple[Condition, ...],
-        consequent: Condition,
-        examples: Sequence[Set[Condition]],
-    ) -> Tuple[int, float]:
-        """Computa suporte e confiança de uma regra."""
-        ant_match = sum(
-            1 for ex in examples
-            if all(ant in ex for ant in antecedents)
-        )
-        
-        if ant_match == 0:
-            return 0, 0.0
-        
-        both_match = sum(
-            1 for ex in examples
-            if all(ant in ex for ant in antecedents) and consequent in ex
-        )
-        
-        return both_match, both_match / ant_match
-    
     def _generalize_rules(self, rules: RuleSet) -> RuleSet:
         """
         Generaliza regras substituindo constantes por variáveis.
@@ -521,4 +607,8 @@ class RuleInductor:
         return generalized
 
 
+# Folga relativa do limite superior de ganho, para absorver arredondamento.
+_BOUND_SLACK = 1.0 + 1e-9
+
+
 __all__ = ["RuleInductor", "SymbolicRule", "RuleSet", "Condition"]
@@ -0,0 +1,181 @@
+"""
+Ingestão em Fluxo (streaming) do Corpus.
+
+Lê documentos de um iterável ou de um arquivo sem carregar o texto inteiro,
+agrupa-os em fatias (shards) e processa cada fatia — tokenização, contagens
+de vocabulário e grafo de co-ocorrência parcial — opcionalmente em processos
+separados. As fatias são devolvidas SEMPRE na ordem do corpus, de modo que a
+redução (`CooccurrenceGraph.merge`, atualização de vocabulário) é
+determinística e idêntica à ingestão sequencial.
+
+A memória fica limitada: no máximo `max_pending` fatias em voo, e o texto
+bruto de cada fatia é descartado depois de tokenizado.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Deque, Iterable, Iterator, List, Sequence, Tuple
+
+from .graph import CooccurrenceGraph
+
+DocumentSource = Iterable[str] | str | Path
+
+
+@dataclass(frozen=True)
+class IngestShard:
+    """Resultado do processamento de uma fatia do corpus."""
+
+    index: int
+    tokenized: Tuple[Tuple[str, ...], ...]
+    graph: CooccurrenceGraph
+    tokens: int
+
+
+@dataclass(frozen=True)
+class IngestProgress:
+    """Progresso acumulado da ingestão (enviado ao callback a cada fatia)."""
+
+    shards: int
+    documents: int
+    tokens: int
+    elapsed: float
+
+    @property
+    def documents_per_second(self) -> float:
+        return self.documents / self.elapsed if self.elapsed > 0 else 0.0
+
+
+ProgressCallback = Callable[[IngestProgress], None]
+
+
+def iter_documents(source: DocumentSource) -> Iterator[str]:
+    """
+    Itera documentos de um iterável de strings ou de um arquivo.
+
+    Arquivos `.jsonl` contêm um documento por linha (string JSON ou objeto com
+    campo `text`); qualquer outro arquivo é lido como um documento por linha.
+    Linhas em branco são ignoradas.
+    """
+    if not isinstance(source, (str, Path)):
+        yield from source
+        return
+
+    path = Path(source)
+    is_jsonl = path.suffix == ".jsonl"
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            if not is_jsonl:
+                yield line
+                continue
+            payload = json.loads(line)
+            if isinstance(payload, dict):
+                payload = payload.get("text", "")
+            if not isinstance(payload, str):
+                raise ValueError(f"{path}: documento JSONL sem texto: {line[:80]!r}")
+            yield payload
+
+
+def iter_chunks(documents: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    """Agrupa documentos em listas de até `chunk_size` elementos."""
+    if chunk_size <= 0:
+        raise ValueError("chunk_size deve ser positivo.")
+    chunk: List[str] = []
+    for document in documents:
+        chunk.append(document)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def process_shard(index: int, documents: Sequence[str], window_size: int) -> IngestShard:
+    """Tokeniza uma fatia e constrói seu grafo de co-ocorrência parcial."""
+    from .engine import tokenize
+
+    tokenized = tuple(tuple(tokenize(document)) for document in documents)
+    graph = CooccurrenceGraph()
+    graph.add_corpus(tokenized, window_size=window_size)
+    return IngestShard(
+        index=index,
+        tokenized=tokenized,
+        graph=graph,
+        tokens=sum(len(tokens) for tokens in tokenized),
+    )
+
+
+def ingest(
+    source: DocumentSource,
+    *,
+    window_size: int = 5,
+    workers: int = 0,
+    chunk_size: int = 256,
+    max_pending: int | None = None,
+    progress: ProgressCallback | None = None,
+    executor: Executor | None = None,
+) -> Iterator[IngestShard]:
+    """
+    Processa o corpus em fatias e as devolve na ordem original.
+
+    Com `workers <= 1` (e sem `executor`) tudo roda no processo atual. Caso
+    contrário as fatias vão para um `ProcessPoolExecutor`, com no máximo
+    `max_pending` (default: 2 * workers) fatias submetidas e não consumidas.
+    """
+    chunks = iter_chunks(iter_documents(source), chunk_size)
+    started = time.perf_counter()
+    documents = 0
+    tokens = 0
+
+    def report(shard: IngestShard) -> IngestShard:
+        nonlocal documents, tokens
+        documents += len(shard.tokenized)
+        tokens += shard.tokens
+        if progress is not None:
+            progress(IngestProgress(
+                shards=shard.index + 1,
+                documents=documents,
+                tokens=tokens,
+                elapsed=time.perf_counter() - started,
+            ))
+        return shard
+
+    if executor is None and workers <= 1:
+        for index, chunk in enumerate(chunks):
+            yield report(process_shard(index, chunk, window_size))
+        return
+
+    own_executor = executor is None
+    pool = executor or ProcessPoolExecutor(max_workers=workers)
+    limit = max_pending or max(2, 2 * max(1, workers))
+    pending: Deque[Future[IngestShard]] = deque()
+    try:
+        for index, chunk in enumerate(chunks):
+            pending.append(pool.submit(process_shard, index, chunk, window_size))
+            if len(pending) >= limit:
+                yield report(pending.popleft().result())
+        while pending:
+            yield report(pending.popleft().result())
+    finally:
+        for future in pending:
+            future.cancel()
+        if own_executor:
+            pool.shutdown(wait=True)
+
+
+__all__ = [
+    "IngestProgress",
+    "IngestShard",
+    "ingest",
+    "iter_chunks",
+    "iter_documents",
+    "process_shard",
+]
@@ -23,14 +23,19 @@ A vantagem: podemos EXPLICAR por que algo foi recuperado.
 from __future__ import annotations
 
 import math
-from collections import Counter, defaultdict
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from heapq import heapify, heappop, heappush, heapreplace, merge
 from dataclasses import dataclass, field
 from hashlib import blake2b
+from itertools import chain
 from typing import (
     Any,
     Callable,
     Dict,
     FrozenSet,
+    Iterable,
     Iterator,
     List,
     Mapping,
@@ -117,17 +122,16 @@ class AssociativeMemory:
     1. Matching de padrões (interseção de tokens)
     2. Força da memória (recência + frequência)
     3. Contexto atual (boost para memórias relacionadas)
+    
+    O decaimento é preguiçoso: as forças em `traces` são relativas a um
+    fator global `_decay_scale` (força real = força armazenada × fator), que
+    `decay_all` só multiplica. O fator é aplicado quando uma memória é
+    pontuada, comparada ou devolvida; `_fold_decay` o incorpora aos traços.
     """
     
     # Armazenamento principal
     traces: Dict[str, MemoryTrace] = field(default_factory=dict)
     
-    # Índice invertido: token -> ids das memórias
-    token_index: Dict[str, Set[str]] = field(default_factory=lambda: defaultdict(set))
-    
-    # Índice de contexto: contexto -> ids das memórias
-    context_index: Dict[str, Set[str]] = field(default_factory=lambda: defaultdict(set))
-    
     # Contador de timestamp
     _timestamp: int = 0
     
@@ -136,6 +140,61 @@ class AssociativeMemory:
     decay_rate: float = 0.999  # Decaimento por acesso
     reinforcement_rate: float = 1.5  # Reforço por re-armazenamento
     
+    # Índice exato: (chave, hash do valor) -> ids das memórias
+    _exact_index: Dict[Tuple[Tuple[str, ...], int], List[str]] = field(default_factory=dict, repr=False)
+    
+    # Ordem de inserção de cada id (desempate igual à iteração de `traces`)
+    _order: Dict[str, int] = field(default_factory=dict, repr=False)
+    _next_order: int = field(default=0, repr=False)
+    
+    # Fator global de decaimento (força real = força armazenada × fator)
+    _decay_scale: float = field(default=1.0, repr=False)
+    
+    # Heap (força, ordem, id) com entradas obsoletas descartadas na leitura
+    _strength_heap: List[Tuple[float, int, str]] = field(default_factory=list, repr=False)
+    
+    # Ordem de inserção -> id (as listas invertidas guardam ordens, não ids)
+    _ids_by_order: Dict[int, str] = field(default_factory=dict, repr=False)
+    
+    # Índice invertido: token -> id inteiro -> ordens (crescentes) das memórias
+    _token_ids: Dict[str, int] = field(default_factory=dict, repr=False)
+    _postings: List[array] = field(default_factory=list, repr=False)
+    
+    # Limites superiores por lista (força, acessos, timestamp máximos)
+    _max_strength: array = field(default_factory=lambda: array("d"), repr=False)
+    _max_access: array = field(default_factory=lambda: array("q"), repr=False)
+    _max_time: array = field(default_factory=lambda: array("q"), repr=False)
+    
+    # Índice de contexto: contexto -> id inteiro -> ordens das memórias
+    _context_ids: Dict[str, int] = field(default_factory=dict, repr=False)
+    _context_postings: List[array] = field(default_factory=list, repr=False)
+    
+    def __post_init__(self) -> None:
+        for trace_id, trace in self.traces.items():
+            order = self._next_order
+            self._order[trace_id] = order
+            self._ids_by_order[order] = trace_id
+            self._next_order += 1
+            self._exact_index.setdefault(_exact_key(trace.key, trace.value), []).append(trace_id)
+            self._index(order, trace)
+        self._rebuild_strength_heap()
+    
+    @property
+    def token_index(self) -> Dict[str, Set[str]]:
+        """Visão token -> ids das memórias (derivada das listas invertidas)."""
+        return {
+            token: self._posting_ids(self._postings[token_id])
+            for token, token_id in self._token_ids.items()
+        }
+    
+    @property
+    def context_index(self) -> Dict[str, Set[str]]:
+        """Visão contexto -> ids das memórias."""
+        return {
+            ctx: self._posting_ids(self._context_postings[ctx_id])
+            for ctx, ctx_id in self._context_ids.items()
+        }
+    
     def store(
         self,
         key: Sequence[str],
@@ -155,10 +214,11 @@ class AssociativeMemory:
         # Verifica se já existe memória similar
         existing = self._find_exact_match(key_tuple, value)
         
+        scale = self._decay_scale
         if existing is not None:
             # Reforça memória existente
             old_trace = self.traces[existing]
-            new_strength = min(10.0, old_trace.strength * self.reinforcement_rate)
+            new_strength = min(10.0, old_trace.strength * scale * self.reinforcement_rate)
             new_trace = MemoryTrace(
                 key=key_tuple,
                 value=value,
@@ -167,7 +227,10 @@ class AssociativeMemory:
                 timestamp=self._timestamp,
                 access_count=old_trace.access_count,
             )
-            self.traces[existing] = new_trace
+            stored = new_trace if scale == 1.0 else new_trace.with_strength(new_strength / scale)
+            self.traces[existing] = stored
+            self._push_strength(existing, stored)
+            self._raise_bounds(stored)
             return new_trace
         
         # Cria nova memória
@@ -179,6 +242,7 @@ class AssociativeMemory:
             timestamp=self._timestamp,
             access_count=0,
         )
+        stored = trace if scale == 1.0 else trace.with_strength(strength / scale)
         
         trace_id = trace.id
         
@@ -186,18 +250,37 @@ class AssociativeMemory:
         if len(self.traces) >= self.max_traces:
             self._evict_weakest()
         
-        # Armazena
-        self.traces[trace_id] = trace
-        
-        # Atualiza índices
-        for token in key_tuple:
-            self.token_index[token].add(trace_id)
-        
-        for ctx in context_tuple:
-            self.context_index[ctx].add(trace_id)
+        # Armazena e atualiza índices
+        self._put(trace_id, stored)
+        self._index(self._order[trace_id], stored)
         
         return trace
     
+    def store_many(
+        self,
+        entries: Iterable[Sequence[Any]],
+        strength: float = 1.0,
+    ) -> List[MemoryTrace]:
+        """
+        Armazena vários itens `(key, value[, context[, strength]])` em ordem.
+        
+        Equivale a chamar `store` para cada item; `strength` é o default
+        dos itens que não trazem a própria força.
+        """
+        stored: List[MemoryTrace] = []
+        store = self.store
+        for entry in entries:
+            size = len(entry)
+            if size == 2:
+                stored.append(store(entry[0], entry[1], (), strength))
+            elif size == 3:
+                stored.append(store(entry[0], entry[1], entry[2], strength))
+            elif size == 4:
+                stored.append(store(entry[0], entry[1], entry[2], entry[3]))
+            else:
+                raise ValueError(f"item de memória inválido (esperado 2 a 4 campos): {entry!r}")
+        return stored
+    
     def retrieve(
         self,
         query: Sequence[str],
@@ -212,6 +295,12 @@ class AssociativeMemory:
         1. Interseção de tokens (Jaccard)
         2. Força da memória
         3. Contexto atual
+        
+        Com `top_k > 0` e `min_match > 0` só memórias que contêm algum token
+        da query podem ser retornadas, e a busca é top-k com poda MaxScore:
+        listas cujo limite superior somado não alcança o k-ésimo melhor score
+        deixam de gerar candidatos. O resultado é o mesmo da pontuação
+        exaustiva; empates de relevância favorecem a memória mais antiga.
         """
         if not query:
             return []
@@ -219,79 +308,205 @@ class AssociativeMemory:
         query_set = set(query)
         context_set = set(context)
         
-        # Encontra candidatos via índice invertido
-        candidate_ids: Set[str] = set()
-        for token in query:
-            if token in self.token_index:
-                candidate_ids.update(self.token_index[token])
+        if top_k > 0 and min_match > 0:
+            selected = self._top_k(query_set, context_set, top_k, min_match)
+        else:
+            # Sem poda: candidatos só de contexto também pontuam (match 0)
+            selected = self._score_all(query_set, context_set, context, min_match)[:top_k]
         
-        # Adiciona candidatos do contexto
-        for ctx in context:
-            if ctx in self.context_index:
-                candidate_ids.update(self.context_index[ctx])
+        # Atualiza contadores de acesso para resultados retornados
+        for trace_id, _ in selected:
+            self._touch(trace_id)
         
-        if not candidate_ids:
-            return []
+        return [result for _, result in selected]
+    
+    def _score(
+        self,
+        trace: MemoryTrace,
+        query_set: Set[str],
+        context_set: Set[str],
+        min_match: float,
+    ) -> RetrievalResult | None:
+        """Pontua um candidato (None se o match ficar abaixo de `min_match`)."""
+        # Match score: Jaccard entre query e key
+        key_set = set(trace.key)
+        intersection = len(query_set & key_set)
+        union = len(query_set | key_set)
+        match_score = intersection / union if union > 0 else 0.0
+        
+        if match_score < min_match:
+            return None
         
-        # Pontua cada candidato
-        results = []
+        # Context boost
+        context_boost = 1.0
+        if trace.context and context_set:
+            ctx_match = len(set(trace.context) & context_set)
+            context_boost = 1.0 + (0.2 * ctx_match)
+        
+        # Recency boost
+        recency = 1.0 / (1.0 + math.log1p(self._timestamp - trace.timestamp))
+        
+        # Frequência boost
+        frequency_boost = 1.0 + (0.1 * trace.access_count)
+        
+        # Força real (decaimento preguiçoso)
+        scale = self._decay_scale
+        strength = trace.strength * scale
+        
+        # Score final
+        relevance = (
+            match_score
+            * strength
+            * context_boost
+            * recency
+            * frequency_boost
+        )
         
-        for trace_id in candidate_ids:
-            if trace_id not in self.traces:
+        return RetrievalResult(
+            trace=trace if scale == 1.0 else trace.with_strength(strength),
+            match_score=match_score,
+            relevance=relevance,
+            matched_terms=tuple(query_set & key_set),
+        )
+    
+    def _score_all(
+        self,
+        query_set: Set[str],
+        context_set: Set[str],
+        context: Sequence[str],
+        min_match: float,
+    ) -> List[Tuple[str, RetrievalResult]]:
+        """Pontuação exaustiva de todos os candidatos, ordenada por relevância."""
+        candidates: Set[int] = set()
+        for token in query_set:
+            token_id = self._token_ids.get(token)
+            if token_id is not None:
+                candidates.update(self._postings[token_id])
+        for ctx in context:
+            ctx_id = self._context_ids.get(ctx)
+            if ctx_id is not None:
+                candidates.update(self._context_postings[ctx_id])
+        
+        results: List[Tuple[str, RetrievalResult]] = []
+        for order in sorted(candidates):
+            trace_id = self._ids_by_order.get(order)
+            if trace_id is None:
                 continue
-            
-            trace = self.traces[trace_id]
-            
-            # Match score: Jaccard entre query e key
-            key_set = set(trace.key)
-            intersection = len(query_set & key_set)
-            union = len(query_set | key_set)
-            match_score = intersection / union if union > 0 else 0.0
-            
-            if match_score < min_match:
+            result = self._score(self.traces[trace_id], query_set, context_set, min_match)
+            if result is not None:
+                results.append((trace_id, result))
+        
+        # Ordenação estável: empates mantêm a ordem de inserção
+        results.sort(key=lambda item: -item[1].relevance)
+        return results
+    
+    def _top_k(
+        self,
+        query_set: Set[str],
+        context_set: Set[str],
+        top_k: int,
+        min_match: float,
+    ) -> List[Tuple[str, RetrievalResult]]:
+        """
+        Top-k document-at-a-time com poda MaxScore.
+        
+        O score de uma memória com `i` tokens da query é no máximo
+        `i / |query| * força * contexto * recência * frequência`, então a soma
+        dos limites das listas que a contêm é um limite superior. As listas
+        são ordenadas por limite; o prefixo cuja soma não supera o k-ésimo
+        score atual ("não essenciais") deixa de gerar candidatos. Cada
+        candidato ainda passa por um limite com a força/recência/acessos do
+        próprio traço antes da pontuação completa.
+        """
+        now = self._timestamp
+        query_size = len(query_set)
+        context_bound = 1.0 + 0.2 * len(context_set) if context_set else 1.0
+        decay_scale = self._decay_scale
+        
+        terms: List[Tuple[float, int]] = []
+        for token in query_set:
+            token_id = self._token_ids.get(token)
+            if token_id is None or not self._postings[token_id]:
                 continue
-            
-            # Context boost
-            context_boost = 1.0
-            if trace.context and context_set:
-                ctx_match = len(set(trace.context) & context_set)
-                context_boost = 1.0 + (0.2 * ctx_match)
-            
-            # Recency boost
-            recency = 1.0 / (1.0 + math.log1p(self._timestamp - trace.timestamp))
-            
-            # Frequência boost
-            frequency_boost = 1.0 + (0.1 * trace.access_count)
-            
-            # Score final
-            relevance = (
-                match_score
-                * trace.strength
-                * context_boost
-                * recency
-                * frequency_boost
+            bound = (
+                self._max_strength[token_id]
+                * decay_scale
+                * context_bound
+                * _recency(now - self._max_time[token_id])
+                * (1.0 + 0.1 * self._max_access[token_id])
+                / query_size
+                * _BOUND_SLACK
             )
-            
-            matched_terms = tuple(query_set & key_set)
-            
-            results.append(RetrievalResult(
-                trace=trace,
-                match_score=match_score,
-                relevance=relevance,
-                matched_terms=matched_terms,
+            terms.append((bound, token_id))
+        if not terms:
+            return []
+        terms.sort()
+        
+        postings = [self._postings[token_id] for _, token_id in terms]
+        prefix = [0.0]
+        for bound, _ in terms:
+            prefix.append(prefix[-1] + bound)
+        total = len(terms)
+        widest = terms[-1][0]
+        first = 0  # primeira lista essencial
+        
+        heap: List[Tuple[float, int, str, RetrievalResult]] = []
+        threshold = -math.inf
+        traces = self.traces
+        ids_by_order = self._ids_by_order
+        scale = decay_scale * context_bound * _BOUND_SLACK
+        log1p = math.log1p
+        last = -1
+        
+        while first < total:
+            # Fusão das listas essenciais a partir da última memória visitada
+            merged = merge(*(
+                memoryview(posting)[bisect_right(posting, last):]
+                for posting in postings[first:]
             ))
+            current = first
+            hits = 0
+            pending = -1
+            for order in chain(merged, (-1,)):
+                if order == pending:
+                    hits += 1
+                    continue
+                if pending >= 0:
+                    last = pending
+                    # Limite pelas listas (não essenciais contam como presentes)
+                    if prefix[first] + hits * widest > threshold:
+                        trace_id = ids_by_order.get(pending)
+                        trace = traces[trace_id] if trace_id is not None else None
+                        # Limite pela força/recência/acessos do próprio traço
+                        if trace is not None and (
+                            min(1.0, (first + hits) / query_size)
+                            * trace.strength
+                            / (1.0 + log1p(now - trace.timestamp))
+                            * (1.0 + 0.1 * trace.access_count)
+                            * scale
+                            > threshold
+                        ):
+                            result = self._score(trace, query_set, context_set, min_match)
+                            if result is not None and result.relevance > threshold:
+                                entry = (result.relevance, -pending, trace_id, result)
+                                if len(heap) < top_k:
+                                    heappush(heap, entry)
+                                else:
+                                    heapreplace(heap, entry)
+                                if len(heap) == top_k:
+                                    # Empate com o limiar perde: ordens chegam crescentes
+                                    threshold = heap[0][0]
+                                    while first < total and prefix[first + 1] <= threshold:
+                                        first += 1
+                if first != current:
+                    break
+                pending = order
+                hits = 1
+            else:
+                break
         
-        # Ordena por relevância e retorna top-k
-        results.sort(key=lambda r: -r.relevance)
-        
-        # Atualiza contadores de acesso para resultados retornados
-        for result in results[:top_k]:
-            trace_id = result.trace.id
-            if trace_id in self.traces:
-                updated = self.traces[trace_id].with_access()
-                self.traces[trace_id] = updated
-        
-        return results[:top_k]
+        heap.sort(key=lambda entry: (-entry[0], -entry[1]))
+        return [(trace_id, result) for _, _, trace_id, result in heap]
     
     def associate(
         self,
@@ -351,21 +566,42 @@ class AssociativeMemory:
         
         Memórias fracas eventualmente são esquecidas.
         Retorna número de memórias removidas.
-        """
-        to_remove = []
         
-        for trace_id, trace in self.traces.items():
-            new_strength = trace.strength * self.decay_rate
-            
-            if new_strength < 0.01:
-                to_remove.append(trace_id)
-            else:
-                self.traces[trace_id] = trace.with_strength(new_strength)
-        
-        for trace_id in to_remove:
+        Só o fator global é multiplicado; como o decaimento é uniforme, as
+        memórias que caem abaixo do limiar são as do topo do heap de forças,
+        removidas em O(k log n).
+        """
+        self._decay_scale *= self.decay_rate
+        scale = self._decay_scale
+        heap = self._strength_heap
+        removed = 0
+        while heap:
+            strength, order, trace_id = heap[0]
+            trace = self.traces.get(trace_id)
+            if trace is None or trace.strength != strength or self._order.get(trace_id) != order:
+                heappop(heap)  # entrada obsoleta
+                continue
+            if strength * scale >= 0.01:
+                break
+            heappop(heap)
             self._remove_trace(trace_id)
+            removed += 1
         
-        return len(to_remove)
+        if scale < _MIN_DECAY_SCALE:
+            # Evita underflow: incorpora o fator aos traços
+            self._fold_decay()
+        
+        return removed
+    
+    def _fold_decay(self) -> None:
+        """Incorpora `_decay_scale` às forças armazenadas (volta a 1.0)."""
+        scale = self._decay_scale
+        if scale != 1.0:
+            for trace_id, trace in self.traces.items():
+                self.traces[trace_id] = trace.with_strength(trace.strength * scale)
+            self._decay_scale = 1.0
+        self._rebuild_strength_heap()
+        self._rebuild_bounds()
     
     def consolidate(
         self,
@@ -378,31 +614,142 @@ class AssociativeMemory:
         Retorna padrões consolidados (para possível extração de regras).
         """
         consolidated = []
+        scale = self._decay_scale
         
         for trace_id, trace in self.traces.items():
-            if trace.access_count >= min_access and trace.strength >= min_strength:
+            if trace.access_count >= min_access and trace.strength * scale >= min_strength:
                 consolidated.append((trace.key, trace.value))
         
         return consolidated
     
     def _find_exact_match(self, key: Tuple[str, ...], value: Any) -> str | None:
-        """Encontra memória com mesma chave e valor."""
-        for trace_id, trace in self.traces.items():
+        """Encontra memória com mesma chave e valor (a mais antiga, se houver várias)."""
+        bucket = self._exact_index.get(_exact_key(key, value))
+        if not bucket:
+            return None
+        
+        found: str | None = None
+        for trace_id in bucket:
+            trace = self.traces[trace_id]
             if trace.key == key and trace.value == value:
-                return trace_id
-        return None
+                if found is None or self._order[trace_id] < self._order[found]:
+                    found = trace_id
+        return found
     
     def _evict_weakest(self) -> None:
-        """Remove a memória mais fraca."""
-        if not self.traces:
+        """Remove a memória mais fraca (empate: a mais antiga)."""
+        heap = self._strength_heap
+        while heap:
+            strength, order, trace_id = heap[0]
+            trace = self.traces.get(trace_id)
+            if trace is None or trace.strength != strength or self._order.get(trace_id) != order:
+                heappop(heap)  # entrada obsoleta
+                continue
+            self._remove_trace(trace_id)
             return
+    
+    def _put(self, trace_id: str, trace: MemoryTrace) -> None:
+        """Grava um traço mantendo índice exato, ordem e heap de forças."""
+        previous = self.traces.get(trace_id)
+        if previous is not None:
+            # Colisão de id: substitui na mesma posição, como o dict faria
+            self._unindex_exact(trace_id, previous)
+            self._unindex(self._order[trace_id], previous)
+        else:
+            order = self._next_order
+            self._order[trace_id] = order
+            self._ids_by_order[order] = trace_id
+            self._next_order += 1
+        self.traces[trace_id] = trace
+        self._exact_index.setdefault(_exact_key(trace.key, trace.value), []).append(trace_id)
+        self._push_strength(trace_id, trace)
+    
+    def _index(self, order: int, trace: MemoryTrace) -> None:
+        """Inclui a memória nas listas invertidas de token e de contexto."""
+        for token in trace.key:
+            token_id = self._token_ids.get(token)
+            if token_id is None:
+                token_id = len(self._postings)
+                self._token_ids[token] = token_id
+                self._postings.append(array("q"))
+                self._max_strength.append(0.0)
+                self._max_access.append(0)
+                self._max_time.append(0)
+            _posting_add(self._postings[token_id], order)
+        self._raise_bounds(trace)
         
-        weakest_id = min(
-            self.traces.keys(),
-            key=lambda tid: self.traces[tid].strength,
-        )
-        
-        self._remove_trace(weakest_id)
+        for ctx in trace.context:
+            ctx_id = self._context_ids.get(ctx)
+            if ctx_id is None:
+                ctx_id = len(self._context_postings)
+                self._context_ids[ctx] = ctx_id
+                self._context_postings.append(array("q"))
+            _posting_add(self._context_postings[ctx_id], order)
+    
+    def _unindex(self, order: int, trace: MemoryTrace) -> None:
+        for token in trace.key:
+            token_id = self._token_ids.get(token)
+            if token_id is not None:
+                _posting_discard(self._postings[token_id], order)
+        for ctx in trace.context:
+            ctx_id = self._context_ids.get(ctx)
+            if ctx_id is not None:
+                _posting_discard(self._context_postings[ctx_id], order)
+    
+    def _raise_bounds(self, trace: MemoryTrace) -> None:
+        """Atualiza os limites superiores das listas dos tokens da chave."""
+        for token in trace.key:
+            token_id = self._token_ids[token]
+            if trace.strength > self._max_strength[token_id]:
+                self._max_strength[token_id] = trace.strength
+            if trace.access_count > self._max_access[token_id]:
+                self._max_access[token_id] = trace.access_count
+            if trace.timestamp > self._max_time[token_id]:
+                self._max_time[token_id] = trace.timestamp
+    
+    def _rebuild_bounds(self) -> None:
+        """Recalcula os limites exatos (remoções e decaimento só os afrouxam)."""
+        size = len(self._postings)
+        self._max_strength = array("d", bytes(8 * size))
+        self._max_access = array("q", bytes(8 * size))
+        self._max_time = array("q", bytes(8 * size))
+        for trace in self.traces.values():
+            self._raise_bounds(trace)
+    
+    def _touch(self, trace_id: str) -> None:
+        """Registra um acesso à memória."""
+        trace = self.traces.get(trace_id)
+        if trace is None:
+            return
+        updated = trace.with_access()
+        self.traces[trace_id] = updated
+        self._raise_bounds(updated)
+    
+    def _posting_ids(self, posting: array) -> Set[str]:
+        ids_by_order = self._ids_by_order
+        return {ids_by_order[order] for order in posting if order in ids_by_order}
+    
+    def _unindex_exact(self, trace_id: str, trace: MemoryTrace) -> None:
+        index_key = _exact_key(trace.key, trace.value)
+        bucket = self._exact_index.get(index_key)
+        if bucket is None:
+            return
+        if trace_id in bucket:
+            bucket.remove(trace_id)
+        if not bucket:
+            del self._exact_index[index_key]
+    
+    def _push_strength(self, trace_id: str, trace: MemoryTrace) -> None:
+        heappush(self._strength_heap, (trace.strength, self._order[trace_id], trace_id))
+        if len(self._strength_heap) > 2 * len(self.traces) + 1024:
+            self._rebuild_strength_heap()
+    
+    def _rebuild_strength_heap(self) -> None:
+        self._strength_heap = [
+            (trace.strength, self._order[trace_id], trace_id)
+            for trace_id, trace in self.traces.items()
+        ]
+        heapify(self._strength_heap)
     
     def _remove_trace(self, trace_id: str) -> None:
         """Remove uma memória e atualiza índices."""
@@ -410,16 +757,12 @@ class AssociativeMemory:
             return
         
         trace = self.traces[trace_id]
+        order = self._order.pop(trace_id)
         
         # Remove dos índices
-        for token in trace.key:
-            if token in self.token_index:
-                self.token_index[token].discard(trace_id)
-        
-        for ctx in trace.context:
-            if ctx in self.context_index:
-                self.context_index[ctx].discard(trace_id)
-        
+        self._unindex(order, trace)
+        self._unindex_exact(trace_id, trace)
+        del self._ids_by_order[order]
         del self.traces[trace_id]
     
     def stats(self) -> Dict[str, int | float]:
@@ -432,15 +775,15 @@ class AssociativeMemory:
                 "unique_tokens": 0,
             }
         
-        strengths = [t.strength for t in self.traces.values()]
+        strengths = [t.strength * self._decay_scale for t in self.traces.values()]
         accesses = [t.access_count for t in self.traces.values()]
         
         return {
             "total_traces": len(self.traces),
             "avg_strength": sum(strengths) / len(strengths),
             "avg_access_count": sum(accesses) / len(accesses),
-            "unique_tokens": len(self.token_index),
-            "unique_contexts": len(self.context_index),
+            "unique_tokens": len(self._token_ids),
+            "unique_contexts": len(self._context_ids),
         }
     
     def __len__(self) -> int:
@@ -451,4 +794,56 @@ class AssociativeMemory:
         return len(results) > 0
 
 
+# Folga relativa nos limites superiores: absorve arredondamento de ponto flutuante
+_BOUND_SLACK = 1.0 + 1e-9
+# Abaixo deste fator global o decaimento é incorporado aos traços
+_MIN_DECAY_SCALE = 1e-100
+
+
+def _recency(age: int) -> float:
+    return 1.0 / (1.0 + math.log1p(age))
+
+
+def _posting_add(posting: array, order: int) -> None:
+    """Insere `order` na lista ordenada (normalmente um append)."""
+    if not posting or posting[-1] < order:
+        posting.append(order)
+        return
+    index = bisect_left(posting, order)
+    if index == len(posting) or posting[index] != order:
+        posting.insert(index, order)
+
+
+def _posting_discard(posting: array, order: int) -> None:
+    index = bisect_left(posting, order)
+    if index < len(posting) and posting[index] == order:
+        del posting[index]
+
+
+def _value_hash(value: Any) -> int:
+    """Hash compatível com `==` (valores iguais têm o mesmo hash), inclusive não-hasháveis."""
+    try:
+        return hash(value)
+    except TypeError:
+        pass
+    try:
+        if isinstance(value, Mapping):
+            return hash(frozenset(value.items()))
+        if isinstance(value, list):
+            return hash(tuple(value))
+        if isinstance(value, (set, frozenset)):
+            return hash(frozenset(value))
+    except TypeError:
+        pass
+    # Sem forma canônica: agrupa por tamanho (ou num único balde)
+    try:
+        return len(value)
+    except TypeError:
+        return 0
+
+
+def _exact_key(key: Tuple[str, ...], value: Any) -> Tuple[Tuple[str, ...], int]:
+    return key, _value_hash(value)
+
+
 __all__ = ["AssociativeMemory", "MemoryTrace", "RetrievalResult"]
@@ -0,0 +1,338 @@
+"""
+Persistência Binária do Estado de Aprendizado.
+
+Contêiner versionado (`state.nsrl`) com uma tabela de seções nomeadas:
+
+    cabeçalho  magic, versão, ordem de bytes, nº de seções, digest do estado
+    tabela     nome, tipo, offset, tamanho e checksum (blake2b) de cada seção
+    seções     alinhadas em 8 bytes
+
+Seções numéricas (contagens do grafo em CSR, versões de linha) são gravadas
+como buffers `array` crus e lidas por `mmap`, sem cópia: a matriz de
+co-ocorrência (`CooccurrenceMatrix`) pode ser consultada direto do arquivo.
+Seções de texto são JSON; componentes com valores arbitrários (memória,
+compressor, indutor, regras) usam pickle — como qualquer arquivo pickle, o
+contêiner deve ser local e confiável.
+
+Cada seção é lida (e seu checksum conferido) só quando pedida, o que permite
+carregar os componentes do `LearningEngine` sob demanda.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+import tempfile
+from array import array
+from collections import Counter
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Set, Tuple
+
+from .graph import CooccurrenceGraph, _CsrRows
+from .memory import AssociativeMemory
+from .sparse import CooccurrenceMatrix, _check_backend
+
+try:  # pragma: no cover - optional acceleration
+    import numpy as _np
+except Exception:  # pragma: no cover - fallback uses stdlib
+    _np = None
+
+MAGIC = b"NSRLSTAT"
+FORMAT_VERSION = 1
+STATE_FILE = "state.nsrl"
+
+# magic, versão, ordem de bytes (0 = little, 1 = big), nº de seções, digest (hex)
+_HEADER = struct.Struct("<8sHBxI32s")
+# nome, typecode ("" = bytes), itemsize, offset, tamanho, checksum
+_SECTION = struct.Struct("<32s2sB5xQQ16s")
+_ALIGN = 8
+_BYTEORDER = 0 if sys.byteorder == "little" else 1
+
+Section = Tuple[str, str, bytes]
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _checksum(payload: bytes | memoryview) -> bytes:
+    return blake2b(payload, digest_size=16).digest()
+
+
+def json_section(name: str, payload: Any) -> Section:
+    return name, "", json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def pickle_section(name: str, payload: Any) -> Section:
+    return name, "", pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def array_section(name: str, values: array) -> Section:
+    return name, values.typecode, values.tobytes()
+
+
+def write_archive(path: str | os.PathLike[str], digest: str, sections: Sequence[Section]) -> None:
+    """Grava o contêiner de forma atômica (arquivo temporário + rename)."""
+    path = Path(path)
+    names = [name for name, _, _ in sections]
+    if len(set(names)) != len(names):
+        raise ValueError("nomes de seção repetidos")
+
+    offset = _align(_HEADER.size + _SECTION.size * len(sections))
+    table: List[bytes] = []
+    for name, typecode, payload in sections:
+        itemsize = array(typecode).itemsize if typecode else 1
+        table.append(_SECTION.pack(
+            name.encode("utf-8"),
+            typecode.encode("ascii"),
+            itemsize,
+            offset,
+            len(payload),
+            _checksum(payload),
+        ))
+        offset = _align(offset + len(payload))
+
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=".tmp-", suffix=".nsrl")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(_HEADER.pack(MAGIC, FORMAT_VERSION, _BYTEORDER, len(sections), digest.encode("ascii")))
+            handle.writelines(table)
+            for _, _, payload in sections:
+                handle.write(b"\0" * (_align(handle.tell()) - handle.tell()))
+                handle.write(payload)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+class StateArchive:
+    """
+    Leitor do contêiner `state.nsrl` (mapeado em memória).
+
+    As seções são decodificadas sob demanda; com `verify=True` o checksum de
+    cada seção é conferido na primeira leitura.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], verify: bool = True) -> None:
+        self.path = Path(path)
+        self.verify = verify
+        with self.path.open("rb") as handle:
+            try:
+                self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:  # arquivo vazio
+                raise ValueError(f"{self.path}: contêiner vazio") from exc
+        self._view = memoryview(self._map)
+        if len(self._view) < _HEADER.size:
+            raise ValueError(f"{self.path}: contêiner truncado")
+
+        magic, version, byteorder, count, digest = _HEADER.unpack_from(self._view, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path}: não é um contêiner de estado NSR-Learn")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"{self.path}: formato v{version} não suportado (máximo v{FORMAT_VERSION})")
+        self.version = version
+        self.digest = digest.decode("ascii")
+        self._native = byteorder == _BYTEORDER
+
+        self._sections: Dict[str, Tuple[str, int, int, int, bytes]] = {}
+        for index in range(count):
+            name, typecode, itemsize, offset, size, checksum = _SECTION.unpack_from(
+                self._view, _HEADER.size + index * _SECTION.size
+            )
+            if offset + size > len(self._view):
+                raise ValueError(f"{self.path}: seção fora dos limites do arquivo")
+            self._sections[name.rstrip(b"\0").decode("utf-8")] = (
+                typecode.rstrip(b"\0").decode("ascii"), itemsize, offset, size, checksum,
+            )
+        self._verified: Set[str] = set()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._sections
+
+    @property
+    def sections(self) -> Tuple[str, ...]:
+        return tuple(self._sections)
+
+    def raw(self, name: str) -> memoryview:
+        """Bytes de uma seção (fatia do mapa, sem cópia)."""
+        try:
+            _, _, offset, size, checksum = self._sections[name]
+        except KeyError:
+            raise KeyError(f"{self.path}: seção ausente: {name!r}") from None
+        payload = self._view[offset:offset + size]
+        if self.verify and name not in self._verified:
+            if _checksum(payload) != checksum:
+                raise ValueError(f"{self.path}: checksum inválido na seção {name!r}")
+            self._verified.add(name)
+        return payload
+
+    def json(self, name: str) -> Any:
+        return json.loads(bytes(self.raw(name)).decode("utf-8"))
+
+    def pickle(self, name: str) -> Any:
+        return pickle.loads(self.raw(name))
+
+    def array(self, name: str) -> Sequence[int]:
+        """
+        Seção numérica como `memoryview` tipado sobre o mapa.
+
+        Se o arquivo foi gravado com outra ordem de bytes (ou outro tamanho de
+        item), devolve uma cópia convertida em `array`.
+        """
+        typecode, itemsize, _, _, _ = self._sections[name]
+        payload = self.raw(name)
+        if not typecode:
+            raise ValueError(f"{self.path}: seção {name!r} não é numérica")
+        if self._native and array(typecode).itemsize == itemsize:
+            return payload.cast(typecode)
+        values = array(typecode)
+        if array(typecode).itemsize != itemsize:
+            raise ValueError(f"{self.path}: tamanho de item incompatível na seção {name!r}")
+        values.frombytes(payload)
+        values.byteswap()
+        return values
+
+    def _owned(self, name: str) -> array:
+        """Cópia da seção numérica num `array` próprio (independe do mapa)."""
+        values = self.array(name)
+        if isinstance(values, array):
+            return values
+        owned = array(values.format)
+        owned.frombytes(values.cast("B"))
+        return owned
+
+    def close(self) -> None:
+        """Fecha o mapa (falha se ainda houver buffers exportados em uso)."""
+        self._view.release()
+        self._map.close()
+
+    def __enter__(self) -> "StateArchive":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        try:
+            self.close()
+        except BufferError:
+            pass
+
+    # ------------------------------------------------------------------
+    # Componentes
+    # ------------------------------------------------------------------
+
+    def matrix(self, backend: str = "array") -> CooccurrenceMatrix:
+        """Matriz de co-ocorrência lida direto do mapa (sem reconstruir o grafo)."""
+        _check_backend(backend)
+        meta = self.json("graph.meta")
+
+        def buffer(name: str) -> Any:
+            values = self.array(name)
+            if backend == "numpy":
+                return _np.frombuffer(values, dtype=_np.int64 if values.itemsize == 8 else _np.int32)
+            return values
+
+        return CooccurrenceMatrix(
+            vocab=tuple(self.json("graph.vocab")),
+            token_counts=buffer("graph.counts"),
+            indptr=buffer("graph.indptr"),
+            indices=buffer("graph.indices"),
+            data=buffer("graph.data"),
+            total_tokens=meta["total_tokens"],
+            total_windows=meta["total_windows"],
+            generation=meta["generation"],
+            backend=backend,
+        )
+
+    def graph(self) -> CooccurrenceGraph:
+        """Reconstrói o `CooccurrenceGraph` mutável (mesmos ids e ordens)."""
+        meta = self.json("graph.meta")
+        vocab: List[str] = self.json("graph.vocab")
+        counts = self.array("graph.counts")
+
+        graph = CooccurrenceGraph()
+        graph.token_counts = Counter({token: count for token, count in zip(vocab, counts) if count})
+        graph.total_tokens = meta["total_tokens"]
+        graph.total_windows = meta["total_windows"]
+        graph._vocab = vocab
+        graph._ids = {token: token_id for token_id, token in enumerate(vocab)}
+        graph._adjacency = _CsrRows(*(self._owned(f"graph.{name}") for name in ("indptr", "indices", "data")))
+        graph._directed = _CsrRows(
+            *(self._owned(f"graph.directed.{name}") for name in ("indptr", "indices", "data"))
+        )
+        graph._generation = meta["generation"]
+        graph._row_versions = self._owned("graph.versions")
+        graph._linked = dict.fromkeys(self.array("graph.linked"))
+        graph._edge_count = meta["edge_count"]
+        graph._cooc_total = meta["cooc_total"]
+        return graph
+
+    def memory(self) -> AssociativeMemory:
+        """Reconstrói a memória associativa (índices refeitos na ordem de inserção)."""
+        payload = self.pickle("memory")
+        return AssociativeMemory(
+            traces=dict(payload["traces"]),
+            _timestamp=payload["timestamp"],
+            max_traces=payload["max_traces"],
+            decay_rate=payload["decay_rate"],
+            reinforcement_rate=payload["reinforcement_rate"],
+        )
+
+
+def graph_sections(graph: CooccurrenceGraph) -> List[Section]:
+    """Seções do grafo: vocabulário, contagens e adjacências em CSR."""
+    # Os buffers CSR do grafo já estão no formato do arquivo
+    graph._compact()
+    adjacency = graph._adjacency
+    directed = graph._directed
+    return [
+        json_section("graph.meta", {
+            "total_tokens": graph.total_tokens,
+            "total_windows": graph.total_windows,
+            "generation": graph._generation,
+            "edge_count": graph._edge_count,
+            "cooc_total": graph._cooc_total,
+        }),
+        json_section("graph.vocab", graph._vocab),
+        array_section("graph.counts", array("q", (graph.token_counts.get(token, 0) for token in graph._vocab))),
+        array_section("graph.indptr", adjacency.indptr),
+        array_section("graph.indices", adjacency.indices),
+        array_section("graph.data", adjacency.data),
+        array_section("graph.directed.indptr", directed.indptr),
+        array_section("graph.directed.indices", directed.indices),
+        array_section("graph.directed.data", directed.data),
+        array_section("graph.versions", graph._row_versions),
+        array_section("graph.linked", array("i", graph._linked)),
+    ]
+
+
+def memory_sections(memory: AssociativeMemory) -> List[Section]:
+    # Forças reais no arquivo: incorpora o decaimento preguiçoso
+    memory._fold_decay()
+    return [
+        pickle_section("memory", {
+            "traces": list(memory.traces.items()),
+            "timestamp": memory._timestamp,
+            "max_traces": memory.max_traces,
+            "decay_rate": memory.decay_rate,
+            "reinforcement_rate": memory.reinforcement_rate,
+        }),
+    ]
+
+
+__all__ = [
+    "FORMAT_VERSION",
+    "STATE_FILE",
+    "StateArchive",
+    "array_section",
+    "graph_sections",
+    "json_section",
+    "memory_sections",
+    "pickle_section",
+    "write_archive",
+]
@@ -210,6 +210,20 @@ class Evaluator:
                 
         except Exception:
             return None
+    
+    def apply(self, op: OpType, args: Sequence[Any]) -> Any:
+        """
+        Aplica `op` a argumentos já avaliados.
+        
+        Mesma semântica de `evaluate` para um nó cujos filhos valem `args`
+        (a avaliação é pura, então o IF pode receber os dois ramos prontos).
+        """
+        try:
+            if op == OpType.IF:
+                return args[1] if args[0] else args[2]
+            return self.ops[op](*args)
+        except Exception:
+            return None
 
 
 @dataclass
@@ -265,9 +279,6 @@ class ProgramSynthesizer:
         self.max_size = max_size
         self.max_candidates = max_candidates
         self.evaluator = Evaluator()
-        
-        # Cache de programas por assinatura de outputs
-        self._signature_cache: Dict[Tuple, Expr] = {}
     
     def synthesize(
         self,
@@ -282,23 +293,22 @@ class ProgramSynthesizer:
         if not examples:
             return None
         
-        # Gera candidatos por tamanho crescente
-        for size in range(1, self.max_size + 1):
-            candidates = self._generate_candidates(size, num_vars, examples)
+        best: SynthesizedProgram | None = None
+        
+        for expr, outputs in self._enumerate(examples, num_vars):
+            matches = sum(1 for ex, out in zip(examples, outputs) if ex.matches(out))
             
-            for expr in candidates:
-                matches = self._count_matches(expr, examples)
-                
+            if best is None or matches > best.examples_matched:
+                best = SynthesizedProgram(
+                    expression=expr,
+                    examples_matched=matches,
+                    total_examples=len(examples),
+                    size=expr.size,
+                )
                 if matches == len(examples):
-                    return SynthesizedProgram(
-                        expression=expr,
-                        examples_matched=matches,
-                        total_examples=len(examples),
-                        size=expr.size,
-                    )
+                    return best
         
-        # Retorna melhor parcial se não encontrou perfeito
-        best = self._find_best_partial(examples, num_vars)
+        # Retorna melhor parcial (o menor entre os que mais acertam)
         return best
     
     def synthesize_transformation(
@@ -344,8 +354,16 @@ class ProgramSynthesizer:
         num_vars: int,
         examples: List[SynthesisExample],
     ) -> Iterator[Expr]:
-        """Gera expressões candidatas até um tamanho máximo."""
-        # Átomos base
+        """Gera expressões candidatas (uma por comportamento) até um tamanho máximo."""
+        for expr, _ in self._enumerate(examples, num_vars, max_size):
+            yield expr
+    
+    def _atoms(
+        self,
+        num_vars: int,
+        examples: List[SynthesisExample],
+    ) -> List[Expr]:
+        """Átomos base: variáveis, constantes comuns e constantes dos exemplos."""
         atoms: List[Expr] = []
         
         # Variáveis
@@ -365,46 +383,106 @@ class ProgramSynthesizer:
                 atoms.append(Expr(OpType.CONST, (ex.output,)))
         
         # Remove duplicatas
-        atoms = list({str(a): a for a in atoms}.values())
-        
-        if max_size == 1:
-            yield from atoms
-            return
-        
-        # Gera combinações
-        generated = 0
-        
-        # Operações unárias
-        unary_ops = [OpType.NEG, OpType.ABS, OpType.LENGTH, OpType.UPPER, 
-                     OpType.LOWER, OpType.REVERSE, OpType.FIRST, OpType.LAST, OpType.NOT]
-        
-        for op in unary_ops:
-            for atom in atoms:
-                if generated >= self.max_candidates:
+        return list({str(a): a for a in atoms}.values())
+    
+    def _enumerate(
+        self,
+        examples: List[SynthesisExample],
+        num_vars: int,
+        max_size: int | None = None,
+    ) -> Iterator[Tuple[Expr, Tuple[Any, ...]]]:
+        """
+        Enumeração bottom-up por tamanho com equivalência observacional.
+        
+        Gera `(expressão, saídas nos exemplos)` em ordem crescente de tamanho
+        (`Expr.size`, o mesmo usado no score MDL).
+        As saídas de cada subexpressão ficam memorizadas no banco, então um
+        candidato é avaliado aplicando só o operador da raiz aos vetores dos
+        filhos. Um candidato cuja assinatura de saídas já foi vista é
+        descartado: o banco guarda um representante (o menor) por
+        comportamento, e as combinações seguintes só usam representantes.
+        No máximo `max_candidates * max_size` candidatos são avaliados.
+        """
+        max_size = self.max_size if max_size is None else max_size
+        envs = [{i: v for i, v in enumerate(ex.inputs)} for ex in examples]
+        bank: Dict[int, List[Tuple[Expr, Tuple[Any, ...]]]] = defaultdict(list)
+        seen: Set[Any] = set()
+        
+        def admit(size: int, expr: Expr, outputs: Tuple[Any, ...]) -> bool:
+            signature = _signature(outputs)
+            if signature in seen:
+                return False
+            seen.add(signature)
+            bank[size].append((expr, outputs))
+            return True
+        
+        for atom in self._atoms(num_vars, examples):
+            outputs = tuple(self.evaluator.evaluate(atom, env) for env in envs)
+            if admit(atom.size, atom, outputs):
+                yield atom, outputs
+        
+        # Mesmo orçamento da busca por níveis: `max_candidates` por tamanho,
+        # mas gasto em ordem, completando cada tamanho antes do seguinte.
+        budget = self.max_candidates * max_size
+        for size in range(2, max_size + 1):
+            for op, children in self._combinations(bank, size):
+                if budget <= 0:
                     return
-                yield Expr(op, (atom,))
-                generated += 1
+                budget -= 1
+                
+                outputs = self._apply_all(op, [child[1] for child in children])
+                if outputs is None:
+                    continue
+                expr = Expr(op, tuple(child[0] for child in children))
+                if admit(size, expr, outputs):
+                    yield expr, outputs
+    
+    def _combinations(
+        self,
+        bank: Mapping[int, List[Tuple[Expr, Tuple[Any, ...]]]],
+        size: int,
+    ) -> Iterator[Tuple[OpType, Tuple[Tuple[Expr, Tuple[Any, ...]], ...]]]:
+        """Combinações de representantes cujo tamanho total é `size`."""
+        # Operações unárias
+        for op in _UNARY_OPS:
+            for child in bank.get(size - 1, ()):
+                yield op, (child,)
         
         # Operações binárias
-        binary_ops = [OpType.ADD, OpType.SUB, OpType.MUL, OpType.DIV,
-                      OpType.CONCAT, OpType.EQ, OpType.AND, OpType.OR]
-        
-        for op in binary_ops:
-            for a1 in atoms:
-                for a2 in atoms:
-                    if generated >= self.max_candidates:
-                        return
-                    yield Expr(op, (a1, a2))
-                    generated += 1
-        
-        # IF-THEN-ELSE
-        for cond in atoms[:5]:  # Limita condições
-            for then_br in atoms[:10]:
-                for else_br in atoms[:10]:
-                    if generated >= self.max_candidates:
-                        return
-                    yield Expr(OpType.IF, (cond, then_br, else_br))
-                    generated += 1
+        for op in _BINARY_OPS:
+            for left_size in range(1, size - 1):
+                rights = bank.get(size - 1 - left_size, ())
+                for left in bank.get(left_size, ()):
+                    for right in rights:
+                        yield op, (left, right)
+        
+        # IF-THEN-ELSE: condições constantes nos exemplos equivalem a um ramo
+        for cond_size in range(1, size - 2):
+            conditions = [
+                cond for cond in bank.get(cond_size, ())
+                if _mixed_truth(cond[1])
+            ]
+            for then_size in range(1, size - 1 - cond_size):
+                elses = bank.get(size - 1 - cond_size - then_size, ())
+                for cond in conditions:
+                    for then_br in bank.get(then_size, ()):
+                        for else_br in elses:
+                            if then_br is not else_br:
+                                yield OpType.IF, (cond, then_br, else_br)
+    
+    def _apply_all(
+        self,
+        op: OpType,
+        arg_outputs: Sequence[Tuple[Any, ...]],
+    ) -> Tuple[Any, ...] | None:
+        """Aplica `op` exemplo a exemplo; None se algum valor ficar grande demais."""
+        apply = self.evaluator.apply
+        outputs = []
+        for args in zip(*arg_outputs):
+            if op == OpType.MUL and _oversized_repeat(*args):
+                return None
+            outputs.append(apply(op, args))
+        return tuple(outputs)
     
     def _count_matches(
         self,
@@ -422,35 +500,47 @@ class ProgramSynthesizer:
                 matches += 1
         
         return matches
-    
-    def _find_best_partial(
-        self,
-        examples: List[SynthesisExample],
-        num_vars: int,
-    ) -> SynthesizedProgram | None:
-        """Encontra o melhor programa parcial."""
-        best_expr = None
-        best_matches = 0
-        best_size = float('inf')
-        
-        for size in range(1, min(5, self.max_size)):
-            for expr in self._generate_candidates(size, num_vars, examples):
-                matches = self._count_matches(expr, examples)
-                
-                if matches > best_matches or (matches == best_matches and expr.size < best_size):
-                    best_expr = expr
-                    best_matches = matches
-                    best_size = expr.size
-        
-        if best_expr is not None:
-            return SynthesizedProgram(
-                expression=best_expr,
-                examples_matched=best_matches,
-                total_examples=len(examples),
-                size=best_expr.size,
-            )
-        
-        return None
+
+
+_UNARY_OPS = (
+    OpType.NEG, OpType.ABS, OpType.LENGTH, OpType.UPPER,
+    OpType.LOWER, OpType.REVERSE, OpType.FIRST, OpType.LAST, OpType.NOT,
+)
+
+_BINARY_OPS = (
+    OpType.ADD, OpType.SUB, OpType.MUL, OpType.DIV,
+    OpType.CONCAT, OpType.EQ, OpType.AND, OpType.OR,
+)
+
+# Limite de tamanho para `sequência * inteiro` durante a enumeração
+_MAX_REPEAT_LENGTH = 10_000
+
+
+def _signature(outputs: Tuple[Any, ...]) -> Any:
+    """Assinatura observacional: valores por exemplo, distinguindo tipos (1 vs True)."""
+    try:
+        signature = tuple((type(value), value) for value in outputs)
+        hash(signature)
+        return signature
+    except TypeError:
+        return tuple((type(value), repr(value)) for value in outputs)
+
+
+def _mixed_truth(outputs: Tuple[Any, ...]) -> bool:
+    """Se a condição é verdadeira em alguns exemplos e falsa em outros."""
+    try:
+        truths = {bool(value) for value in outputs}
+    except Exception:
+        return True
+    return len(truths) > 1
+
+
+def _oversized_repeat(left: Any, right: Any) -> bool:
+    """Se `left * right` repetiria uma sequência além do limite."""
+    for seq, times in ((left, right), (right, left)):
+        if isinstance(seq, (str, list, tuple)) and isinstance(times, int):
+            return len(seq) * times > _MAX_REPEAT_LENGTH
+    return False
 
 
 class PatternLearner:
@@ -0,0 +1,332 @@
+"""
+Matriz Esparsa de Co-ocorrência (CSR).
+
+Representação compacta, somente leitura, das contagens do
+`CooccurrenceGraph`: cada linha (token) guarda os ids dos vizinhos e as
+contagens inteiras em buffers contíguos (`array` da stdlib ou, quando
+disponível e solicitado, NumPy). As contagens continuam inteiros exatos.
+
+Sobre esses buffers:
+- PMI/PPMI/NPMI são calculados por linha inteira de uma vez
+- A centralidade (soma de PPMI) é calculada sobre todas as entradas
+- A matriz compartilha os buffers CSR do grafo, sem cópia nem varredura
+
+O backend `array` usa `math.log2` e reproduz exatamente os valores do grafo.
+O backend `numpy` usa `numpy.log2`, cujo resultado pode diferir do `math` no
+último bit; as contagens e a ordem das linhas são as mesmas.
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from dataclasses import dataclass, field
+from heapq import nlargest
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence, Tuple
+
+try:  # pragma: no cover - optional acceleration
+    import numpy as _np
+except Exception:  # pragma: no cover - fallback uses stdlib
+    _np = None
+
+if TYPE_CHECKING:
+    from .graph import CooccurrenceGraph
+
+BACKENDS = ("array", "numpy")
+
+
+def numpy_available() -> bool:
+    """Indica se o backend `numpy` pode ser usado."""
+    return _np is not None
+
+
+def _check_backend(backend: str) -> None:
+    if backend not in BACKENDS:
+        raise ValueError(f"backend desconhecido: {backend!r} (use {', '.join(BACKENDS)})")
+    if backend == "numpy" and _np is None:
+        raise RuntimeError("backend 'numpy' requer o pacote numpy instalado")
+
+
+def _buffer(typecode: str, values: Any, backend: str) -> Any:
+    if backend == "numpy":
+        # `asarray` sobre um `array` compartilha a memória (sem cópia)
+        return _np.asarray(values, dtype=_np.int64 if typecode == "q" else _np.int32)
+    return values if isinstance(values, array) else array(typecode, values)
+
+
+@dataclass(frozen=True)
+class CooccurrenceMatrix:
+    """
+    Contagens de co-ocorrência em formato CSR.
+    
+    A linha `i` ocupa `indices[indptr[i]:indptr[i + 1]]` (ids dos vizinhos,
+    na ordem de inserção do grafo) e o mesmo intervalo de `data` (contagens).
+    A diagonal guarda pares de um token consigo mesmo e é ignorada nas
+    consultas de vizinhança.
+    """
+    
+    vocab: Tuple[str, ...]
+    token_counts: Any  # contagem de cada id (int64)
+    indptr: Any  # int64, len(vocab) + 1
+    indices: Any  # int32
+    data: Any  # int64
+    total_tokens: int
+    total_windows: int
+    generation: int
+    backend: str = "array"
+    _ids: Dict[str, int] = field(default_factory=dict, repr=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        if not self._ids:
+            self._ids.update((token, token_id) for token_id, token in enumerate(self.vocab))
+    
+    # ------------------------------------------------------------------
+    # Construção
+    # ------------------------------------------------------------------
+    
+    @classmethod
+    def from_graph(cls, graph: "CooccurrenceGraph", backend: str = "array") -> "CooccurrenceMatrix":
+        """
+        Constrói a matriz a partir do grafo.
+        
+        Compacta os deltas pendentes do grafo (só as linhas alteradas são
+        refeitas) e usa os buffers CSR resultantes diretamente: o grafo nunca
+        os altera no lugar, então compartilhá-los é seguro.
+        """
+        _check_backend(backend)
+        graph._compact()
+        rows = graph._adjacency
+        return cls._assemble(graph, rows.indptr, rows.indices, rows.data, backend)
+    
+    def updated(self, graph: "CooccurrenceGraph", backend: str | None = None) -> "CooccurrenceMatrix":
+        """
+        Nova matriz para o estado atual do grafo.
+        
+        Como o grafo já guarda as contagens em CSR, o custo é o da
+        compactação dos deltas pendentes (linhas inalteradas são copiadas em
+        bloco), sem reler linha a linha os buffers desta matriz.
+        """
+        backend = backend or self.backend
+        _check_backend(backend)
+        if graph.generation < self.generation or len(graph._vocab) < len(self.vocab):
+            raise ValueError("grafo anterior à matriz; reconstrua com from_graph")
+        return self.from_graph(graph, backend=backend)
+    
+    @classmethod
+    def _assemble(
+        cls,
+        graph: "CooccurrenceGraph",
+        indptr: array,
+        indices: array,
+        data: array,
+        backend: str,
+    ) -> "CooccurrenceMatrix":
+        vocab = tuple(graph._vocab)
+        counts = array("q", (graph.token_counts.get(token, 0) for token in vocab))
+        return cls(
+            vocab=vocab,
+            token_counts=_buffer("q", counts, backend),
+            indptr=_buffer("q", indptr, backend),
+            indices=_buffer("i", indices, backend),
+            data=_buffer("q", data, backend),
+            total_tokens=graph.total_tokens,
+            total_windows=graph.total_windows,
+            generation=graph.generation,
+            backend=backend,
+        )
+    
+    # ------------------------------------------------------------------
+    # Acesso
+    # ------------------------------------------------------------------
+    
+    def __len__(self) -> int:
+        return len(self.vocab)
+    
+    @property
+    def nnz(self) -> int:
+        """Entradas armazenadas (cada par aparece nas duas linhas)."""
+        return int(self.indptr[-1])
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes ocupados pelos buffers numéricos."""
+        total = 0
+        for buffer in (self.token_counts, self.indptr, self.indices, self.data):
+            total += buffer.nbytes if self.backend == "numpy" else buffer.itemsize * len(buffer)
+        return total
+    
+    def token_id(self, token: str) -> int | None:
+        return self._ids.get(token)
+    
+    def row(self, token: str) -> List[Tuple[str, int]]:
+        """Vizinhos e contagens de um token, na ordem de inserção."""
+        token_id = self._ids.get(token)
+        if token_id is None:
+            return []
+        start, end = self._bounds(token_id)
+        vocab = self.vocab
+        return [
+            (vocab[int(other)], int(count))
+            for other, count in zip(self.indices[start:end], self.data[start:end])
+        ]
+    
+    def count(self, token1: str, token2: str) -> int:
+        id1 = self._ids.get(token1)
+        id2 = self._ids.get(token2)
+        if id1 is None or id2 is None:
+            return 0
+        start, end = self._bounds(id1)
+        for offset, other in enumerate(self.indices[start:end]):
+            if other == id2:
+                return int(self.data[start + offset])
+        return 0
+    
+    def _bounds(self, token_id: int) -> Tuple[int, int]:
+        return int(self.indptr[token_id]), int(self.indptr[token_id + 1])
+    
+    # ------------------------------------------------------------------
+    # PMI em bloco
+    # ------------------------------------------------------------------
+    
+    def row_pmi(self, token: str) -> List[Tuple[str, float]]:
+        """PMI de um token com cada vizinho (mesma fórmula de `CooccurrenceGraph.pmi`)."""
+        token_id = self._ids.get(token)
+        if token_id is None:
+            return []
+        start, end = self._bounds(token_id)
+        values = self._pmi_values(token_id, start, end)
+        vocab = self.vocab
+        return [(vocab[int(other)], float(value)) for other, value in zip(self.indices[start:end], values)]
+    
+    def row_ppmi(self, token: str) -> List[Tuple[str, float]]:
+        """PPMI (PMI truncado em zero) de um token com cada vizinho."""
+        return [(other, max(0.0, value)) for other, value in self.row_pmi(token)]
+    
+    def row_npmi(self, token: str) -> List[Tuple[str, float]]:
+        """NPMI de um token com cada vizinho (mesma fórmula de `CooccurrenceGraph.npmi`)."""
+        token_id = self._ids.get(token)
+        if token_id is None or self.total_windows == 0:
+            return []
+        start, end = self._bounds(token_id)
+        pmi_values = self._pmi_values(token_id, start, end)
+        windows = self.total_windows
+        vocab = self.vocab
+        result: List[Tuple[str, float]] = []
+        for other, count, pmi_value in zip(self.indices[start:end], self.data[start:end], pmi_values):
+            denominator = -math.log2(int(count) / windows)
+            result.append((vocab[int(other)], float(pmi_value) / denominator if denominator != 0 else 0.0))
+        return result
+    
+    def _pmi_values(self, token_id: int, start: int, end: int) -> Sequence[float]:
+        total = self.total_tokens
+        if start == end or total == 0:
+            return []
+        windows = max(1, self.total_windows)
+        p_token = int(self.token_counts[token_id]) / total
+        if self.backend == "numpy":
+            others = self.indices[start:end]
+            p_cooc = self.data[start:end] / windows
+            expected = p_token * (self.token_counts[others] / total)
+            return _np.log2(p_cooc / expected)
+        counts = self.token_counts
+        return [
+            math.log2((count / windows) / (p_token * (counts[other] / total)))
+            for other, count in zip(self.indices[start:end], self.data[start:end])
+        ]
+    
+    def _all_ppmi(self) -> Tuple[Any, Any]:
+        """(linha de cada entrada, PPMI de cada entrada, diagonal zerada)."""
+        size = len(self.vocab)
+        if self.backend == "numpy":
+            rows = _np.repeat(_np.arange(size, dtype=_np.int64), _np.diff(self.indptr))
+            total = self.total_tokens
+            if total == 0 or not len(rows):
+                return rows, _np.zeros(len(rows))
+            p_cooc = self.data / max(1, self.total_windows)
+            expected = (self.token_counts[rows] / total) * (self.token_counts[self.indices] / total)
+            values = _np.maximum(0.0, _np.log2(p_cooc / expected))
+            values[rows == self.indices] = 0.0
+            return rows, values
+        rows = array("q")
+        values = array("d")
+        for token_id in range(size):
+            start, end = self._bounds(token_id)
+            rows.extend([token_id] * (end - start))
+            for other, value in zip(self.indices[start:end], self._pmi_values(token_id, start, end)):
+                values.append(max(0.0, value) if other != token_id else 0.0)
+        return rows, values
+    
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    
+    def neighbors(self, token: str, top_k: int = 10, min_cooc: int = 2) -> List[Tuple[str, float]]:
+        """Mesmo resultado de `CooccurrenceGraph.neighbors` (backend `array`)."""
+        token_id = self._ids.get(token)
+        if token_id is None or top_k <= 0:
+            return []
+        start, end = self._bounds(token_id)
+        if start == end:
+            return []
+        vocab = self.vocab
+        if self.backend == "numpy":
+            others = self.indices[start:end]
+            counts = self.data[start:end]
+            values = _np.maximum(0.0, self._pmi_values(token_id, start, end))
+            mask = (others != token_id) & (counts >= min_cooc) & (values > 0)
+            others, values = others[mask], values[mask]
+            order = _np.argsort(-values, kind="stable")[:top_k]
+            return [(vocab[int(others[i])], float(values[i])) for i in order]
+        candidates = [
+            (vocab[other], value)
+            for other, count, value in zip(
+                self.indices[start:end], self.data[start:end], self._pmi_values(token_id, start, end)
+            )
+            if other != token_id and count >= min_cooc and value > 0
+        ]
+        return nlargest(top_k, candidates, key=lambda x: x[1])
+    
+    def centrality(self) -> Dict[str, float]:
+        """Soma de PPMI por token com ao menos um vizinho (ordem dos ids)."""
+        rows, values = self._all_ppmi()
+        size = len(self.vocab)
+        if self.backend == "numpy":
+            sums = _np.bincount(rows, weights=values, minlength=size)
+            linked = _np.bincount(rows[rows != self.indices], minlength=size) > 0
+            return {self.vocab[i]: float(sums[i]) for i in _np.flatnonzero(linked)}
+        sums: Dict[str, float] = {}
+        for offset, token_id in enumerate(rows):
+            if self.indices[offset] == token_id:
+                continue
+            token = self.vocab[token_id]
+            sums[token] = sums.get(token, 0.0) + values[offset]
+        return sums
+    
+    def most_central(self, top_k: int = 20) -> List[Tuple[str, float]]:
+        """
+        Tokens com maior soma de PPMI.
+        
+        Os valores coincidem com `CooccurrenceGraph.most_central`; empates são
+        resolvidos pela ordem dos ids (primeira ocorrência do token).
+        """
+        return nlargest(top_k, self.centrality().items(), key=lambda x: x[1])
+    
+    def stats(self) -> Dict[str, int | float]:
+        diagonal = 0
+        total = 0
+        for token_id in range(len(self.vocab)):
+            start, end = self._bounds(token_id)
+            for offset in range(start, end):
+                count = int(self.data[offset])
+                total += count
+                if int(self.indices[offset]) == token_id:
+                    diagonal += count
+        return {
+            "rows": len(self.vocab),
+            "nnz": self.nnz,
+            "total_cooc": (total + diagonal) // 2,
+            "nbytes": self.nbytes,
+        }
+
+
+__all__ = ["BACKENDS", "CooccurrenceMatrix", "numpy_available"]
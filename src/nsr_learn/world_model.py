@@ -23,11 +23,17 @@ Inspiração: PDDL, STRIPS, Situational Calculus
 
 from __future__ import annotations
 
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Mapping, Sequence, Set, Tuple
+from itertools import count, product
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Sequence, Set, Tuple
 import heapq
+import math
+
+# Índice de fluents de um estado: predicado → tuplas de argumentos verdadeiras
+FluentIndex = Dict[str, FrozenSet[Tuple[str, ...]]]
 
 
 @dataclass(frozen=True)
@@ -102,6 +108,9 @@ class Action:
     - Precondições: o que deve ser verdade para executar
     - Efeitos positivos (add): o que se torna verdade
     - Efeitos negativos (delete): o que deixa de ser verdade
+    
+    `parameter_types` (opcional) dá o tipo de cada parâmetro, como chave de
+    `WorldModel.objects`; parâmetros sem tipo aceitam qualquer objeto.
     """
     
     name: str
@@ -110,6 +119,7 @@ class Action:
     add_effects: FrozenSet[Fluent]
     delete_effects: FrozenSet[Fluent]
     cost: float = 1.0
+    parameter_types: Tuple[str | None, ...] = ()
     
     def is_applicable(self, state: State) -> bool:
         """Verifica se a ação pode ser executada no estado."""
@@ -194,20 +204,39 @@ class WorldModel:
     """
     
     def __init__(self):
-        self.actions: Dict[str, Action] = {}
-        self.objects: Dict[str, Set[str]] = defaultdict(set)  # type → objects
+        self._actions: Dict[str, Action] = {}
+        self._objects: Dict[str, FrozenSet[str]] = {}  # type → objects
         self.learned_rules: List[TransitionRule] = []
         
         # Histórico para aprendizado
         self.transition_history: List[Tuple[State, str, State]] = []
+        
+        # Instanciações por (esquema, fluents relevantes do estado), LRU
+        self._grounding_cache: "OrderedDict[Tuple[Any, ...], List[Action]]" = OrderedDict()
+        
+        # Estatísticas da última chamada a `plan`
+        self.search_stats: Dict[str, Any] = {}
+    
+    @property
+    def actions(self) -> Mapping[str, Action]:
+        """Esquemas de ação (somente leitura: use `add_action_schema`)."""
+        return MappingProxyType(self._actions)
+    
+    @property
+    def objects(self) -> Mapping[str, FrozenSet[str]]:
+        """Objetos por tipo (somente leitura: use `add_object`)."""
+        return MappingProxyType(self._objects)
     
     def add_action_schema(self, action: Action) -> None:
         """Adiciona um esquema de ação."""
-        self.actions[action.name] = action
+        self._actions[action.name] = action
+        # Todo caminho de mutação passa por aqui: o cache de instanciações não fica obsoleto
+        self._grounding_cache.clear()
     
     def add_object(self, obj: str, obj_type: str) -> None:
         """Adiciona um objeto ao mundo."""
-        self.objects[obj_type].add(obj)
+        self._objects[obj_type] = self._objects.get(obj_type, frozenset()) | {obj}
+        self._grounding_cache.clear()
     
     def simulate(
         self,
@@ -245,14 +274,22 @@ class WorldModel:
     def get_applicable_actions(
         self,
         state: State,
+        index: FluentIndex | None = None,
     ) -> List[Action]:
-        """Retorna todas as ações aplicáveis no estado."""
+        """
+        Retorna todas as ações aplicáveis no estado.
+        
+        `index` (opcional) é o índice de fluents do estado, que o planejador
+        mantém incrementalmente com `advance_index`.
+        """
+        if index is None:
+            index = fluent_index(state)
+        
         applicable = []
         
-        for action_schema in self.actions.values():
-            # Gera todas as instanciações possíveis
-            grounded = self._ground_action(action_schema, state)
-            applicable.extend(a for a in grounded if a.is_applicable(state))
+        for action_schema in self._actions.values():
+            # Só as instanciações cujas precondições o estado satisfaz
+            applicable.extend(self._ground_action(action_schema, state, index))
         
         return applicable
     
@@ -261,48 +298,289 @@ class WorldModel:
         initial_state: State,
         goal: FrozenSet[Fluent],
         max_depth: int = 20,
+        heuristic: str = "goal_count",
+        search: str = "astar",
+        max_nodes: int | None = None,
+        beam_width: int = 16,
+        weight: float = 1.0,
     ) -> Plan | None:
         """
         Planeja uma sequência de ações para alcançar o objetivo.
         
-        Usa A* com heurística de contagem de objetivos não satisfeitos.
+        Heurísticas (`heuristic`):
+        - "goal_count": objetivos não satisfeitos (padrão)
+        - "h_max" / "h_add": custo relaxado (sem deletes) do objetivo, pelo
+          máximo / pela soma dos custos das precondições
+        - "ff": custo de um plano relaxado extraído dos suportes de h_add
+        
+        Buscas (`search`):
+        - "astar": A* (a ordem de expansão padrão)
+        - "ida": IDA*, memória linear na profundidade
+        - "beam": busca em feixe com `beam_width` estados por camada
+        
+        Em "astar" e "ida", `weight` multiplica a heurística (f = g + w·h).
+        O plano só é garantidamente ótimo com heurística admissível — das
+        disponíveis, apenas "h_max" — e w = 1 (A* reabre um estado quando o
+        alcança por caminho mais barato). "goal_count", "h_add" e "ff" podem
+        superestimar o custo restante; com elas, ou com w > 1, a busca troca
+        otimalidade por menos expansões.
+        
+        `max_nodes` limita o número de expansões (None = sem limite); ao
+        esgotá-lo a busca desiste e retorna None. Estatísticas da última
+        busca ficam em `self.search_stats`.
         """
+        if heuristic not in HEURISTICS:
+            raise ValueError(f"heurística desconhecida: {heuristic!r} (use {', '.join(HEURISTICS)})")
+        if search not in SEARCH_MODES:
+            raise ValueError(f"busca desconhecida: {search!r} (use {', '.join(SEARCH_MODES)})")
+        
+        self.search_stats = {"search": search, "heuristic": heuristic, "expanded": 0, "generated": 0}
+        
         if initial_state.satisfies(goal):
             return Plan()
         
-        # Priority queue: (custo + heurística, custo, state, actions)
-        start = (self._heuristic(initial_state, goal), 0.0, initial_state, [])
-        frontier = [start]
-        visited: Set[State] = set()
+        estimate = self._heuristic_function(initial_state, goal, heuristic)
+        if weight != 1.0 and search != "beam":
+            base = estimate
+            estimate = lambda state: weight * base(state)
+        runner = {"astar": self._astar, "ida": self._ida, "beam": self._beam}[search]
+        return runner(initial_state, goal, estimate, max_depth, max_nodes, beam_width)
+    
+    def _astar(
+        self,
+        initial_state: State,
+        goal: FrozenSet[Fluent],
+        estimate: Callable[[State], float],
+        max_depth: int,
+        max_nodes: int | None,
+        beam_width: int,
+    ) -> Plan | None:
+        """
+        A*; o caminho é reconstruído por ponteiros para o nó pai.
+        
+        Um estado já expandido volta à fronteira se for alcançado com custo
+        menor (reabertura), o que preserva a otimalidade com heurística
+        admissível mas inconsistente.
+        """
+        stats = self.search_stats
+        h0 = estimate(initial_state)
+        if h0 == math.inf:
+            return None
+        
+        # Nó i: alcançado a partir de parents[i] por via[i]
+        parents: List[int] = [-1]
+        via: List[Action | None] = [None]
+        
+        # Priority queue: (custo + heurística, heurística, desempate, custo,
+        # profundidade, state, nó, índice) — em f igual, o mais perto do objetivo
+        tie = count()
+        frontier = [(h0, h0, next(tie), 0.0, 0, initial_state, 0, fluent_index(initial_state))]
+        # Menor custo conhecido até cada estado
+        best_cost: Dict[State, float] = {initial_state: 0.0}
         
         while frontier:
-            _, cost, state, actions = heapq.heappop(frontier)
-            
-            if state in visited:
-                continue
+            _, _, _, cost, depth, state, node, index = heapq.heappop(frontier)
             
-            visited.add(state)
+            if cost > best_cost[state]:
+                continue  # entrada superada por um caminho mais barato
             
             if state.satisfies(goal):
-                return Plan(actions=actions)
+                return _extract_plan(parents, via, node)
             
-            if len(actions) >= max_depth:
+            if depth >= max_depth:
                 continue
             
-            for action in self.get_applicable_actions(state):
+            if max_nodes is not None and stats["expanded"] >= max_nodes:
+                return None
+            stats["expanded"] += 1
+            
+            for action in self.get_applicable_actions(state, index):
                 next_state = action.apply(state)
+                new_cost = cost + action.cost
                 
-                if next_state in visited:
+                if new_cost >= best_cost.get(next_state, math.inf):
                     continue
                 
-                new_cost = cost + action.cost
-                priority = new_cost + self._heuristic(next_state, goal)
-                new_actions = actions + [action]
+                h = estimate(next_state)
+                if h == math.inf:
+                    continue  # beco sem saída mesmo relaxado
                 
-                heapq.heappush(frontier, (priority, new_cost, next_state, new_actions))
+                best_cost[next_state] = new_cost
+                parents.append(node)
+                via.append(action)
+                stats["generated"] += 1
+                
+                heapq.heappush(frontier, (
+                    new_cost + h, h, next(tie), new_cost, depth + 1,
+                    next_state, len(parents) - 1, advance_index(index, action),
+                ))
         
         return None
     
+    def _ida(
+        self,
+        initial_state: State,
+        goal: FrozenSet[Fluent],
+        estimate: Callable[[State], float],
+        max_depth: int,
+        max_nodes: int | None,
+        beam_width: int,
+    ) -> Plan | None:
+        """
+        IDA*: busca em profundidade limitada por custo + heurística, com o
+        limite elevado ao menor f que o excedeu. Só o caminho atual fica em
+        memória (mais o cache de heurística).
+        """
+        stats = self.search_stats
+        bound = estimate(initial_state)
+        path_states: Set[State] = {initial_state}
+        path_actions: List[Action] = []
+        
+        def expand(state: State, index: FluentIndex, cost: float) -> float | None:
+            """None se achou o objetivo; senão o menor f acima do limite."""
+            if state.satisfies(goal):
+                return None
+            if len(path_actions) >= max_depth:
+                return math.inf
+            if max_nodes is not None and stats["expanded"] >= max_nodes:
+                return math.inf
+            stats["expanded"] += 1
+            
+            successors = []
+            for action in self.get_applicable_actions(state, index):
+                next_state = action.apply(state)
+                if next_state in path_states:
+                    continue
+                stats["generated"] += 1
+                f = cost + action.cost + estimate(next_state)
+                successors.append((f, len(successors), action, next_state))
+            successors.sort(key=lambda entry: entry[:2])
+            
+            smallest = math.inf
+            for f, _, action, next_state in successors:
+                if f > bound + _F_EPSILON:
+                    smallest = min(smallest, f)
+                    continue
+                path_states.add(next_state)
+                path_actions.append(action)
+                found = expand(next_state, advance_index(index, action), cost + action.cost)
+                if found is None:
+                    return None
+                path_actions.pop()
+                path_states.discard(next_state)
+                smallest = min(smallest, found)
+            return smallest
+        
+        while bound < math.inf:
+            found = expand(initial_state, fluent_index(initial_state), 0.0)
+            if found is None:
+                return Plan(actions=list(path_actions))
+            if max_nodes is not None and stats["expanded"] >= max_nodes:
+                return None
+            bound = found
+        
+        return None
+    
+    def _beam(
+        self,
+        initial_state: State,
+        goal: FrozenSet[Fluent],
+        estimate: Callable[[State], float],
+        max_depth: int,
+        max_nodes: int | None,
+        beam_width: int,
+    ) -> Plan | None:
+        """
+        Busca em feixe: a cada profundidade mantém só os `beam_width`
+        sucessores de menor heurística (desempate por custo). Incompleta, mas
+        com memória limitada a feixe × profundidade.
+        """
+        stats = self.search_stats
+        if estimate(initial_state) == math.inf:
+            return None
+        
+        parents: List[int] = [-1]
+        via: List[Action | None] = [None]
+        layer = [(0.0, initial_state, 0, fluent_index(initial_state))]
+        visited: Set[State] = {initial_state}
+        tie = count()
+        
+        for _ in range(max_depth):
+            candidates = []
+            
+            for cost, state, node, index in layer:
+                if max_nodes is not None and stats["expanded"] >= max_nodes:
+                    return None
+                stats["expanded"] += 1
+                
+                for action in self.get_applicable_actions(state, index):
+                    next_state = action.apply(state)
+                    if next_state in visited:
+                        continue
+                    visited.add(next_state)
+                    stats["generated"] += 1
+                    
+                    if next_state.satisfies(goal):
+                        parents.append(node)
+                        via.append(action)
+                        return _extract_plan(parents, via, len(parents) - 1)
+                    
+                    h = estimate(next_state)
+                    if h == math.inf:
+                        continue
+                    candidates.append((h, cost + action.cost, next(tie), next_state, node, action, index))
+            
+            if not candidates:
+                return None
+            
+            layer = []
+            for _, cost, _, next_state, node, action, index in heapq.nsmallest(beam_width, candidates):
+                parents.append(node)
+                via.append(action)
+                layer.append((cost, next_state, len(parents) - 1, advance_index(index, action)))
+        
+        return None
+    
+    def _heuristic_function(
+        self,
+        initial_state: State,
+        goal: FrozenSet[Fluent],
+        heuristic: str,
+    ) -> Callable[[State], float]:
+        """Heurística escolhida, memorizada por estado."""
+        if heuristic == "goal_count":
+            return lambda state: self._heuristic(state, goal)
+        
+        relaxed = RelaxedTask(self._relaxed_actions(initial_state), goal)
+        cache: Dict[State, float] = {}
+        
+        def estimate(state: State) -> float:
+            value = cache.get(state)
+            if value is None:
+                if len(cache) >= _HEURISTIC_CACHE_SIZE:
+                    cache.clear()
+                value = cache[state] = relaxed.evaluate(state, heuristic)
+            return value
+        
+        return estimate
+    
+    def _relaxed_actions(self, initial_state: State) -> List[Action]:
+        """
+        Ações instanciadas alcançáveis ignorando deletes (ponto fixo).
+        
+        Todo estado alcançável a partir de `initial_state` só tem fluents
+        desse conjunto relaxado, então as ações aplicáveis em qualquer um
+        deles estão na lista.
+        """
+        reached = set(initial_state.fluents)
+        while True:
+            actions = self.get_applicable_actions(State(frozenset(reached)))
+            size = len(reached)
+            for action in actions:
+                reached.update(action.add_effects)
+            if len(reached) == size:
+                return actions
+    
     def learn_from_observation(
         self,
         before: State,
@@ -382,34 +660,153 @@ class WorldModel:
         self,
         action: Action,
         state: State,
+        index: FluentIndex | None = None,
     ) -> List[Action]:
-        """Gera todas as instanciações de uma ação."""
+        """
+        Gera as instanciações de uma ação aplicáveis no estado.
+        
+        Em vez do produto cartesiano de todos os objetos, faz uma junção das
+        precondições sobre o índice de fluents do estado: cada precondição
+        liga (ou confere) variáveis com as tuplas verdadeiras do seu
+        predicado, da mais seletiva para a menos seletiva. Parâmetros com tipo
+        só aceitam objetos daquele tipo em `self.objects`; parâmetros fora das
+        precondições percorrem seu domínio (o tipo, ou todos os objetos
+        conhecidos e do estado). O resultado é ordenado pelos objetos e fica
+        em cache pela parte do estado que o determina (os predicados das
+        precondições), então estados que só diferem em outros fluents
+        reaproveitam a instanciação.
+        """
         if not action.parameters:
-            return [action]
+            return [action] if action.is_applicable(state) else []
         
-        # Simplificação: usa objetos de todos os tipos
-        all_objects = set()
-        for objs in self.objects.values():
-            all_objects.update(objs)
+        if index is None:
+            index = fluent_index(state)
         
-        # Extrai objetos do estado também
-        for fluent in state.fluents:
-            all_objects.update(fluent.args)
+        variables = {p for p in action.parameters if p.startswith("?")}
+        bound_in_preconditions = {
+            arg for f in action.preconditions for arg in f.args if arg in variables
+        }
+        free = [p for p in action.parameters if p not in bound_in_preconditions]
+        untyped_free = any(self._domain(action, p) is None for p in free)
         
-        if not all_objects:
-            return []
+        key = (
+            action,
+            tuple(index.get(f.predicate) for f in action.preconditions),
+            _index_objects(index) if untyped_free else None,
+        )
+        cached = self._grounding_cache.get(key)
+        if cached is not None:
+            self._grounding_cache.move_to_end(key)
+            return list(cached)
         
-        # Gera combinações
-        from itertools import product
+        grounded = [
+            action.ground(bindings)
+            for bindings in sorted(
+                self._join_preconditions(action, index, variables, free),
+                key=lambda b: tuple(b[p] for p in action.parameters),
+            )
+        ]
         
-        grounded = []
-        object_list = list(all_objects)
+        self._grounding_cache[key] = grounded
+        while len(self._grounding_cache) > _GROUNDING_CACHE_SIZE:
+            self._grounding_cache.popitem(last=False)
+        return list(grounded)
+    
+    def _join_preconditions(
+        self,
+        action: Action,
+        index: FluentIndex,
+        variables: Set[str],
+        free: Sequence[str],
+    ) -> List[Dict[str, str]]:
+        """Ligações dos parâmetros que satisfazem todas as precondições."""
+        bindings: List[Dict[str, str]] = [{}]
         
-        for combo in product(object_list, repeat=len(action.parameters)):
-            bindings = {param: obj for param, obj in zip(action.parameters, combo)}
-            grounded.append(action.ground(bindings))
+        # Mais seletivas primeiro (menos tuplas no predicado)
+        ordered = sorted(
+            action.preconditions,
+            key=lambda f: (len(index.get(f.predicate, ())), str(f)),
+        )
         
-        return grounded[:100]  # Limita para performance
+        for condition in ordered:
+            bucket = index.get(condition.predicate)
+            if not bucket:
+                return []
+            
+            arity = len(condition.args)
+            bound = [(i, a) for i, a in enumerate(condition.args) if a in variables and a in bindings[0]]
+            unbound = [(i, a) for i, a in enumerate(condition.args) if a in variables and a not in bindings[0]]
+            constants = [(i, a) for i, a in enumerate(condition.args) if a not in variables]
+            
+            candidates = [
+                args for args in bucket
+                if len(args) == arity and all(args[i] == a for i, a in constants)
+            ]
+            
+            # Junção por hash nas variáveis já ligadas
+            if bound:
+                by_key: Dict[Tuple[str, ...], List[Tuple[str, ...]]] = defaultdict(list)
+                for args in candidates:
+                    by_key[tuple(args[i] for i, _ in bound)].append(args)
+            
+            extended: List[Dict[str, str]] = []
+            for binding in bindings:
+                matches = by_key.get(tuple(binding[a] for _, a in bound), ()) if bound else candidates
+                for args in matches:
+                    new_binding = self._extend(action, binding, unbound, args)
+                    if new_binding is not None:
+                        extended.append(new_binding)
+            
+            bindings = extended
+            if not bindings:
+                return []
+        
+        # Parâmetros que nenhuma precondição restringe
+        if free:
+            domains = []
+            for param in free:
+                domain = self._domain(action, param)
+                if domain is None:
+                    domain = set().union(*self._objects.values(), _index_objects(index))
+                if not domain:
+                    return []
+                domains.append(sorted(domain))
+            
+            bindings = [
+                {**binding, **dict(zip(free, combo))}
+                for binding in bindings
+                for combo in product(*domains)
+            ]
+        
+        return bindings
+    
+    def _extend(
+        self,
+        action: Action,
+        binding: Dict[str, str],
+        unbound: Sequence[Tuple[int, str]],
+        args: Tuple[str, ...],
+    ) -> Dict[str, str] | None:
+        """Estende uma ligação com os argumentos de um fluent (tipos conferidos)."""
+        new_binding = dict(binding)
+        for i, var in unbound:
+            value = args[i]
+            if new_binding.get(var, value) != value:
+                return None  # mesma variável duas vezes na precondição
+            domain = self._domain(action, var)
+            if domain is not None and value not in domain:
+                return None
+            new_binding[var] = value
+        return new_binding
+    
+    def _domain(self, action: Action, param: str) -> FrozenSet[str] | None:
+        """Objetos aceitos por um parâmetro tipado (None se não tiver tipo)."""
+        if not action.parameter_types:
+            return None
+        obj_type = action.parameter_types[action.parameters.index(param)]
+        if obj_type is None:
+            return None
+        return self._objects.get(obj_type, frozenset())
     
     def _heuristic(self, state: State, goal: FrozenSet[Fluent]) -> float:
         """Heurística: conta objetivos não satisfeitos."""
@@ -417,6 +814,257 @@ class WorldModel:
         return float(unsatisfied)
 
 
+_GROUNDING_CACHE_SIZE = 4096
+_HEURISTIC_CACHE_SIZE = 200_000
+
+# Tolerância ao comparar f com o limite do IDA* (somas de custos float)
+_F_EPSILON = 1e-9
+
+HEURISTICS = ("goal_count", "h_max", "h_add", "ff")
+SEARCH_MODES = ("astar", "ida", "beam")
+
+
+class RelaxedTask:
+    """
+    Problema relaxado (sem efeitos delete) para heurísticas h_max/h_add/FF.
+    
+    Fluents e ações instanciadas são internados uma vez. Para cada agregação
+    (máximo ou soma) a tarefa guarda o custo de todos os fluents no último
+    estado avaliado e o melhor suporte de cada um; avaliar outro estado só
+    atualiza o que a diferença entre os dois muda (em A*, os efeitos da ação
+    aplicada):
+    
+    - fluents adicionados passam a custo 0 e as reduções se propagam em
+      ordem de custo (estilo Dijkstra);
+    - fluents removidos, e os que dependiam deles pelos suportes, perdem o
+      custo e são recalculados a partir dos demais.
+    
+    O resultado é o mesmo ponto fixo de uma propagação completa. FF extrai o
+    plano relaxado dos custos mantidos para h_add.
+    """
+    
+    def __init__(self, actions: Sequence[Action], goal: FrozenSet[Fluent]):
+        self.ids: Dict[Fluent, int] = {}
+        self.actions = list(actions)
+        self.pre = [[self._intern(f) for f in a.preconditions] for a in self.actions]
+        self.add = [[self._intern(f) for f in a.add_effects] for a in self.actions]
+        self.cost = [a.cost for a in self.actions]
+        self.goal = sorted({self._intern(g) for g in goal})
+        
+        self.pre_of: List[List[int]] = [[] for _ in self.ids]
+        self.add_of: List[List[int]] = [[] for _ in self.ids]
+        for a, pre in enumerate(self.pre):
+            for f in pre:
+                self.pre_of[f].append(a)
+        for a, add in enumerate(self.add):
+            for f in add:
+                self.add_of[f].append(a)
+        # (ação, custo, precondições, efeitos) das ações que usam cada fluent
+        self.triggers = [
+            [(a, self.cost[a], self.pre[a], self.add[a]) for a in actions_of]
+            for actions_of in self.pre_of
+        ]
+        
+        # Por agregação (True = máximo): [fluents do estado, custos, suportes]
+        self._views: Dict[bool, List[Any]] = {}
+    
+    def _intern(self, fluent: Fluent) -> int:
+        return self.ids.setdefault(fluent, len(self.ids))
+    
+    def evaluate(self, state: State, heuristic: str) -> float:
+        """Valor da heurística no estado (`math.inf` se o objetivo for inalcançável)."""
+        use_max = heuristic == "h_max"
+        cost = self._costs(state.fluents, use_max)
+        
+        goal_costs = [cost[g] for g in self.goal]
+        if any(c == math.inf for c in goal_costs):
+            return math.inf
+        if use_max:
+            return max(goal_costs, default=0.0)
+        if heuristic == "h_add":
+            return sum(goal_costs)
+        
+        # FF: plano relaxado pelo primeiro suporte de menor custo (de h_add)
+        # de cada fluent — escolhido pelos custos, não pela ordem em que as
+        # atualizações incrementais os encontraram
+        lookup = cost.__getitem__
+        achiever_cost = lambda a: self.cost[a] + sum(map(lookup, self.pre[a]))
+        chosen: Set[int] = set()
+        seen: Set[int] = set()
+        stack = [g for g in self.goal if cost[g] > 0.0]
+        while stack:
+            f = stack.pop()
+            if f in seen:
+                continue
+            seen.add(f)
+            a = min(self.add_of[f], key=achiever_cost)
+            if a not in chosen:
+                chosen.add(a)
+                stack.extend(g for g in self.pre[a] if cost[g] > 0.0)
+        return sum(self.cost[a] for a in chosen)
+    
+    def _costs(self, fluents: FrozenSet[Fluent], use_max: bool) -> List[float]:
+        """Custos de todos os fluents no estado `fluents`."""
+        inf = math.inf
+        view = self._views.get(use_max)
+        if view is None:
+            # Estado vazio: só as ações sem precondição alcançam algo
+            view = self._views[use_max] = [frozenset(), [inf] * len(self.ids), [-1] * len(self.ids)]
+            self._propagate(view[1], view[2], [], range(len(self.ids)), use_max)
+        current, cost, supporter = view
+        if fluents is current:
+            return cost
+        
+        # Diferença entre conjuntos de fluents (hashes já guardados nos
+        # conjuntos); só ela é traduzida para ids
+        ids = self.ids
+        deleted = sorted(ids[f] for f in current - fluents if f in ids)
+        added = sorted(ids[f] for f in fluents - current if f in ids)
+        view[0] = fluents
+        
+        for f in added:
+            cost[f] = 0.0
+            supporter[f] = -1
+        
+        # Removidos e, pelos suportes, o que dependia deles — em ordem de
+        # custo, para que um fluent com outro suporte de mesmo custo (e
+        # precondições já decididas) o mantenha sem entrar no recálculo
+        add = self.add
+        invalid: Set[int] = set()
+        queue = [(0.0, f) for f in deleted]
+        while queue:
+            value, g = heapq.heappop(queue)
+            if g in invalid:
+                continue
+            if value > 0.0:
+                alternative = self._alternative(g, value, cost, supporter[g], use_max)
+                if alternative >= 0:
+                    supporter[g] = alternative
+                    continue
+            invalid.add(g)
+            cost[g] = inf
+            for a in self.pre_of[g]:
+                for h in add[a]:
+                    if supporter[h] == a:
+                        heapq.heappush(queue, (cost[h], h))
+        for f in invalid:
+            supporter[f] = -1
+        
+        self._propagate(cost, supporter, [(0.0, f) for f in added], invalid, use_max)
+        return cost
+    
+    def _alternative(self, g: int, value: float, cost: List[float], current: int, use_max: bool) -> int:
+        """
+        Outro suporte de `g` que ainda o alcança com custo `value`, ou -1.
+        
+        Inválidos já estão em custo infinito; as precondições precisam custar
+        menos que `value` (com custo de ação positivo, a soma ou o máximo já
+        garante isso), pois só essas já foram decididas.
+        """
+        aggregate = max if use_max else sum
+        lookup = cost.__getitem__
+        for a in self.add_of[g]:
+            pre = self.pre[a]
+            if a == current or not pre:
+                continue
+            reached = self.cost[a] + aggregate(map(lookup, pre))
+            if reached <= value and (self.cost[a] > 0.0 or max(map(lookup, pre)) < value):
+                return a
+        return -1
+    
+    def _propagate(
+        self,
+        cost: List[float],
+        supporter: List[int],
+        heap: List[Tuple[float, int]],
+        invalid: Iterable[int],
+        use_max: bool,
+    ) -> None:
+        """
+        Recalcula os fluents `invalid` (custo infinito) a partir dos demais e
+        propaga as reduções de custo da fila `heap` até o ponto fixo.
+        """
+        # Custo relaxado de alcançar e aplicar a ação: custo + máximo ou soma
+        # dos custos das precondições (laço em C via `map`)
+        aggregate = max if use_max else sum
+        lookup = cost.__getitem__
+        pre = self.pre
+        action_cost = self.cost
+        
+        for f in invalid:
+            best, best_action = math.inf, -1
+            for a in self.add_of[f]:
+                value = action_cost[a] + (aggregate(map(lookup, pre[a])) if pre[a] else 0.0)
+                if value < best:
+                    best, best_action = value, a
+            if best_action >= 0:
+                cost[f] = best
+                supporter[f] = best_action
+                heap.append((best, f))
+        heapq.heapify(heap)
+        
+        triggers = self.triggers
+        heappush, heappop = heapq.heappush, heapq.heappop
+        while heap:
+            value, f = heappop(heap)
+            if value > cost[f]:
+                continue
+            for a, base, needs, effects in triggers[f]:
+                reached = base + aggregate(map(lookup, needs))
+                for g in effects:
+                    if reached < cost[g]:
+                        cost[g] = reached
+                        supporter[g] = a
+                        heappush(heap, (reached, g))
+
+
+def _extract_plan(parents: Sequence[int], via: Sequence[Action | None], node: int) -> Plan:
+    """Refaz o plano seguindo os ponteiros para o pai a partir de `node`."""
+    actions: List[Action] = []
+    while parents[node] >= 0:
+        actions.append(via[node])
+        node = parents[node]
+    actions.reverse()
+    return Plan(actions=actions)
+
+
+def fluent_index(state: State) -> FluentIndex:
+    """Agrupa os fluents do estado por predicado."""
+    grouped: Dict[str, Set[Tuple[str, ...]]] = defaultdict(set)
+    for fluent in state.fluents:
+        grouped[fluent.predicate].add(fluent.args)
+    return {predicate: frozenset(args) for predicate, args in grouped.items()}
+
+
+def advance_index(index: FluentIndex, action: Action) -> FluentIndex:
+    """
+    Índice do estado após `action`, a partir do índice do estado anterior.
+    
+    Só os predicados tocados pelos efeitos são refeitos; os demais conjuntos
+    são compartilhados (e continuam servindo de chave do cache de
+    instanciação).
+    """
+    touched: Dict[str, Tuple[Set[Tuple[str, ...]], Set[Tuple[str, ...]]]] = {}
+    for fluent in action.delete_effects:
+        touched.setdefault(fluent.predicate, (set(), set()))[0].add(fluent.args)
+    for fluent in action.add_effects:
+        touched.setdefault(fluent.predicate, (set(), set()))[1].add(fluent.args)
+    
+    new_index = dict(index)
+    for predicate, (deleted, added) in touched.items():
+        bucket = (index.get(predicate, frozenset()) - deleted) | added
+        if bucket:
+            new_index[predicate] = frozenset(bucket)
+        else:
+            new_index.pop(predicate, None)
+    return new_index
+
+
+def _index_objects(index: FluentIndex) -> FrozenSet[str]:
+    """Objetos que aparecem em algum fluent do índice."""
+    return frozenset(arg for bucket in index.values() for args in bucket for arg in args)
+
+
 class MentalSimulator:
     """
     Simulador mental para "imaginar" cenários.
@@ -463,11 +1111,22 @@ class MentalSimulator:
         from_state: State,
         goal: FrozenSet[Fluent],
         max_steps: int = 10,
+        heuristic: str = "goal_count",
+        search: str = "astar",
+        max_nodes: int | None = None,
     ) -> Dict[str, Any]:
         """
         Verifica se é possível alcançar um objetivo.
+        
+        `heuristic`, `search` e `max_nodes` são repassados a `WorldModel.plan`.
         """
-        plan = self.model.plan(from_state, goal, max_depth=max_steps)
+        plan = self.model.plan(
+            from_state, goal,
+            max_depth=max_steps,
+            heuristic=heuristic,
+            search=search,
+            max_nodes=max_nodes,
+        )
         
         if plan is None:
             return {
@@ -601,6 +1260,12 @@ def create_blocks_world() -> WorldModel:
 
 
 __all__ = [
+    "HEURISTICS",
+    "SEARCH_MODES",
+    "RelaxedTask",
+    "FluentIndex",
+    "advance_index",
+    "fluent_index",
     "Fluent",
     "State",
     "Action",
@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from nsr.async_service import AsyncConversationService, ServiceClosed, _Job
+
+
+class _Recorder:
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.seen = []
+        self.active = 0
+
+
+def _slow_echo(state, text):
+    state.active += 1
+    assert state.active == 1, "sessão processada por duas threads ao mesmo tempo"
+    time.sleep(0.01)
+    state.seen.append(text)
+    state.active -= 1
+    return f"{state.session_id}:{text}"
+
+
+def test_per_session_ordering_and_isolation():
+    async def scenario():
+        async with AsyncConversationService(_Recorder, _slow_echo, max_workers=4) as service:
+            calls = [service.process(f"s{idx % 3}", f"m{idx}") for idx in range(12)]
+            results = await asyncio.gather(*calls)
+            states = {sid: service.session_state(sid) for sid in service.session_ids}
+            return results, states, service.stats
+
+    results, states, stats = asyncio.run(scenario())
+    assert results[0] == "s0:m0"
+    assert states["s0"].seen == ["m0", "m3", "m6", "m9"]
+    assert states["s1"].seen == ["m1", "m4", "m7", "m10"]
+    assert stats.completed == 12
+    assert stats.sessions_created == 3
+
+
+def test_timeout_drops_requests_that_never_started():
+    gate = threading.Event()
+
+    def blocking(state, text):
+        if text == "block":
+            gate.wait(2)
+        state.seen.append(text)
+        return text
+
+    async def scenario():
+        service = AsyncConversationService(_Recorder, blocking, max_workers=1)
+        first = asyncio.create_task(service.process("a", "block"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(asyncio.TimeoutError):
+            await service.process("a", "late", timeout=0.05)
+        gate.set()
+        assert await first == "block"
+        assert await service.process("a", "next") == "next"
+        seen = list(service.session_state("a").seen)
+        await service.aclose()
+        with pytest.raises(ServiceClosed):
+            await service.process("a", "closed")
+        return seen, service.stats
+
+    seen, stats = asyncio.run(scenario())
+    assert seen == ["block", "next"]
+    assert stats.timeouts == 1
+    assert stats.dropped_expired == 1
+
+
+def test_handler_errors_propagate_to_caller():
+    def failing(state, text):
+        raise ValueError(text)
+
+    async def scenario():
+        async with AsyncConversationService(_Recorder, failing) as service:
+            with pytest.raises(ValueError):
+                await service.process("x", "boom")
+            return service.stats.failed
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_default_service_runs_enhanced_conversation():
+    async def scenario():
+        async with AsyncConversationService(max_workers=2) as service:
+            (reply_a, turn_a), (reply_b, _) = await asyncio.gather(
+                service.process("alice", "O carro tem roda"),
+                service.process("bob", "2+2"),
+            )
+            alice = service.session_state("alice")
+            bob = service.session_state("bob")
+            return reply_a, turn_a, reply_b, alice, bob
+
+    reply_a, turn_a, reply_b, alice, bob = asyncio.run(scenario())
+    assert reply_a and reply_b
+    assert turn_a.user_input == "O carro tem roda"
+    assert alice.session is not bob.session
+    assert len(alice.context.turns) == 1
+    assert len(bob.context.turns) == 1
+
+
+def test_meta_runtime_sessions_are_isolated():
+    async def scenario():
+        async with AsyncConversationService.for_meta_runtime(max_workers=2) as service:
+            await asyncio.gather(service.process("a", "oi"), service.process("b", "oi"))
+            await service.process("a", "o carro bateu no muro")
+            return (
+                service.session_state("a").state.metrics.total_requests,
+                service.session_state("b").state.metrics.total_requests,
+            )
+
+    assert asyncio.run(scenario()) == (2, 1)
+
+
+def test_idle_sessions_release_slots_and_keep_bounded_state():
+    async def scenario():
+        async with AsyncConversationService(_Recorder, _slow_echo, max_workers=2, max_idle_sessions=2) as service:
+            await service.process("a", "1")
+            await asyncio.sleep(0)
+            assert service.active_session_ids == ()
+            # O estado sobrevive à liberação do slot
+            await service.process("a", "2")
+            assert service.session_state("a").seen == ["1", "2"]
+            for sid in ("b", "c", "d"):
+                await service.process(sid, "x")
+            await asyncio.sleep(0)
+            return service.session_ids, service.active_session_ids, service.stats
+
+    ids, active, stats = asyncio.run(scenario())
+    assert ids == ("c", "d")
+    assert active == ()
+    assert stats.sessions_created == 4
+    assert stats.sessions_evicted == 2
+
+
+def test_expired_job_fails_with_timeout_not_cancellation():
+    gate = threading.Event()
+
+    def blocking(state, text):
+        if text == "block":
+            gate.wait(2)
+        return text
+
+    async def scenario():
+        async with AsyncConversationService(_Recorder, blocking, max_workers=1) as service:
+            first = asyncio.create_task(service.process("a", "block"))
+            await asyncio.sleep(0.01)
+            loop = asyncio.get_running_loop()
+            slot = service._slots["a"]
+            late = loop.create_future()
+            slot.pending += 1
+            await slot.queue.put(_Job(text="late", future=late, deadline=loop.time()))
+            gate.set()
+            await first
+            with pytest.raises(asyncio.TimeoutError):
+                await late
+            return service.stats.dropped_expired
+
+    assert asyncio.run(scenario()) == 1
@@ -1,3 +1,5 @@
+import pytest
+
 from nsr.bayes_engine import BayesNetwork
 
 
@@ -22,3 +24,84 @@ def test_posterior_with_evidence():
     posterior = network.posterior("Traffic", {"Rain": "yes"})
     assert posterior["jam"] == 0.7
     assert posterior["clear"] == 0.3
+
+
+def build_diamond_network() -> BayesNetwork:
+    network = BayesNetwork()
+    network.add_variable("Cloudy", values=("yes", "no"))
+    network.add_variable("Sprinkler", values=("on", "off"), parents=("Cloudy",))
+    network.add_variable("Rain", values=("yes", "no"), parents=("Cloudy",))
+    network.add_variable("Wet", values=("yes", "no"), parents=("Sprinkler", "Rain"))
+    network.set_distribution("Cloudy", distribution={"yes": 0.5, "no": 0.5})
+    network.set_distribution("Sprinkler", given={"Cloudy": "yes"}, distribution={"on": 0.1, "off": 0.9})
+    network.set_distribution("Sprinkler", given={"Cloudy": "no"}, distribution={"on": 0.5, "off": 0.5})
+    network.set_distribution("Rain", given={"Cloudy": "yes"}, distribution={"yes": 0.8, "no": 0.2})
+    network.set_distribution("Rain", given={"Cloudy": "no"}, distribution={"yes": 0.2, "no": 0.8})
+    for sprinkler, rain, wet in (("on", "yes", 0.99), ("on", "no", 0.9), ("off", "yes", 0.9), ("off", "no", 0.0)):
+        network.set_distribution(
+            "Wet",
+            given={"Sprinkler": sprinkler, "Rain": rain},
+            distribution={"yes": wet, "no": 1.0 - wet},
+        )
+    return network
+
+
+def test_elimination_matches_enumeration():
+    network = build_diamond_network()
+    queries = [
+        ("Rain", {"Wet": "yes"}),
+        ("Cloudy", {"Wet": "yes", "Sprinkler": "off"}),
+        ("Sprinkler", {}),
+        ("Wet", {"Cloudy": "no"}),
+        ("Rain", {"Rain": "no"}),
+    ]
+    for variable, evidence in queries:
+        assert network.posterior(variable, evidence) == network.posterior(variable, evidence, method="enumeration")
+    assert build_diamond_network().digest() == network.digest()
+
+
+def test_elimination_reports_missing_cpt_entry():
+    network = build_simple_network()
+    network.add_variable("Accident", values=("yes", "no"), parents=("Traffic",))
+    network.set_distribution("Accident", given={"Traffic": "jam"}, distribution={"yes": 0.3, "no": 0.7})
+    assert network.posterior("Accident", {"Traffic": "jam"}) == {"yes": 0.3, "no": 0.7}
+    with pytest.raises(ValueError, match="Missing CPT entry"):
+        network.posterior("Accident", {})
+
+
+def test_junction_tree_marginals_match_posteriors():
+    network = build_diamond_network()
+    evidence = {"Wet": "yes"}
+    marginals = network.marginals(evidence)
+    assert list(marginals) == ["Cloudy", "Sprinkler", "Rain", "Wet"]
+    assert marginals["Wet"] == {"yes": 1.0, "no": 0.0}
+    for variable in ("Cloudy", "Sprinkler", "Rain"):
+        expected = network.posterior(variable, evidence, method="enumeration")
+        assert marginals[variable] == expected
+        assert network.posterior(variable, evidence, method="junction_tree") == expected
+
+
+def test_compiled_cache_is_thread_safe(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    import nsr.bayes_engine as bayes_engine
+
+    # Cache minúsculo: força despejos concorrentes entre redes distintas
+    monkeypatch.setattr(bayes_engine, "_COMPILED_CACHE_SIZE", 2)
+    networks = []
+    for index in range(8):
+        network = build_simple_network()
+        prior = (index + 1) / 10
+        network.set_distribution("Rain", distribution={"yes": prior, "no": 1 - prior})
+        networks.append(network)
+    expected = [network.posterior("Traffic", {"Rain": "yes"}, method="enumeration") for network in networks]
+
+    def query(position: int):
+        network = networks[position % len(networks)]
+        return network.posterior("Traffic", {"Rain": "yes"}), network.marginals({"Traffic": "jam"})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(query, range(400)))
+    for position, (posterior, _) in enumerate(results):
+        assert posterior == expected[position % len(networks)]
+    assert len(bayes_engine._COMPILED_CACHE) <= 2
@@ -1,3 +1,5 @@
+import pytest
+
 from nsr.factor_graph_engine import FactorGraph
 
 
@@ -38,3 +40,25 @@ def test_factor_graph_belief_propagation():
     assert "Sprinkler" in marginals
     assert abs(sum(marginals["Rain"].values()) - 1.0) < 1e-6
     assert abs(sum(marginals["Sprinkler"].values()) - 1.0) < 1e-6
+
+
+def test_residual_schedule_matches_exact_marginals_on_tree():
+    graph = build_simple_graph()
+    residual = graph.belief_propagation(tolerance=1e-12)
+    assert graph.bp_stats["converged"]
+    flooding = graph.belief_propagation(schedule="flooding", tolerance=1e-12)
+    # P(Sprinkler=on) = 0.2 * 0.1 + 0.8 * 0.5
+    assert abs(residual["Sprinkler"]["on"] - 0.42) < 1e-9
+    assert abs(residual["Rain"]["yes"] - 0.2) < 1e-9
+    for variable, distribution in flooding.items():
+        for value, prob in distribution.items():
+            assert abs(residual[variable][value] - prob) < 1e-9
+
+
+def test_belief_propagation_is_deterministic_with_damping():
+    graph = build_simple_graph()
+    first = graph.belief_propagation(damping=0.5, backend="python")
+    second = build_simple_graph().belief_propagation(damping=0.5, backend="python")
+    assert first == second
+    with pytest.raises(ValueError):
+        graph.belief_propagation(schedule="random")
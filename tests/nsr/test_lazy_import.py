@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+
+import nsr
+
+
+def test_import_nsr_does_not_load_engines():
+    code = (
+        "import sys, nsr;"
+        "loaded = sorted(name for name in sys.modules if name.startswith('nsr.'));"
+        "print(','.join(loaded))"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)
+    assert proc.stdout.strip() == ""
+
+
+def test_public_names_resolve_lazily():
+    for name in nsr.__all__:
+        assert getattr(nsr, name) is not None
+    assert nsr.logic_route.__name__ == "maybe_route_logic"
+    assert "BayesNetwork" in dir(nsr)
+
+
+def test_unknown_attribute_raises():
+    try:
+        nsr.does_not_exist
+    except AttributeError as exc:
+        assert "does_not_exist" in str(exc)
+    else:  # pragma: no cover
+        raise AssertionError("expected AttributeError")
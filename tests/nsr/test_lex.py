@@ -2,7 +2,15 @@ import json
 
 import pytest
 
-from nsr.lex import compose_lexicon, load_lexicon_file
+from nsr.lex import (
+    DEFAULT_COMPILED_LEXICON,
+    compile_lexicon,
+    compiled_lexicon_for,
+    compose_lexicon,
+    load_lexicon_file,
+    tokenize,
+)
+from nsr.state import Lexicon
 
 
 def test_compose_lexicon_merges_language_packs():
@@ -32,3 +40,41 @@ def test_load_lexicon_file_builds_custom_pack(tmp_path):
 def test_compose_lexicon_raises_for_unknown_pack():
     with pytest.raises(ValueError):
         compose_lexicon(("xx",))
+
+
+SAMPLE_TEXTS = (
+    "O automóvel anda rapidamente com quatro rodas e tem motor",
+    "The car has a wheel and moves slowly with the driver",
+    "El coche tiene una rueda y se mueve lentamente",
+    "La voiture a une roue et avance rapidement avec le conducteur",
+    "La macchina ha una ruota e cammina lentamente con gli amici",
+)
+
+
+def test_compiled_lexicon_matches_dict_lookups():
+    for codes in (("pt",), ("en", "es"), ("pt", "en", "es", "fr", "it")):
+        lexicon = compose_lexicon(codes)
+        compiled = compile_lexicon(lexicon)
+        for text in SAMPLE_TEXTS:
+            assert tokenize(text, compiled) == tokenize(text, lexicon)
+
+
+def test_compiled_lexicon_is_cached_per_language_combination():
+    assert compiled_lexicon_for(("PT", "en")) is compiled_lexicon_for(["pt", "en"])
+    assert compiled_lexicon_for(("pt", "en", "es", "fr", "it")) is DEFAULT_COMPILED_LEXICON
+    with pytest.raises(TypeError):
+        DEFAULT_COMPILED_LEXICON.entries["carro"] = ("x", "ENTITY", None, False)
+
+
+def test_compiled_lexicon_recognizes_multiword_expressions():
+    lexicon = Lexicon(
+        synonyms={"carro de corrida": "bolide", "carro": "carro"},
+        rel_words={"faz parte de": "PART_OF"},
+    )
+    tokens = tokenize("O Carro de Corrida faz parte de equipe", compile_lexicon(lexicon))
+    assert [(tok.lemma, tok.tag, tok.payload) for tok in tokens] == [
+        ("bolide", "ENTITY", None),
+        ("faz parte de", "RELWORD", "PART_OF"),
+        ("equipe", "ENTITY", None),
+    ]
+    assert tokens[0].surface == "Carro de Corrida"
@@ -1,3 +1,5 @@
+import math
+
 from nsr.markov_engine import MarkovModel
 
 
@@ -33,3 +35,31 @@ def test_forward_with_observations():
     rain_prob = final_distribution["Rain"]
     dry_prob = final_distribution["Dry"]
     assert round(rain_prob + dry_prob, 6) == 1.0
+
+
+def test_forward_likelihood_matches_log_space_and_batch():
+    model = build_chain()
+    observations = ["umbrella", "no", "umbrella"]
+    _, _, likelihood = model.forward(observations)
+    log_likelihood = model.log_likelihood(observations)
+    assert abs(likelihood - math.exp(log_likelihood)) < 1e-6
+    # P(umbrella) no primeiro passo: prior = (0.5, 0.5)
+    assert abs(model.log_likelihood(["umbrella"]) - math.log(0.5 * 0.9 + 0.5 * 0.2)) < 1e-9
+    long_sequence = ["umbrella", "no"] * 2000
+    assert model.forward(long_sequence)[2] == 0.0
+    assert math.isfinite(model.log_likelihood(long_sequence))
+    batch = model.batch_log_likelihood([observations, ["umbrella"], []])
+    assert batch == (log_likelihood, model.log_likelihood(["umbrella"]), 0.0)
+
+
+def test_viterbi_and_smoothing():
+    model = build_chain()
+    path, score = model.viterbi(["umbrella", "umbrella", "no", "no"])
+    assert path == ("Rain", "Rain", "Dry", "Dry")
+    assert score < 0.0
+    smoothed = model.smooth(["umbrella", "umbrella", "no"])
+    assert len(smoothed) == 3
+    for distribution in smoothed:
+        assert round(sum(distribution.values()), 5) == 1.0
+    # A última suavizada coincide com a filtrada do forward
+    assert smoothed[-1] == model.forward(["umbrella", "umbrella", "no"])[0]
@@ -0,0 +1,44 @@
+"""
+Testes para o sistema de planejamento.
+"""
+
+from liu import entity, relation, struct
+from nsr.planning_system import Action, PlanningSystem
+
+
+def _corridor_system() -> PlanningSystem:
+    """Corredor r0..r5 com atalho caro de r0 para r4."""
+    rooms = [entity(f"r{i}") for i in range(6)]
+    system = PlanningSystem()
+    for i in range(5):
+        system.add_action(Action(f"go{i}", (relation("AT", rooms[i]),), (relation("AT", rooms[i + 1]),)))
+        system.add_action(Action(f"back{i}", (relation("AT", rooms[i + 1]),), (relation("AT", rooms[i]),), cost=0.5))
+    system.add_action(Action("jump", (relation("AT", rooms[0]),), (relation("AT", rooms[4]),), cost=3.5))
+    return system
+
+
+def test_plan_finds_cheapest_sequence():
+    """Testa que o A* retorna o plano de menor custo."""
+    system = _corridor_system()
+    start = struct(here=relation("AT", entity("r0")))
+    goal = relation("AT", entity("r5"))
+
+    plan = system.plan(start, goal)
+
+    assert plan is not None
+    assert [action.name for action in plan.actions] == ["jump", "go4"]
+    assert plan.cost == 4.5
+    assert system.search_stats["expanded"] > 0
+    assert system.search_stats["generated"] >= system.search_stats["expanded"]
+
+
+def test_plan_is_deterministic_and_respects_depth():
+    """Testa determinismo da busca e o limite de profundidade."""
+    start = struct(here=relation("AT", entity("r0")))
+    goal = relation("AT", entity("r5"))
+
+    first = _corridor_system().plan(start, goal)
+    second = _corridor_system().plan(start, goal)
+
+    assert first == second
+    assert _corridor_system().plan(start, goal, max_depth=1) is None
@@ -22,3 +22,44 @@ def test_factor_polynomial_with_zero_leading_coeffs():
     assert result.degree == 1
     assert len(result.factors) == 1
     assert result.factors[0][1] == 4.0
+
+
+def test_factor_polynomial_multiplicity_and_zero_roots():
+    # x^2 (x-1)^2 (2x+3) = 2x^5 - x^4 - 4x^3 + 3x^2
+    result = factor_polynomial({"coefficients": [2, -1, -4, 3, 0, 0]})
+    assert [root for _, root in result.factors] == [-1.5, 0.0, 0.0, 1.0, 1.0]
+    assert result.residual == 2.0  # sobra o coeficiente líder 2
+
+
+def test_factor_polynomial_rational_coefficients():
+    # (x - 1)(x - 1/2) com coeficientes não inteiros
+    result = factor_polynomial({"coefficients": [1, -1.5, 0.5]})
+    assert [root for _, root in result.factors] == [0.5, 1.0]
+    assert result.residual == 0.0
+
+
+def test_factor_polynomial_large_constant():
+    coefficients = [1]
+    for root in (123457, -98765, 99991, 3, 7, -11, 13, 17, -19, 23):
+        coefficients = [a - root * b for a, b in zip(coefficients + [0], [0] + coefficients)]
+    coefficients = [a + b for a, b in zip(coefficients + [0, 0], [0, 0] + coefficients)]  # * (x^2 + 1)
+    result = factor_polynomial({"coefficients": coefficients})
+    assert result.degree == 12
+    assert [root for _, root in result.factors] == [-98765.0, -19.0, -11.0, 3.0, 7.0, 13.0, 17.0, 23.0, 99991.0, 123457.0]
+    assert result.residual == 2.0  # sobra x^2 + 1
+
+
+def test_factor_polynomial_hard_constant_skips_full_factorization():
+    # constante = produto de primos ~10^18, muito acima da cota das raízes
+    a, b = 10**18 + 3, 10**18 + 9
+    result = factor_polynomial({"coefficients": [1, 0, 0, 0, 0, -(a * b * a)]})
+    assert result.factors == ()
+    # (3x - a·b)(x^4 + 5): raiz racional com constante difícil de fatorar
+    result = factor_polynomial({"coefficients": [3, -a * b, 0, 0, 15, -5 * a * b]})
+    assert [root for _, root in result.factors] == [a * b / 3]
+
+
+def test_factor_polynomial_small_prime_constant():
+    # (x - 41)(x^3 + 2): 41 coincide com uma base do Miller-Rabin
+    result = factor_polynomial({"coefficients": [1, -41, 0, 2, -82]})
+    assert [root for _, root in result.factors] == [41.0]
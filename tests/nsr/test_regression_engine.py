@@ -1,4 +1,9 @@
-from nsr.regression_engine import solve_linear_regression
+import json
+import random
+
+import pytest
+
+from nsr.regression_engine import solve_linear_regression, stream_linear_regression
 
 
 def test_simple_regression_two_features():
@@ -37,3 +42,72 @@ def test_regression_without_intercept():
     coeff = dict(result.coefficients)["time"]
     assert round(coeff, 4) == 2.0
     assert result.mse == 0.0
+
+
+def _line_payload():
+    return {
+        "features": ["a", "b"],
+        "target": "y",
+        "data": [{"a": i, "b": (i * 7) % 5, "y": 1.5 + 2.0 * i - 0.5 * ((i * 7) % 5)} for i in range(12)],
+    }
+
+
+def test_qr_and_cholesky_agree():
+    payload = _line_payload()
+    qr = solve_linear_regression({**payload, "solver": "qr"})
+    cholesky = solve_linear_regression({**payload, "solver": "cholesky"})
+    for (_, expected), (_, actual) in zip(qr.coefficients, cholesky.coefficients):
+        assert abs(expected - actual) < 1e-9
+    assert round(qr.intercept, 6) == 1.5
+    assert (qr.r_squared, qr.mse, qr.residual_sum) == (cholesky.r_squared, cholesky.mse, cholesky.residual_sum)
+
+
+def test_default_solver_is_normal_equations_and_others_stay_within_tolerance():
+    rng = random.Random(48)
+    for _ in range(50):
+        features = [f"x{i}" for i in range(rng.randint(1, 5))]
+        data = []
+        for _ in range(rng.randint(len(features) + 2, 40)):
+            row = {name: rng.uniform(-100, 100) for name in features}
+            row["y"] = sum(row.values()) * rng.uniform(0.5, 1.5) + rng.gauss(0, 5)
+            data.append(row)
+        payload = {"features": features, "target": "y", "data": data}
+        default = solve_linear_regression(payload)
+        assert default == solve_linear_regression({**payload, "solver": "normal"})
+        for solver in ("qr", "cholesky"):
+            other = solve_linear_regression({**payload, "solver": solver})
+            pairs = [(default.intercept, other.intercept)]
+            pairs += [(left, right) for (_, left), (_, right) in zip(default.coefficients, other.coefficients)]
+            for left, right in pairs:
+                assert abs(left - right) <= 1e-9 * max(1.0, abs(left))
+
+
+def test_ridge_handles_collinear_features():
+    payload = {
+        "features": ["a", "b"],
+        "target": "y",
+        "data": [{"a": i, "b": 2 * i, "y": 3 * i + 1} for i in range(10)],
+    }
+    with pytest.raises(ValueError):
+        solve_linear_regression(payload)
+    result = solve_linear_regression({**payload, "ridge": 0.1})
+    coeff = dict(result.coefficients)
+    # Ridge reparte o peso na direção colinear: a + 2b ≈ 3
+    assert abs(coeff["a"] + 2 * coeff["b"] - 3.0) < 1e-2
+    assert abs(coeff["b"] - 2 * coeff["a"]) < 1e-6
+
+
+def test_streaming_matches_in_memory(tmp_path):
+    payload = _line_payload()
+    expected = solve_linear_regression(payload)
+    csv_path = tmp_path / "data.csv"
+    lines = ["a,b,y"] + [f"{row['a']},{row['b']},{row['y']}" for row in payload["data"]]
+    csv_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    jsonl_path = tmp_path / "data.jsonl"
+    jsonl_path.write_text("\n".join(json.dumps(row) for row in payload["data"]) + "\n", encoding="utf-8")
+    for source in (csv_path, jsonl_path):
+        result = stream_linear_regression(source, features=["a", "b"], target="y")
+        assert result.sample_size == expected.sample_size
+        assert (result.r_squared, result.mse) == (expected.r_squared, expected.mse)
+        for (_, left), (_, right) in zip(result.coefficients, expected.coefficients):
+            assert abs(left - right) < 1e-9
@@ -0,0 +1,91 @@
+import json
+
+import nsr.cli as nsr_cli
+from nsr import SessionCtx, run_text_full
+from nsr.result_cache import OutcomeCache, outcome_cache_key
+
+
+def _session(cache=None):
+    session = SessionCtx(result_cache=cache)
+    session.config.memory_store_path = None
+    session.config.episodes_path = None
+    session.config.induction_rules_path = None
+    return session
+
+
+def _signature(outcome, session):
+    return (
+        outcome.answer,
+        outcome.trace.digest,
+        outcome.trace.steps,
+        outcome.equation_digest,
+        outcome.halt_reason,
+        len(session.meta_buffer),
+        session.last_equation_stats.equation_digest,
+    )
+
+
+def test_cache_hit_matches_uncached_run():
+    cache = OutcomeCache()
+    first_session = _session(cache)
+    first = run_text_full("O carro tem roda", first_session)
+    assert first.trace.cache["status"] == "miss"
+    second_session = _session(cache)
+    second = run_text_full("O carro tem roda", second_session)
+    assert second.trace.cache["status"] == "hit:memory"
+    assert second.trace.cache["hits"] == 1
+    plain_session = _session()
+    plain = run_text_full("O carro tem roda", plain_session)
+    assert plain.trace.cache is None
+    assert _signature(second, second_session) == _signature(plain, plain_session)
+    assert second.isr is not first.isr
+
+
+def test_key_changes_with_session_state_and_config():
+    session = _session()
+    base = outcome_cache_key("2+2", session)
+    assert outcome_cache_key("2+2", _session()) == base
+    assert outcome_cache_key("2 + 2", session) != base
+    session.config.max_steps = 8
+    assert outcome_cache_key("2+2", session) != base
+    stateful = _session()
+    run_text_full("oi", stateful)
+    assert outcome_cache_key("2+2", stateful) != base
+
+
+def test_stateful_session_advances_like_uncached():
+    cache = OutcomeCache()
+    cached_session = _session(cache)
+    plain_session = _session()
+    for text in ("oi", "oi", "2+2"):
+        cached = run_text_full(text, cached_session)
+        plain = run_text_full(text, plain_session)
+        assert _signature(cached, cached_session) == _signature(plain, plain_session)
+
+
+def test_disk_tier_survives_new_cache(tmp_path):
+    run_text_full("2+2", _session(OutcomeCache(disk_path=tmp_path)))
+    reloaded = OutcomeCache(disk_path=tmp_path)
+    outcome = run_text_full("2+2", _session(reloaded))
+    assert outcome.trace.cache["status"] == "hit:disk"
+    assert reloaded.stats.disk_hits == 1
+
+
+def test_lru_evicts_oldest_entry():
+    cache = OutcomeCache(max_entries=1)
+    run_text_full("oi", _session(cache))
+    run_text_full("2+2", _session(cache))
+    assert len(cache) == 1
+    assert cache.stats.evictions == 1
+    assert run_text_full("oi", _session(cache)).trace.cache["status"] == "miss"
+
+
+def test_cli_cache_dir_keeps_output(tmp_path, capsys):
+    argv = ["O carro tem roda", "--format", "json", "--no-server"]
+    nsr_cli.main(argv)
+    plain = capsys.readouterr().out.strip()
+    for _ in range(2):
+        nsr_cli.main(argv + ["--cache-dir", str(tmp_path)])
+        assert capsys.readouterr().out.strip() == plain
+    assert list(tmp_path.glob("*.pkl"))
+    assert json.loads(plain)["answer"]
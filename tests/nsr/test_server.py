@@ -0,0 +1,84 @@
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+
+import pytest
+
+import nsr.cli as nsr_cli
+from nsr.server import NSRServer, request_cli_output, send_request, serve_stdio, serve_unix
+
+
+def _cli_output(argv, capsys):
+    assert nsr_cli.main(argv + ["--no-server"]) == 0
+    return capsys.readouterr().out.strip().splitlines()[-1]
+
+
+def test_stdio_run_matches_cli_output(capsys):
+    argv = ["O carro tem roda", "--format", "json", "--include-meta"]
+    expected = _cli_output(argv, capsys)
+    server = NSRServer()
+    stdin = io.StringIO(json.dumps({"id": 7, "op": "run", "argv": argv}) + "\n")
+    stdout = io.StringIO()
+    serve_stdio(server, stdin, stdout)
+    reply = json.loads(stdout.getvalue())
+    assert reply["id"] == 7
+    assert reply["ok"] is True
+    assert reply["output"] == expected
+
+
+def test_named_sessions_are_kept_and_evicted():
+    server = NSRServer(max_sessions=2)
+    for name in ("a", "b", "a", "c"):
+        assert server.handle({"op": "run", "text": "oi", "session": name})["ok"]
+    assert server.session_names == ["a", "c"]
+    assert server.handle({"op": "reset", "session": "a"})["reset"] is True
+    assert server.handle({"op": "sessions"})["sessions"] == ["c"]
+
+
+def test_request_flags_do_not_leak_into_named_session():
+    server = NSRServer()
+    reply = server.handle(
+        {"op": "run", "argv": ["oi", "--max-steps", "3", "--disable-contradictions"], "session": "bot"}
+    )
+    assert reply["ok"]
+    session = server._session("bot")
+    assert session.config.max_steps == 32
+    assert session.config.enable_contradiction_check is True
+    assert session.result_cache is None
+
+
+def test_errors_are_reported_in_payload():
+    server = NSRServer()
+    assert server.handle({"op": "nope"})["ok"] is False
+    reply = json.loads(server.handle_line("{not json"))
+    assert reply["ok"] is False
+    failed = server.handle({"op": "run", "argv": ["Um carro existe", "--expect-meta-digest", "abc"]})
+    assert failed["ok"] is False
+    assert "meta_digest divergente" in failed["error"]
+
+
+def test_client_returns_none_without_server(tmp_path):
+    assert request_cli_output(["oi"], path=tmp_path / "missing.sock") is None
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="requer sockets Unix")
+def test_unix_socket_client_roundtrip(capsys):
+    argv = ["2 + 2", "--format", "json"]
+    expected = _cli_output(argv, capsys)
+    path = os.path.join(tempfile.mkdtemp(prefix="nsr"), "s.sock")
+    thread = threading.Thread(target=serve_unix, args=(NSRServer(), path), daemon=True)
+    thread.start()
+    for _ in range(200):
+        if os.path.exists(path):
+            break
+        time.sleep(0.01)
+    try:
+        assert request_cli_output(argv + ["--output", "ignored.json"], path=path) == expected
+    finally:
+        assert send_request({"op": "shutdown"}, path=path)["ok"]
+        thread.join(timeout=5)
+    assert not os.path.exists(path)
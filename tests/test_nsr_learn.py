@@ -17,6 +17,7 @@ from nsr_learn.graph import CooccurrenceGraph, GraphNode, GraphEdge
 from nsr_learn.inductor import RuleInductor, SymbolicRule, RuleSet, Condition
 from nsr_learn.memory import AssociativeMemory, MemoryTrace, RetrievalResult
 from nsr_learn.engine import LearningEngine, LearningConfig, tokenize
+from nsr_learn.persistence import StateArchive
 
 
 # =============================================================================
@@ -57,6 +58,67 @@ class TestMDLCompressor:
         
         assert result1.compression_ratio == result2.compression_ratio
     
+    def test_incremental_learning_matches_naive_bpe(self):
+        """Contagem incremental de pares reproduz o BPE ingênuo (recontagem completa)."""
+        import random
+        from collections import Counter
+
+        from nsr_learn.compressor import Pattern
+
+        def naive_learn(compressor, corpus):
+            sequence = [tok for seq in corpus for tok in list(seq) + ["<SEP>"]]
+            original_bits = compressor._compute_bits(sequence)
+            patterns = []
+            for _ in range(compressor.max_dictionary_size):
+                pairs = Counter(
+                    pair for pair in zip(sequence, sequence[1:]) if "<SEP>" not in pair
+                )
+                if not pairs:
+                    break
+                best, freq = pairs.most_common(1)[0]
+                if freq < compressor.min_pattern_freq:
+                    break
+                old_bits = compressor._compute_bits(sequence)
+                symbol = compressor._new_symbol()
+                sequence = compressor._substitute(sequence, best, symbol)
+                compressor.dictionary.add(symbol, best, freq)
+                savings = old_bits - (
+                    compressor._compute_bits(sequence)
+                    + compressor.dictionary.size_in_bits() / (len(patterns) + 1)
+                    + 1
+                )
+                if savings <= 0:
+                    compressor.dictionary.entries.pop(symbol)
+                    compressor.dictionary.frequencies.pop(symbol)
+                    break
+                patterns.append(Pattern(best, freq, savings))
+            for n in range(3, min(compressor.max_pattern_length + 1, len(sequence) // 2 + 1)):
+                grams = Counter(
+                    tuple(sequence[i:i + n]) for i in range(len(sequence) - n + 1)
+                    if "<SEP>" not in sequence[i:i + n]
+                )
+                for gram, count in grams.items():
+                    savings = count * (sum(len(t) * 5.0 for t in gram) - len(f"N{n}") * 5.0)
+                    if count >= compressor.min_pattern_freq and savings > 0:
+                        patterns.append(Pattern(gram, count, savings))
+            compressed_bits = compressor._compute_bits(sequence)
+            return original_bits, compressed_bits, sorted(patterns, key=lambda p: -p.savings)
+
+        for seed in range(40):
+            rng = random.Random(seed)
+            vocab = [f"w{i}" for i in range(rng.randint(2, 8))]
+            corpus = [[rng.choice(vocab) for _ in range(rng.randint(0, 14))] for _ in range(rng.randint(1, 10))]
+            fast = MDLCompressor(min_pattern_freq=rng.choice([1, 2, 3]), max_pattern_length=rng.choice([4, 16]))
+            slow = MDLCompressor(min_pattern_freq=fast.min_pattern_freq, max_pattern_length=fast.max_pattern_length)
+
+            result = fast.learn(corpus)
+            original_bits, compressed_bits, patterns = naive_learn(slow, corpus)
+
+            assert fast.dictionary.entries == slow.dictionary.entries
+            assert fast.dictionary.frequencies == slow.dictionary.frequencies
+            assert (result.original_bits, result.compressed_bits) == (original_bits, compressed_bits)
+            assert list(result.patterns) == patterns
+    
     def test_similarity_via_compression(self):
         """Testa similaridade baseada em NCD."""
         compressor = MDLCompressor()
@@ -123,6 +185,100 @@ class TestCooccurrenceGraph:
         sim = graph.similarity("gato", "cachorro")
         assert sim > 0, "Devem ter alguma similaridade"
 
+    def test_adjacency_index_matches_pair_scan(self):
+        """Consultas via índice de adjacência coincidem com a varredura de pares."""
+        import math
+        import random
+        from collections import defaultdict
+        from heapq import nlargest
+
+        rng = random.Random(7)
+        vocab = [f"t{i}" for i in range(25)]
+        docs = [[rng.choice(vocab) for _ in range(rng.randint(2, 12))] for _ in range(80)]
+
+        graph = CooccurrenceGraph()
+        graph.add_corpus(docs, window_size=3)
+
+        # Referência: contagens por frozenset na ordem de inserção original
+        pairs = defaultdict(int)
+        total_windows = 0
+        for doc in docs:
+            for i, center in enumerate(doc):
+                for j in range(max(0, i - 3), min(len(doc), i + 4)):
+                    if i != j:
+                        pairs[frozenset([center, doc[j]])] += 1
+                total_windows += 1
+
+        def ref_ppmi(a, b):
+            cooc = pairs.get(frozenset([a, b]), 0)
+            if cooc == 0:
+                return 0.0
+            p1 = graph.token_counts[a] / graph.total_tokens
+            p2 = graph.token_counts[b] / graph.total_tokens
+            return max(0.0, math.log2((cooc / total_windows) / (p1 * p2)))
+
+        def ref_neighbors(token, top_k, min_cooc):
+            candidates = []
+            for pair, count in pairs.items():
+                if count < min_cooc or token not in pair or len(pair) != 2:
+                    continue
+                (other,) = pair - {token}
+                score = ref_ppmi(token, other)
+                if score > 0:
+                    candidates.append((other, score))
+            return nlargest(top_k, candidates, key=lambda x: x[1])
+
+        assert graph.cooc_counts == dict(pairs)
+        assert graph.stats()["total_edges"] == len(pairs)
+        for token in vocab:
+            for top_k, min_cooc in ((10, 2), (50, 1), (3, 1)):
+                assert graph.neighbors(token, top_k, min_cooc) == ref_neighbors(token, top_k, min_cooc)
+
+        centrality = defaultdict(float)
+        for pair in pairs:
+            if len(pair) == 2:
+                a, b = list(pair)
+                centrality[a] += ref_ppmi(a, b)
+                centrality[b] += ref_ppmi(a, b)
+        assert graph.most_central(10) == nlargest(10, centrality.items(), key=lambda x: x[1])
+
+    def test_merge_matches_sequential_ingestion(self):
+        """Reduzir grafos parciais em ordem equivale a adicionar tudo em sequência."""
+        import random
+
+        rng = random.Random(13)
+        vocab = [f"t{i}" for i in range(15)]
+        docs = [[rng.choice(vocab) for _ in range(rng.randint(1, 9))] for _ in range(50)]
+
+        sequential = CooccurrenceGraph()
+        sequential.add_corpus(docs, window_size=2)
+        merged = CooccurrenceGraph()
+        for start in range(0, len(docs), 7):
+            partial = CooccurrenceGraph()
+            partial.add_corpus(docs[start:start + 7], window_size=2)
+            merged.merge(partial)
+
+        # Compara também a ordem de inserção de cada linha CSR
+        for graph in (merged, sequential):
+            graph._compact()
+        for attr in ("_adjacency", "_directed"):
+            for buffer in ("indptr", "indices", "data"):
+                assert getattr(getattr(merged, attr), buffer) == getattr(getattr(sequential, attr), buffer)
+        for attr in ("_vocab", "_row_versions", "_linked"):
+            assert list(getattr(merged, attr)) == list(getattr(sequential, attr))
+        assert merged.generation == sequential.generation
+        assert merged.stats() == sequential.stats()
+        assert list(merged.token_counts.items()) == list(sequential.token_counts.items())
+
+    def test_repeated_token_is_not_its_own_neighbor(self):
+        """Token repetido na janela não vira vizinho de si mesmo."""
+        graph = CooccurrenceGraph()
+        for _ in range(3):
+            graph.add_document(["a", "b", "a", "c"])
+
+        assert graph.cooc_count("a", "a") > 0
+        assert "a" not in [n for n, _ in graph.neighbors("a", min_cooc=1)]
+
 
 # =============================================================================
 # TESTES DO INDUTOR DE REGRAS
@@ -144,7 +300,30 @@ class TestRuleInductor:
         rules = inductor.induce_from_sequences(sequences)
         
         assert len(rules) > 0, "Deveria induzir alguma regra"
-    
+
+    def test_rule_metrics_match_example_counts(self):
+        """Suporte, confiança e lift minerados batem com a contagem direta."""
+        import random
+
+        rng = random.Random(3)
+        facts = [Condition(pred, (f"{pred}{i}",)) for pred in ("p", "q") for i in range(6)]
+        examples = [rng.sample(facts, rng.randint(1, 6)) for _ in range(40)]
+        sets = [set(ex) for ex in examples]
+
+        inductor = RuleInductor(min_support=3, min_confidence=0.4, max_rules=10_000)
+        rules = inductor.induce_from_facts(examples)
+
+        assert any(len(rule.antecedents) == 2 for rule in rules)
+        assert [str(r) for r in rules] == [str(r) for r in inductor.induce_from_facts(examples)]
+        for rule in rules:
+            covered = [ex for ex in sets if all(ant in ex for ant in rule.antecedents)]
+            both = sum(1 for ex in covered if rule.consequent in ex)
+            p_cons = sum(1 for ex in sets if rule.consequent in ex) / len(sets)
+
+            assert rule.support == both >= 3
+            assert rule.confidence == both / len(covered) >= 0.4
+            assert rule.lift == rule.confidence / p_cons
+
     def test_rule_application(self):
         """Verifica que regras podem ser aplicadas."""
         # Cria regra manualmente
@@ -234,6 +413,92 @@ class TestAssociativeMemory:
         assert len(results1) >= 1
         assert len(results2) >= 1
 
+    def test_indexed_store_matches_linear_scan(self):
+        """Índice exato e heap de forças reproduzem a varredura linear."""
+        import random
+
+        def linear_find(memory, key, value):
+            for trace_id, trace in memory.traces.items():
+                if trace.key == key and trace.value == value:
+                    return trace_id
+            return None
+
+        rng = random.Random(4)
+        memory = AssociativeMemory(max_traces=6, decay_rate=0.5)
+        values = [1, 1.0, "1", {"n": 2}, [2], None]
+        for _ in range(300):
+            key = tuple(rng.choice(["a", "b", "ab"]) for _ in range(rng.randint(1, 2)))
+            value = rng.choice(values)
+            assert memory._find_exact_match(key, value) == linear_find(memory, key, value)
+            if len(memory) >= memory.max_traces and linear_find(memory, key, value) is None:
+                weakest = min(memory.traces, key=lambda tid: memory.traces[tid].strength)
+                memory.store(key, value, strength=rng.choice([0.5, 1.0, 2.0]))
+                assert weakest not in memory.traces or memory.traces[weakest].key == key
+            else:
+                memory.store(key, value, strength=rng.choice([0.5, 1.0, 2.0]))
+            if rng.random() < 0.05:
+                memory.decay_all()
+            assert len(memory) <= memory.max_traces
+
+    def test_store_many_equals_sequential_store(self):
+        """`store_many` equivale a `store` item a item."""
+        items = [(("a", "b"), "x"), (("b",), "y", ("ctx",)), (("a", "b"), "x", (), 3.0), (("c",), {"k": 1})]
+        batched = AssociativeMemory(max_traces=3)
+        sequential = AssociativeMemory(max_traces=3)
+
+        batched.store_many(items, strength=0.7)
+        sequential.store(("a", "b"), "x", strength=0.7)
+        sequential.store(("b",), "y", ("ctx",), strength=0.7)
+        sequential.store(("a", "b"), "x", strength=3.0)
+        sequential.store(("c",), {"k": 1}, strength=0.7)
+
+        assert list(batched.traces.items()) == list(sequential.traces.items())
+        with pytest.raises(ValueError):
+            batched.store_many([(("a",),)])
+
+    def test_lazy_decay_applies_on_read_and_forgets_weakest(self):
+        """Decaimento preguiçoso: forças reais na leitura, fracas removidas."""
+        memory = AssociativeMemory(decay_rate=0.5)
+        memory.store(("forte",), "a", strength=1.0)
+        memory.store(("fraca",), "b", strength=0.03)
+
+        assert memory.decay_all() == 0
+        assert memory.retrieve(["forte"], top_k=1)[0].trace.strength == 0.5
+        assert memory.decay_all() == 1  # 0.03 * 0.25 < 0.01
+        assert [trace.key for trace in memory.traces.values()] == [("forte",)]
+        assert memory.stats()["avg_strength"] == 0.25
+
+        # Reforço e nova memória partem da força real atual
+        assert memory.store(("forte",), "a").strength == 0.375
+        memory.store(("nova",), "c", strength=1.0)
+        memory.decay_all()
+        assert [r.trace.strength for r in memory.retrieve(["forte", "nova"], top_k=2, min_match=0.1)] == [0.5, 0.1875]
+
+    def test_top_k_retrieval_matches_exhaustive_scoring(self):
+        """A poda MaxScore devolve exatamente o top-k da pontuação exaustiva."""
+        import copy
+        import random
+
+        rng = random.Random(11)
+        vocab = [f"t{i}" for i in range(12)]
+        memory = AssociativeMemory(max_traces=80, decay_rate=0.8)
+        for step in range(400):
+            key = [rng.choice(vocab) for _ in range(rng.randint(1, 4))]
+            memory.store(key, rng.randint(0, 20), [rng.choice(vocab)], strength=rng.choice([0.5, 1.0, 2.0]))
+            if step % 50 == 49:
+                memory.decay_all()
+            if step % 7 == 0:
+                query = [rng.choice(vocab) for _ in range(rng.randint(1, 4))]
+                context = [rng.choice(vocab)]
+                top_k = rng.choice([1, 3, 10])
+                expected = copy.deepcopy(memory)._score_all(set(query), set(context), context, 0.2)[:top_k]
+                results = memory.retrieve(query, context, top_k=top_k, min_match=0.2)
+                assert [(r.trace.id, r.relevance) for r in results] == [
+                    (trace_id, r.relevance) for trace_id, r in expected
+                ]
+        assert set(memory.token_index) <= set(vocab)
+        assert all(ids <= set(memory.traces) for ids in memory.token_index.values())
+
 
 # =============================================================================
 # TESTES DO MOTOR DE APRENDIZADO
@@ -258,6 +523,99 @@ class TestLearningEngine:
         assert result["documents"] == 3
         assert result["vocabulary_size"] > 0
     
+    def test_learn_stream_matches_learn(self, tmp_path):
+        """Ingestão em fatias reproduz vocabulário, grafo e regras de `learn`."""
+        corpus = [
+            "O gato dorme no sofá.",
+            "O cachorro dorme no chão.",
+            "O gato come ração.",
+            "O cachorro come osso no quintal.",
+            "A menina brinca com o gato.",
+            "O menino brinca com o cachorro no quintal.",
+            "O gato dorme no chão.",
+        ]
+        reference = LearningEngine()
+        reference.learn(corpus)
+
+        corpus_file = tmp_path / "corpus.jsonl"
+        corpus_file.write_text(
+            "\n".join('{"text": "%s"}' % doc for doc in corpus) + "\n",
+            encoding="utf-8",
+        )
+        progress = []
+        for source, workers in ((iter(corpus), 0), (corpus_file, 2)):
+            streamed = LearningEngine()
+            result = streamed.learn_stream(source, workers=workers, chunk_size=2, progress=progress.append)
+
+            assert result["documents"] == len(corpus)
+            assert result["tokens"] == reference.state.tokens_seen
+            assert streamed.state.vocabulary == reference.state.vocabulary
+            assert [str(rule) for rule in streamed.state.rules] == [str(rule) for rule in reference.state.rules]
+            assert streamed.state.graph.cooc_counts == reference.state.graph.cooc_counts
+            assert streamed.state.graph.directed_counts == reference.state.graph.directed_counts
+            assert streamed.state.graph.stats() == reference.state.graph.stats()
+            assert streamed.state.graph.neighbors("gato", min_cooc=1) == reference.state.graph.neighbors("gato", min_cooc=1)
+            assert streamed.state.graph.most_central(5) == reference.state.graph.most_central(5)
+        assert progress[-1].documents == len(corpus)
+        assert progress[-1].shards == 4
+
+        # Corpus repetido em fatias: padrões reaproveitam símbolos e o dicionário fica limitado
+        streamed = LearningEngine(LearningConfig(max_dictionary_size=8))
+        result = streamed.learn_stream(corpus * 40, chunk_size=140)
+        patterns = [pattern for _, pattern, _ in streamed.state.compressor.get_patterns()]
+        assert 0 < len(patterns) <= 8
+        assert len(set(patterns)) == len(patterns)
+        assert result["patterns_found"] > 0
+        assert any(
+            isinstance(trace.value, dict) and trace.value.get("type") == "pattern"
+            for trace in streamed.state.memory.traces.values()
+        )
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        """`load` restaura todos os componentes salvos por `save`."""
+        engine = LearningEngine()
+        engine.learn([
+            "O gato dorme no sofá.",
+            "O cachorro dorme no chão.",
+            "O gato come ração no chão.",
+        ])
+        engine.learn_pair("Quem dorme no sofá?", "O gato dorme no sofá.")
+        engine.save(tmp_path)
+
+        lazy = LearningEngine.load(tmp_path)
+        assert set(lazy.state._pending) == {"vocabulary", "graph", "memory", "compressor", "inductor", "rules"}
+        assert lazy.state.graph.neighbors("gato", min_cooc=1) == engine.state.graph.neighbors("gato", min_cooc=1)
+        assert "memory" in lazy.state._pending
+
+        loaded = LearningEngine.load(tmp_path, lazy=False)
+        original, restored = engine.state, loaded.state
+        assert restored.digest() == original.digest()
+        assert restored.vocabulary == original.vocabulary
+        assert restored.graph.directed_counts == original.graph.directed_counts
+        assert restored.graph.most_central(5) == original.graph.most_central(5)
+        assert list(restored.memory.traces.items()) == list(original.memory.traces.items())
+        assert restored.rules.rules == original.rules.rules
+        assert list(restored.compressor.get_patterns()) == list(original.compressor.get_patterns())
+        assert loaded.query("Quem dorme no sofá?").response == engine.query("Quem dorme no sofá?").response
+
+        archive = StateArchive(tmp_path / "state.nsrl")
+        assert archive.matrix().most_central(5) == original.graph.most_central(5)
+
+    def test_load_rejects_corrupted_state(self, tmp_path):
+        """Checksum e digest protegem o contêiner salvo."""
+        engine = LearningEngine()
+        engine.learn(["O gato dorme no sofá.", "O cachorro dorme no chão."])
+        engine.save(tmp_path)
+        state_file = tmp_path / "state.nsrl"
+        payload = bytearray(state_file.read_bytes())
+        payload[-1] ^= 0xFF
+        state_file.write_bytes(bytes(payload))
+
+        with pytest.raises(ValueError):
+            LearningEngine.load(tmp_path, lazy=False)
+        with pytest.raises(ValueError):
+            LearningEngine.load(tmp_path / "vocabulary.txt")
+
     def test_query_after_learning(self):
         """Verifica que responde queries após aprender."""
         engine = LearningEngine()
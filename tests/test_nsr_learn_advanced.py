@@ -68,6 +68,49 @@ class TestAnalogy:
         assert analogy is not None
         assert "x" in analogy.mapping.entity_map
         assert "rel" in analogy.mapping.relation_map
+    
+    def test_mapping_follows_structure(self):
+        """Testa que o mapeamento guloso segue a estrutura, não a ordem dos predicados."""
+        from nsr_learn.analogy import AnalogyEngine, TEACHER_STUDENT, DOCTOR_PATIENT
+        
+        engine = AnalogyEngine()
+        analogy = engine.find_analogy(TEACHER_STUDENT, DOCTOR_PATIENT)
+        
+        assert analogy is not None
+        assert analogy.mapping.entity_map == {"professor": "medico", "aluno": "paciente"}
+        assert analogy.mapping.relation_map["mais_experiente"] == "mais_experiente"
+        assert analogy.mapping.relation_map["aprende"] == "recebe_tratamento"
+        assert analogy.confidence == 1.0
+    
+    def test_signature_index_and_bounded_caches(self):
+        """Testa o ranking pelo índice de assinaturas e os caches limitados."""
+        from nsr_learn.analogy import AnalogyEngine, Structure, SOLAR_SYSTEM, ATOM, TEACHER_STUDENT
+        
+        engine = AnalogyEngine(cache_size=2, max_analogies=3)
+        for structure in (SOLAR_SYSTEM, TEACHER_STUDENT, ATOM):
+            engine.register_structure(structure)
+        
+        similar = engine.find_similar_domain(ATOM)
+        assert [(s.name, score) for s, score in similar] == [("sistema_solar", 1.0)]
+        assert len(engine.find_similar_domain(ATOM, min_score=0.0)) == 2
+        
+        # Re-registro atualiza o índice
+        engine.register_structure(Structure.from_facts("sistema_solar", [("ensina", "a", "b")]))
+        assert [s.name for s, _ in engine.find_similar_domain(ATOM, min_score=0.0)] == [
+            "sistema_solar",
+            "professor_aluno",
+        ]
+        assert engine.find_similar_domain(ATOM) == []
+        
+        # Sem predicado de mesma aridade no alvo, a assinatura descarta a analogia
+        unary = Structure.from_facts("unario", [("centro", "x")])
+        assert engine.find_analogy(TEACHER_STUDENT, unary) is None
+        
+        for _ in range(5):
+            assert engine.find_analogy(SOLAR_SYSTEM, ATOM) is not None
+            assert engine.find_analogy(ATOM, SOLAR_SYSTEM) is not None
+        assert len(engine.known_analogies) == 3
+        assert len(engine._mapping_cache) <= 2
 
 
 # ==================== TESTES DE RACIOCÍNIO ====================
@@ -246,7 +289,54 @@ class TestAttention:
         for score in scores:
             assert AttentionFactor.RELEVANCE in score.factors
             assert AttentionFactor.SALIENCE in score.factors
-    
+
+    def test_batch_attention_matches_per_item_computers(self):
+        """Testa que o modo em lote reproduz os computadores item a item."""
+        from nsr_learn.attention import (
+            AttentionContext,
+            AttentionFactor,
+            SymbolicAttention,
+            _np,
+        )
+
+        corpus = [
+            ["o", "Gato", "causa", "medo", "no", "cachorro"],
+            ["o", "cachorro", "corre", "no", "parque"],
+            ["o", "gato", "dorme", "no", "sofá"],
+        ]
+        attention = SymbolicAttention()
+        attention.learn_corpus(corpus)
+
+        items = ["o", "Gato", "corre", "no", "parque", "gato", "novo", "o", "Gato"]
+        context = AttentionContext(query="gato corre", history=["no", "o", "no"], focus_items={"parque"})
+
+        scores = attention.attend(items, context)
+        max_freq = 3
+        expected = []
+        for i, item in enumerate(items):
+            factors = {
+                AttentionFactor.SALIENCE: attention.salience.compute(item, items),
+                AttentionFactor.RELEVANCE: attention.relevance.compute(context.query, item),
+                AttentionFactor.RECENCY: context.get_recency(item),
+                AttentionFactor.FREQUENCY: sum(1 for x in items if x.lower() == item.lower()) / max_freq,
+                AttentionFactor.SURPRISE: attention.surprise.compute(item, items[i - 1] if i else None),
+                AttentionFactor.POSITION: 1.0 - i / len(items),
+            }
+            if item in context.focus_items:
+                factors = {f: min(1.0, v * 1.5) for f, v in factors.items()}
+            total = sum(factors[f] * attention.factor_weights[f] for f in AttentionFactor)
+            expected.append((item, total, factors))
+        expected.sort(key=lambda entry: entry[1], reverse=True)
+
+        assert [(s.item, s.total_score, s.factors) for s in scores] == expected
+        assert [s.item for s in attention.attend(items, context, top_k=3)] == [e[0] for e in expected[:3]]
+
+        if _np is not None:
+            vectorized = attention.attend(items, context, backend="numpy")
+            assert [(s.item, s.total_score, s.factors) for s in vectorized] == expected
+        with pytest.raises(ValueError):
+            attention.attend(items, context, backend="gpu")
+
     def test_multi_head_attention(self):
         """Testa atenção multi-head."""
         from nsr_learn.attention import MultiHeadSymbolicAttention, AttentionContext
@@ -317,6 +407,204 @@ class TestGenerator:
         assert len(completion.split()) >= 2
 
 
+# ==================== TESTES DE SÍNTESE DE PROGRAMAS ====================
+
+class TestProgramSynthesis:
+    """Testes para a síntese de programas."""
+
+    def test_synthesizes_nested_programs(self):
+        """Testa que a busca bottom-up vai além de uma única operação."""
+        from nsr_learn.program_synthesis import ProgramSynthesizer
+
+        synth = ProgramSynthesizer()
+
+        program = synth.synthesize_transformation([("abc", "CBA"), ("hey", "YEH")])
+        assert program is not None and program.accuracy == 1.0
+        assert synth.apply(program, "nsr") == "RSN"
+
+        program = synth.synthesize_numeric([(1, 3), (2, 5), (4, 9), (8, 17)])
+        assert program is not None and program.accuracy == 1.0
+        assert synth.apply(program, 10) == 21
+
+    def test_candidates_are_observationally_distinct(self):
+        """Testa que só um programa por assinatura de saídas é mantido."""
+        from nsr_learn.program_synthesis import ProgramSynthesizer, SynthesisExample
+
+        synth = ProgramSynthesizer(max_candidates=500)
+        examples = [SynthesisExample(inputs=(x,), output=x * 3) for x in (1, 2, 5)]
+
+        signatures = []
+        sizes = []
+        for expr in synth._generate_candidates(7, 1, examples):
+            outputs = tuple(
+                synth.evaluator.evaluate(expr, {0: ex.inputs[0]}) for ex in examples
+            )
+            signatures.append(tuple((type(v), v) for v in outputs))
+            sizes.append(expr.size)
+
+        assert len(signatures) == len(set(signatures))
+        assert sizes == sorted(sizes)
+        assert max(sizes) > 5  # além de op(átomo, átomo)
+
+
+# ==================== TESTES DO MODELO DE MUNDO ====================
+
+class TestWorldModel:
+    """Testes para o modelo de mundo discreto."""
+
+    @staticmethod
+    def _towers(n: int):
+        """n blocos em pares: b0 sobre b1, b2 sobre b3, ..."""
+        from nsr_learn.world_model import Fluent, State
+
+        blocks = [f"b{i}" for i in range(n)]
+        fluents = {Fluent("arm_empty", ())}
+        for top, bottom in zip(blocks[::2], blocks[1::2]):
+            fluents |= {
+                Fluent("on", (top, bottom)),
+                Fluent("on_table", (bottom,)),
+                Fluent("clear", (top,)),
+            }
+        return blocks, State(frozenset(fluents))
+
+    def test_grounding_returns_every_applicable_action(self):
+        """Testa que a instanciação não perde ações (antes truncava em 100)."""
+        from nsr_learn.world_model import create_blocks_world
+
+        model = create_blocks_world()
+        blocks, state = self._towers(20)
+
+        actions = model.get_applicable_actions(state)
+
+        assert sorted(a.name for a in actions) == sorted(
+            f"unstack({top}, {bottom})" for top, bottom in zip(blocks[::2], blocks[1::2])
+        )
+        assert all(a.is_applicable(state) for a in actions)
+
+    def test_typed_parameters_restrict_grounding(self):
+        """Testa que parâmetros tipados só recebem objetos do tipo."""
+        from nsr_learn.world_model import Action, Fluent, State, WorldModel
+
+        model = WorldModel()
+        model.add_object("r1", "robot")
+        for room in ("sala", "cozinha", "quarto"):
+            model.add_object(room, "room")
+        model.add_action_schema(Action(
+            name="move",
+            parameters=("?r", "?from", "?to"),
+            preconditions=frozenset([Fluent("at", ("?r", "?from"))]),
+            add_effects=frozenset([Fluent("at", ("?r", "?to"))]),
+            delete_effects=frozenset([Fluent("at", ("?r", "?from"))]),
+            parameter_types=("robot", "room", "room"),
+        ))
+        state = State(frozenset([Fluent("at", ("r1", "sala")), Fluent("at", ("caixa", "sala"))]))
+
+        names = [a.name for a in model.get_applicable_actions(state)]
+
+        assert names == [
+            "move(r1, sala, cozinha)",
+            "move(r1, sala, quarto)",
+            "move(r1, sala, sala)",
+        ]
+
+        # Mutações passam pelos métodos add_*, que invalidam o cache de instanciações
+        model.add_object("varanda", "room")
+        names = [a.name for a in model.get_applicable_actions(state)]
+        assert "move(r1, sala, varanda)" in names
+        with pytest.raises(TypeError):
+            model.objects["room"] = frozenset()
+        with pytest.raises(TypeError):
+            model.actions["move"] = None
+
+    def test_plan_reaches_goal(self):
+        """Testa planejamento no mundo de blocos."""
+        from nsr_learn.world_model import Fluent, create_blocks_world
+
+        model = create_blocks_world()
+        blocks, state = self._towers(4)
+        goal = frozenset([Fluent("on", ("b1", "b0")), Fluent("on", ("b3", "b2"))])
+
+        plan = model.plan(state, goal)
+
+        assert plan is not None
+        assert model.simulate(state, plan.actions)[-1].satisfies(goal)
+
+    def test_relaxed_heuristics_and_search_modes(self):
+        """Testa h_max/IDA* ótimos, FF/feixe válidos e o orçamento de nós."""
+        import pytest
+        from nsr_learn.world_model import Fluent, create_blocks_world
+
+        model = create_blocks_world()
+        blocks, state = self._towers(4)
+        goal = frozenset([Fluent("on", ("b0", "b2")), Fluent("on", ("b2", "b3"))])
+
+        optimal = model.plan(state, goal, heuristic="h_max")
+        ida = model.plan(state, goal, heuristic="h_max", search="ida")
+        assert optimal is not None and ida is not None
+        assert ida.length == optimal.length
+
+        for heuristic in ("h_add", "ff"):
+            for search in ("astar", "beam"):
+                plan = model.plan(state, goal, heuristic=heuristic, search=search)
+                assert plan is not None
+                assert model.simulate(state, plan.actions)[-1].satisfies(goal)
+                assert model.search_stats["heuristic"] == heuristic
+
+        assert model.plan(state, goal, heuristic="goal_count", max_nodes=1) is None
+        assert model.search_stats["expanded"] == 1
+        with pytest.raises(ValueError):
+            model.plan(state, goal, heuristic="landmarks")
+
+    def test_incremental_relaxed_costs_match_fresh_evaluation(self):
+        """Testa que atualizar os custos do estado anterior dá o mesmo valor que recalcular."""
+        import random
+        from nsr_learn.world_model import Fluent, RelaxedTask, create_blocks_world
+
+        model = create_blocks_world()
+        blocks, state = self._towers(6)
+        goal = frozenset([Fluent("on", ("b1", "b0")), Fluent("on", ("b0", "b4")), Fluent("on", ("b5", "b2"))])
+        actions = model._relaxed_actions(state)
+        incremental = RelaxedTask(actions, goal)
+
+        rng = random.Random(5)
+        states = [state]
+        for _ in range(40):
+            state = rng.choice(model.get_applicable_actions(state)).apply(state)
+            states.append(state)
+        rng.shuffle(states[20:])  # saltos entre estados não vizinhos
+
+        for state in states:
+            for heuristic in ("h_max", "h_add", "ff"):
+                expected = RelaxedTask(actions, goal).evaluate(state, heuristic)
+                assert incremental.evaluate(state, heuristic) == expected
+
+    def test_astar_reopens_states_reached_more_cheaply(self):
+        """Testa que A* reabre um estado expandido quando acha caminho mais barato."""
+        from nsr_learn.world_model import Action, Fluent, State, WorldModel
+
+        model = WorldModel()
+        for source, target, cost in (("s", "a", 1.0), ("s", "b", 3.0), ("a", "b", 1.0), ("b", "g", 5.0)):
+            model.add_action_schema(Action(
+                name=f"{source}_{target}",
+                parameters=(),
+                preconditions=frozenset([Fluent("at", (source,))]),
+                add_effects=frozenset([Fluent("at", (target,))]),
+                delete_effects=frozenset([Fluent("at", (source,))]),
+                cost=cost,
+            ))
+        # Admissível mas inconsistente: "b" sai da fila (via s_b) antes de "a"
+        estimates = {"a": 5.0}
+        model._heuristic_function = lambda initial, goal, heuristic: (
+            lambda state: sum(estimates.get(f.args[0], 0.0) for f in state.fluents)
+        )
+
+        plan = model.plan(State(frozenset([Fluent("at", ("s",))])), frozenset([Fluent("at", ("g",))]))
+
+        assert plan is not None
+        assert [a.name for a in plan.actions] == ["s_a", "a_b", "b_g"]
+        assert plan.cost == 7.0
+
+
 # ==================== TESTES DO MOTOR INTEGRADO ====================
 
 class TestAdvancedEngine:
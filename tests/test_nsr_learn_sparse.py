@@ -0,0 +1,111 @@
+"""
+Testes da matriz CSR de co-ocorrência (`nsr_learn.sparse`).
+"""
+
+import random
+
+import pytest
+
+from nsr_learn.graph import CooccurrenceGraph
+from nsr_learn.sparse import CooccurrenceMatrix, numpy_available
+
+
+def _corpus(seed: int, docs: int = 60):
+    rng = random.Random(seed)
+    vocab = [f"t{i}" for i in range(20)]
+    return vocab, [[rng.choice(vocab) for _ in range(rng.randint(2, 10))] for _ in range(docs)]
+
+
+def test_matrix_matches_graph_queries():
+    vocab, docs = _corpus(3)
+    graph = CooccurrenceGraph()
+    graph.add_corpus(docs, window_size=3)
+    matrix = graph.to_matrix()
+
+    for token in vocab:
+        assert matrix.row(token) == [
+            (other, graph.cooc_count(token, other)) for other, _ in matrix.row(token)
+        ]
+        for other, value in matrix.row_pmi(token):
+            assert value == graph.pmi(token, other)
+        for other, value in matrix.row_npmi(token):
+            assert value == graph.npmi(token, other)
+        for top_k, min_cooc in ((10, 2), (50, 1)):
+            assert matrix.neighbors(token, top_k, min_cooc) == graph.neighbors(token, top_k, min_cooc)
+
+    assert dict(matrix.most_central(50)) == dict(graph.most_central(50))
+    assert matrix.stats()["total_cooc"] == sum(graph.cooc_counts.values())
+
+
+def test_incremental_update_rebuilds_only_changed_rows():
+    _, docs = _corpus(5, docs=40)
+    graph = CooccurrenceGraph()
+    graph.add_corpus(docs[:30])
+    base = graph.to_matrix()
+
+    graph.add_document(["t1", "t2", "novo"])
+    assert set(graph.rows_changed_since(base.generation)) == {
+        graph._ids["t1"], graph._ids["t2"], graph._ids["novo"]
+    }
+    graph.add_corpus(docs[30:])
+
+    incremental = graph.to_matrix(previous=base)
+    fresh = CooccurrenceMatrix.from_graph(graph)
+    assert incremental == fresh
+    assert incremental.count("t1", "novo") == graph.cooc_count("t1", "novo")
+
+
+def test_unknown_backend_is_rejected():
+    graph = CooccurrenceGraph()
+    graph.add_document(["a", "b"])
+    with pytest.raises(ValueError):
+        graph.to_matrix(backend="gpu")
+
+
+@pytest.mark.skipif(not numpy_available(), reason="numpy não instalado")
+def test_numpy_backend_matches_counts_and_order():
+    vocab, docs = _corpus(11)
+    graph = CooccurrenceGraph()
+    graph.add_corpus(docs)
+    plain = graph.to_matrix()
+    vectorized = graph.to_matrix(backend="numpy")
+
+    for token in vocab:
+        assert vectorized.row(token) == plain.row(token)
+        expected = plain.neighbors(token, 10, 1)
+        got = vectorized.neighbors(token, 10, 1)
+        assert [other for other, _ in got] == [other for other, _ in expected]
+        assert [value for _, value in got] == pytest.approx([value for _, value in expected])
+    assert vectorized.centrality() == pytest.approx(plain.centrality())
+
+
+def test_matrix_shares_graph_buffers_and_survives_later_documents():
+    vocab, docs = _corpus(17)
+    graph = CooccurrenceGraph()
+    graph.add_corpus(docs[:30])
+    matrix = graph.to_matrix()
+    assert matrix.indices is graph._adjacency.indices
+    rows = [matrix.row(token) for token in vocab]
+
+    graph.add_corpus(docs[30:])
+    assert [matrix.row(token) for token in vocab] == rows
+    assert graph.to_matrix() == CooccurrenceMatrix.from_graph(graph)
+
+
+def test_compaction_threshold_does_not_change_counts_or_order(monkeypatch):
+    import nsr_learn.graph as graph_module
+
+    vocab, docs = _corpus(19)
+    lazy = CooccurrenceGraph()
+    lazy.add_corpus(docs)
+    monkeypatch.setattr(graph_module._CsrRows, "should_compact", lambda self: True)
+    eager = CooccurrenceGraph()
+    for doc in docs:
+        eager.add_document(doc)
+        assert not eager._adjacency.deltas
+
+    for token in vocab:
+        assert lazy.neighbors(token, 10, 1) == eager.neighbors(token, 10, 1)
+    assert lazy.to_matrix() == eager.to_matrix()
+    assert lazy.directed_counts == eager.directed_counts
+    assert lazy.stats() == eager.stats()